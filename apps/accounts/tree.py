@@ -0,0 +1,107 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\accounts\tree.py
+"""
+Chart of accounts tree with balances, in a fixed number of queries.
+
+load_account_tree() reads every account of a company once, in tree order
+(tree_id, lft), and the journal lines' debit/credit totals with one grouped
+aggregate. Subtotals are then rolled up the tree in memory: walking the accounts
+in reverse tree order visits every child before its parent, so each account's
+total is complete by the time it is added to its parent. The resulting balance
+is what Account.get_balance() returns, without a descendants query and an
+aggregate per account.
+"""
+from decimal import Decimal
+from django.db.models import Sum
+
+from apps.journal.models import JournalEntryLine
+from .models import Account, AccountType
+
+DEBIT_BALANCE_CATEGORIES = [AccountType.Category.ASSET, AccountType.Category.EXPENSE]
+
+def natural_balance(category, total_debit, total_credit):
+    """Same sign convention as Account.get_balance()"""
+    if category in DEBIT_BALANCE_CATEGORIES:
+        return total_debit - total_credit
+    return total_credit - total_debit
+
+def direct_totals(company, start_date=None, end_date=None):
+    """{account_id: (total_debit, total_credit)} of the lines posted to each account itself"""
+    lines = JournalEntryLine.objects.filter(account__company=company)
+    if start_date:
+        lines = lines.filter(journal_entry__date__gte=start_date)
+    if end_date:
+        lines = lines.filter(journal_entry__date__lte=end_date)
+    # SQLite sums decimals as floats; amounts are kept to the cent
+    cent = Decimal('0.01')
+    return {
+        row['account_id']: (row['total_debit'].quantize(cent), row['total_credit'].quantize(cent))
+        for row in lines.values('account_id').annotate(
+            total_debit=Sum('debit', default=Decimal('0.00')),
+            total_credit=Sum('credit', default=Decimal('0.00'))
+        ).order_by()
+    }
+
+def load_account_tree(company, start_date=None, end_date=None):
+    """
+    The company's accounts in tree order, each carrying:
+
+    - direct_debit / direct_credit: totals of its own lines
+    - total_debit / total_credit: the same over it and all its descendants
+    - balance: natural balance of the rolled up totals (see get_balance())
+    - has_lines / has_lines_below: whether it, or anything in its subtree, has lines
+
+    Two queries whatever the size of the chart.
+    """
+    totals = direct_totals(company, start_date, end_date)
+    accounts = list(
+        Account.objects.filter(company=company).select_related('account_type').order_by('tree_id', 'lft')
+    )
+    zero = Decimal('0.00')
+    by_id = {}
+    for account in accounts:
+        account.direct_debit, account.direct_credit = totals.get(account.id, (zero, zero))
+        account.has_lines = account.id in totals
+        account.total_debit = account.direct_debit
+        account.total_credit = account.direct_credit
+        account.has_lines_below = account.has_lines
+        by_id[account.id] = account
+
+    for account in reversed(accounts):
+        parent = by_id.get(account.parent_id)
+        if parent is not None:
+            parent.total_debit += account.total_debit
+            parent.total_credit += account.total_credit
+            parent.has_lines_below = parent.has_lines_below or account.has_lines_below
+        if parent is not None or account.parent_id is None:
+            # Serve the parent from memory so templates can walk up without queries
+            Account.parent.field.set_cached_value(account, parent)
+        account.balance = natural_balance(account.account_type.category, account.total_debit, account.total_credit)
+    return accounts
+
+def group_by_type(accounts, include=None):
+    """
+    {account type name: {'accounts': [...], 'total': Decimal}} in account type
+    order, accounts by number. A group's total is the sum of its top-level
+    accounts, as a parent's balance already includes its children. ``include``
+    optionally filters the listed accounts (totals still cover the whole tree).
+    """
+    groups = {}
+    for account in sorted(accounts, key=lambda account: (account.account_type_id, account.account_number)):
+        group = groups.get(account.account_type_id)
+        if group is None:
+            group = groups[account.account_type_id] = {
+                'name': account.account_type.name, 'accounts': [], 'total': Decimal('0.00'),
+            }
+        if account.parent_id is None:
+            group['total'] += account.balance
+        if include is None or include(account):
+            group['accounts'].append(account)
+
+    return {
+        group['name']: {'accounts': group['accounts'], 'total': group['total']}
+        for group in groups.values() if group['accounts']
+    }
+
+def chart_of_accounts(company, start_date=None, end_date=None, include=None):
+    """Grouped chart of accounts with balances: load_account_tree() + group_by_type()"""
+    return group_by_type(load_account_tree(company, start_date, end_date), include)
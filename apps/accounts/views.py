@@ -16,6 +16,7 @@ from apps.authentication.models import User
 from apps.journal.models import JournalEntryLine, JournalEntry
 from apps.accounts.models import Account, AccountType
 from apps.accounts.forms import AccountForm
+from apps.accounts.tree import chart_of_accounts, load_account_tree
 from django.db import transaction 
 from django.utils import timezone
 
@@ -27,33 +28,8 @@ def chart_of_accounts_list(request):
     including balances for each account and totals for each group.
     """
     company = request.user.company
-    grouped_accounts = {}
-    account_types = AccountType.objects.all()
-
-    for acc_type in account_types:
-        accounts_in_group = Account.objects.filter(
-            company=company, 
-            account_type=acc_type
-        ).order_by('account_number')
-        
-        if accounts_in_group.exists():
-            group_total = Decimal('0.00')
-            
-            # Calculate the balance for each account and attach it to the object
-            for account in accounts_in_group:
-                account.balance = account.get_balance()
-                
-                # To get the group total, we only sum the balances of top-level accounts
-                # (where parent is None). This avoids double-counting, as the balance of a 
-                # parent account already includes the balances of its children.
-                if account.parent is None:
-                    group_total += account.balance
-
-            # Store the list of accounts (with balances) and the calculated total for the group
-            grouped_accounts[acc_type.name] = {
-                'accounts': accounts_in_group,
-                'total': group_total
-            }
+    # Balances and group totals come from one pass over the account tree
+    grouped_accounts = chart_of_accounts(company)
 
     context = {
         'grouped_accounts': grouped_accounts,
@@ -164,34 +140,28 @@ def opening_balance_entry(request):
         total_debits = Decimal('0.00')
         total_credits = Decimal('0.00')
 
-        # Process each account from the form
+        # Process each account from the form; the accounts are loaded in one query
+        balances = {}
         for key, value in request.POST.items():
             if key.startswith('balance_') and value:
-                account_id = key.split('_')[1]
-                balance = Decimal(value)
-                
                 try:
-                    account = Account.objects.get(id=account_id, company=company)
-                    
-                    # Determine if the balance is a debit or credit
-                    if account.account_type.category in [AccountType.Category.ASSET, AccountType.Category.EXPENSE]:
-                        JournalEntryLine.objects.create(
-                            journal_entry=journal_entry,
-                            account=account,
-                            debit=balance,
-                            credit=0
-                        )
-                        total_debits += balance
-                    else: # Liability, Equity, Revenue
-                        JournalEntryLine.objects.create(
-                            journal_entry=journal_entry,
-                            account=account,
-                            debit=0,
-                            credit=balance
-                        )
-                        total_credits += balance
-                except (Account.DoesNotExist, ValueError):
+                    balances[int(key.split('_')[1])] = Decimal(value)
+                except (ValueError, ArithmeticError):
                     continue # Ignore invalid data
+        accounts = Account.objects.filter(company=company, id__in=balances).select_related('account_type')
+
+        lines = []
+        for account in accounts:
+            balance = balances[account.id]
+            # Determine if the balance is a debit or credit
+            if account.account_type.category in [AccountType.Category.ASSET, AccountType.Category.EXPENSE]:
+                lines.append(JournalEntryLine(journal_entry=journal_entry, account=account, debit=balance, credit=0))
+                total_debits += balance
+            else: # Liability, Equity, Revenue
+                lines.append(JournalEntryLine(journal_entry=journal_entry, account=account, debit=0, credit=balance))
+                total_credits += balance
+        # The entry's own save already bumped the ledger version in this transaction
+        JournalEntryLine.objects.bulk_create(lines)
 
         # Create the final balancing entry in Retained Earnings
         balancing_amount = total_debits - total_credits
@@ -213,19 +183,14 @@ def opening_balance_entry(request):
         messages.success(request, f"Opening balances saved successfully as Journal Entry #{journal_entry.id}.")
         return redirect('journal:journal-entry-detail', pk=journal_entry.pk)
 
-    # For GET request, prepare the accounts for the form
-    account_types = AccountType.objects.all()
-    grouped_accounts = {}
-    for acc_type in account_types:
-        # Exclude control accounts as their balances are derived from sub-ledgers
-        accounts_in_group = Account.objects.filter(
-            company=company, 
-            account_type=acc_type,
-            is_control_account=False 
-        ).order_by('account_number')
-        
-        if accounts_in_group.exists():
-            grouped_accounts[acc_type.name] = accounts_in_group
+    # For GET request, prepare the accounts for the form.
+    # Control accounts are excluded as their balances are derived from sub-ledgers
+    grouped_accounts = {
+        group_name: group['accounts']
+        for group_name, group in chart_of_accounts(
+            company, include=lambda account: not account.is_control_account
+        ).items()
+    }
 
     context = {
         'grouped_accounts': grouped_accounts,
@@ -242,7 +207,7 @@ def export_chart_of_accounts(request):
     if not company:
         return JsonResponse({'error': 'No company found'}, status=400)
     
-    accounts = Account.objects.filter(company=company).order_by('account_number')
+    accounts = sorted(load_account_tree(company), key=lambda account: account.account_number)
     
     headers = ['Account Number', 'Account Name', 'Account Type', 'Category', 'Current Balance', 'Is Active']
     data = []
@@ -253,7 +218,7 @@ def export_chart_of_accounts(request):
             account.name,
             account.account_type.name,
             account.account_type.get_category_display(),
-            account.get_balance(),
+            account.balance,
             'Yes' if account.is_active else 'No'
         ])
     
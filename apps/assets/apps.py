@@ -5,3 +5,7 @@ from django.apps import AppConfig
 class AssetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.assets'
+
+    def ready(self):
+        # Keeps the stored depreciation schedules in step with their assets
+        import apps.assets.signals
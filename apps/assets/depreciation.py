@@ -0,0 +1,412 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\assets\depreciation.py
+"""
+Depreciation engine.
+
+Every depreciable asset has a stored monthly schedule (DepreciationScheduleLine),
+computed once from its inputs and rebuilt only when those inputs or its posted
+entries change. Monthly posting then reads one period's lines for a whole
+company and writes the journal entries, their lines and the DepreciationEntry
+audit rows with bulk_create - optionally as one consolidated journal entry
+grouped by expense / accumulated depreciation account - instead of running the
+per-asset duplicate check and book value aggregates.
+
+Schedules run from the purchase month over useful_life_years * 12 months (six
+years for the MACRS table). Annual amounts follow the asset's method; declining
+balance methods switch to straight line once that gives more, so every schedule
+ends exactly at salvage value. Units of production is scheduled on an even
+production estimate but posted from units_produced_to_date. Months already
+posted keep their posted amounts; the first open month catches up any
+difference between what was posted and what the schedule expects by then.
+
+bulk_create() and queryset.update() send no signals, so the report cache and the
+journal counters are invalidated here explicitly, in the posting's transaction
+(see apps.core.versions).
+"""
+import calendar
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from decimal import Decimal
+from django.db import connections, router, transaction
+from django.db.models import Sum
+
+from apps.core.counters import JOURNAL_ENTRIES, bump_counters
+from apps.core.sqlite import immediate_atomic
+from apps.journal.models import JournalEntry, JournalEntryLine
+from apps.reporting.cache import bump_ledger_version
+from .models import Asset, DepreciationEntry, DepreciationScheduleLine
+
+Method = Asset.DepreciationMethod
+
+SCHEDULE_INPUTS = [
+    'purchase_date', 'purchase_price', 'salvage_value', 'depreciation_method',
+    'useful_life_years', 'estimated_total_units', 'units_produced_to_date',
+]
+
+DECLINING_RATES = {
+    Method.DECLINING_BALANCE: Decimal('2.0'),  # Kept as double declining, like calculate_annual_depreciation
+    Method.DOUBLE_DECLINING: Decimal('2.0'),
+    Method.DECLINING_BALANCE_150: Decimal('1.5'),
+}
+# Simplified 5-year property table (half-year convention spills into year 6)
+MACRS_RATES = [Decimal('0.20'), Decimal('0.32'), Decimal('0.192'), Decimal('0.1152'), Decimal('0.1152'), Decimal('0.0576')]
+
+BULK_BATCH_SIZE = 1000
+
+def month_end(day):
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+@lru_cache(maxsize=4096)
+def month_end_of(year, month):
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+def to_cents(amount):
+    """Amount in integer cents, as the schedules are computed"""
+    return int((Decimal(amount or 0) * 100).to_integral_value())
+
+def to_money(cents):
+    """Integer cents back to a two-place Decimal"""
+    return (Decimal(cents) / 100).quantize(Decimal('0.01'))
+
+def schedule_signature(asset):
+    raw = '|'.join(str(getattr(asset, field)) for field in SCHEDULE_INPUTS)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def schedule_years(method, useful_life_years):
+    if method == Method.NO_DEPRECIATION or not useful_life_years:
+        return 0
+    if method == Method.MACRS:
+        return len(MACRS_RATES)
+    return useful_life_years
+
+def annual_amounts(method, cost, salvage, useful_life_years):
+    """Depreciation per year of life, in cents, totalling cost - salvage"""
+    base = cost - salvage
+    years = schedule_years(method, useful_life_years)
+    if base <= 0 or years == 0:
+        return []
+
+    amounts = []
+    if method in (Method.STRAIGHT_LINE, Method.UNITS_OF_PRODUCTION):
+        # UOP: even production over the life is the best estimate ahead of actuals
+        amounts = [base * (year + 1) // years - base * year // years for year in range(years)]
+    elif method == Method.SUM_OF_YEARS:
+        total = years * (years + 1) // 2
+        taken = 0
+        for year in range(1, years + 1):
+            cumulative = base * sum(range(years, years - year, -1)) // total
+            amounts.append(cumulative - taken)
+            taken = cumulative
+    elif method in DECLINING_RATES:
+        rate = DECLINING_RATES[method] / Decimal(years)
+        book = cost
+        for year in range(years):
+            remaining = book - salvage
+            declining = int((Decimal(book) * rate).to_integral_value())
+            straight = remaining // (years - year)
+            amount = max(0, min(max(declining, straight), remaining))
+            amounts.append(amount)
+            book -= amount
+    elif method == Method.MACRS:
+        for rate in MACRS_RATES:
+            amounts.append(int((Decimal(cost) * rate).to_integral_value()))
+
+    # Cap at the depreciable base and put any rounding residue in the last year
+    capped, taken = [], 0
+    for amount in amounts:
+        amount = max(0, min(amount, base - taken))
+        capped.append(amount)
+        taken += amount
+    if capped:
+        capped[-1] += base - taken
+    return capped
+
+def compute_schedule(purchase_date, purchase_price, salvage_value, method, useful_life_years, posted=None):
+    """
+    [(period_end, period_number, year_number, amount, accumulated, book_value, is_posted)]
+    in cents for one asset. ``posted`` maps (year, month) to the cents already posted.
+    """
+    cost, salvage = to_cents(purchase_price), to_cents(salvage_value)
+    base = max(cost - salvage, 0)
+    posted = posted or {}
+    years = annual_amounts(method, cost, salvage, useful_life_years)
+
+    # Expected accumulated depreciation at the end of each month
+    expected = []
+    accumulated = 0
+    for annual in years:
+        for month in range(12):
+            expected.append(accumulated + annual * (month + 1) // 12)
+        accumulated += annual
+
+    lines = []
+    running = 0
+    first_month = purchase_date.year * 12 + purchase_date.month - 1
+    for index, target in enumerate(expected):
+        key = divmod(first_month + index, 12)
+        key = (key[0], key[1] + 1)
+        period = month_end_of(*key)
+        if key in posted:
+            amount = posted[key]
+            is_posted = True
+        else:
+            amount = max(0, min(target, base) - running)
+            is_posted = False
+        running += amount
+        lines.append((period, index + 1, index // 12 + 1, amount, running, cost - running, is_posted))
+    return lines
+
+def posted_amounts(asset_ids):
+    """{asset_id: {(year, month): cents}} of posted DepreciationEntry rows"""
+    asset_ids = list(asset_ids)
+    posted = defaultdict(lambda: defaultdict(int))
+    for start in range(0, len(asset_ids), BULK_BATCH_SIZE):
+        for asset_id, day, amount in (
+            DepreciationEntry.objects.filter(asset_id__in=asset_ids[start:start + BULK_BATCH_SIZE])
+            .values_list('asset_id', 'date', 'amount')
+        ):
+            posted[asset_id][(day.year, day.month)] += to_cents(amount)
+    return posted
+
+SCHEDULE_COLUMNS = [
+    'asset_id', 'period_end', 'period_number', 'year_number',
+    'amount', 'accumulated_depreciation', 'book_value', 'is_posted',
+]
+
+def _insert_schedule_rows(rows, using):
+    # A schedule is ~60 rows per asset; executemany skips bulk_create's per-field
+    # preparation, which dominates rebuilding thousands of assets at once
+    connection = connections[using]
+    table = connection.ops.quote_name(DepreciationScheduleLine._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(column) for column in SCHEDULE_COLUMNS)
+    placeholders = ', '.join(['%s'] * len(SCHEDULE_COLUMNS))
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BULK_BATCH_SIZE * 10):
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                rows[start:start + BULK_BATCH_SIZE * 10],
+            )
+
+def _record_signatures(assets, using):
+    # One distinct value per asset: executemany beats bulk_update's CASE per row
+    connection = connections[using]
+    table = connection.ops.quote_name(Asset._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {table} SET schedule_signature = %s WHERE id = %s",
+            [(asset.schedule_signature, asset.id) for asset in assets],
+        )
+
+def regenerate_schedules(assets):
+    """Rebuilds the stored schedule of each asset and records its signature"""
+    assets = list(assets)
+    if not assets:
+        return 0
+    # The raw SQL below goes where the ORM would write these rows
+    using = router.db_for_write(DepreciationScheduleLine)
+    created = 0
+    with transaction.atomic(using=using):
+        for start in range(0, len(assets), BULK_BATCH_SIZE):
+            chunk = assets[start:start + BULK_BATCH_SIZE]
+            ids = [asset.id for asset in chunk]
+            posted = posted_amounts(ids)
+            DepreciationScheduleLine.objects.using(using).filter(asset_id__in=ids).delete()
+
+            rows = []
+            for asset in chunk:
+                for period, number, year, amount, accumulated, book, is_posted in compute_schedule(
+                    asset.purchase_date, asset.purchase_price, asset.salvage_value,
+                    asset.depreciation_method, asset.useful_life_years, posted.get(asset.id)
+                ):
+                    rows.append((asset.id, period, number, year, to_money(amount), to_money(accumulated), to_money(book), is_posted))
+                asset.schedule_signature = schedule_signature(asset)
+            _insert_schedule_rows(rows, using)
+            _record_signatures(chunk, using)
+            created += len(rows)
+    return created
+
+def ensure_schedules(assets):
+    """Regenerates the schedules of assets whose inputs changed since they were built"""
+    stale = [asset for asset in assets if asset.schedule_signature != schedule_signature(asset)]
+    regenerate_schedules(stale)
+    return len(stale)
+
+# --- Posting -------------------------------------------------------------------
+
+def _year_number(asset, period):
+    months = (period.year - asset.purchase_date.year) * 12 + period.month - asset.purchase_date.month
+    return months // 12 + 1
+
+def _uop_amounts(assets, period):
+    """Units of production: depreciation earned by units_produced_to_date, less what is posted"""
+    uop = [asset for asset in assets if asset.depreciation_method == Method.UNITS_OF_PRODUCTION]
+    if not uop:
+        return {}
+    posted = dict(
+        DepreciationEntry.objects.filter(asset__in=uop, date__lte=period)
+        .values('asset_id').annotate(total=Sum('amount')).values_list('asset_id', 'total')
+    )
+    amounts = {}
+    for asset in uop:
+        base = asset.purchase_price - asset.salvage_value
+        if not asset.estimated_total_units or base <= 0:
+            amounts[asset.id] = Decimal('0.00')
+            continue
+        units = min(asset.units_produced_to_date, asset.estimated_total_units)
+        earned = (base * units / asset.estimated_total_units).quantize(Decimal('0.01'))
+        amounts[asset.id] = max(Decimal('0.00'), earned - (posted.get(asset.id) or Decimal('0.00')))
+    return amounts
+
+@immediate_atomic
+def post_assets_depreciation(company, assets, post_date, consolidated=False, user=None):
+    """
+    Posts the depreciation of ``assets`` (all of ``company``) for the month of
+    ``post_date``. Returns {'posted': [(asset, amount)], 'entries': [journal entry per
+    posting], 'skipped': {asset_id: reason}, 'journal_entries': count}.
+    """
+    period = month_end(post_date)
+    assets = [
+        asset for asset in assets
+        if asset.depreciation_method != Method.NO_DEPRECIATION and asset.purchase_date <= period
+    ]
+    result = {'posted': [], 'entries': [], 'skipped': {}, 'journal_entries': 0}
+    if not assets:
+        return result
+    ensure_schedules(assets)
+    by_id = {asset.id: asset for asset in assets}
+
+    already = set(
+        DepreciationEntry.objects.filter(asset_id__in=by_id, date__year=period.year, date__month=period.month)
+        .values_list('asset_id', flat=True)
+    )
+    scheduled = dict(
+        DepreciationScheduleLine.objects.filter(asset_id__in=by_id, period_end=period, is_posted=False)
+        .values_list('asset_id', 'amount')
+    )
+    uop = _uop_amounts(assets, period)
+
+    postings = []
+    for asset in assets:
+        if asset.id in already:
+            result['skipped'][asset.id] = f"Depreciation for {period.strftime('%B %Y')} has already been posted for {asset.name}."
+            continue
+        amount = uop[asset.id] if asset.id in uop else scheduled.get(asset.id, Decimal('0.00'))
+        if amount <= 0:
+            result['skipped'][asset.id] = f"No depreciation due for {asset.name} in {period.strftime('%B %Y')}."
+            continue
+        postings.append((asset, amount))
+    if not postings:
+        return result
+
+    if consolidated:
+        entry = JournalEntry.objects.create(
+            company=company,
+            date=period,
+            description=f"Monthly depreciation for {period.strftime('%B %Y')} ({len(postings)} assets)",
+            created_by=user,
+        )
+        expense, accumulated = defaultdict(Decimal), defaultdict(Decimal)
+        for asset, amount in postings:
+            expense[asset.depreciation_expense_account_id] += amount
+            accumulated[asset.accumulated_depreciation_account_id] += amount
+        lines = [
+            JournalEntryLine(journal_entry=entry, account_id=account_id, debit=amount, credit=Decimal('0.00'),
+                             description="Depreciation expense")
+            for account_id, amount in expense.items()
+        ] + [
+            JournalEntryLine(journal_entry=entry, account_id=account_id, debit=Decimal('0.00'), credit=amount,
+                             description="Accumulated depreciation")
+            for account_id, amount in accumulated.items()
+        ]
+        entries = [entry] * len(postings)
+    else:
+        entries = JournalEntry.objects.bulk_create([
+            JournalEntry(company=company, date=period, description=f"Monthly depreciation for asset: {asset.name}"[:255],
+                         created_by=user)
+            for asset, _ in postings
+        ], batch_size=BULK_BATCH_SIZE)
+        lines = []
+        for entry, (asset, amount) in zip(entries, postings):
+            lines.append(JournalEntryLine(journal_entry=entry, account_id=asset.depreciation_expense_account_id,
+                                          debit=amount, credit=Decimal('0.00')))
+            lines.append(JournalEntryLine(journal_entry=entry, account_id=asset.accumulated_depreciation_account_id,
+                                          debit=Decimal('0.00'), credit=amount))
+    JournalEntryLine.objects.bulk_create(lines, batch_size=BULK_BATCH_SIZE)
+
+    DepreciationEntry.objects.bulk_create([
+        DepreciationEntry(asset=asset, journal_entry=entry, date=period, amount=amount,
+                          year_number=_year_number(asset, period),
+                          units_produced=asset.units_produced_to_date if asset.id in uop else 0)
+        for entry, (asset, amount) in zip(entries, postings)
+    ], batch_size=BULK_BATCH_SIZE)
+
+    posted_ids = [asset.id for asset, _ in postings]
+    DepreciationScheduleLine.objects.filter(asset_id__in=posted_ids, period_end=period).update(is_posted=True)
+    # Units of production posted actuals: rebuild the estimate for the months ahead
+    regenerate_schedules([asset for asset, _ in postings if asset.id in uop])
+
+    bump_ledger_version(company.id)
+    bump_counters(JOURNAL_ENTRIES, company.id)
+
+    result['posted'] = postings
+    result['entries'] = entries
+    result['journal_entries'] = 1 if consolidated else len(postings)
+    return result
+
+def post_company_depreciation(company_id, post_date, consolidated=False):
+    """Posts a company's depreciation for the month of ``post_date``; returns a summary dict"""
+    from apps.core.models import Company
+    company = Company.objects.get(pk=company_id)
+    assets = list(
+        Asset.objects.filter(company=company, purchase_date__lte=month_end(post_date))
+        .exclude(depreciation_method=Method.NO_DEPRECIATION)
+    )
+    result = post_assets_depreciation(company, assets, post_date, consolidated=consolidated)
+    return {
+        'company': company.name,
+        'assets': len(assets),
+        'posted': len(result['posted']),
+        'amount': sum((amount for _, amount in result['posted']), Decimal('0.00')),
+        'journal_entries': result['journal_entries'],
+        'skipped': len(result['skipped']),
+    }
+
+def _post_company_worker(args):
+    company_id, post_date, consolidated = args
+    try:
+        return post_company_depreciation(company_id, post_date, consolidated)
+    finally:
+        connections.close_all()
+
+def _init_worker():
+    # Spawned workers (Windows/macOS) start without Django configured
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+def post_depreciation(post_date, company_ids, consolidated=False, workers=0, progress_callback=None):
+    """
+    Posts the month of ``post_date`` for every company in ``company_ids``, across
+    ``workers`` processes when > 1. Each company posts in its own transaction.
+    Returns the per-company summaries.
+    """
+    jobs = [(company_id, post_date, consolidated) for company_id in company_ids]
+    summaries = []
+    if workers > 1 and len(jobs) > 1:
+        # Forked workers must not share the parent's open connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            for summary in executor.map(_post_company_worker, jobs):
+                summaries.append(summary)
+                if progress_callback:
+                    progress_callback(summary)
+    else:
+        for job in jobs:
+            summary = post_company_depreciation(*job)
+            summaries.append(summary)
+            if progress_callback:
+                progress_callback(summary)
+    return summaries
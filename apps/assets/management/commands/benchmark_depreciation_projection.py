@@ -0,0 +1,64 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\assets\management\commands\benchmark_depreciation_projection.py
+import random
+import time
+from datetime import date
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+
+from apps.assets.depreciation import compute_schedule
+from apps.assets.models import Asset
+from apps.assets.projection import project_monthly
+
+METHODS = [
+    Asset.DepreciationMethod.STRAIGHT_LINE,
+    Asset.DepreciationMethod.DOUBLE_DECLINING,
+    Asset.DepreciationMethod.DECLINING_BALANCE_150,
+    Asset.DepreciationMethod.SUM_OF_YEARS,
+    Asset.DepreciationMethod.MACRS,
+]
+
+class Command(BaseCommand):
+    help = (
+        'Compare the grouped depreciation projection with a per-asset schedule loop '
+        'on generated (unsaved) assets, and check both give the same figures.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assets', type=int, default=10000, help='Number of assets to generate')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        assets = []
+        for i in range(options['assets']):
+            price = Decimal(rng.randint(50000, 50000000)) / 100
+            assets.append(Asset(
+                id=i + 1,
+                name=f"Bench asset {i}",
+                purchase_date=date(rng.randint(2015, 2025), rng.randint(1, 12), rng.randint(1, 28)),
+                purchase_price=price,
+                salvage_value=(price * Decimal(rng.randint(0, 20)) / 100).quantize(Decimal('0.01')),
+                depreciation_method=rng.choice(METHODS),
+                useful_life_years=rng.randint(3, 20),
+            ))
+
+        started = time.perf_counter()
+        loop = {
+            asset.id: [
+                row[3] for row in compute_schedule(
+                    asset.purchase_date, asset.purchase_price, asset.salvage_value,
+                    asset.depreciation_method, asset.useful_life_years,
+                )
+            ]
+            for asset in assets
+        }
+        loop_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        grouped = project_monthly(assets)
+        grouped_time = time.perf_counter() - started
+
+        mismatches = sum(1 for asset in assets if loop[asset.id] != grouped[asset.id])
+        self.stdout.write(f"{'Per-asset schedule loop':<28} {loop_time:8.2f} s")
+        self.stdout.write(f"{'Grouped projection':<28} {grouped_time:8.2f} s")
+        self.stdout.write(f"{len(assets)} assets, {mismatches} mismatched schedules")
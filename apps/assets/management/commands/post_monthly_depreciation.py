@@ -1,54 +1,61 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\assets\management\commands\post_monthly_depreciation.py
-from django.core.management.base import BaseCommand
+import time
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from apps.core.models import Company
-from apps.assets.models import Asset
-from apps.assets.services import post_depreciation_for_asset
+from apps.assets.depreciation import month_end, post_depreciation
 from dateutil.relativedelta import relativedelta
 
 class Command(BaseCommand):
     help = 'Calculates and posts depreciation for all active assets for the previous month.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Any date in the month to post (YYYY-MM-DD, default: previous month)')
+        parser.add_argument('--company-id', type=int, action='append', dest='company_ids',
+                            help='Company to post for (repeatable, default: all active companies)')
+        parser.add_argument('--consolidated', action='store_true',
+                            help='Post one journal entry per company, grouped by account, instead of one per asset')
+        parser.add_argument('--workers', type=int, default=0, help='Post companies in parallel processes')
+
     def handle(self, *args, **options):
-        # This command should be run at the beginning of a month to post for the previous month.
-        today = timezone.now().date()
-        # Get the last day of the previous month.
-        post_date = today.replace(day=1) - relativedelta(days=1)
+        if options['date']:
+            try:
+                post_date = month_end(datetime.strptime(options['date'], '%Y-%m-%d').date())
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD")
+        else:
+            # This command should be run at the beginning of a month to post for the previous month.
+            today = timezone.now().date()
+            # Get the last day of the previous month.
+            post_date = today.replace(day=1) - relativedelta(days=1)
 
         self.stdout.write(f"--- Starting Depreciation Posting for {post_date.strftime('%B %Y')} ---")
 
-        active_companies = Company.objects.filter(is_active=True) # Assuming Company has an 'is_active' flag
-        if not active_companies.exists():
+        companies = Company.objects.filter(is_active=True)
+        if options['company_ids']:
+            companies = companies.filter(pk__in=options['company_ids'])
+        company_ids = list(companies.values_list('id', flat=True))
+        if not company_ids:
             self.stdout.write(self.style.WARNING("No active companies found."))
             return
 
-        for company in active_companies:
-            self.stdout.write(self.style.SUCCESS(f"\nProcessing company: {company.name}"))
-            
-            # Find assets that are active (purchased before the post date) and not fully depreciated.
-            assets_to_process = Asset.objects.filter(
-                company=company,
-                purchase_date__lte=post_date
-            )
-
-            if not assets_to_process.exists():
-                self.stdout.write("No assets requiring depreciation found for this company.")
-                continue
-
-            for asset in assets_to_process:
-                # Check if asset has already reached its salvage value
-                if asset.current_book_value <= asset.salvage_value:
-                    self.stdout.write(f"  - Skipping {asset.name}: Already at or below salvage value.")
-                    continue
-
-                # Call the service to perform the posting
-                journal_entry, message = post_depreciation_for_asset(asset, post_date)
-                
-                if journal_entry:
-                    self.stdout.write(self.style.SUCCESS(f"  - SUCCESS: {message} (JE ID: {journal_entry.id})"))
-                else:
-                    # Display info or warning messages without failing the whole command
-                    self.stdout.write(self.style.WARNING(f"  - INFO: {message}"))
-
-        self.stdout.write("\n--- Depreciation Posting Complete ---")
-
+        def report(summary):
+            self.stdout.write(self.style.SUCCESS(
+                f"  - {summary['company']}: posted {summary['posted']} of {summary['assets']} assets, "
+                f"{summary['amount']} in {summary['journal_entries']} journal entries"
+                + (f" ({summary['skipped']} skipped)" if summary['skipped'] else "")
+            ))
+
+        started = time.monotonic()
+        summaries = post_depreciation(
+            post_date, company_ids,
+            consolidated=options['consolidated'],
+            workers=options['workers'],
+            progress_callback=report,
+        )
+
+        self.stdout.write(
+            f"\n--- Depreciation Posting Complete: {sum(s['posted'] for s in summaries)} assets "
+            f"in {time.monotonic() - started:.1f}s ---"
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0004_asset_estimated_total_units_and_more'),
+        ('journal', '0003_bank_reconciliation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='schedule_signature',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.AlterField(
+            model_name='depreciationentry',
+            name='journal_entry',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='depreciation_records', to='journal.journalentry'),
+        ),
+        migrations.CreateModel(
+            name='DepreciationScheduleLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_end', models.DateField(help_text='Last day of the month this line depreciates.')),
+                ('period_number', models.PositiveIntegerField(help_text="Month of the asset's life, starting at 1")),
+                ('year_number', models.PositiveIntegerField(help_text="Year of the asset's life, starting at 1")),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('accumulated_depreciation', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('book_value', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('is_posted', models.BooleanField(default=False)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_lines', to='assets.asset')),
+            ],
+            options={
+                'ordering': ['asset', 'period_end'],
+                'indexes': [models.Index(fields=['period_end', 'is_posted'], name='asset_schedule_period_idx')],
+                'unique_together': {('asset', 'period_end')},
+            },
+        ),
+    ]
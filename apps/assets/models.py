@@ -63,6 +63,8 @@ class Asset(models.Model):
     )
     useful_life_years = models.PositiveIntegerField(help_text="The number of years the asset is expected to be in service.")
     salvage_value = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), help_text="The estimated residual value of an asset at the end of its useful life.")
+    # Hash of the inputs the stored schedule was built from (see depreciation.py)
+    schedule_signature = models.CharField(max_length=40, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.name} ({self.company.name})"
@@ -180,10 +182,11 @@ class DepreciationEntry(models.Model):
     This prevents duplicate postings and creates a clear history.
     """
     asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name='depreciation_entries')
-    journal_entry = models.OneToOneField(
+    # A consolidated monthly entry carries the depreciation of many assets
+    journal_entry = models.ForeignKey(
         'journal.JournalEntry', 
         on_delete=models.PROTECT, 
-        related_name='depreciation_record'
+        related_name='depreciation_records'
     )
     date = models.DateField(help_text="The date for which depreciation was calculated (e.g., end of the month).")
     amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="The amount of depreciation posted for this period.")
@@ -198,3 +201,29 @@ class DepreciationEntry(models.Model):
 
     def __str__(self):
         return f"Depreciation for {self.asset.name} on {self.date} for {self.amount}"
+
+class DepreciationScheduleLine(models.Model):
+    """
+    One month of an asset's precomputed depreciation schedule. Rows are rebuilt
+    whenever the asset's depreciation inputs or its posted entries change;
+    posted months carry the amount actually posted.
+    """
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name='schedule_lines')
+    period_end = models.DateField(help_text="Last day of the month this line depreciates.")
+    period_number = models.PositiveIntegerField(help_text="Month of the asset's life, starting at 1")
+    year_number = models.PositiveIntegerField(help_text="Year of the asset's life, starting at 1")
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    accumulated_depreciation = models.DecimalField(max_digits=12, decimal_places=2)
+    book_value = models.DecimalField(max_digits=12, decimal_places=2)
+    is_posted = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['asset', 'period_end']
+        unique_together = ('asset', 'period_end')
+        indexes = [
+            # Monthly posting loads one period's open lines
+            models.Index(fields=['period_end', 'is_posted'], name='asset_schedule_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asset.name} {self.period_end}: {self.amount}"
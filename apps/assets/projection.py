@@ -0,0 +1,135 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\assets\projection.py
+"""
+Depreciation schedule projection for one or many assets, in memory.
+
+Assets are grouped by (method, schedule length). Each asset's annual amounts
+come from apps.assets.depreciation.annual_amounts(); the monthly spread of a
+group is then computed column by column - month k of every asset in the group
+is one list operation - so a 10,000-asset forecast is a few hundred passes over
+flat lists instead of a per-asset loop with book value queries. (numpy is not a
+dependency of this project; the same shape of arithmetic is done on plain
+integer-cent lists.)
+
+The figures match apps.assets.depreciation.compute_schedule() - the stored
+schedule - to the cent, including months already posted when ``posted`` is
+passed.
+"""
+from collections import defaultdict
+from datetime import date
+
+from .depreciation import annual_amounts, month_end_of, posted_amounts, schedule_years, to_cents, to_money
+
+def _annual_columns(method, years, costs, salvages):
+    """Year-by-year depreciation columns (cents) for a group of assets sharing method and life"""
+    # annual_amounts() is the stored schedule's own rule; schedule_years() maps ``years`` to itself
+    rows = [annual_amounts(method, cost, salvage, years) for cost, salvage in zip(costs, salvages)]
+    return [list(column) for column in zip(*rows)]
+
+def _monthly_columns(annual, count):
+    """Monthly depreciation columns (cents) from annual ones, spread as the stored schedule does"""
+    months = []
+    accumulated = [0] * count
+    previous = [0] * count
+    for column in annual:
+        for month in range(1, 13):
+            expected = [before + amount * month // 12 for before, amount in zip(accumulated, column)]
+            months.append([now - last for now, last in zip(expected, previous)])
+            previous = expected
+        accumulated = [before + amount for before, amount in zip(accumulated, column)]
+    return months
+
+def _apply_posted(monthly, first_month, base, posted):
+    """Replaces posted months with their posted amounts and catches up, like compute_schedule()"""
+    expected, running, result = 0, 0, []
+    for index, amount in enumerate(monthly):
+        expected += amount
+        year, month = divmod(first_month + index, 12)
+        key = (year, month + 1)
+        if key in posted:
+            amount = posted[key]
+        else:
+            amount = max(0, min(expected, base) - running)
+        running += amount
+        result.append(amount)
+    return result
+
+def project_monthly(assets, posted=None):
+    """
+    {asset_id: [monthly cents, ...]} from each asset's purchase month onwards.
+    ``posted`` is {asset_id: {(year, month): cents}} (see posted_amounts()).
+    """
+    posted = posted or {}
+    groups = defaultdict(list)
+    for asset in assets:
+        years = schedule_years(asset.depreciation_method, asset.useful_life_years)
+        if years and asset.purchase_price > asset.salvage_value:
+            groups[(asset.depreciation_method, years)].append(asset)
+
+    projection = {asset.id: [] for asset in assets}
+    for (method, years), members in groups.items():
+        costs = [to_cents(asset.purchase_price) for asset in members]
+        salvages = [to_cents(asset.salvage_value) for asset in members]
+        months = _monthly_columns(_annual_columns(method, years, costs, salvages), len(members))
+        # Transpose the month columns into one row per asset
+        for index, row in enumerate(zip(*months)):
+            asset = members[index]
+            row = list(row)
+            if posted.get(asset.id):
+                first_month = asset.purchase_date.year * 12 + asset.purchase_date.month - 1
+                row = _apply_posted(row, first_month, costs[index] - salvages[index], posted[asset.id])
+            projection[asset.id] = row
+    return projection
+
+def project_depreciation(assets, include_posted=True, monthly=False):
+    """
+    Full multi-year schedules of ``assets``. Returns
+    {'assets': [{'asset', 'years': [...], 'months': [...]}], 'calendar_years': {year: total}}.
+    Year (and, with ``monthly``, month) rows carry depreciation, accumulated and
+    book value as Decimals; with ``include_posted`` the months posted so far use
+    their posted amounts.
+    """
+    assets = list(assets)
+    posted = posted_amounts([asset.id for asset in assets]) if include_posted else {}
+    projection = project_monthly(assets, posted)
+
+    calendar = defaultdict(int)
+    schedules = []
+    for asset in assets:
+        cost = to_cents(asset.purchase_price)
+        first_month = asset.purchase_date.year * 12 + asset.purchase_date.month - 1
+        asset_posted = posted.get(asset.id, {})
+        amounts = projection[asset.id]
+        years, months = [], []
+        running = 0
+        for start in range(0, len(amounts), 12):
+            year_total = 0
+            for index in range(start, min(start + 12, len(amounts))):
+                amount = amounts[index]
+                year, month = divmod(first_month + index, 12)
+                running += amount
+                year_total += amount
+                calendar[year] += amount
+                if monthly:
+                    months.append({
+                        'period_end': month_end_of(year, month + 1),
+                        'period_number': index + 1,
+                        'depreciation': to_money(amount),
+                        'accumulated': to_money(running),
+                        'book_value': to_money(cost - running),
+                        'posted': (year, month + 1) in asset_posted,
+                    })
+            start_year, start_month = divmod(first_month + start, 12)
+            years.append({
+                'year_number': start // 12 + 1,
+                'period_start': date(start_year, start_month + 1, 1),
+                'period_end': month_end_of(year, month + 1),
+                'depreciation': to_money(year_total),
+                'accumulated': to_money(running),
+                'book_value': to_money(cost - running),
+            })
+        schedules.append({'asset': asset, 'years': years, 'months': months})
+
+    return {
+        'assets': schedules,
+        'calendar_years': {year: to_money(total) for year, total in sorted(calendar.items())},
+    }
@@ -0,0 +1,25 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\assets\signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .depreciation import regenerate_schedules, schedule_signature
+from .models import Asset, DepreciationEntry
+
+@receiver(post_save, sender=Asset)
+def rebuild_schedule_on_change(sender, instance, raw=False, **kwargs):
+    # Only a change to the depreciation inputs invalidates the stored schedule
+    if raw or instance.schedule_signature == schedule_signature(instance):
+        return
+    regenerate_schedules([instance])
+
+@receiver(post_delete, sender=DepreciationEntry)
+def rebuild_schedule_on_unpost(sender, instance, **kwargs):
+    # After commit: when the asset itself is being deleted there is nothing to rebuild
+    asset_id = instance.asset_id
+
+    def rebuild():
+        asset = Asset.objects.filter(pk=asset_id).first()
+        if asset is not None:
+            regenerate_schedules([asset])
+    transaction.on_commit(rebuild)
@@ -1,3 +1,144 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from apps.core.testing import CompanyTestCase
+from apps.core.versions import get_version
+from apps.journal.models import JournalEntryLine
+from apps.reporting.cache import LEDGER_VERSION
+from .depreciation import compute_schedule, post_assets_depreciation, post_depreciation
+from .models import Asset, DepreciationEntry, DepreciationScheduleLine
+from .projection import project_depreciation
+
+Method = Asset.DepreciationMethod
+
+
+class AssetTestCase(CompanyTestCase):
+    company_name = 'Asset Co'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.expense, cls.asset_account, cls.accumulated = cls.account('5500'), cls.account('1500'), cls.account('1600')
+
+    def make_asset(self, method=Method.STRAIGHT_LINE, price='12000.00', salvage='2000.00', life=5, **fields):
+        return Asset.objects.create(
+            company=self.company, name=f"{method} asset", purchase_date=date(2025, 1, 15),
+            purchase_price=Decimal(price), salvage_value=Decimal(salvage), depreciation_method=method,
+            useful_life_years=life, depreciation_expense_account=self.expense, asset_account=self.asset_account,
+            accumulated_depreciation_account=self.accumulated, **fields
+        )
+
+
+class ScheduleTests(AssetTestCase):
+    def test_every_schedule_depreciates_cost_less_salvage(self):
+        methods = [method for method in Method.values if method != Method.NO_DEPRECIATION]
+        for method in methods:
+            for price, salvage, life in (('12000.00', '2000.00', 5), ('999.99', '0.00', 3), ('5000.00', '4999.00', 7)):
+                with self.subTest(method=method, price=price, life=life):
+                    lines = compute_schedule(date(2025, 1, 15), Decimal(price), Decimal(salvage), method, life)
+                    total = sum(amount for _, _, _, amount, _, _, _ in lines)
+                    self.assertEqual(Decimal(total) / 100, Decimal(price) - Decimal(salvage))
+                    self.assertTrue(all(amount >= 0 for _, _, _, amount, _, _, _ in lines))
+                    self.assertEqual(Decimal(lines[-1][5]) / 100, Decimal(salvage))
+
+    def test_stored_schedule_follows_the_asset(self):
+        asset = self.make_asset()
+        lines = DepreciationScheduleLine.objects.filter(asset=asset)
+        self.assertEqual(lines.count(), 60)
+        self.assertEqual(sum(line.amount for line in lines), Decimal('10000.00'))
+
+        asset.useful_life_years = 4
+        asset.save()
+        self.assertEqual(DepreciationScheduleLine.objects.filter(asset=asset).count(), 48)
+
+
+class PostingTests(AssetTestCase):
+    def test_posting_twice_for_a_month_posts_once(self):
+        asset = self.make_asset()
+        first = post_assets_depreciation(self.company, [asset], date(2025, 3, 10))
+        second = post_assets_depreciation(self.company, [asset], date(2025, 3, 31))
+
+        self.assertEqual(len(first['posted']), 1)
+        self.assertEqual(second['posted'], [])
+        self.assertIn(asset.id, second['skipped'])
+        self.assertEqual(DepreciationEntry.objects.filter(asset=asset).count(), 1)
+
+        entry = first['entries'][0]
+        lines = JournalEntryLine.objects.filter(journal_entry=entry)
+        self.assertEqual(sum(line.debit for line in lines), first['posted'][0][1])
+        self.assertEqual(sum(line.debit for line in lines), sum(line.credit for line in lines))
+
+    def test_posted_months_keep_their_amounts_when_the_schedule_is_rebuilt(self):
+        asset = self.make_asset()
+        posted = post_assets_depreciation(self.company, [asset], date(2025, 1, 31))['posted'][0][1]
+
+        asset.salvage_value = Decimal('0.00')
+        asset.save()
+
+        january = DepreciationScheduleLine.objects.get(asset=asset, period_end=date(2025, 1, 31))
+        self.assertTrue(january.is_posted)
+        self.assertEqual(january.amount, posted)
+        self.assertEqual(
+            sum(line.amount for line in DepreciationScheduleLine.objects.filter(asset=asset)), Decimal('12000.00')
+        )
+
+    def test_consolidated_posting_is_one_balanced_entry(self):
+        assets = [self.make_asset(), self.make_asset(Method.SUM_OF_YEARS), self.make_asset(Method.DOUBLE_DECLINING)]
+        result = post_assets_depreciation(self.company, assets, date(2025, 2, 28), consolidated=True)
+
+        self.assertEqual(result['journal_entries'], 1)
+        lines = JournalEntryLine.objects.filter(journal_entry=result['entries'][0])
+        total = sum(amount for _, amount in result['posted'])
+        self.assertEqual(sum(line.debit for line in lines), total)
+        self.assertEqual(sum(line.credit for line in lines), total)
+
+    def test_company_posting_retires_cached_reports(self):
+        self.make_asset()
+        version = get_version(LEDGER_VERSION, self.company.id)
+
+        summaries = post_depreciation(date(2025, 4, 1), [self.company.id])
+
+        self.assertEqual(summaries[0]['posted'], 1)
+        self.assertGreater(get_version(LEDGER_VERSION, self.company.id), version)
+
+
+class ProjectionTests(AssetTestCase):
+    def assertMatchesStoredSchedule(self, assets):
+        projection = project_depreciation(assets, monthly=True)
+        for schedule in projection['assets']:
+            asset = schedule['asset']
+            with self.subTest(method=asset.depreciation_method, price=asset.purchase_price):
+                stored = DepreciationScheduleLine.objects.filter(asset=asset).values_list(
+                    'period_end', 'period_number', 'amount', 'accumulated_depreciation', 'book_value', 'is_posted'
+                )
+                projected = [
+                    (month['period_end'], month['period_number'], month['depreciation'], month['accumulated'],
+                     month['book_value'], month['posted'])
+                    for month in schedule['months']
+                ]
+                self.assertEqual(projected, list(stored))
+        return projection
+
+    def test_projection_matches_the_stored_schedule_to_the_cent(self):
+        assets = [
+            self.make_asset(method, price, salvage, life)
+            for method in Method.values if method != Method.NO_DEPRECIATION
+            for price, salvage, life in (('12000.00', '2000.00', 5), ('999.99', '0.00', 3), ('7333.33', '101.01', 7))
+        ]
+        projection = self.assertMatchesStoredSchedule(assets)
+
+        stored_by_year = {}
+        for line in DepreciationScheduleLine.objects.filter(asset__in=assets):
+            stored_by_year[line.period_end.year] = stored_by_year.get(line.period_end.year, 0) + line.amount
+        self.assertEqual(projection['calendar_years'], stored_by_year)
+
+    def test_posted_months_match_after_the_asset_changes(self):
+        asset = self.make_asset(Method.DOUBLE_DECLINING, '9999.99', '333.33', 4)
+        post_assets_depreciation(self.company, [asset], date(2025, 1, 31))
+        post_assets_depreciation(self.company, [asset], date(2025, 2, 28))
+
+        asset.salvage_value = Decimal('0.00')
+        asset.save()
+
+        projection = self.assertMatchesStoredSchedule([asset])
+        self.assertEqual(sum(month['posted'] for month in projection['assets'][0]['months']), 2)
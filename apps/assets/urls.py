@@ -30,4 +30,7 @@ urlpatterns = [
     path('export/', views.export_assets, name='export'),
     path('export/maintenance/', views.export_maintenance_records, name='export-maintenance'),
     path('export/depreciation/', views.export_depreciation_schedule, name='export-depreciation'),
+
+    # Depreciation projection
+    path('api/depreciation-projection/', views.depreciation_projection_api, name='api-depreciation-projection'),
 ]
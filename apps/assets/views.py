@@ -4,6 +4,7 @@ from django import forms
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from decimal import Decimal
@@ -15,7 +16,8 @@ from datetime import datetime, timedelta, date
 from apps.reporting.export_utils import export_to_csv, export_to_excel, export_to_pdf
 from django.http import JsonResponse
 
-from .models import Asset, AssetMaintenance, DepreciationEntry
+from .models import Asset, AssetMaintenance
+from .projection import project_depreciation
 from .forms import AssetForm, AssetMaintenanceForm
 from apps.authentication.decorators import RoleRequiredMixin
 from apps.authentication.models import User
@@ -502,29 +504,52 @@ def export_maintenance_records(request):
     else:
         return JsonResponse({'error': 'Invalid format'}, status=400)
 
+def _projection_assets(request):
+    """The company's assets selected by ?asset=<id> (repeatable), all of them by default"""
+    assets = Asset.objects.filter(company=request.user.company).order_by('name')
+    asset_ids = [value for value in request.GET.getlist('asset') if value.isdigit()]
+    if asset_ids:
+        assets = assets.filter(pk__in=asset_ids)
+    return assets
+
 def export_depreciation_schedule(request):
-    """Export depreciation schedule in requested format"""
+    """Export the depreciation schedule (posted and projected) in requested format"""
     format_type = request.GET.get('format', 'csv')
     company = request.user.company
     
     if not company:
         return JsonResponse({'error': 'No company found'}, status=400)
     
-    depreciation_entries = DepreciationEntry.objects.filter(
-        asset__company=company
-    ).select_related('asset').order_by('asset__name', '-date')
+    monthly = request.GET.get('detail') == 'monthly'
+    projection = project_depreciation(_projection_assets(request), monthly=monthly)
     
-    headers = ['Asset Name', 'Date', 'Depreciation Amount', 'Accumulated Depreciation', 'Book Value']
+    headers = ['Asset Name', 'Period', 'Period Start', 'Period End', 'Depreciation Amount', 'Accumulated Depreciation', 'Book Value']
     data = []
     
-    for entry in depreciation_entries:
-        data.append([
-            entry.asset.name,
-            entry.date,
-            entry.amount,
-            entry.asset.accumulated_depreciation,
-            entry.asset.current_book_value
-        ])
+    for schedule in projection['assets']:
+        asset = schedule['asset']
+        if monthly:
+            for row in schedule['months']:
+                data.append([
+                    asset.name,
+                    f"Month {row['period_number']}" + (" (posted)" if row['posted'] else ""),
+                    row['period_end'].replace(day=1),
+                    row['period_end'],
+                    row['depreciation'],
+                    row['accumulated'],
+                    row['book_value']
+                ])
+        else:
+            for row in schedule['years']:
+                data.append([
+                    asset.name,
+                    f"Year {row['year_number']}",
+                    row['period_start'],
+                    row['period_end'],
+                    row['depreciation'],
+                    row['accumulated'],
+                    row['book_value']
+                ])
     
     filename = f"depreciation_schedule_{company.name.lower().replace(' ', '_')}_{date.today()}"
     title = "Depreciation Schedule"
@@ -537,6 +562,34 @@ def export_depreciation_schedule(request):
         return export_to_pdf(data, filename, headers, title, company.name)
     else:
         return JsonResponse({'error': 'Invalid format'}, status=400)
+
+@login_required
+def depreciation_projection_api(request):
+    """
+    Multi-year depreciation schedules of the company's assets (?asset=<id>,
+    repeatable) plus totals per calendar year. ?detail=monthly adds month rows.
+    """
+    monthly = request.GET.get('detail') == 'monthly'
+    projection = project_depreciation(_projection_assets(request), monthly=monthly)
+
+    def serialize(row):
+        return {key: (str(value) if isinstance(value, (Decimal, date)) else value) for key, value in row.items()}
+
+    return JsonResponse({
+        'assets': [
+            {
+                'id': schedule['asset'].id,
+                'name': schedule['asset'].name,
+                'method': schedule['asset'].depreciation_method,
+                'purchase_price': str(schedule['asset'].purchase_price),
+                'salvage_value': str(schedule['asset'].salvage_value),
+                'years': [serialize(row) for row in schedule['years']],
+                **({'months': [serialize(row) for row in schedule['months']]} if monthly else {}),
+            }
+            for schedule in projection['assets']
+        ],
+        'calendar_years': {str(year): str(total) for year, total in projection['calendar_years'].items()},
+    })
     
 class MaintenanceListView(LoginRequiredMixin, ListView):
     model = AssetMaintenance
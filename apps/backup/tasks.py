@@ -8,7 +8,7 @@ from .models import Backup, BackupSettings
 from apps.core.models import Company
 from apps.authentication.models import User
 from apps.reporting.utils import export_all_data_to_zip, export_audit_documents_to_zip
-from apps.core.email_utils import send_email
+from apps.core.email_queue import queue_email
 
 def perform_backup_and_notify(company_id):
     """
@@ -74,7 +74,7 @@ def perform_backup_and_notify(company_id):
             if cc_emails:
                 print(f"CC recipients: {', '.join(cc_emails)}")
                 
-            success = send_email(
+            _, success = queue_email(
                 subject=f"Data Backup for {company.name}",
                 template_name='emails/backup_notification.html',
                 context={
@@ -88,13 +88,12 @@ def perform_backup_and_notify(company_id):
                 to_emails=recipients,
                 cc_emails=cc_emails,  # Add CC functionality
                 attachment_path=new_backup.file.path,
-                company=company
+                company=company,
+                dedup_key=f"backup:{new_backup.id}"
             )
             
             if not success:
-                print(f"Failed to send backup email for {company.name}")
-                new_backup.notes = "Backup created but email sending failed"
-                new_backup.save()
+                print(f"Backup email for {company.name} was already queued")
         else:
             print(f"No email recipients configured for {company.name}")
             new_backup.notes = "Backup created but no email recipients configured"
@@ -164,7 +163,7 @@ def send_audit_reminders(company_id):
             print(f"No primary recipients found for audit reminder. Cannot send reminder.")
             return False
 
-        send_email(
+        queue_email(
             subject=f"Audit Reminder: {user_company.name}",
             template_name='emails/audit_reminder.html',
             context={
@@ -187,10 +186,11 @@ def send_audit_reminders(company_id):
             },
             to_emails=to_emails,
             cc_emails=cc_emails,  # Add CC functionality
-            company=user_company
+            company=user_company,
+            dedup_key=f"audit-reminder:{user_company.id}:{timezone.now().date()}"
         )
         
-        print(f"Successfully sent audit reminders for {user_company.name}")
+        print(f"Queued audit reminders for {user_company.name}")
         print(f"TO: {', '.join(to_emails)}")
         if cc_emails:
             print(f"CC: {', '.join(cc_emails)}")
@@ -260,7 +260,8 @@ def send_audit_documents(company_id):
         import os
         file_size_mb = os.path.getsize(audit_zip_path) / (1024 * 1024)
         
-        success = send_email(
+        # The worker removes the temporary package once it has been sent
+        _, success = queue_email(
             subject=f"Audit Documents Package: {user_company.name}",
             template_name='emails/audit_documents.html',
             context={
@@ -295,23 +296,22 @@ def send_audit_documents(company_id):
             to_emails=to_emails,
             cc_emails=cc_emails,
             attachment_path=audit_zip_path,
-            company=user_company
+            delete_attachment=True,
+            company=user_company,
+            dedup_key=f"audit-package:{user_company.id}:{timezone.now().date()}"
         )
         
-        if success:
-            print(f"Successfully sent audit documents for {user_company.name}")
-            print(f"TO: {', '.join(to_emails)}")
-            if cc_emails:
-                print(f"CC: {', '.join(cc_emails)}")
-            print(f"Package size: {file_size_mb:.1f} MB")
-        else:
-            print(f"Failed to send audit documents for {user_company.name}")
-        
-        # Clean up temporary file
-        try:
+        if not success:
+            # Today's package is already queued and the worker deletes that one; this copy is ours to remove
             os.remove(audit_zip_path)
-        except:
-            pass
+            print(f"Audit documents for {user_company.name} were already queued today")
+            return True
+        
+        print(f"Queued audit documents for {user_company.name}")
+        print(f"TO: {', '.join(to_emails)}")
+        if cc_emails:
+            print(f"CC: {', '.join(cc_emails)}")
+        print(f"Package size: {file_size_mb:.1f} MB")
         
         return success
 
@@ -1,7 +1,7 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\admin.py
 
 from django.contrib import admin
-from .models import Company, EmailConfiguration
+from .models import Company, EmailConfiguration, OutboundEmail
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
@@ -36,3 +36,10 @@ class CompanyAdmin(admin.ModelAdmin):
 class EmailConfigurationAdmin(admin.ModelAdmin):
     list_display = ('company', 'email_address', 'is_active')
     list_filter = ('is_active',)
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_emails', 'company', 'status', 'attempts', 'created_at', 'sent_at', 'send_seconds')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to_emails', 'dedup_key')
+    readonly_fields = ('created_at', 'sent_at', 'send_seconds', 'attempts', 'last_error')
@@ -5,3 +5,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        from .counters import connect_counter_signals
+        from .picker import connect_picker_signals
+        from .search import connect_search_signals
+        from .sqlite import connect_sqlite_signals
+        connect_sqlite_signals()
+        connect_search_signals()
+        connect_picker_signals()
+        connect_counter_signals()
@@ -0,0 +1,630 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\bootstrap.py
+"""
+Company bootstrap: chart of accounts, default transaction categories and
+settings for one or many companies, in a fixed number of queries.
+
+Creating accounts one by one is slow twice over: every MPTT insert renumbers
+the tree, and every child looks its parent up again. Here the whole chart is
+laid out in memory first - parents resolved by account number, and each
+account's tree_id/lft/rght/level computed the way a rebuild would (siblings by
+account number, as Account.MPTTMeta.order_insertion_by has it) - then written
+with one bulk_create per tree level, for all companies at once. New trees get
+tree ids after the current highest, so existing trees are never touched and no
+rebuild is needed.
+
+bulk_create() sends no signals, so the report cache is invalidated here.
+"""
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Max
+
+from apps.accounts.models import Account, AccountType
+from apps.backup.models import BackupSettings
+from apps.core.models import Company
+from apps.reporting.cache import bump_ledger_version
+from apps.transactions.constants import TransactionType
+from apps.transactions.models import TransactionCategory
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+ACCOUNT_TYPE_DEFINITIONS = {
+    'Current Asset': AccountType.Category.ASSET,
+    'Fixed Asset': AccountType.Category.ASSET,
+    'Accumulated Depreciation': AccountType.Category.ASSET,
+    'Current Liability': AccountType.Category.LIABILITY,
+    'Equity': AccountType.Category.EQUITY,
+    'Revenue': AccountType.Category.REVENUE,
+    'Expense': AccountType.Category.EXPENSE,
+    'Depreciation Expense': AccountType.Category.EXPENSE,
+}
+
+# Standard chart of accounts, by account type
+CHART_OF_ACCOUNTS = {
+    'Current Asset': [
+        {'number': '1110', 'name': 'Bank Accounts', 'parent': None, 'system_account': Account.SystemAccount.DEFAULT_CASH},
+        {'number': '1200', 'name': 'Accounts Receivable', 'parent': None, 'is_control': True, 'system_account': Account.SystemAccount.ACCOUNTS_RECEIVABLE},
+        {'number': '1300', 'name': 'Inventory Asset', 'parent': None, 'system_account': Account.SystemAccount.INVENTORY_ASSET},
+    ],
+    'Fixed Asset': [
+        {'number': '1500', 'name': 'Fixed Assets', 'parent': None},
+        {'number': '1510', 'name': 'Land', 'parent': '1500'},
+        {'number': '1520', 'name': 'Buildings', 'parent': '1500'},
+        {'number': '1530', 'name': 'Machinery & Equipment', 'parent': '1500'},
+        {'number': '1540', 'name': 'Vehicles', 'parent': '1500'},
+        {'number': '1550', 'name': 'Office Equipment', 'parent': '1500'},  # ✅ ADDED
+    ],
+    'Accumulated Depreciation': [
+        {'number': '1600', 'name': 'Accumulated Depreciation', 'parent': None},
+        {'number': '1620', 'name': 'Accumulated Depreciation - Buildings', 'parent': '1600'},
+        {'number': '1630', 'name': 'Accumulated Depreciation - Machinery', 'parent': '1600'},
+        {'number': '1640', 'name': 'Accumulated Depreciation - Vehicles', 'parent': '1600'},
+        {'number': '1650', 'name': 'Accumulated Depreciation - Office Equipment', 'parent': '1600'},  # ✅ ADDED
+    ],
+    'Current Liability': [
+        {'number': '2100', 'name': 'Current Liabilities', 'parent': None},
+        {'number': '2200', 'name': 'Accounts Payable', 'parent': '2100', 'is_control': True, 'system_account': Account.SystemAccount.ACCOUNTS_PAYABLE},
+        {'number': '2300', 'name': 'Sales Tax Payable', 'parent': '2100', 'system_account': Account.SystemAccount.SALES_TAX_PAYABLE},
+    ],
+    'Equity': [
+        {'number': '3000', 'name': 'Equity', 'parent': None},
+        {'number': '3100', 'name': 'Owner\'s Capital', 'parent': '3000'},
+        {'number': '3200', 'name': 'Retained Earnings', 'parent': '3000', 'system_account': Account.SystemAccount.RETAINED_EARNINGS},
+    ],
+    'Revenue': [
+        {'number': '4000', 'name': 'Income / Revenue', 'parent': None},
+        {'number': '4100', 'name': 'Sales Revenue', 'parent': '4000'},
+        {'number': '4200', 'name': 'Service Revenue', 'parent': '4000'},
+        {'number': '4300', 'name': 'Interest Income', 'parent': '4000'},
+    ],
+    'Expense': [
+        {'number': '5000', 'name': 'Expenses', 'parent': None},
+        {'number': '5100', 'name': 'Cost of Goods Sold', 'parent': '5000', 'system_account': Account.SystemAccount.COST_OF_GOODS_SOLD},
+        {'number': '5200', 'name': 'Rent Expense', 'parent': '5000'},
+        {'number': '5300', 'name': 'Salaries & Wages', 'parent': '5000'},
+        {'number': '5400', 'name': 'Office Supplies', 'parent': '5000'},
+        {'number': '6100', 'name': 'Office Rent', 'parent': '5000'},  # ✅ ADDED
+        {'number': '6200', 'name': 'Staff Salaries', 'parent': '5000'},  # ✅ ADDED
+        {'number': '6300', 'name': 'Office Supplies Expense', 'parent': '5000'},  # ✅ ADDED
+        {'number': '6400', 'name': 'Utilities Expense', 'parent': '5000'},  # ✅ ADDED
+    ],
+    'Depreciation Expense': [
+        {'number': '5500', 'name': 'Depreciation Expense', 'parent': None},
+        {'number': '5520', 'name': 'Depreciation - Buildings', 'parent': '5500'},
+        {'number': '5530', 'name': 'Depreciation - Machinery', 'parent': '5500'},
+        {'number': '5540', 'name': 'Depreciation - Vehicles', 'parent': '5500'},
+        {'number': '7020', 'name': 'Depreciation - Buildings Alt', 'parent': '5500'},  # ✅ ADDED
+        {'number': '7030', 'name': 'Depreciation - Machinery Alt', 'parent': '5500'},  # ✅ ADDED
+        {'number': '7040', 'name': 'Depreciation - Vehicles Alt', 'parent': '5500'},  # ✅ ADDED
+        {'number': '7050', 'name': 'Depreciation - Office Equipment', 'parent': '5500'},  # ✅ ADDED
+    ]
+}
+
+# Default transaction categories; account_numbers are tried in order (exact, then prefix)
+DEFAULT_CATEGORIES = [
+    # 🎯 REVENUE CATEGORIES (Sales & Income)
+    {
+        'name': 'Product Sales',
+        'account_type': 'Revenue',
+        'allowed_transaction_types': [TransactionType.SALE],
+        'account_numbers': ['4100', '4000'],
+        'description': 'Revenue from selling physical products and goods',
+        'priority': 1
+    },
+    {
+        'name': 'Service Revenue',
+        'account_type': 'Revenue',
+        'allowed_transaction_types': [TransactionType.SALE],
+        'account_numbers': ['4200', '4000'],
+        'description': 'Revenue from providing services and consultancy',
+        'priority': 1
+    },
+    {
+        'name': 'Consulting Fees',
+        'account_type': 'Revenue',
+        'allowed_transaction_types': [TransactionType.SALE],
+        'account_numbers': ['4200', '4000'],
+        'description': 'Revenue from consulting and advisory services',
+        'priority': 2
+    },
+    {
+        'name': 'Interest Income',
+        'account_type': 'Revenue',
+        'allowed_transaction_types': [TransactionType.SALE, TransactionType.ADJUSTMENT],
+        'account_numbers': ['4300', '4000'],
+        'description': 'Interest earned on bank deposits and investments',
+        'priority': 2
+    },
+    {
+        'name': 'Other Income',
+        'account_type': 'Revenue',
+        'allowed_transaction_types': [TransactionType.SALE, TransactionType.ADJUSTMENT],
+        'account_numbers': ['4300', '4000'],
+        'description': 'Miscellaneous income and other revenue sources',
+        'priority': 3
+    },
+    
+    # 🎯 OPERATING EXPENSE CATEGORIES
+    {
+        'name': 'Office Rent',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE, TransactionType.PURCHASE],
+        'account_numbers': ['6100', '5200', '5000'],
+        'description': 'Monthly office rent and lease payments',
+        'priority': 1
+    },
+    {
+        'name': 'Staff Salaries & Wages',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['6200', '5300', '5000'],
+        'description': 'Employee salaries, wages, and compensation',
+        'priority': 1
+    },
+    {
+        'name': 'Office Supplies',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE, TransactionType.PURCHASE],
+        'account_numbers': ['6300', '5400', '5000'],
+        'description': 'Stationery, printing materials, and office consumables',
+        'priority': 1
+    },
+    {
+        'name': 'Utilities & Communications',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['6400', '5000'],
+        'description': 'Electricity, water, internet, phone, and utility bills',
+        'priority': 1
+    },
+    {
+        'name': 'Transportation & Travel',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Business travel, fuel, transportation, and vehicle expenses',
+        'priority': 2
+    },
+    {
+        'name': 'Marketing & Advertising',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE, TransactionType.PURCHASE],
+        'account_numbers': ['5000'],
+        'description': 'Promotional activities, advertising, and marketing campaigns',
+        'priority': 2
+    },
+    {
+        'name': 'Professional Services',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE, TransactionType.PURCHASE],
+        'account_numbers': ['5000'],
+        'description': 'Legal fees, accounting services, consultancy, and professional fees',
+        'priority': 2
+    },
+    {
+        'name': 'Insurance Premiums',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Business insurance premiums and coverage costs',
+        'priority': 2
+    },
+    {
+        'name': 'Bank Charges & Fees',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Bank fees, transaction charges, and financial service fees',
+        'priority': 2
+    },
+    {
+        'name': 'Training & Development',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Staff training, courses, and professional development',
+        'priority': 3
+    },
+    {
+        'name': 'Equipment Maintenance & Repairs',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Repair and maintenance of office equipment and machinery',
+        'priority': 2
+    },
+    {
+        'name': 'Software & Subscriptions',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Software licenses, SaaS subscriptions, and digital tools',
+        'priority': 2
+    },
+    {
+        'name': 'Cost of Goods Sold',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.SALE, TransactionType.ADJUSTMENT],
+        'account_numbers': ['5100', '5000'],
+        'description': 'Direct costs of goods sold to customers',
+        'priority': 1
+    },
+    
+    # 🎯 INVENTORY & PURCHASING CATEGORIES
+    {
+        'name': 'Inventory Purchase',
+        'account_type': 'Current Asset',
+        'allowed_transaction_types': [TransactionType.PURCHASE],
+        'account_numbers': ['1300', '1110'],
+        'description': 'Purchase of goods for resale and inventory',
+        'priority': 1
+    },
+    {
+        'name': 'Raw Materials Purchase',
+        'account_type': 'Current Asset',
+        'allowed_transaction_types': [TransactionType.PURCHASE],
+        'account_numbers': ['1300', '1110'],
+        'description': 'Raw materials for manufacturing and production',
+        'priority': 2
+    },
+    {
+        'name': 'Equipment Purchase',
+        'account_type': 'Fixed Asset',
+        'allowed_transaction_types': [TransactionType.PURCHASE],
+        'account_numbers': ['1550', '1530', '1500'],
+        'description': 'Purchase of office equipment, machinery, and fixed assets',
+        'priority': 2
+    },
+    {
+        'name': 'Vehicle Purchase',
+        'account_type': 'Fixed Asset',
+        'allowed_transaction_types': [TransactionType.PURCHASE],
+        'account_numbers': ['1540', '1500'],
+        'description': 'Purchase of company vehicles and transportation equipment',
+        'priority': 3
+    },
+    
+    # 🎯 FINANCIAL & LIABILITY CATEGORIES
+    {
+        'name': 'Loan Payments',
+        'account_type': 'Current Liability',
+        'allowed_transaction_types': [TransactionType.PAYMENT, TransactionType.EXPENSE],
+        'account_numbers': ['2100'],
+        'description': 'Loan principal and interest payments',
+        'priority': 2
+    },
+    {
+        'name': 'Tax Payments',
+        'account_type': 'Current Liability',
+        'allowed_transaction_types': [TransactionType.PAYMENT, TransactionType.EXPENSE],
+        'account_numbers': ['2300', '2100'],
+        'description': 'Income tax, VAT, sales tax, and other tax payments',
+        'priority': 2
+    },
+    {
+        'name': 'Vendor Payments',
+        'account_type': 'Current Liability',
+        'allowed_transaction_types': [TransactionType.PAYMENT],
+        'account_numbers': ['2200', '2100'],
+        'description': 'Payments to suppliers and vendors for purchases',
+        'priority': 1
+    },
+    {
+        'name': 'Owner Drawings',
+        'account_type': 'Equity',
+        'allowed_transaction_types': [TransactionType.EXPENSE, TransactionType.PAYMENT],
+        'account_numbers': ['3100', '3000'],
+        'description': 'Money withdrawn by business owner for personal use',
+        'priority': 2
+    },
+    {
+        'name': 'Capital Contributions',
+        'account_type': 'Equity',
+        'allowed_transaction_types': [TransactionType.SALE, TransactionType.ADJUSTMENT],
+        'account_numbers': ['3100', '3000'],
+        'description': 'Owner capital contributions and investments',
+        'priority': 3
+    },
+    
+    # 🎯 DEPRECIATION CATEGORIES
+    {
+        'name': 'Building Depreciation',
+        'account_type': 'Depreciation Expense',
+        'allowed_transaction_types': [TransactionType.ADJUSTMENT],
+        'account_numbers': ['5520', '7020', '5500'],
+        'description': 'Depreciation expense for buildings and structures',
+        'priority': 3
+    },
+    {
+        'name': 'Equipment Depreciation',
+        'account_type': 'Depreciation Expense',
+        'allowed_transaction_types': [TransactionType.ADJUSTMENT],
+        'account_numbers': ['7050', '5530', '5500'],
+        'description': 'Depreciation expense for equipment and machinery',
+        'priority': 3
+    },
+    {
+        'name': 'Vehicle Depreciation',
+        'account_type': 'Depreciation Expense',
+        'allowed_transaction_types': [TransactionType.ADJUSTMENT],
+        'account_numbers': ['5540', '7040', '5500'],
+        'description': 'Depreciation expense for vehicles and transportation',
+        'priority': 3
+    },
+    
+    # 🎯 MISCELLANEOUS CATEGORIES
+    {
+        'name': 'Petty Cash Expenses',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Small miscellaneous expenses paid from petty cash',
+        'priority': 2
+    },
+    {
+        'name': 'Entertainment & Hospitality',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Business entertainment, client hospitality, and meals',
+        'priority': 3
+    },
+    {
+        'name': 'Donations & Charity',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Charitable donations and community contributions',
+        'priority': 3
+    },
+    {
+        'name': 'Research & Development',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE, TransactionType.PURCHASE],
+        'account_numbers': ['5000'],
+        'description': 'R&D activities, innovation, and product development expenses',
+        'priority': 3
+    },
+    {
+        'name': 'Freight & Shipping',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Shipping costs, freight charges, and delivery expenses',
+        'priority': 2
+    },
+    {
+        'name': 'Quality Control & Testing',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Quality assurance, testing, and compliance expenses',
+        'priority': 3
+    },
+    {
+        'name': 'Licensing & Permits',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Business licenses, permits, and regulatory fees',
+        'priority': 2
+    },
+    {
+        'name': 'Security Services',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Security services, surveillance, and safety expenses',
+        'priority': 3
+    },
+    {
+        'name': 'Cleaning & Maintenance',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.EXPENSE],
+        'account_numbers': ['5000'],
+        'description': 'Cleaning services, janitorial, and facility maintenance',
+        'priority': 2
+    },
+    {
+        'name': 'Bad Debt Expense',
+        'account_type': 'Expense',
+        'allowed_transaction_types': [TransactionType.ADJUSTMENT],
+        'account_numbers': ['5000'],
+        'description': 'Write-off of uncollectible customer debts',
+        'priority': 3
+    },
+]
+
+class BootstrapError(ValueError):
+    """A company can't be bootstrapped as requested; nothing has been written"""
+
+def ensure_account_types(definitions=ACCOUNT_TYPE_DEFINITIONS):
+    """{name: AccountType} for ``definitions``, creating or re-categorising as needed"""
+    account_types = AccountType.objects.in_bulk(list(definitions), field_name='name')
+    missing = [AccountType(name=name, category=category) for name, category in definitions.items() if name not in account_types]
+    if missing:
+        AccountType.objects.bulk_create(missing)
+        account_types = AccountType.objects.in_bulk(list(definitions), field_name='name')
+    changed = [account_type for name, account_type in account_types.items() if account_type.category != definitions[name]]
+    for account_type in changed:
+        account_type.category = definitions[account_type.name]
+    if changed:
+        AccountType.objects.bulk_update(changed, ['category'])
+    return account_types
+
+def _layout_tree(company, chart, account_types, tree_id):
+    """
+    Unsaved accounts of ``chart`` for ``company`` with their MPTT fields set, and
+    the next free tree id. Parents are referenced by number in ``parent_number``.
+    """
+    definitions = {}
+    children = defaultdict(list)
+    for type_name, accounts in chart.items():
+        for data in accounts:
+            definitions[data['number']] = (type_name, data)
+            children[data['parent']].append(data['number'])
+    unknown = [number for number in children if number is not None and number not in definitions]
+    if unknown:
+        raise BootstrapError(f"Parent account(s) {', '.join(unknown)} are not in the chart")
+
+    laid_out = []
+
+    def visit(number, tree, level, left):
+        type_name, data = definitions[number]
+        account = Account(
+            company=company,
+            account_type=account_types[type_name],
+            name=data['name'],
+            account_number=number,
+            is_control_account=data.get('is_control', False),
+            system_account=data.get('system_account', None),
+            tree_id=tree,
+            level=level,
+            lft=left,
+        )
+        account.parent_number = data['parent']
+        laid_out.append(account)
+        right = left + 1
+        for child in sorted(children[number]):
+            right = visit(child, tree, level + 1, right) + 1
+        account.rght = right
+        return right
+
+    for root in sorted(children[None]):
+        visit(root, tree_id, 0, 1)
+        tree_id += 1
+    return laid_out, tree_id
+
+def seed_chart_of_accounts(companies, chart=CHART_OF_ACCOUNTS):
+    """
+    Creates ``chart`` for each of ``companies``, which must not have accounts yet.
+    Returns {company_id: {account_number: Account}}.
+    """
+    companies = list(companies)
+    with_accounts = set(
+        Account.objects.filter(company__in=companies).values_list('company__name', flat=True).distinct()
+    )
+    if with_accounts:
+        raise BootstrapError(f"Already has a chart of accounts: {', '.join(sorted(with_accounts))}")
+
+    account_types = ensure_account_types()
+    # New trees go after every existing one, as MPTT does for a new root
+    tree_id = (Account.objects.aggregate(max_tree=Max('tree_id'))['max_tree'] or 0) + 1
+    by_level = defaultdict(list)
+    created = {}
+    for company in companies:
+        accounts, tree_id = _layout_tree(company, chart, account_types, tree_id)
+        created[company.id] = {account.account_number: account for account in accounts}
+        for account in accounts:
+            by_level[account.level].append(account)
+
+    # One INSERT per tree level: a level's parents have their ids by the time it is written
+    for level in sorted(by_level):
+        accounts = by_level[level]
+        for account in accounts:
+            if account.parent_number is not None:
+                account.parent = created[account.company_id][account.parent_number]
+        Account.objects.bulk_create(accounts, batch_size=BULK_BATCH_SIZE)
+        if accounts and accounts[0].pk is None:
+            # Backends that can't return ids from a bulk insert
+            ids = {
+                (company_id, number): pk for pk, company_id, number in Account.objects.filter(
+                    company__in=companies, level=level
+                ).values_list('id', 'company_id', 'account_number')
+            }
+            for account in accounts:
+                account.pk = ids[(account.company_id, account.account_number)]
+
+    for company in companies:
+        bump_ledger_version(company.id)
+    return created
+
+def _best_account(numbers, candidates):
+    """Exact account number first, then the lowest number starting with it (see find_best_account)"""
+    for number in candidates:
+        if number in numbers:
+            return numbers[number]
+        for account_number in sorted(numbers):
+            if account_number.startswith(number):
+                return numbers[account_number]
+    return None
+
+def default_category_plan(companies, definitions=DEFAULT_CATEGORIES):
+    """
+    [(company, definition, default account)] for the categories each company is
+    missing, highest priority first. Definitions whose accounts can't be found
+    are left out, like the create_default_categories command always did.
+    """
+    companies = list(companies)
+    accounts = defaultdict(dict)
+    for account in Account.objects.filter(company__in=companies).only('id', 'company_id', 'account_number', 'name'):
+        accounts[account.company_id][account.account_number] = account
+    existing = set(TransactionCategory.objects.filter(company__in=companies).values_list('company_id', 'name'))
+
+    plan = []
+    for company in companies:
+        for definition in sorted(definitions, key=lambda definition: definition.get('priority', 3)):
+            if (company.id, definition['name']) in existing:
+                continue
+            default_account = _best_account(accounts[company.id], definition.get('account_numbers', []))
+            if definition.get('account_numbers') and default_account is None:
+                continue
+            plan.append((company, definition, default_account))
+    return plan
+
+def create_default_categories(companies, definitions=DEFAULT_CATEGORIES):
+    """Bulk-creates the default transaction categories each company is missing. Returns the new categories."""
+    plan = default_category_plan(companies, definitions)
+    account_types = AccountType.objects.in_bulk(
+        list({definition['account_type'] for definition in definitions}), field_name='name'
+    )
+    missing_types = {definition['account_type'] for _, definition, _ in plan} - set(account_types)
+    if missing_types:
+        raise BootstrapError(f"Required account type(s) not found: {', '.join(sorted(missing_types))}")
+    return TransactionCategory.objects.bulk_create([
+        TransactionCategory(
+            company=company,
+            name=definition['name'],
+            account_type=account_types[definition['account_type']],
+            allowed_transaction_types=definition['allowed_transaction_types'],
+            default_account=default_account,
+            description=definition['description'],
+        )
+        for company, definition, default_account in plan
+    ], batch_size=BULK_BATCH_SIZE)
+
+def create_default_settings(companies):
+    """Backup settings with their defaults for the user companies that have none"""
+    companies = [company for company in companies if company.company_type == Company.CompanyType.USER]
+    existing = set(BackupSettings.objects.filter(company__in=companies).values_list('company_id', flat=True))
+    return BackupSettings.objects.bulk_create([
+        BackupSettings(company=company, backup_enabled=True, backup_frequency_days=7, debtor_reminders_enabled=True)
+        for company in companies if company.id not in existing
+    ])
+
+@transaction.atomic
+def bootstrap_companies(companies, chart=CHART_OF_ACCOUNTS, categories=DEFAULT_CATEGORIES, settings=True):
+    """
+    Chart of accounts, default categories and (with ``settings``) backup settings
+    for new ``companies``, all in one transaction. Returns a summary dict.
+    """
+    companies = list(companies)
+    if not companies:
+        return {'companies': 0, 'accounts': 0, 'categories': 0, 'settings': 0}
+    accounts = seed_chart_of_accounts(companies, chart)
+    created_categories = create_default_categories(companies, categories) if categories else []
+    created_settings = create_default_settings(companies) if settings else []
+    summary = {
+        'companies': len(companies),
+        'accounts': sum(len(company_accounts) for company_accounts in accounts.values()),
+        'categories': len(created_categories),
+        'settings': len(created_settings),
+    }
+    logger.info("Bootstrapped %d company(ies): %d accounts, %d categories, %d settings",
+                summary['companies'], summary['accounts'], summary['categories'], summary['settings'])
+    return summary
+
+def bootstrap_company(company, **kwargs):
+    return bootstrap_companies([company], **kwargs)
@@ -1,6 +1,7 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\context_processors.py
 
 from .utils import get_currency_symbol, get_currency_icon_class, format_currency
+from apps.subscriptions.utils import get_company_access
 
 def currency_context(request):
     """
@@ -11,14 +12,10 @@ def currency_context(request):
     icon_class = 'fa-naira-sign'
     currency_code = 'NGN'
 
-    # This 'if' block is the important part
-    if (request.user.is_authenticated and 
-        hasattr(request.user, 'company') and 
-        request.user.company and
-        hasattr(request.user.company, 'currency')):
-        
-        company = request.user.company
-        currency_code = getattr(company, 'currency', 'NGN') 
+    # The currency comes from the request's cached access bundle
+    access = get_company_access(request.user)
+    if access.company_id:
+        currency_code = access.currency or 'NGN'
         
         # Use centralized utility functions
         symbol = get_currency_symbol(currency_code)
@@ -0,0 +1,142 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\counters.py
+"""
+Cached per-month counters for the large lists (transactions, journal entries,
+inventory movements).
+
+get_monthly_counters() returns {(year, month): {'count': ..., ...}} for a company,
+built with one grouped query and cached under a version (apps.core.versions)
+that is bumped, in the writer's transaction, whenever a row of that list is saved or deleted. List pages read their summary
+stats from here instead of counting the filtered set on every request.
+
+Note: queryset.update() and bulk_create() do not send signals; code that writes
+these models that way must call bump_counters() itself.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .versions import bump_version, get_version
+
+COUNTERS_CACHE_PREFIX = 'monthly_counters'
+
+TRANSACTIONS = 'transactions'
+JOURNAL_ENTRIES = 'journal_entries'
+INVENTORY_MOVEMENTS = 'inventory_movements'
+
+def _journal_aggregates():
+    return {
+        'count': Count('id', distinct=True),
+        'line_count': Count('lines'),
+        'entries_with_lines': Count('id', filter=Q(lines__isnull=False), distinct=True),
+    }
+
+def _movement_aggregates():
+    return {
+        'count': Count('id'),
+        'processed': Count('id', filter=Q(is_processed=True)),
+    }
+
+def _transaction_aggregates():
+    return {'count': Count('id')}
+
+# kind -> (model label, date field, aggregates)
+COUNTERS = {
+    TRANSACTIONS: ('transactions.Transaction', 'date', _transaction_aggregates),
+    JOURNAL_ENTRIES: ('journal.JournalEntry', 'date', _journal_aggregates),
+    INVENTORY_MOVEMENTS: ('inventory.InventoryMovement', 'created_at', _movement_aggregates),
+}
+
+def _version_name(kind):
+    return f"{COUNTERS_CACHE_PREFIX}:{kind}"
+
+def _get_version(kind, company_id):
+    return get_version(_version_name(kind), company_id)
+
+def bump_counters(kind, company_id):
+    bump_version(_version_name(kind), company_id)
+
+def build_monthly_counters(kind, company_id):
+    label, date_field, aggregates = COUNTERS[kind]
+    model = apps.get_model(label)
+    rows = (
+        model.objects.filter(company_id=company_id)
+        .annotate(month=TruncMonth(date_field))
+        .values('month')
+        .annotate(**aggregates())
+        .order_by('month')
+    )
+    counters = {}
+    for row in rows:
+        month = row.pop('month')
+        if month is not None:
+            counters[(month.year, month.month)] = row
+    return counters
+
+def get_monthly_counters(kind, company_id):
+    """{(year, month): counters} for a company, served from the cache"""
+    key = f"{COUNTERS_CACHE_PREFIX}:{kind}:{company_id}:{_get_version(kind, company_id)}"
+    counters = cache.get(key)
+    if counters is None:
+        counters = build_monthly_counters(kind, company_id)
+        cache.set(key, counters, timeout=getattr(settings, 'MONTHLY_COUNTERS_CACHE_TIMEOUT', 86400))
+    return counters
+
+def sum_counters(counters, months=None):
+    """Adds up the counters of the given (year, month) keys (all months by default)"""
+    totals = {}
+    for month, values in counters.items():
+        if months is not None and month not in months:
+            continue
+        for name, value in values.items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+def current_month():
+    today = timezone.localdate()
+    return (today.year, today.month)
+
+# --- Invalidation ------------------------------------------------------------
+
+def _bump(kind, company_id):
+    if company_id:
+        bump_counters(kind, company_id)
+
+# Saves that touch none of these fields can't move a row between months or counters
+COUNTED_FIELDS = {
+    TRANSACTIONS: {'company', 'date'},
+    JOURNAL_ENTRIES: {'company', 'date'},
+    INVENTORY_MOVEMENTS: {'company', 'created_at', 'is_processed'},
+}
+
+def _invalidate_for_row(sender, instance, created=False, update_fields=None, **kwargs):
+    for kind, (label, _, _) in COUNTERS.items():
+        if sender._meta.label != label:
+            continue
+        if not created and update_fields is not None and not set(update_fields) & COUNTED_FIELDS[kind]:
+            continue
+        _bump(kind, instance.company_id)
+
+def _invalidate_for_journal_line(sender, instance, created=True, **kwargs):
+    # Line counts feed the journal list's average lines per entry; edits don't change them
+    if not created:
+        return
+    JournalEntry = apps.get_model('journal', 'JournalEntry')
+    if sender.journal_entry.is_cached(instance):
+        company_id = instance.journal_entry.company_id
+    else:
+        company_id = JournalEntry.objects.filter(pk=instance.journal_entry_id).values_list('company_id', flat=True).first()
+    _bump(JOURNAL_ENTRIES, company_id)
+
+def connect_counter_signals():
+    """Called from CoreConfig.ready()"""
+    for kind, (label, _, _) in COUNTERS.items():
+        model = apps.get_model(label)
+        post_save.connect(_invalidate_for_row, sender=model, dispatch_uid=f'counters_save_{kind}')
+        post_delete.connect(_invalidate_for_row, sender=model, dispatch_uid=f'counters_delete_{kind}')
+    line_model = apps.get_model('journal', 'JournalEntryLine')
+    post_save.connect(_invalidate_for_journal_line, sender=line_model, dispatch_uid='counters_save_journal_line')
+    post_delete.connect(_invalidate_for_journal_line, sender=line_model, dispatch_uid='counters_delete_journal_line')
@@ -1,25 +1,40 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\database_config.py
 import os
 import json
-import psycopg2
 from django.conf import settings
-from django.core.management import execute_from_command_line
+
+from config.database import build_database_url
 
 class DatabaseConfigurator:
-    """Handle database configuration for standalone installations"""
+    """
+    Handle database configuration for standalone installations.
+
+    The chosen database is saved as DATABASE_URL in the project's .env file,
+    which settings.py reads at startup (see config/database.py). Settings are
+    not changed in the running process: restart the application, then run
+    ``manage.py migrate`` against the new database.
+    """
     
     CONFIG_FILE = 'database_config.json'
+    ENV_FILE = '.env'
     
     @staticmethod
     def test_postgresql_connection(config):
         """Test PostgreSQL connection"""
         try:
-            conn = psycopg2.connect(
+            try:
+                import psycopg
+                connect = psycopg.connect
+            except ImportError:
+                import psycopg2
+                connect = psycopg2.connect
+            conn = connect(
                 host=config['host'],
                 port=config['port'],
-                database=config['name'],
+                dbname=config['name'],
                 user=config['user'],
-                password=config['password']
+                password=config['password'],
+                connect_timeout=10
             )
             conn.close()
             return True
@@ -29,14 +44,14 @@ class DatabaseConfigurator:
     
     @staticmethod
     def save_database_config(config):
-        """Save database configuration to file"""
+        """Save database configuration to file and DATABASE_URL to .env"""
         config_path = os.path.join(settings.BASE_DIR, DatabaseConfigurator.CONFIG_FILE)
         
+        # Everything but the password, for display
         with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+            json.dump({key: value for key, value in config.items() if key != 'password'}, f, indent=2)
         
-        # Update Django settings dynamically
-        DatabaseConfigurator.update_django_settings(config)
+        DatabaseConfigurator.write_env_value('DATABASE_URL', build_database_url(config))
     
     @staticmethod
     def load_database_config():
@@ -50,23 +65,19 @@ class DatabaseConfigurator:
         return None
     
     @staticmethod
-    def update_django_settings(config):
-        """Update Django database settings"""
-        if config['type'] == 'postgresql':
-            settings.DATABASES['default'] = {
-                'ENGINE': 'django.db.backends.postgresql',
-                'NAME': config['name'],
-                'USER': config['user'],
-                'PASSWORD': config['password'],
-                'HOST': config['host'],
-                'PORT': config['port'],
-            }
+    def write_env_value(key, value):
+        """Set ``key`` in the .env file, replacing an existing line"""
+        if '\n' in value or '\r' in value:
+            raise ValueError(f"{key} must be a single line")
+        env_path = os.path.join(settings.BASE_DIR, DatabaseConfigurator.ENV_FILE)
+        lines = []
+        if os.path.exists(env_path):
+            with open(env_path, 'r') as f:
+                lines = [line for line in f.read().splitlines() if not line.startswith(f"{key}=")]
+        lines.append(f"{key}={value}")
         
-        # Run migrations after database change
-        try:
-            execute_from_command_line(['manage.py', 'migrate'])
-        except Exception as e:
-            print(f"Migration failed: {e}")
+        with open(env_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
     
     @staticmethod
     def setup_postgresql_installer():
@@ -0,0 +1,215 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\email_queue.py
+"""
+Outbound email queue.
+
+queue_email() renders an email and stores it as an OutboundEmail instead of
+talking to the mail server from the request or command that produced it. The
+process_email_queue command drains the queue: due emails are claimed with a
+short lease, grouped by sender so each worker thread reuses one connection,
+and failures are retried with exponential backoff until max_attempts.
+"""
+import math
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.db import close_old_connections, connection
+from django.db.models import Avg, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .email_transport import email_batch, send_message
+from .email_utils import build_email_message, get_sender_config
+from .models import OutboundEmail
+
+# Retry after 1, 2, 4, 8... minutes, never waiting more than an hour
+RETRY_BASE_DELAY = 60
+RETRY_MAX_DELAY = 3600
+# A claimed email whose worker died becomes due again after this long
+CLAIM_LEASE = timedelta(minutes=15)
+
+def _email_list(emails):
+    if not emails:
+        return ''
+    if isinstance(emails, str):
+        emails = [emails]
+    return ', '.join(email.strip() for email in emails if email and email.strip())
+
+def queue_email(subject, template_name, context, to_emails, cc_emails=None, attachment_path=None,
+                company=None, dedup_key=None, delete_attachment=False):
+    """
+    Queues a templated email for the worker. Takes the same arguments as send_email().
+
+    If ``dedup_key`` is given and an email with that key was already queued, nothing
+    new is queued. Returns (outbound_email, created).
+    """
+    fields = {
+        'company': company,
+        'subject': subject,
+        'template_name': template_name,
+        'html_content': render_to_string(template_name, context),
+        'to_emails': _email_list(to_emails),
+        'cc_emails': _email_list(cc_emails),
+        'attachment_path': attachment_path or '',
+        'delete_attachment': delete_attachment,
+    }
+    if dedup_key:
+        return OutboundEmail.objects.get_or_create(dedup_key=dedup_key, defaults=fields)
+    return OutboundEmail.objects.create(**fields), True
+
+def retry_delay(attempts):
+    """Seconds to wait after the given number of failed attempts"""
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+def claim_due_emails(limit, now=None):
+    """
+    Marks up to ``limit`` due emails as SENDING and returns them. Each row is
+    claimed with a conditional update, so concurrent workers never share one.
+    """
+    now = now or timezone.now()
+    due = Q(status=OutboundEmail.Status.PENDING) | Q(status=OutboundEmail.Status.SENDING)
+    candidate_ids = list(
+        OutboundEmail.objects.filter(due, next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+
+    claimed_ids = [
+        email_id for email_id in candidate_ids
+        if OutboundEmail.objects.filter(due, pk=email_id, next_attempt_at__lte=now).update(
+            status=OutboundEmail.Status.SENDING,
+            next_attempt_at=now + CLAIM_LEASE
+        )
+    ]
+    return list(OutboundEmail.objects.filter(pk__in=claimed_ids).select_related('company'))
+
+def _remove_attachment(email):
+    if email.delete_attachment and email.attachment_path:
+        try:
+            os.remove(email.attachment_path)
+        except OSError:
+            pass
+
+def deliver_email(email):
+    """Sends one claimed email and records the outcome (call inside email_batch())"""
+    started = time.monotonic()
+    try:
+        config = get_sender_config(email.company)
+        if config is None:
+            raise RuntimeError("Email credentials are not configured.")
+        if email.attachment_path and not os.path.exists(email.attachment_path):
+            raise FileNotFoundError(f"Attachment {email.attachment_path} no longer exists.")
+
+        msg, recipients = build_email_message(
+            config.email,
+            email.subject,
+            [address.strip() for address in email.to_emails.split(',') if address.strip()],
+            html_content=email.html_content if email.html_content else None,
+            text_content=email.text_content,
+            cc_emails=[address.strip() for address in email.cc_emails.split(',') if address.strip()],
+            attachment_path=email.attachment_path or None
+        )
+        send_message(config, msg, recipients)
+    except Exception as e:
+        email.attempts += 1
+        email.last_error = str(e) or e.__class__.__name__
+        if email.attempts >= email.max_attempts:
+            email.status = OutboundEmail.Status.FAILED
+            _remove_attachment(email)
+        else:
+            email.status = OutboundEmail.Status.PENDING
+            email.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(email.attempts))
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+        return False
+
+    email.attempts += 1
+    email.status = OutboundEmail.Status.SENT
+    email.sent_at = timezone.now()
+    email.send_seconds = time.monotonic() - started
+    email.last_error = ''
+    email.save(update_fields=['attempts', 'status', 'sent_at', 'send_seconds', 'last_error'])
+    _remove_attachment(email)
+    return True
+
+def _deliver_group(emails):
+    """Worker thread body: one connection per sender for the whole group"""
+    close_old_connections()
+    try:
+        with email_batch():
+            return [deliver_email(email) for email in emails]
+    finally:
+        # Threads get their own database connection; don't leak it
+        connection.close()
+
+def process_email_queue(batch_size=50, concurrency=4, now=None):
+    """
+    Claims up to ``batch_size`` due emails and sends them on at most
+    ``concurrency`` connections at once. Returns (sent, failed) counts.
+    """
+    emails = claim_due_emails(batch_size, now)
+    if not emails:
+        return 0, 0
+
+    by_sender = defaultdict(list)
+    for email in emails:
+        by_sender[email.company_id].append(email)
+
+    # Split big senders so every worker has a similar share of the batch
+    chunk_size = max(1, math.ceil(len(emails) / max(concurrency, 1)))
+    groups = [
+        sender_emails[i:i + chunk_size]
+        for sender_emails in by_sender.values()
+        for i in range(0, len(sender_emails), chunk_size)
+    ]
+
+    if concurrency <= 1 or len(groups) == 1:
+        with email_batch():
+            results = [deliver_email(email) for email in emails]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(groups))) as executor:
+            results = [result for group_results in executor.map(_deliver_group, groups) for result in group_results]
+
+    sent = sum(1 for result in results if result)
+    return sent, len(results) - sent
+
+def get_queue_stats(company=None, hours=24):
+    """
+    Queue depth, failure rate and latency over the last ``hours`` hours, for one
+    company's emails or (company=None, for the worker command) the whole queue.
+    """
+    since = timezone.now() - timedelta(hours=hours)
+    emails = OutboundEmail.objects.all()
+    if company is not None:
+        emails = emails.filter(company=company)
+
+    pending = emails.filter(status=OutboundEmail.Status.PENDING).count()
+    retrying = emails.filter(status=OutboundEmail.Status.PENDING, attempts__gt=0).count()
+    sending = emails.filter(status=OutboundEmail.Status.SENDING).count()
+
+    recent_sent = emails.filter(status=OutboundEmail.Status.SENT, sent_at__gte=since)
+    sent_count = recent_sent.count()
+    failed_count = emails.filter(status=OutboundEmail.Status.FAILED, created_at__gte=since).count()
+    finished = sent_count + failed_count
+
+    send_times = sorted(recent_sent.exclude(send_seconds__isnull=True).values_list('send_seconds', flat=True))
+    p95_send_seconds = send_times[min(len(send_times) - 1, int(len(send_times) * 0.95))] if send_times else None
+
+    queue_times = [
+        (sent_at - created_at).total_seconds()
+        for sent_at, created_at in recent_sent.values_list('sent_at', 'created_at')
+    ]
+
+    return {
+        'hours': hours,
+        'queue_depth': pending + sending,
+        'pending': pending,
+        'retrying': retrying,
+        'sending': sending,
+        'sent': sent_count,
+        'failed': failed_count,
+        'failure_rate': round(failed_count * 100 / finished, 1) if finished else 0,
+        'avg_send_seconds': recent_sent.aggregate(avg=Avg('send_seconds'))['avg'],
+        'p95_send_seconds': p95_send_seconds,
+        'avg_queue_seconds': sum(queue_times) / len(queue_times) if queue_times else None,
+    }
@@ -0,0 +1,192 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\email_transport.py
+"""
+Email transports used by apps.core.email_utils.
+
+A transport delivers already-built MIME messages. Outside a batch every send
+opens and closes its own connection; inside ``email_batch()`` one authenticated
+connection is kept per sender configuration (server, port, account, TLS) and
+reused until the batch ends, so sending N messages costs one SMTP handshake.
+Encoded attachments are also reused for the whole batch.
+
+settings.EMAIL_TRANSPORT selects the transport:
+  'smtp'    - real delivery (default)
+  'console' - print each message to stdout
+  'file'    - write each message as a .eml file under settings.EMAIL_FILE_PATH
+"""
+import os
+import smtplib
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from email import encoders
+from email.mime.base import MIMEBase
+from typing import NamedTuple
+from django.conf import settings
+
+SMTP_TIMEOUT = 30
+
+class SenderConfig(NamedTuple):
+    email: str
+    password: str
+    host: str
+    port: int
+    use_tls: bool
+
+class SMTPTransport:
+    """One authenticated SMTP connection, reopened once if the server drops it."""
+
+    def __init__(self, config):
+        self.config = config
+        self.connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return
+        connection = smtplib.SMTP(self.config.host, self.config.port, timeout=SMTP_TIMEOUT)
+        try:
+            if self.config.use_tls:
+                connection.starttls()
+            connection.login(self.config.email, self.config.password)
+        except Exception:
+            connection.close()
+            raise
+        self.connection = connection
+
+    def close(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.quit()
+        except (smtplib.SMTPException, OSError):
+            # The server may already have hung up on an idle connection
+            self.connection.close()
+        finally:
+            self.connection = None
+
+    def discard(self):
+        """Drops a connection the server has already hung up on, releasing its socket"""
+        if self.connection is None:
+            return
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+        finally:
+            self.connection = None
+
+    def send(self, msg, recipients):
+        self.open()
+        try:
+            self.connection.sendmail(self.config.email, recipients, msg.as_string())
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # Pooled connections can time out between messages; reconnect and retry once
+            self.discard()
+            self.open()
+            self.connection.sendmail(self.config.email, recipients, msg.as_string())
+
+class ConsoleTransport:
+    """Prints messages instead of sending them (local development)."""
+
+    def __init__(self, config, stream=None):
+        self.config = config
+        self.stream = stream or sys.stdout
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, msg, recipients):
+        self.stream.write(msg.as_string())
+        self.stream.write('\n' + '-' * 79 + '\n')
+        self.stream.flush()
+
+class FileTransport(ConsoleTransport):
+    """Writes each message to its own .eml file (local development and testing)."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.directory = getattr(settings, 'EMAIL_FILE_PATH', None) or os.path.join(settings.MEDIA_ROOT, 'sent_emails')
+
+    def send(self, msg, recipients):
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{id(msg)}.eml"
+        with open(os.path.join(self.directory, filename), 'wb') as f:
+            f.write(msg.as_bytes())
+
+TRANSPORTS = {
+    'smtp': SMTPTransport,
+    'console': ConsoleTransport,
+    'file': FileTransport,
+}
+
+_batch = threading.local()
+
+def _batch_state():
+    return getattr(_batch, 'state', None)
+
+@contextmanager
+def email_batch():
+    """
+    Reuse one connection per sender configuration (and each encoded attachment)
+    for every message sent inside the block. Nested batches join the outer one.
+    """
+    if _batch_state() is not None:
+        yield
+        return
+
+    _batch.state = {'transports': {}, 'attachments': {}}
+    try:
+        yield
+    finally:
+        state = _batch.state
+        _batch.state = None
+        for transport in state['transports'].values():
+            transport.close()
+
+def get_transport(config):
+    """A transport for ``config``; pooled when called inside email_batch()"""
+    state = _batch_state()
+    if state is not None and config in state['transports']:
+        return state['transports'][config]
+
+    transport_class = TRANSPORTS[getattr(settings, 'EMAIL_TRANSPORT', 'smtp')]
+    transport = transport_class(config)
+    if state is not None:
+        state['transports'][config] = transport
+    return transport
+
+def send_message(config, msg, recipients):
+    """Deliver a built message; the connection is closed afterwards unless batching"""
+    transport = get_transport(config)
+    try:
+        transport.send(msg, recipients)
+    finally:
+        if _batch_state() is None:
+            transport.close()
+
+def attachment_part(path):
+    """
+    The encoded MIME part for a file. Inside a batch each file is read and
+    base64-encoded once, however many messages it is attached to.
+    """
+    state = _batch_state()
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if state is not None and key in state['attachments']:
+        return state['attachments'][key]
+
+    part = MIMEBase('application', 'octet-stream')
+    with open(path, 'rb') as attachment:
+        part.set_payload(attachment.read())
+    encoders.encode_base64(part)
+    part.add_header(
+        'Content-Disposition',
+        f'attachment; filename= {os.path.basename(path)}'
+    )
+
+    if state is not None:
+        state['attachments'][key] = part
+    return part
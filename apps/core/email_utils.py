@@ -1,40 +1,97 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\email_utils.py
 
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
 import os
 from django.template.loader import render_to_string
 from django.conf import settings
 from .models import EmailConfiguration
+from .email_transport import SenderConfig, attachment_part, email_batch, send_message
 
-def send_email(subject, template_name, context, to_emails, cc_emails=None, from_email=None, attachment_path=None, company=None):
+def get_sender_config(company=None, verbose=False):
     """
-    Sends an email with intelligent sender logic.
-    - If 'company' is provided, it uses that company's specific email configuration.
-    - If 'company' is NOT provided, it uses the system's default email settings from settings.py.
+    Sender account and server for a company.
+    - If 'company' has an active email configuration, its account and server are used.
+    - Otherwise the system's default email settings from settings.py are used.
+    Returns None when no credentials are configured.
     """
     # --- KEY FIX: Start with system defaults from settings.py ---
-    sender_email = settings.EMAIL_HOST_USER
-    sender_password = settings.EMAIL_HOST_PASSWORD
+    config = SenderConfig(
+        email=settings.EMAIL_HOST_USER,
+        password=settings.EMAIL_HOST_PASSWORD,
+        host=settings.EMAIL_HOST,
+        port=settings.EMAIL_PORT,
+        use_tls=settings.EMAIL_USE_TLS,
+    )
 
     # --- NEW LOGIC: If a company is specified, try to use its config instead ---
     if company:
         try:
             email_config = company.email_config
             if email_config and email_config.is_active and email_config.email_address and email_config.app_password:
-                sender_email = email_config.email_address
-                sender_password = email_config.app_password
-                print(f"INFO: Using specific email configuration for company: {company.name}")
+                config = SenderConfig(
+                    email=email_config.email_address,
+                    password=email_config.app_password,
+                    host=email_config.smtp_server or settings.EMAIL_HOST,
+                    port=email_config.smtp_port or settings.EMAIL_PORT,
+                    use_tls=email_config.use_tls,
+                )
+                if verbose:
+                    print(f"INFO: Using specific email configuration for company: {company.name}")
         except EmailConfiguration.DoesNotExist:
-            print(f"INFO: No specific email config for {company.name}. Falling back to system default.")
-    else:
+            if verbose:
+                print(f"INFO: No specific email config for {company.name}. Falling back to system default.")
+    elif verbose:
         print("INFO: No company provided. Using system default email configuration.")
 
+    if not config.email or not config.password:
+        return None
+    return config
+
+def build_email_message(sender_email, subject, to_emails, html_content=None, text_content=None,
+                        cc_emails=None, attachment_path=None):
+    """
+    Builds the MIME message for one email. Returns (msg, all_recipients).
+    """
+    msg = MIMEMultipart('alternative') if html_content is not None else MIMEMultipart()
+    msg['From'] = sender_email
+    
+    if isinstance(to_emails, str):
+        to_emails = [to_emails]
+    msg['To'] = ', '.join(to_emails)
+    
+    all_recipients = list(to_emails)
+    if cc_emails:
+        if isinstance(cc_emails, str):
+            cc_emails = [cc_emails]
+        cc_emails = [email.strip() for email in cc_emails if email.strip() and email.strip() not in to_emails]
+        if cc_emails:
+            msg['Cc'] = ', '.join(cc_emails)
+            all_recipients.extend(cc_emails)
+    
+    msg['Subject'] = subject
+    
+    if html_content is not None:
+        msg.attach(MIMEText(html_content, 'html'))
+    else:
+        msg.attach(MIMEText(text_content or '', 'plain'))
+    
+    if attachment_path and os.path.exists(attachment_path):
+        msg.attach(attachment_part(attachment_path))
+    
+    return msg, all_recipients
+
+def send_email(subject, template_name, context, to_emails, cc_emails=None, from_email=None, attachment_path=None, company=None):
+    """
+    Sends an email with intelligent sender logic.
+    - If 'company' is provided, it uses that company's specific email configuration.
+    - If 'company' is NOT provided, it uses the system's default email settings from settings.py.
+    Inside email_batch() the connection is reused for later messages.
+    """
+    config = get_sender_config(company, verbose=True)
+
     # Final check to ensure credentials are set from either source
-    if not sender_email or not sender_password:
+    if config is None:
         print("ERROR: Email credentials are not configured. Email not sent. Please set EMAIL_HOST_USER and EMAIL_HOST_PASSWORD in settings.py.")
         return False
 
@@ -42,49 +99,16 @@ def send_email(subject, template_name, context, to_emails, cc_emails=None, from_
         # Render the email template
         html_content = render_to_string(template_name, context)
         
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['From'] = sender_email
-        
-        if isinstance(to_emails, str):
-            to_emails = [to_emails]
-        msg['To'] = ', '.join(to_emails)
-        
-        all_recipients = list(to_emails)
-        if cc_emails:
-            if isinstance(cc_emails, str):
-                cc_emails = [cc_emails]
-            cc_emails = [email.strip() for email in cc_emails if email.strip() and email.strip() not in to_emails]
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
-                all_recipients.extend(cc_emails)
-        
-        msg['Subject'] = subject
-        
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
+        msg, all_recipients = build_email_message(
+            config.email, subject, to_emails,
+            html_content=html_content,
+            cc_emails=cc_emails,
+            attachment_path=attachment_path
+        )
         
-        if attachment_path and os.path.exists(attachment_path):
-            with open(attachment_path, "rb") as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
-            encoders.encode_base64(part)
-            part.add_header(
-                'Content-Disposition',
-                f'attachment; filename= {os.path.basename(attachment_path)}'
-            )
-            msg.attach(part)
+        send_message(config, msg, all_recipients)
         
-        # Send email using SMTP
-        server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT)
-        if settings.EMAIL_USE_TLS:
-            server.starttls()
-        
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, all_recipients, msg.as_string())
-        server.quit()
-        
-        print(f"SUCCESS: Email sent from '{sender_email}' to '{', '.join(to_emails)}'")
+        print(f"SUCCESS: Email sent from '{config.email}' to '{msg['To']}'")
         return True
         
     except Exception as e:
@@ -95,52 +119,37 @@ def send_email_simple(subject, message, to_emails, cc_emails=None, company=None)
     """
     Simple email sender without template, with CC support and smart sender logic.
     """
-    sender_email = settings.EMAIL_HOST_USER
-    sender_password = settings.EMAIL_HOST_PASSWORD
-
-    if company:
-        try:
-            email_config = company.email_config
-            if email_config and email_config.is_active and email_config.email_address and email_config.app_password:
-                sender_email = email_config.email_address
-                sender_password = email_config.app_password
-        except EmailConfiguration.DoesNotExist:
-            pass
+    config = get_sender_config(company)
 
-    if not sender_email or not sender_password:
+    if config is None:
         print("ERROR: Email credentials are not configured. Email not sent.")
         return False
     
     try:
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        
-        if isinstance(to_emails, str):
-            to_emails = [to_emails]
-        msg['To'] = ', '.join(to_emails)
-        
-        all_recipients = list(to_emails)
-        if cc_emails:
-            if isinstance(cc_emails, str):
-                cc_emails = [cc_emails]
-            cc_emails = [email.strip() for email in cc_emails if email.strip() and email.strip() not in to_emails]
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
-                all_recipients.extend(cc_emails)
+        msg, all_recipients = build_email_message(
+            config.email, subject, to_emails,
+            text_content=message,
+            cc_emails=cc_emails
+        )
         
-        msg['Subject'] = subject
-        msg.attach(MIMEText(message, 'plain'))
-        
-        server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT)
-        if settings.EMAIL_USE_TLS:
-            server.starttls()
-        
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, all_recipients, msg.as_string())
-        server.quit()
+        send_message(config, msg, all_recipients)
         
         return True
         
     except Exception as e:
         print(f"Error sending simple email: {e}")
         return False
+
+def send_email_batch(messages, company=None):
+    """
+    Sends several templated emails with one connection per sender configuration.
+    ``messages`` is a list of send_email() keyword arguments (the company argument
+    applies to messages that don't set their own). Returns a list of booleans.
+    """
+    results = []
+    with email_batch():
+        for message in messages:
+            message = dict(message)
+            message.setdefault('company', company)
+            results.append(send_email(**message))
+    return results
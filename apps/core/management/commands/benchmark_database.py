@@ -0,0 +1,89 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\benchmark_database.py
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from apps.accounts.models import Account
+from apps.core.bootstrap import bootstrap_company
+from apps.core.models import Company
+from apps.journal.models import JournalEntry, JournalEntryLine
+from apps.reporting.services import build_balance_sheet, build_income_statement, build_trial_balance
+from apps.reporting.utils import build_general_ledger_export_rows
+
+BULK_BATCH_SIZE = 1000
+
+class Command(BaseCommand):
+    help = (
+        'Time posting and reporting on the configured database (DATABASE_URL): journal '
+        'entries saved one by one and in bulk, the financial statements and the streamed '
+        'general ledger export, for a generated company. Everything is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=5000, help='Journal entries posted in bulk')
+        parser.add_argument('--single', type=int, default=200, help='Journal entries posted one by one')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        settings_dict = connection.settings_dict
+        pooled = 'pool' in settings_dict.get('OPTIONS', {})
+        self.stdout.write(
+            f"Database: {connection.vendor} {settings_dict['NAME']} "
+            f"(CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}, pool={'on' if pooled else 'off'})"
+        )
+        rng = random.Random(options['seed'])
+        timings = []
+
+        def timed(label, rows, function):
+            started = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - started
+            timings.append((label, rows, elapsed))
+            return result
+
+        with transaction.atomic():
+            company = Company.objects.create(name=f"Benchmark {uuid.uuid4().hex[:8]}")
+            bootstrap_company(company)
+            accounts = list(Account.objects.filter(company=company, children__isnull=True).values_list('id', flat=True))
+            start = date.today() - timedelta(days=365)
+
+            def pairs(count):
+                for _ in range(count):
+                    debit, credit = rng.sample(accounts, 2)
+                    yield debit, credit, Decimal(rng.randint(100, 1000000)) / 100, start + timedelta(days=rng.randrange(365))
+
+            def post_single():
+                for debit, credit, amount, day in pairs(options['single']):
+                    entry = JournalEntry.objects.create(company=company, date=day, description="Benchmark posting")
+                    JournalEntryLine.objects.create(journal_entry=entry, account_id=debit, debit=amount, credit=Decimal('0.00'))
+                    JournalEntryLine.objects.create(journal_entry=entry, account_id=credit, debit=Decimal('0.00'), credit=amount)
+
+            def post_bulk():
+                rows = list(pairs(options['entries']))
+                entries = JournalEntry.objects.bulk_create([
+                    JournalEntry(company=company, date=day, description="Benchmark posting") for _, _, _, day in rows
+                ], batch_size=BULK_BATCH_SIZE)
+                lines = []
+                for entry, (debit, credit, amount, _) in zip(entries, rows):
+                    lines.append(JournalEntryLine(journal_entry=entry, account_id=debit, debit=amount, credit=Decimal('0.00')))
+                    lines.append(JournalEntryLine(journal_entry=entry, account_id=credit, debit=Decimal('0.00'), credit=amount))
+                JournalEntryLine.objects.bulk_create(lines, batch_size=BULK_BATCH_SIZE)
+
+            timed('post one by one', options['single'], post_single)
+            timed('post in bulk', options['entries'], post_bulk)
+            timed('trial balance', len(accounts), lambda: build_trial_balance(company))
+            timed('income statement', len(accounts), lambda: build_income_statement(company))
+            timed('balance sheet', len(accounts), lambda: build_balance_sheet(company))
+            gl_rows = timed('general ledger export', 0, lambda: build_general_ledger_export_rows(company))
+            timings[-1] = (timings[-1][0], len(gl_rows), timings[-1][2])
+
+            transaction.set_rollback(True)
+
+        for label, rows, elapsed in timings:
+            rate = f"{rows / elapsed:,.0f} rows/s" if rows and elapsed else ''
+            self.stdout.write(f"  {label:<24} {elapsed * 1000:9.1f} ms  {rows:>7} rows  {rate}")
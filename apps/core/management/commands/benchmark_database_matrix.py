@@ -0,0 +1,72 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\benchmark_database_matrix.py
+import os
+import subprocess
+import sys
+import tempfile
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.database import POSTGRESQL_ENGINE, parse_database_url
+
+class Command(BaseCommand):
+    help = (
+        'Run the posting/reporting benchmarks against several databases, one process per '
+        'database with its own DATABASE_URL: a scratch SQLite file and, when given, a local '
+        'PostgreSQL database (migrated first; use an empty scratch database).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database-url', action='append', default=[],
+                            help='Database to benchmark (repeatable). Default: a scratch SQLite file, '
+                                 'plus $BENCHMARK_POSTGRES_URL when set')
+        parser.add_argument('--pool', action='store_true', help='Also run PostgreSQL with the psycopg pool on')
+        parser.add_argument('--entries', type=int, default=5000)
+        parser.add_argument('--single', type=int, default=200)
+        parser.add_argument('--writers', type=int, default=8, help='Parallel writers for the SQLite writer benchmark')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            urls = options['database_url'] or [f"sqlite:///{os.path.join(directory, 'bench.sqlite3')}"]
+            if not options['database_url'] and os.getenv('BENCHMARK_POSTGRES_URL'):
+                urls.append(os.getenv('BENCHMARK_POSTGRES_URL'))
+
+            runs = []
+            for url in urls:
+                try:
+                    engine = parse_database_url(url, settings.BASE_DIR)['ENGINE']
+                except ValueError as e:
+                    raise CommandError(str(e))
+                runs.append((url, engine, {}))
+                if options['pool'] and engine == POSTGRESQL_ENGINE:
+                    runs.append((url, engine, {'DB_POOL': 'True'}))
+
+            failed = 0
+            for url, engine, extra_env in runs:
+                env = {**os.environ, 'DATABASE_URL': url, **extra_env}
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"== {url.split('@')[-1]}{' (pooled)' if extra_env else ''}"
+                ))
+                steps = [
+                    ['migrate', '--noinput', '-v', '0'],
+                    ['benchmark_database', '--entries', str(options['entries']), '--single', str(options['single'])],
+                ]
+                if engine != POSTGRESQL_ENGINE:
+                    steps.append(['benchmark_sqlite_writers', '--writers', str(options['writers'])])
+                for step in steps:
+                    if not self.run_step(step, env):
+                        failed += 1
+                        break
+
+        if failed:
+            raise CommandError(f"{failed} database(s) failed; see the output above.")
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(runs)} database configuration(s)"))
+
+    def run_step(self, step, env):
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        completed = subprocess.run([sys.executable, manage, *step], env=env, capture_output=True, text=True)
+        if completed.stdout:
+            self.stdout.write(completed.stdout.rstrip())
+        if completed.returncode != 0:
+            self.stderr.write(f"'{step[0]}' failed:\n{completed.stderr.rstrip()}")
+            return False
+        return True
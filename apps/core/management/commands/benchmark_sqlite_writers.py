@@ -0,0 +1,133 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\benchmark_sqlite_writers.py
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.sqlite import DEFAULT_PRAGMAS, pragma_statements
+from .benchmark_typeahead import percentile
+
+SCHEMA = [
+    "CREATE TABLE balance (account INTEGER PRIMARY KEY, amount INTEGER NOT NULL)",
+    "CREATE TABLE entry (id INTEGER PRIMARY KEY, account INTEGER NOT NULL, amount INTEGER NOT NULL, memo TEXT)",
+    "CREATE INDEX entry_account ON entry (account)",
+]
+
+# name -> (pragmas, BEGIN statement, busy timeout in seconds)
+PROFILES = {
+    # Django's defaults: rollback journal, full sync, deferred transactions, 5s timeout
+    'default': ({}, 'BEGIN', 5),
+    'tuned': (DEFAULT_PRAGMAS, 'BEGIN IMMEDIATE', 20),
+}
+
+class Command(BaseCommand):
+    help = (
+        'Measure posting throughput of parallel writers on a scratch SQLite database, '
+        'with Django\'s default SQLite settings and with the tuned profile '
+        '(WAL, synchronous=NORMAL, busy timeout, BEGIN IMMEDIATE).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Parallel writer threads')
+        parser.add_argument('--transactions', type=int, default=200, help='Postings per writer')
+        parser.add_argument('--readers', type=int, default=2, help='Parallel threads running report-style reads')
+        parser.add_argument('--profile', choices=['default', 'tuned', 'both'], default='both')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['writers'] < 1 or options['transactions'] < 1:
+            raise CommandError("--writers and --transactions must be at least 1.")
+        profiles = list(PROFILES) if options['profile'] == 'both' else [options['profile']]
+        for name in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                stats = self.run_profile(os.path.join(directory, 'bench.sqlite3'), name, options)
+            self.stdout.write(
+                f"{name:<8} {options['writers']} writers x {options['transactions']}: "
+                f"{stats['committed']} committed, {stats['locked']} 'database is locked' in {stats['elapsed']:.2f}s "
+                f"-> {stats['committed'] / stats['elapsed']:.0f} postings/s, "
+                f"p50 {stats['p50'] * 1000:.1f} ms, p95 {stats['p95'] * 1000:.1f} ms; "
+                f"{stats['reads']} reads"
+            )
+
+    def connect(self, path, name):
+        pragmas, _, busy_timeout = PROFILES[name]
+        connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        if pragmas:
+            for statement in pragma_statements(pragmas, busy_timeout):
+                connection.execute(statement)
+        return connection
+
+    def run_profile(self, path, name, options):
+        accounts = 50
+        setup = self.connect(path, name)
+        for statement in SCHEMA:
+            setup.execute(statement)
+        setup.executemany("INSERT INTO balance VALUES (?, 0)", [(account,) for account in range(accounts)])
+        setup.close()
+
+        begin = PROFILES[name][1]
+        latencies, counts, lock = [], {'committed': 0, 'locked': 0, 'reads': 0}, threading.Lock()
+        stop = threading.Event()
+
+        def writer(index):
+            rng = random.Random(options['seed'] + index)
+            connection = self.connect(path, name)
+            local_latencies, committed, locked = [], 0, 0
+            for _ in range(options['transactions']):
+                account, amount = rng.randrange(accounts), rng.randint(1, 1000)
+                started = time.perf_counter()
+                try:
+                    # A posting reads before it writes, like a balance check followed by the entry
+                    connection.execute(begin)
+                    connection.execute("SELECT amount FROM balance WHERE account = ?", (account,)).fetchone()
+                    connection.execute("INSERT INTO entry (account, amount, memo) VALUES (?, ?, ?)", (account, amount, 'posting'))
+                    connection.execute("UPDATE balance SET amount = amount + ? WHERE account = ?", (amount, account))
+                    connection.execute("COMMIT")
+                    committed += 1
+                    local_latencies.append(time.perf_counter() - started)
+                except sqlite3.OperationalError as e:
+                    if connection.in_transaction:
+                        connection.execute("ROLLBACK")
+                    if 'locked' not in str(e) and 'busy' not in str(e):
+                        raise
+                    locked += 1
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                counts['committed'] += committed
+                counts['locked'] += locked
+
+        def reader():
+            connection = self.connect(path, name)
+            reads = 0
+            while not stop.is_set():
+                try:
+                    connection.execute("SELECT account, SUM(amount) FROM entry GROUP BY account").fetchall()
+                    reads += 1
+                except sqlite3.OperationalError:
+                    pass
+            connection.close()
+            with lock:
+                counts['reads'] += reads
+
+        readers = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        writers = [threading.Thread(target=writer, args=(index,)) for index in range(options['writers'])]
+        started = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        return {
+            **counts,
+            'elapsed': elapsed,
+            'p50': percentile(latencies, 0.50) if latencies else 0,
+            'p95': percentile(latencies, 0.95) if latencies else 0,
+        }
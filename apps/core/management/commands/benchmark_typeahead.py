@@ -0,0 +1,146 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\benchmark_typeahead.py
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from apps.accounts.models import Account
+from apps.core.models import Company
+from apps.core.picker import INVENTORY, bump_picker_version, get_projection
+from apps.core.search import rebuild_index, search_queryset
+from apps.inventory.api_views import inventory_search_api
+from apps.inventory.models import InventoryCostLayer, InventoryItem
+
+WORDS = [
+    'steel', 'bolt', 'cable', 'paint', 'filter', 'valve', 'pump', 'panel', 'sensor', 'switch',
+    'copper', 'nylon', 'rubber', 'brass', 'glass', 'timber', 'cement', 'plastic', 'motor', 'gear',
+]
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class Command(BaseCommand):
+    help = (
+        'Measure typeahead latency (p50/p95) of the inventory search API against a '
+        'generated catalogue. All generated data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', type=int, help='Company to generate items for (default: first company)')
+        parser.add_argument('--items', type=int, default=50000, help='Number of items to generate')
+        parser.add_argument('--requests', type=int, default=300, help='Requests per measured path')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(pk=options['company_id']).first() if options['company_id'] else Company.objects.first()
+        if company is None:
+            raise CommandError("No company found.")
+        user = get_user_model().objects.filter(company=company, is_active=True).first()
+        account = Account.objects.filter(company=company).first()
+        if user is None or account is None:
+            raise CommandError(f"{company} needs an active user and at least one account.")
+
+        rng = random.Random(options['seed'])
+        queries = [
+            ' '.join(word[:rng.randint(2, len(word))] for word in rng.sample(WORDS, rng.randint(1, 2)))
+            for _ in range(options['requests'])
+        ]
+
+        try:
+            with transaction.atomic():
+                self._generate(company, account, options['items'], rng)
+                self._measure(company, user, queries)
+                transaction.set_rollback(True)
+        finally:
+            # The projection built inside the transaction refers to rolled back rows
+            bump_picker_version(INVENTORY, company.id)
+
+    def _generate(self, company, account, count, rng):
+        started = time.monotonic()
+        items = InventoryItem.objects.bulk_create([
+            InventoryItem(
+                company=company,
+                name=f"{' '.join(rng.sample(WORDS, 3))} {i}",
+                sku=f"BENCH-{i:06d}",
+                description=f"{rng.choice(WORDS)} grade {rng.choice(WORDS)}",
+                quantity_on_hand=Decimal(rng.randint(0, 500)),
+                sale_price=Decimal(rng.randint(100, 100000)) / 100,
+                income_account=account,
+            )
+            for i in range(count)
+        ], batch_size=2000)
+
+        if not items or items[0].pk is None:
+            items = list(InventoryItem.objects.filter(company=company, sku__startswith='BENCH-'))
+        now = timezone.now()
+        InventoryCostLayer.objects.bulk_create([
+            InventoryCostLayer(
+                item=item,
+                purchase_date=now - timedelta(days=layer),
+                quantity=Decimal('10'),
+                quantity_remaining=Decimal(rng.randint(1, 10)),
+                unit_cost=Decimal(rng.randint(100, 50000)) / 100,
+            )
+            for item in items if item.quantity_on_hand > 0
+            for layer in range(2)
+        ], batch_size=2000)
+
+        # bulk_create sends no signals: refresh the index and projection by hand
+        rebuild_index('inventory', company_id=company.id)
+        bump_picker_version(INVENTORY, company.id)
+        self.stdout.write(f"Generated {count} items in {time.monotonic() - started:.1f}s")
+
+    def _time_requests(self, user, queries, headers=None):
+        factory = RequestFactory()
+        samples = []
+        statuses = set()
+        for query in queries:
+            request = factory.get('/inventory/api/items/search/', {'q': query}, **(headers or {}).get(query, {}))
+            request.user = user
+            started = time.perf_counter()
+            response = inventory_search_api(request)
+            samples.append(time.perf_counter() - started)
+            statuses.add(response.status_code)
+        return samples, statuses
+
+    def _report(self, label, samples, statuses=None):
+        self.stdout.write(
+            f"{label:<32} p50 {percentile(samples, 0.5) * 1000:8.2f} ms   "
+            f"p95 {percentile(samples, 0.95) * 1000:8.2f} ms"
+            + (f"   status {sorted(statuses)}" if statuses else "")
+        )
+
+    def _measure(self, company, user, queries):
+        # Previous implementation: ORM rows plus a cost layer scan per result
+        legacy = []
+        for query in queries:
+            started = time.perf_counter()
+            items, _ = search_queryset(
+                InventoryItem.objects.filter(company=company, is_active=True),
+                'inventory', company.id, query, 1, 15
+            )
+            [str(item.purchase_price or 0) for item in items]
+            legacy.append(time.perf_counter() - started)
+        self._report('ORM rows + per-item cost', legacy)
+
+        started = time.perf_counter()
+        get_projection(INVENTORY, company.id)
+        self.stdout.write(f"{'Projection build':<32} {(time.perf_counter() - started) * 1000:8.2f} ms")
+
+        samples, statuses = self._time_requests(user, queries)
+        self._report('Picker projection (200)', samples, statuses)
+
+        # Clients repeating a query send back the ETag they were given
+        etags = {}
+        for query in queries:
+            request = RequestFactory().get('/inventory/api/items/search/', {'q': query})
+            request.user = user
+            etags[query] = {'HTTP_IF_NONE_MATCH': inventory_search_api(request)['ETag']}
+        samples, statuses = self._time_requests(user, queries, etags)
+        self._report('Conditional request (304)', samples, statuses)
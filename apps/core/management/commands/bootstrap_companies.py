@@ -0,0 +1,52 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\bootstrap_companies.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.core.bootstrap import BootstrapError, bootstrap_companies
+from apps.core.models import Company
+
+class Command(BaseCommand):
+    help = (
+        'Provision many companies in one run: chart of accounts, default transaction '
+        'categories and backup settings, written in bulk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', action='append', default=[], help='Create a company with this name (repeatable)')
+        parser.add_argument('--company-id', action='append', type=int, default=[],
+                            help='Bootstrap this existing company (repeatable); it must have no accounts yet')
+        parser.add_argument('--all-missing', action='store_true',
+                            help='Bootstrap every active user company that has no accounts yet')
+        parser.add_argument('--currency', default='NGN', help='Currency of the companies created with --name')
+
+    def handle(self, *args, **options):
+        if not (options['name'] or options['company_id'] or options['all_missing']):
+            raise CommandError("Pass --name, --company-id or --all-missing.")
+
+        started = time.monotonic()
+        try:
+            with transaction.atomic():
+                companies = list(Company.objects.filter(pk__in=options['company_id']))
+                missing_ids = set(options['company_id']) - {company.id for company in companies}
+                if missing_ids:
+                    raise CommandError(f"Company ID(s) not found: {', '.join(map(str, sorted(missing_ids)))}")
+                if options['all_missing']:
+                    companies += list(
+                        Company.objects.filter(company_type=Company.CompanyType.USER, is_active=True, accounts__isnull=True)
+                        .exclude(pk__in=[company.id for company in companies])
+                    )
+                for name in options['name']:
+                    if Company.objects.filter(name__iexact=name).exists():
+                        raise CommandError(f"A company named '{name}' already exists.")
+                    companies.append(Company.objects.create(
+                        name=name, currency=options['currency'], company_type=Company.CompanyType.USER
+                    ))
+                summary = bootstrap_companies(companies)
+        except BootstrapError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Bootstrapped {summary['companies']} company(ies) in {time.monotonic() - started:.2f}s: "
+            f"{summary['accounts']} accounts, {summary['categories']} categories, {summary['settings']} settings"
+        ))
@@ -0,0 +1,66 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\process_email_queue.py
+import time
+from django.core.management.base import BaseCommand
+
+from apps.core.email_queue import get_queue_stats, process_email_queue
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Emails claimed per batch',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Maximum number of mail server connections used at once',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, polling the queue every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=10,
+            help='Seconds to wait between polls when the queue is empty (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        concurrency = options['concurrency']
+
+        total_sent = 0
+        total_failed = 0
+        while True:
+            started = time.monotonic()
+            sent, failed = process_email_queue(batch_size, concurrency)
+            total_sent += sent
+            total_failed += failed
+
+            if sent or failed:
+                self.stdout.write(
+                    f"Batch: {sent} sent, {failed} failed in {time.monotonic() - started:.1f}s"
+                )
+
+            if not options['loop']:
+                # Drain everything that is due now, then stop
+                if sent + failed == 0:
+                    break
+                continue
+
+            if sent + failed < batch_size:
+                time.sleep(options['interval'])
+
+        stats = get_queue_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {total_sent}, failed {total_failed}. "
+            f"Queue depth {stats['queue_depth']} ({stats['retrying']} waiting to retry), "
+            f"{stats['failure_rate']}% failed in the last {stats['hours']}h"
+        ))
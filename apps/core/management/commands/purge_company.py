@@ -0,0 +1,54 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\purge_company.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import Company
+from apps.core.purge import PurgeError, purge_companies
+
+def write_result(stdout, result, dry_run):
+    """Row counts of a purge, shared with purge_expired_trials"""
+    verb = 'Would delete' if dry_run else 'Deleted'
+    for label, count in result['deleted'].items():
+        if count:
+            stdout.write(f"   {verb} {count:>8} {label}")
+    for label, count in result['nulled'].items():
+        stdout.write(f"   {'Would clear' if dry_run else 'Cleared'} {count:>8} {label}")
+    for label, count in result['blockers'].items():
+        stdout.write(f"   BLOCKED by {count:>8} {label}")
+
+class Command(BaseCommand):
+    help = (
+        'Permanently delete a company and all of its data with set-based DELETEs '
+        'in one transaction. Use --dry-run to see the row counts first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', type=int, required=True, help='Company ID to purge')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be deleted')
+        parser.add_argument('--vacuum', action='store_true', help='Reclaim space and refresh statistics afterwards')
+        parser.add_argument('--confirm', action='store_true', help='Confirm you want to delete the company')
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(pk=options['company_id']).first()
+        if company is None:
+            raise CommandError(f"Company {options['company_id']} not found")
+        dry_run = options['dry_run']
+        if not dry_run and not options['confirm']:
+            raise CommandError(
+                f"This will DELETE '{company.name}' and all of its data. "
+                "Add --confirm to proceed, or --dry-run to see what would be deleted."
+            )
+
+        started = time.monotonic()
+        try:
+            result = purge_companies([company], dry_run=dry_run, vacuum=options['vacuum'])
+        except PurgeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'Dry run for' if dry_run else 'Purged'} {company.name} (ID {company.id}):")
+        write_result(self.stdout, result, dry_run)
+        total = sum(result['deleted'].values())
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"{total} rows would be deleted; nothing was changed."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {total} rows in {time.monotonic() - started:.2f}s"))
@@ -0,0 +1,48 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\purge_expired_trials.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.purge import PurgeError, expired_trial_companies, purge_companies
+from .purge_company import write_result
+
+class Command(BaseCommand):
+    help = (
+        'Delete the companies whose free trial ended more than --grace-days ago and was '
+        'marked expired or inactive, with all of their data, in one set-based purge. '
+        'Only lists them and the row counts unless --yes is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-days', type=int, default=30,
+                            help='Days after the trial expired before the company is deleted')
+        parser.add_argument('--yes', action='store_true', help='Delete the companies listed; without it nothing is changed')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the companies and row counts (the default)')
+        parser.add_argument('--vacuum', action='store_true', help='Reclaim space and refresh statistics afterwards')
+
+    def handle(self, *args, **options):
+        companies = list(expired_trial_companies(options['grace_days']))
+        if not companies:
+            self.stdout.write('No expired trials to purge.')
+            return
+
+        for company in companies:
+            self.stdout.write(f"   {company.id:>6}  {company.name}")
+
+        dry_run = options['dry_run'] or not options['yes']
+        started = time.monotonic()
+        try:
+            result = purge_companies(companies, dry_run=dry_run, vacuum=options['vacuum'])
+        except PurgeError as e:
+            raise CommandError(str(e))
+
+        write_result(self.stdout, result, dry_run)
+        total = sum(result['deleted'].values())
+        if dry_run:
+            self.stdout.write(self.style.WARNING(
+                f"{len(companies)} expired trial(s), {total} rows would be deleted; nothing was changed. "
+                "Run again with --yes to delete them."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Purged {len(companies)} expired trial(s), {total} rows in {time.monotonic() - started:.2f}s"
+            ))
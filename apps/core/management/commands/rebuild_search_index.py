@@ -0,0 +1,39 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\rebuild_search_index.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.search import DOCUMENT_TYPES, get_backend, rebuild_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index used by the inventory, customer and transaction search APIs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=int,
+            help='Only rebuild documents of this company',
+        )
+        parser.add_argument(
+            '--type',
+            choices=sorted(DOCUMENT_TYPES),
+            action='append',
+            dest='types',
+            help='Only rebuild this document type (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            raise CommandError(
+                "The search index is not available on this database. Run 'manage.py migrate core' first."
+            )
+
+        for doc_type in options['types'] or DOCUMENT_TYPES:
+            started = time.monotonic()
+            count = rebuild_index(
+                doc_type,
+                company_id=options['company_id'],
+                progress_callback=lambda done: self.stdout.write(f"  {done} {doc_type} documents...")
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed {count} {doc_type} documents in {time.monotonic() - started:.1f}s"
+            ))
@@ -1,5 +1,5 @@
 # apps/core/management/commands/reset_accounting_system.py
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from apps.accounts.models import Account, AccountType
 from apps.journal.models import JournalEntry, JournalEntryLine
@@ -7,6 +7,7 @@ from apps.customers.models import Customer
 from apps.transactions.models import Transaction, TransactionItem, TransactionCategory
 from apps.inventory.models import InventoryItem, InventoryTransaction, InventoryBatch, InventoryCostLayer
 from apps.assets.models import Asset, AssetMaintenance, DepreciationEntry
+from apps.core.purge import PurgeError, purge_company
 from decimal import Decimal
 from django.utils import timezone
 
@@ -66,26 +67,35 @@ class Command(BaseCommand):
         """Completely wipe all transactional data in correct order"""
         self.stdout.write('🗑️  Performing complete data wipe...')
         
-        # Delete in dependency order to avoid foreign key errors
         wipe_steps = [
-            ('Journal Entry Lines', lambda: JournalEntryLine.objects.filter(journal_entry__company=company).delete()),
-            ('Journal Entries', lambda: JournalEntry.objects.filter(company=company).delete()),
-            ('Transaction Items', lambda: TransactionItem.objects.filter(transaction__company=company).delete()),
-            ('Transactions', lambda: Transaction.objects.filter(company=company).delete()),
-            ('Inventory Transactions', lambda: InventoryTransaction.objects.filter(company=company).delete()),
-            ('Inventory Cost Layers', lambda: InventoryCostLayer.objects.filter(item__company=company).delete()),
-            ('Inventory Batches', lambda: InventoryBatch.objects.filter(item__company=company).delete()),
-            ('Inventory Items', lambda: InventoryItem.objects.filter(company=company).delete()),
-            ('Asset Maintenance', lambda: AssetMaintenance.objects.filter(asset__company=company).delete()),
-            ('Depreciation Entries', lambda: DepreciationEntry.objects.filter(asset__company=company).delete()),
-            ('Assets', lambda: Asset.objects.filter(company=company).delete()),
-            ('Transaction Categories', lambda: TransactionCategory.objects.filter(company=company).delete()),
-            ('Customers', lambda: Customer.objects.filter(company=company).delete()),
+            ('Journal Entry Lines', JournalEntryLine),
+            ('Journal Entries', JournalEntry),
+            ('Transaction Items', TransactionItem),
+            ('Transactions', Transaction),
+            ('Inventory Transactions', InventoryTransaction),
+            ('Inventory Cost Layers', InventoryCostLayer),
+            ('Inventory Batches', InventoryBatch),
+            ('Inventory Items', InventoryItem),
+            ('Asset Maintenance', AssetMaintenance),
+            ('Depreciation Entries', DepreciationEntry),
+            ('Assets', Asset),
+            ('Transaction Categories', TransactionCategory),
+            ('Customers', Customer),
         ]
         
-        for step_name, delete_func in wipe_steps:
-            count = delete_func()[0]
+        # One set-based DELETE per table, dependency order worked out by the purge engine
+        try:
+            result = purge_company(company, models=[model for _, model in wipe_steps])
+        except PurgeError as e:
+            raise CommandError(str(e))
+        
+        deleted = dict(result['deleted'])
+        for step_name, model in wipe_steps:
+            count = deleted.pop(model._meta.label, 0)
             self.stdout.write(f'   ✓ Cleared {count} {step_name}')
+        related = sum(deleted.values())
+        if related:
+            self.stdout.write(f'   ✓ Cleared {related} related rows')
         
         self.stdout.write('   ✅ All transactional data cleared')
     
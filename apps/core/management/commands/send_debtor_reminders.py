@@ -5,7 +5,7 @@ from django.db.models import F
 from apps.core.models import Company
 from apps.customers.models import Customer
 from apps.transactions.models import Transaction
-from apps.core.email_utils import send_email
+from apps.core.email_queue import queue_email
 from apps.core.utils import get_currency_symbol  # Import centralized function
 from datetime import date
 
@@ -110,9 +110,9 @@ class Command(BaseCommand):
                     company_sent += 1
                     continue
                 
-                # Send the email
+                # Queue the email for the process_email_queue worker
                 try:
-                    success = send_email(
+                    _, success = queue_email(
                         subject=f"Payment Reminder from {company.name}",
                         template_name='emails/debtor_reminder.html',
                         context={
@@ -126,22 +126,24 @@ class Command(BaseCommand):
                             'overdue_transactions': overdue_transactions,
                             'currency_symbol': currency_symbol,
                         },
-                        to_emails=[customer.email]
+                        to_emails=[customer.email],
+                        company=company,
+                        # At most one reminder per customer per day
+                        dedup_key=f"overdue-reminder:{company.id}:{customer.id}:{today}"
                     )
                     
                     if success:
                         self.stdout.write(
                             self.style.SUCCESS(
-                                f"  ✓ Sent reminder to {customer.name} "
+                                f"  ✓ Queued reminder to {customer.name} "
                                 f"for {overdue_transactions.count()} overdue invoices"
                             )
                         )
                         company_sent += 1
                     else:
                         self.stdout.write(
-                            self.style.ERROR(f"  ✗ Failed to send reminder to {customer.name}")
+                            self.style.WARNING(f"  - Reminder to {customer.name} was already queued today")
                         )
-                        company_failed += 1
                         
                 except Exception as e:
                     self.stdout.write(
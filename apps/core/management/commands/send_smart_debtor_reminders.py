@@ -8,7 +8,7 @@ from decimal import Decimal
 from apps.core.models import Company
 from apps.backup.models import BackupSettings, DebtorReminderLog
 from apps.transactions.models import Transaction
-from apps.core.email_utils import send_email
+from apps.core.email_queue import queue_email
 from apps.core.utils import get_currency_symbol  # Add this import
 
 
@@ -186,13 +186,14 @@ class Command(BaseCommand):
                                 f'for transaction #{transaction.id} - {currency_symbol}{transaction.balance_due}'
                             )
                         else:
-                            # Send the email
-                            success = send_email(
+                            # Queue the email; the dedup key stops a second run from sending it again
+                            _, success = queue_email(
                                 subject=subject,
                                 template_name=template,
                                 context=context,
                                 to_emails=[customer.email],
-                                company=company 
+                                company=company,
+                                dedup_key=f"debtor-reminder:{transaction.id}:{reminder_type}"
                             )
                             
                             if success:
@@ -207,14 +208,14 @@ class Command(BaseCommand):
                                 
                                 reminders_sent_this_run += 1
                                 self.stdout.write(
-                                    f'  ✓ Sent {reminder_type} reminder to {customer.name} '
+                                    f'  ✓ Queued {reminder_type} reminder to {customer.name} '
                                     f'for transaction #{transaction.id} - {currency_symbol}{transaction.balance_due}'
                                 )
                             else:
                                 self.stdout.write(
                                     self.style.ERROR(
-                                        f'  ✗ Failed to send reminder to {customer.name} '
-                                        f'for transaction #{transaction.id}'
+                                        f'  ✗ Reminder to {customer.name} for transaction '
+                                        f'#{transaction.id} was already queued'
                                     )
                                 )
                 
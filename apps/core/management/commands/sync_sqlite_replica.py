@@ -0,0 +1,50 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\management\commands\sync_sqlite_replica.py
+import sqlite3
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.core.routers import replica_alias
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database onto the SQLite read replica (REPLICA_DATABASE_URL), '
+        'for running the replica routing locally. Uses SQLite\'s online backup, so posting can '
+        'continue meanwhile. Run it with --every to keep refreshing, like a lagging replica.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, default=0,
+                            help='Seconds between refreshes; 0 copies once')
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("No replica configured. Set REPLICA_DATABASE_URL, e.g. sqlite:///db_replica.sqlite3.")
+        primary, replica = connections[DEFAULT_DB_ALIAS].settings_dict, connections[alias].settings_dict
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite' or connections[alias].vendor != 'sqlite':
+            raise CommandError("Both DATABASE_URL and REPLICA_DATABASE_URL must be SQLite files; "
+                               "replicate PostgreSQL with streaming replication instead.")
+        if str(primary['NAME']) == str(replica['NAME']):
+            raise CommandError("The replica must be a different file from the primary.")
+
+        while True:
+            started = time.perf_counter()
+            self.copy(str(primary['NAME']), str(replica['NAME']))
+            self.stdout.write(self.style.SUCCESS(
+                f"Copied {primary['NAME']} -> {replica['NAME']} in {(time.perf_counter() - started) * 1000:.0f} ms"
+            ))
+            if options['every'] <= 0:
+                break
+            time.sleep(options['every'])
+
+    def copy(self, source_path, target_path):
+        # Django's connection to the replica holds no lock between queries, and readers
+        # see either the old or the new copy: backup() replaces it in one transaction
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
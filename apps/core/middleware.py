@@ -0,0 +1,57 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\middleware.py
+import time
+from django.conf import settings
+
+from .routers import replica_alias, replica_reads
+
+PIN_COOKIE = 'replica_pin'
+SAFE_METHODS = ('GET', 'HEAD')
+
+# URL namespaces that only read; user_type_required() hides the view's module
+REPLICA_NAMESPACES = {'reporting'}
+
+def is_replica_view(request):
+    """Reporting views and exports (url names starting with 'export') are read-only"""
+    match = request.resolver_match
+    if match is None:
+        return False
+    if REPLICA_NAMESPACES.intersection(match.namespaces):
+        return True
+    return bool(match.url_name and match.url_name.startswith('export'))
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends read-only reporting requests to the read replica (see apps.core.routers)
+    and keeps a client on the primary for REPLICA_PIN_SECONDS after it posts.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if replica_alias() is None:
+            return self.get_response(request)
+
+        # Disabled until process_view() has seen the view: middleware reads stay on the primary
+        with replica_reads(pinned=self.is_pinned(request), enabled=False) as state:
+            request._replica_routing = state
+            response = self.get_response(request)
+
+        if request.method not in SAFE_METHODS:
+            pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+            response.set_cookie(
+                PIN_COOKIE, str(int(time.time()) + pin_seconds), max_age=pin_seconds,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
+
+    def is_pinned(self, request):
+        try:
+            return int(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = getattr(request, '_replica_routing', None)
+        if state is not None and request.method in SAFE_METHODS and is_replica_view(request):
+            state['replica'] = True
+        return None
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_company_fiscal_closing_grace_period_months_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('template_name', models.CharField(blank=True, max_length=200)),
+                ('html_content', models.TextField(blank=True)),
+                ('text_content', models.TextField(blank=True)),
+                ('to_emails', models.TextField(help_text='Comma-separated email addresses')),
+                ('cc_emails', models.TextField(blank=True)),
+                ('attachment_path', models.CharField(blank=True, max_length=500)),
+                ('delete_attachment', models.BooleanField(default=False, help_text='Remove the attachment file once the email is sent or has finally failed')),
+                ('dedup_key', models.CharField(blank=True, help_text='Queuing another email with the same key is a no-op', max_length=255, null=True, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('send_seconds', models.FloatField(blank=True, help_text='Time the successful SMTP send took', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('company', models.ForeignKey(blank=True, help_text='Whose email configuration sends it (blank = system default)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbound_emails', to='core.company')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='core_outbou_status_f5f1ae_idx')],
+            },
+        ),
+    ]
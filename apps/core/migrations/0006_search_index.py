@@ -0,0 +1,131 @@
+from django.db import migrations
+
+# Frozen copy of the index layout in apps/core/search.py as of this migration
+SEARCH_TABLE = 'search_index'
+CHUNK_SIZE = 2000
+# doc_type -> code used in the SQLite rowid (object_id * 8 + code)
+ROWID_CODES = {'inventory': 1, 'customer': 2, 'transaction': 3}
+
+
+def _create_sqlite(cursor):
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "doc_type UNINDEXED, object_id UNINDEXED, company_id UNINDEXED, title, body, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+
+
+def _create_postgresql(cursor):
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "doc_type varchar(20) NOT NULL, "
+        "object_id bigint NOT NULL, "
+        "company_id bigint NOT NULL, "
+        "title text NOT NULL DEFAULT '', "
+        "body text NOT NULL DEFAULT '', "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(body, '')), 'B')) STORED, "
+        "PRIMARY KEY (doc_type, object_id))"
+    )
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_company_idx ON {SEARCH_TABLE} (company_id, doc_type)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)")
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    if cursor.fetchone():
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_title_trgm_idx "
+            f"ON {SEARCH_TABLE} USING GIN (title gin_trgm_ops)"
+        )
+
+
+CREATE_SCHEMA = {
+    'sqlite': _create_sqlite,
+    'postgresql': _create_postgresql,
+}
+
+
+def _join(*parts):
+    return ' '.join(part for part in parts if part)
+
+
+def _documents(apps, using):
+    """(doc_type, object_id, company_id, title, body) for every searchable row"""
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    Customer = apps.get_model('customers', 'Customer')
+    Transaction = apps.get_model('transactions', 'Transaction')
+
+    items = InventoryItem.objects.using(using).values_list('id', 'company_id', 'name', 'sku', 'description')
+    for object_id, company_id, name, sku, description in items.iterator(chunk_size=CHUNK_SIZE):
+        yield 'inventory', object_id, company_id, _join(name, sku), description or ''
+
+    customers = Customer.objects.using(using).values_list('id', 'company_id', 'name', 'email', 'phone')
+    for object_id, company_id, name, email, phone in customers.iterator(chunk_size=CHUNK_SIZE):
+        yield 'customer', object_id, company_id, name, _join(email, phone)
+
+    transactions = Transaction.objects.using(using).values_list(
+        'id', 'company_id', 'reference_number', 'description', 'customer__name'
+    )
+    for object_id, company_id, reference, description, customer_name in transactions.iterator(chunk_size=CHUNK_SIZE):
+        yield 'transaction', object_id, company_id, reference or '', _join(description, customer_name)
+
+
+def _insert(cursor, vendor, rows):
+    if vendor == 'sqlite':
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, doc_type, object_id, company_id, title, body) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [(object_id * 8 + ROWID_CODES[doc_type], doc_type, object_id, company_id, title, body)
+             for doc_type, object_id, company_id, title, body in rows]
+        )
+    else:
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (doc_type, object_id, company_id, title, body) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            rows
+        )
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    create_schema = CREATE_SCHEMA.get(connection.vendor)
+    if create_schema is None:
+        return
+    try:
+        with connection.cursor() as cursor:
+            create_schema(cursor)
+    except Exception as e:
+        # e.g. SQLite built without FTS5: the search APIs keep using icontains
+        print(f"WARNING: Search index not created ({e}); searches will not be ranked.")
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        chunk = []
+        for row in _documents(apps, connection.alias):
+            chunk.append(row)
+            if len(chunk) >= CHUNK_SIZE:
+                _insert(cursor, connection.vendor, chunk)
+                chunk = []
+        if chunk:
+            _insert(cursor, connection.vendor, chunk)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_SCHEMA:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_outboundemail'),
+        ('customers', '0004_customer_payable_balance_customer_receivable_balance'),
+        ('inventory', '0009_migrate_product_to_stock_item'),
+        ('transactions', '0007_expenseline'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -183,4 +183,87 @@ class EmailConfiguration(models.Model):
 
     class Meta:
         verbose_name = "Email Configuration"
-        verbose_name_plural = "Email Configurations"
\ No newline at end of file
+        verbose_name_plural = "Email Configurations"
+
+class OutboundEmail(models.Model):
+    """
+    An email waiting to be delivered by the process_email_queue worker.
+    The HTML is rendered when the email is queued, so the worker never needs
+    the original template context.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbound_emails',
+        help_text="Whose email configuration sends it (blank = system default)"
+    )
+    subject = models.CharField(max_length=255)
+    template_name = models.CharField(max_length=200, blank=True)
+    html_content = models.TextField(blank=True)
+    text_content = models.TextField(blank=True)
+    to_emails = models.TextField(help_text="Comma-separated email addresses")
+    cc_emails = models.TextField(blank=True)
+    attachment_path = models.CharField(max_length=500, blank=True)
+    delete_attachment = models.BooleanField(
+        default=False,
+        help_text="Remove the attachment file once the email is sent or has finally failed"
+    )
+    dedup_key = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Queuing another email with the same key is a no-op"
+    )
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    send_seconds = models.FloatField(null=True, blank=True, help_text="Time the successful SMTP send took")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_emails} ({self.status})"
+
+    @property
+    def queue_seconds(self):
+        """Time from queuing to delivery"""
+        if not self.sent_at:
+            return None
+        return (self.sent_at - self.created_at).total_seconds()
+
+class CacheVersion(models.Model):
+    """
+    Version of a company's cached dataset (report ledger, list counters,
+    pickers, MRP). Cached values are keyed on it, so bumping it retires them in
+    every process at once (see apps.core.versions). company_id is a plain column,
+    not a foreign key, so the versions of a purged company can still be bumped.
+    """
+    name = models.CharField(max_length=100)
+    company_id = models.BigIntegerField()
+    version = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'company_id'], name='unique_cache_version'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}:{self.company_id} v{self.version}"
@@ -0,0 +1,159 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\pagination.py
+"""
+Keyset (cursor) pagination for the large, newest-first lists.
+
+Instead of OFFSET/LIMIT, each page is fetched with a WHERE on the last row seen,
+e.g. ``(date, id) < (last_date, last_id)``, so page 2,000 costs the same as page 1
+when (company, date, id) is indexed. Links carry ``?after=`` / ``?before=``
+cursors instead of page numbers. Lists never run an unbounded COUNT(*): callers
+pass an exact total they already know (see apps.core.counters) or get a count
+capped at APPROXIMATE_COUNT_LIMIT.
+"""
+from django.db.models import Q
+
+APPROXIMATE_COUNT_LIMIT = 1000
+CURSOR_SEPARATOR = '~'
+
+def approximate_count(queryset, limit=APPROXIMATE_COUNT_LIMIT):
+    """
+    Counts at most ``limit + 1`` rows. Returns (count, exact); when exact is
+    False the list has more than ``limit`` rows.
+    """
+    count = queryset.order_by()[:limit + 1].count()
+    if count > limit:
+        return limit, False
+    return count, True
+
+def _encode_cursor(obj, keys):
+    values = []
+    for key in keys:
+        value = getattr(obj, key)
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+    return CURSOR_SEPARATOR.join(values)
+
+def _decode_cursor(cursor, model, keys):
+    """The key values in ``cursor``, or None when it is missing or malformed"""
+    if not cursor:
+        return None
+    parts = cursor.split(CURSOR_SEPARATOR)
+    if len(parts) != len(keys):
+        return None
+    try:
+        return [model._meta.get_field(key).to_python(part) for key, part in zip(keys, parts)]
+    except Exception:
+        return None
+
+def _seek(keys, values, lookup):
+    """(k1, k2, ...) <lookup> (v1, v2, ...) expanded into plain comparisons"""
+    condition = Q()
+    for position, key in enumerate(keys):
+        term = Q(**{f"{key}__{lookup}": values[position]})
+        for previous_key, previous_value in zip(keys[:position], values[:position]):
+            term &= Q(**{previous_key: previous_value})
+        condition |= term
+    return condition
+
+class KeysetPage:
+    """One page of a keyset-paginated list; iterate it like a Page."""
+
+    def __init__(self, object_list, request, per_page, count, count_is_exact,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.count = count
+        self.count_is_exact = count_is_exact
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._params = request.GET.copy()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def display_count(self):
+        """"1,000+" when the count was capped"""
+        return f"{self.count:,}" if self.count_is_exact else f"{self.count:,}+"
+
+    def _query(self, name, cursor):
+        params = self._params.copy()
+        for key in ('after', 'before', 'page'):
+            params.pop(key, None)
+        params[name] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        return self._query('after', self.next_cursor) if self.has_next else ''
+
+    @property
+    def previous_query(self):
+        return self._query('before', self.previous_cursor) if self.has_previous else ''
+
+    @property
+    def first_query(self):
+        params = self._params.copy()
+        for key in ('after', 'before', 'page'):
+            params.pop(key, None)
+        return params.urlencode()
+
+def keyset_paginate(request, queryset, per_page, keys=('date', 'id'), count=None):
+    """
+    A newest-first page of ``queryset`` ordered by ``keys`` descending.
+
+    ``count`` is the list's total when the caller already knows it (e.g. from
+    monthly counters); otherwise it is approximated with a capped count.
+    """
+    keys = list(keys)
+    model = queryset.model
+    descending = queryset.order_by(*[f"-{key}" for key in keys])
+    after = _decode_cursor(request.GET.get('after'), model, keys)
+    before = _decode_cursor(request.GET.get('before'), model, keys)
+
+    if before is not None:
+        # Walk backwards from the cursor, then flip the rows back to newest-first
+        rows = list(
+            queryset.filter(_seek(keys, before, 'gt')).order_by(*keys)[:per_page + 1]
+        )
+        has_more_before = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_more_after = True
+    else:
+        if after is not None:
+            descending = descending.filter(_seek(keys, after, 'lt'))
+        rows = list(descending[:per_page + 1])
+        has_more_after = len(rows) > per_page
+        rows = rows[:per_page]
+        has_more_before = after is not None
+
+    if count is None:
+        count, count_is_exact = approximate_count(queryset)
+    else:
+        count_is_exact = True
+
+    return KeysetPage(
+        rows,
+        request,
+        per_page,
+        count,
+        count_is_exact,
+        next_cursor=_encode_cursor(rows[-1], keys) if rows and has_more_after else None,
+        previous_cursor=_encode_cursor(rows[0], keys) if rows and has_more_before else None,
+    )
@@ -0,0 +1,245 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\picker.py
+"""
+Picker projections for the typeahead APIs.
+
+A projection is the small, already-serialized row set a picker needs for one
+company (inventory items with price and stock, customers with balances). It is
+built with a handful of set-based queries and kept in process memory together
+with the company's picker version, for the PICKER_MAX_PROJECTIONS most recently
+used (picker, company) pairs of each process. The version is a database row
+(apps.core.versions) bumped, in the writer's transaction, whenever a row that
+feeds the projection is saved or deleted, so every process rebuilds on its next
+request.
+
+The version also drives the APIs' ETags: a typeahead request whose
+If-None-Match still matches is answered with 304 before any search runs.
+
+Note: queryset.update() and bulk_create() do not send signals; code that writes
+these models that way must call bump_picker_version() itself.
+"""
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from decimal import Decimal
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from .search import search_id_chunks
+from .versions import bump_version, get_version
+
+PICKER_CACHE_PREFIX = 'picker'
+INVENTORY = 'inventory'
+CUSTOMER = 'customer'
+
+# (picker type, company id) -> Projection, least recently used first
+_projections = OrderedDict()
+_lock = threading.Lock()
+
+def _version_name(picker_type):
+    return f"{PICKER_CACHE_PREFIX}:{picker_type}"
+
+def get_picker_version(picker_type, company_id):
+    return get_version(_version_name(picker_type), company_id)
+
+def bump_picker_version(picker_type, company_id):
+    bump_version(_version_name(picker_type), company_id)
+
+def _weighted_costs(rows):
+    """{item_id: average unit cost} from (item_id, quantity_remaining, unit_cost) rows"""
+    totals = defaultdict(lambda: [Decimal('0.00'), Decimal('0.00')])
+    for item_id, quantity, unit_cost in rows:
+        totals[item_id][0] += quantity * unit_cost
+        totals[item_id][1] += quantity
+    return {
+        item_id: (total_cost / total_quantity if total_quantity > 0 else Decimal('0.00'))
+        for item_id, (total_cost, total_quantity) in totals.items()
+    }
+
+def build_inventory_projection(company_id):
+    """
+    Active items of a company as picker rows. purchase_price matches
+    InventoryItem.current_average_cost, computed for all items in three queries
+    instead of two layer scans per item.
+    """
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    InventoryCostLayer = apps.get_model('inventory', 'InventoryCostLayer')
+    InventoryBatch = apps.get_model('inventory', 'InventoryBatch')
+    InventoryPriceAdjustment = apps.get_model('inventory', 'InventoryPriceAdjustment')
+
+    items = list(
+        InventoryItem.objects.filter(company_id=company_id, is_active=True)
+        .order_by('name')
+        .values('id', 'name', 'sku', 'description', 'unit_of_measurement', 'quantity_on_hand',
+                'sale_price', 'item_type', 'costing_method', 'enable_batch_tracking')
+    )
+
+    layer_costs = _weighted_costs(
+        InventoryCostLayer.objects.filter(item__company_id=company_id, quantity_remaining__gt=0)
+        .values_list('item_id', 'quantity_remaining', 'unit_cost')
+    )
+    batch_costs = _weighted_costs(
+        InventoryBatch.objects.filter(item__company_id=company_id, quantity_remaining__gt=0)
+        .values_list('item_id', 'quantity_remaining', 'unit_cost')
+    )
+    adjusted_costs = {}
+    for item_id, new_unit_cost in (
+        InventoryPriceAdjustment.objects.filter(
+            item__company_id=company_id,
+            item__costing_method=InventoryItem.CostingMethod.PRICE_ADJUSTMENT
+        ).order_by('item_id', '-adjustment_date').values_list('item_id', 'new_unit_cost')
+    ):
+        # Latest adjustment wins, like item.price_adjustments.first()
+        adjusted_costs.setdefault(item_id, new_unit_cost)
+
+    item_type_labels = dict(InventoryItem.ITEM_TYPE_CHOICES)
+    rows = []
+    for item in items:
+        item_id = item['id']
+        if item['quantity_on_hand'] <= 0:
+            cost = Decimal('0.00')
+        elif item['costing_method'] == InventoryItem.CostingMethod.PRICE_ADJUSTMENT:
+            cost = adjusted_costs.get(item_id, layer_costs.get(item_id, Decimal('0.00')))
+        elif item['enable_batch_tracking']:
+            cost = batch_costs.get(item_id, Decimal('0.00'))
+        else:
+            cost = layer_costs.get(item_id, Decimal('0.00'))
+
+        rows.append({
+            'id': item_id,
+            'name': item['name'],
+            'sku': item['sku'] or '',
+            'description': item['description'] or '',
+            'unit_of_measurement': item['unit_of_measurement'] or 'pcs',
+            'quantity_on_hand': str(item['quantity_on_hand']),
+            'sale_price': str(item['sale_price'] or 0),
+            'purchase_price': str(cost or 0),
+            'item_type': item['item_type'],
+            'item_type_display': item_type_labels.get(item['item_type'], item['item_type']),
+        })
+    return rows
+
+def build_customer_projection(company_id):
+    """Customers and vendors of a company as picker rows"""
+    Customer = apps.get_model('customers', 'Customer')
+    entity_labels = dict(Customer.ENTITY_TYPE_CHOICES)
+    return [
+        {
+            'id': customer['id'],
+            'name': customer['name'],
+            'email': customer['email'] or '',
+            'phone': customer['phone'] or '',
+            'entity_type': customer['entity_type'],
+            'entity_type_display': entity_labels.get(customer['entity_type'], customer['entity_type']),
+            'receivable_balance': customer['receivable_balance'],
+            'payable_balance': customer['payable_balance'],
+            'credit_limit': customer['credit_limit'],
+        }
+        for customer in Customer.objects.filter(company_id=company_id).order_by('name').values(
+            'id', 'name', 'email', 'phone', 'entity_type',
+            'receivable_balance', 'payable_balance', 'credit_limit'
+        )
+    ]
+
+BUILDERS = {
+    INVENTORY: build_inventory_projection,
+    CUSTOMER: build_customer_projection,
+}
+
+# Fields matched by substring when the search index is unavailable
+FALLBACK_FIELDS = {
+    INVENTORY: ('name', 'sku', 'description'),
+    CUSTOMER: ('name', 'email', 'phone'),
+}
+
+class Projection:
+    def __init__(self, version, rows):
+        self.version = version
+        self.rows = rows
+        self.by_id = {row['id']: row for row in rows}
+
+def get_projection(picker_type, company_id):
+    """The current projection for a company, rebuilt when its version has moved on"""
+    version = get_picker_version(picker_type, company_id)
+    key = (picker_type, company_id)
+    with _lock:
+        projection = _projections.get(key)
+        if projection is None or projection.version != version:
+            projection = Projection(version, BUILDERS[picker_type](company_id))
+            _projections[key] = projection
+        _projections.move_to_end(key)
+        # Whole catalogues: keep only the busiest companies of this process
+        while len(_projections) > getattr(settings, 'PICKER_MAX_PROJECTIONS', 64):
+            _projections.popitem(last=False)
+    return projection
+
+def picker_etag(picker_type, company_id, request):
+    """ETag for a typeahead response: the picker version plus the query string"""
+    params = request.GET.urlencode()
+    digest = hashlib.md5(f"{company_id}:{get_picker_version(picker_type, company_id)}:{params}".encode('utf-8'))
+    return f"{picker_type}-{digest.hexdigest()}"
+
+def search_projection(picker_type, company_id, query, page=1, limit=15, row_filter=None):
+    """
+    One page of picker rows matching ``query`` (all rows when empty), best matches
+    first. ``row_filter`` narrows rows (item type, entity type). Returns (rows, has_more).
+    """
+    projection = get_projection(picker_type, company_id)
+    offset = (page - 1) * limit
+
+    if query:
+        chunks = search_id_chunks(picker_type, company_id, query)
+        if chunks is None:
+            needle = query.lower()
+            fields = FALLBACK_FIELDS[picker_type]
+            candidates = (row for row in projection.rows if any(needle in row[field].lower() for field in fields))
+        else:
+            # Chunks are fetched lazily, only as far as the page (after row_filter) needs
+            candidates = (
+                projection.by_id[object_id]
+                for ids in chunks for object_id in ids if object_id in projection.by_id
+            )
+    else:
+        candidates = iter(projection.rows)
+
+    if row_filter:
+        candidates = (row for row in candidates if row_filter(row))
+
+    # Only materialize what this page needs (plus one row to know if there is more)
+    page_rows = []
+    for position, row in enumerate(candidates):
+        if position >= offset + limit:
+            return page_rows, True
+        if position >= offset:
+            page_rows.append(row)
+    return page_rows, False
+
+# --- Invalidation ------------------------------------------------------------
+
+def _bump(picker_type, company_id):
+    if company_id:
+        bump_picker_version(picker_type, company_id)
+
+def _invalidate_for_company_row(sender, instance, **kwargs):
+    picker_type = CUSTOMER if sender._meta.label == 'customers.Customer' else INVENTORY
+    _bump(picker_type, instance.company_id)
+
+def _invalidate_for_item_row(sender, instance, **kwargs):
+    # Cost layers, batches and price adjustments change an item's purchase price
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    if sender.item.is_cached(instance):
+        company_id = instance.item.company_id
+    else:
+        company_id = InventoryItem.objects.filter(pk=instance.item_id).values_list('company_id', flat=True).first()
+    _bump(INVENTORY, company_id)
+
+def connect_picker_signals():
+    """Called from CoreConfig.ready()"""
+    for label in ('inventory.InventoryItem', 'customers.Customer'):
+        model = apps.get_model(label)
+        for signal in (post_save, post_delete):
+            signal.connect(_invalidate_for_company_row, sender=model, dispatch_uid=f'picker_{label}_{signal is post_save}')
+    for label in ('inventory.InventoryCostLayer', 'inventory.InventoryBatch', 'inventory.InventoryPriceAdjustment'):
+        model = apps.get_model(label)
+        for signal in (post_save, post_delete):
+            signal.connect(_invalidate_for_item_row, sender=model, dispatch_uid=f'picker_{label}_{signal is post_save}')
@@ -0,0 +1,309 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\purge.py
+"""
+Set-based purge of company data: a wipe of selected models, or a whole tenant.
+
+Model.delete() on a queryset loads every object to walk its cascades and send
+signals, and PROTECT relations (InventoryTransaction.item, Asset.account, ...)
+force the caller to delete in exactly the right order. Here the foreign key
+graph is read from the model registry once per set of root models:
+
+- scope: the root models (each filtered by its path to Company) plus everything
+  that CASCADEs from them, e.g. JournalEntry -> JournalEntryLine. A cascaded
+  model's rows are ``fk IN (SELECT id FROM <parent scope>)``.
+- order: in-scope models are deleted children first (topological order of their
+  foreign keys), so even databases that check constraints immediately accept it.
+- references from rows that stay behind: SET_NULL ones are cleared with one
+  UPDATE; PROTECT/RESTRICT/DO_NOTHING ones block the purge (PurgeError).
+
+Every table is then emptied with one DELETE ... WHERE ... IN (subquery), in one
+transaction, without loading a row. No delete signals are sent, so the caches
+fed by them (report ledger version, list counters, pickers, company access) and
+the search index are cleared here.
+"""
+from collections import defaultdict, deque
+from datetime import timedelta
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import CASCADE, SET_NULL, Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.core import counters, picker
+from apps.core.search import DOCUMENT_TYPES, get_backend
+
+class PurgeError(ValueError):
+    """The purge would leave rows pointing at deleted ones"""
+
+def _company_model():
+    return apps.get_model('core', 'Company')
+
+def _foreign_keys():
+    """[(model, field, target model)] for every concrete FK / one-to-one, through tables included"""
+    edges = []
+    for model in apps.get_models(include_auto_created=True):
+        opts = model._meta
+        if opts.proxy or not opts.managed:
+            continue
+        for field in opts.local_fields:
+            if field.is_relation and (field.many_to_one or field.one_to_one):
+                edges.append((model, field, field.related_model._meta.concrete_model))
+    return edges
+
+def _company_path(model, edges):
+    """Shortest lookup from ``model`` to Company ('company', 'item__company', ...), or None"""
+    company_model = _company_model()
+    if model is company_model:
+        return 'pk'
+    outgoing = defaultdict(list)
+    for source, field, target in edges:
+        if source is not target:
+            outgoing[source].append((field, target))
+    seen, queue = {model}, deque([(model, [])])
+    while queue:
+        current, path = queue.popleft()
+        for field, target in outgoing[current]:
+            if target is company_model:
+                return '__'.join(path + [field.name])
+            if target not in seen:
+                seen.add(target)
+                queue.append((target, path + [field.name]))
+    return None
+
+class PurgePlan:
+    """
+    The delete order and reference handling for a set of root models. Depends
+    only on the models, so it is built once and reused for any companies.
+    """
+    def __init__(self, roots):
+        edges = _foreign_keys()
+        self.roots = {}
+        for model in roots:
+            path = _company_path(model, edges)
+            if path is None:
+                raise PurgeError(f"{model._meta.label} has no relation to a company")
+            self.roots[model] = path
+
+        # Cascade closure, breadth first: a model's depth is its distance from a root
+        self.depth = {model: 0 for model in self.roots}
+        queue = deque(self.roots)
+        while queue:
+            parent = queue.popleft()
+            for source, field, target in edges:
+                if (target is parent and source not in self.depth
+                        and field.remote_field.on_delete is CASCADE):
+                    self.depth[source] = self.depth[parent] + 1
+                    queue.append(source)
+
+        # A cascaded model is scoped through its cascade parents nearer the roots
+        self.cascades = defaultdict(list)
+        for source, field, target in edges:
+            if (source in self.depth and target in self.depth and source is not target
+                    and field.remote_field.on_delete is CASCADE
+                    and self.depth[target] < self.depth[source]):
+                self.cascades[source].append(field)
+
+        # Foreign keys into the scope; the ones from in-scope rows also order the deletes
+        self.incoming = [(source, field, target) for source, field, target in edges
+                         if target in self.depth and not (source is target and source in self.depth)]
+        self.models, self.deferred = self._order()
+
+    def _order(self):
+        """
+        In-scope models, referencing ones first. A cycle (Company.primary_contact
+        <-> User.company) is broken at a nullable key that does not define scope;
+        those keys are cleared before the deletes (``deferred``).
+        """
+        scope_fields = {field for fields in self.cascades.values() for field in fields}
+        scope_fields.update(model._meta.get_field(path.split('__')[0])
+                            for model, path in self.roots.items() if path != 'pk')
+        pending = {(source, field, target) for source, field, target in self.incoming if source in self.depth}
+        deferred = []
+        ordered, remaining = [], set(self.depth)
+        while remaining:
+            blocked = {target for source, _, target in pending if source in remaining}
+            ready = sorted((model for model in remaining if model not in blocked),
+                           key=lambda model: (-self.depth[model], model._meta.label))
+            if not ready:
+                breakable = sorted(
+                    (edge for edge in pending
+                     if edge[0] in remaining and edge[1].null and edge[1] not in scope_fields),
+                    key=lambda edge: (edge[0]._meta.label, edge[1].name)
+                )
+                if not breakable:
+                    labels = ', '.join(sorted(model._meta.label for model in remaining))
+                    raise PurgeError(f"Cannot order the delete of: {labels}")
+                pending.discard(breakable[0])
+                deferred.append(breakable[0])
+                continue
+            for model in ready:
+                ordered.append(model)
+                remaining.discard(model)
+            pending = {edge for edge in pending if edge[0] in remaining}
+        return ordered, deferred
+
+    def scopes(self, company_ids):
+        """{model: queryset of the rows to delete} for the given company ids"""
+        scopes = {}
+        for model in sorted(self.depth, key=lambda model: self.depth[model]):
+            condition = Q()
+            if model in self.roots:
+                condition |= Q(**{f"{self.roots[model]}__in": company_ids})
+            for field in self.cascades[model]:
+                condition |= Q(**{f"{field.name}__in": scopes[field.related_model._meta.concrete_model].values('pk')})
+            scopes[model] = model._base_manager.filter(condition)
+        return scopes
+
+_plans = {}
+
+def get_plan(roots=None):
+    """The (cached) PurgePlan for ``roots``; a whole tenant when None"""
+    roots = tuple(roots or [_company_model()])
+    key = tuple(model._meta.label for model in roots)
+    if key not in _plans:
+        _plans[key] = PurgePlan(roots)
+    return _plans[key]
+
+def _references(plan, scopes):
+    """
+    References to purged rows that must be cleared or block the purge, as
+    [(model, field, queryset, deferred)]: the deferred keys of in-scope rows,
+    then references from rows that stay behind.
+    """
+    references = [
+        (source, field, scopes[source].filter(**{f"{field.name}__in": scopes[target].values('pk')}), True)
+        for source, field, target in plan.deferred
+    ]
+    for source, field, target in plan.incoming:
+        if source in scopes and field in plan.cascades[source]:
+            continue
+        rows = source._base_manager.filter(**{f"{field.name}__in": scopes[target].values('pk')})
+        if source in scopes:
+            rows = rows.exclude(pk__in=scopes[source].values('pk'))
+        references.append((source, field, rows, False))
+    return references
+
+def _label(model, field=None):
+    return f"{model._meta.label}.{field.name}" if field is not None else model._meta.label
+
+def purge_companies(companies, models=None, dry_run=False, vacuum=False, using=DEFAULT_DB_ALIAS):
+    """
+    Deletes the data of ``companies`` (Company objects or ids): the rows of
+    ``models`` and everything cascading from them, or the whole tenant,
+    Company rows included, when ``models`` is None.
+
+    Returns {'deleted': {label: rows}, 'nulled': {label.field: rows},
+    'blockers': {label.field: rows}}. With ``dry_run`` nothing is written and
+    the counts are what would be deleted; otherwise blockers raise PurgeError.
+    ``vacuum`` reclaims space and refreshes planner statistics after commit.
+    """
+    company_ids = sorted({getattr(company, 'pk', company) for company in companies})
+    plan = get_plan(models)
+    result = {'deleted': {}, 'nulled': {}, 'blockers': {}}
+    if not company_ids:
+        return result
+
+    with transaction.atomic(using=using):
+        scopes = plan.scopes(company_ids)
+        scopes = {model: queryset.using(using) for model, queryset in scopes.items()}
+        set_null = []
+        for source, field, rows, deferred in _references(plan, scopes):
+            rows = rows.using(using)
+            if deferred or field.remote_field.on_delete is SET_NULL:
+                set_null.append((source, field, rows))
+            elif rows.exists():
+                result['blockers'][_label(source, field)] = rows.count()
+
+        if dry_run:
+            for source, field, rows in set_null:
+                count = rows.count()
+                if count:
+                    result['nulled'][_label(source, field)] = count
+            for model in plan.models:
+                result['deleted'][_label(model)] = scopes[model].count()
+            return result
+
+        if result['blockers']:
+            details = ', '.join(f"{label} ({count})" for label, count in result['blockers'].items())
+            raise PurgeError(f"Rows outside the purge still reference it: {details}")
+
+        for source, field, rows in set_null:
+            count = rows.update(**{field.name: None})
+            if count:
+                result['nulled'][_label(source, field)] = count
+        for model in plan.models:
+            result['deleted'][_label(model)] = scopes[model]._raw_delete(using)
+
+        _clear_search_index(plan, company_ids, using)
+        _invalidate_caches(company_ids)
+
+    if vacuum:
+        vacuum_tables(plan.models, using)
+    return result
+
+def purge_company(company, **kwargs):
+    return purge_companies([company], **kwargs)
+
+def _clear_search_index(plan, company_ids, using):
+    backend = get_backend(using)
+    if backend is None:
+        return
+    purged = {model._meta.label for model in plan.models}
+    with connections[using].cursor() as cursor:
+        for doc_type, (_, label, _, _) in DOCUMENT_TYPES.items():
+            if label in purged:
+                for company_id in company_ids:
+                    backend.clear(cursor, doc_type, company_id)
+
+def _invalidate_caches(company_ids):
+    from apps.reporting.cache import bump_ledger_version
+    from apps.subscriptions.utils import invalidate_company_access
+
+    for company_id in company_ids:
+        bump_ledger_version(company_id)
+        for kind in (counters.TRANSACTIONS, counters.JOURNAL_ENTRIES, counters.INVENTORY_MOVEMENTS):
+            counters.bump_counters(kind, company_id)
+        for picker_type in (picker.INVENTORY, picker.CUSTOMER):
+            picker.bump_picker_version(picker_type, company_id)
+        invalidate_company_access(company_id)
+
+def vacuum_tables(models_to_vacuum, using=DEFAULT_DB_ALIAS):
+    """
+    Reclaims the space of purged tables and refreshes planner statistics. Must
+    run outside a transaction (VACUUM cannot).
+    """
+    connection = connections[using]
+    tables = sorted({model._meta.db_table for model in models_to_vacuum})
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('VACUUM')
+            cursor.execute('ANALYZE')
+        elif connection.vendor == 'postgresql':
+            for table in tables:
+                cursor.execute(f'VACUUM ANALYZE {quote(table)}')
+        elif connection.vendor == 'mysql':
+            cursor.execute('ANALYZE TABLE ' + ', '.join(quote(table) for table in tables))
+
+def expired_trial_companies(grace_days=0):
+    """
+    Companies whose trial subscription ended more than ``grace_days`` ago and
+    has been marked expired or deactivated. A company that moved to a paid plan,
+    whose subscription is pending verification, or with a paid-plan registration
+    request pending or approved under its name or email is never included.
+    """
+    from apps.subscriptions.models import RegistrationRequest, Subscription
+
+    cutoff = timezone.now() - timedelta(days=grace_days)
+    conversions = RegistrationRequest.objects.exclude(plan=Subscription.Plan.TRIAL).filter(
+        Q(company_name__iexact=OuterRef('name')) | Q(contact_email__iexact=OuterRef('email')),
+        status__in=[RegistrationRequest.Status.PENDING, RegistrationRequest.Status.APPROVED],
+    )
+    return (
+        _company_model().objects.filter(
+            subscription__plan=Subscription.Plan.TRIAL,
+            subscription__expires_on__lt=cutoff,
+        )
+        .filter(Q(subscription__status=Subscription.Status.EXPIRED) | Q(subscription__is_active=False))
+        .exclude(subscription__status=Subscription.Status.PENDING)
+        .exclude(Exists(conversions))
+        .order_by('id')
+    )
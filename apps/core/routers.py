@@ -0,0 +1,94 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\routers.py
+"""
+Read-replica routing.
+
+Posting always writes to 'default'. Read-only reporting paths - the views of
+apps.reporting, the export views and audit packaging - read from the replica
+alias (REPLICA_DATABASE_ALIAS, configured by REPLICA_DATABASE_URL) so a
+month-end export does not hold up invoice entry. Everything else, and every
+path when no replica is configured, reads from 'default'; backups in particular
+are taken from the primary, never from a copy that may be behind it.
+
+Reads go to the replica only inside replica_reads(), which the
+ReplicaRoutingMiddleware enables for reporting GET requests. Within it:
+
+- a write sends the rest of the block, and of the blocks around it, to the
+  primary (read-your-writes); so does an open transaction on 'default'. A
+  block opened after the write starts on the replica again
+- a client that posted something in the last REPLICA_PIN_SECONDS is pinned to
+  the primary for the whole request (cookie set by the middleware)
+- sessions, users and content types always come from the primary
+
+The state lives in a ContextVar, so threads and async tasks don't share it.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Replica lag must never log someone out or hide a new user
+PRIMARY_ONLY_APPS = {'admin', 'auth', 'authentication', 'contenttypes', 'sessions'}
+
+_routing = ContextVar('replica_routing', default=None)
+
+def replica_alias():
+    """The replica's alias, or None when no replica is configured"""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES and alias != DEFAULT_DB_ALIAS else None
+
+def reading_from_replica():
+    """Whether reads in the current context go to the replica"""
+    state = _routing.get()
+    return bool(
+        state and state['replica'] and not state['pinned'] and not state['wrote'] and replica_alias()
+        and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+    )
+
+@contextmanager
+def replica_reads(pinned=False, enabled=True):
+    """
+    Send reads in the block to the replica; also usable as a decorator. Yields
+    the block's state: the middleware opens it disabled and sets
+    state['replica'] once it knows the view.
+    """
+    outer = _routing.get()
+    state = {
+        'replica': enabled,
+        'pinned': pinned or bool(outer and outer['pinned']),
+        'wrote': False,
+        'outer': outer,
+    }
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+def pin_to_primary():
+    """Route the rest of the current context's reads to 'default'"""
+    state = _routing.get()
+    while state is not None:
+        state['wrote'] = True
+        state = state['outer']
+
+class ReplicaRouter:
+    """Listed in DATABASE_ROUTERS"""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in PRIMARY_ONLY_APPS and reading_from_replica():
+            return replica_alias()
+        # Explicit, so objects loaded from the replica don't keep reading from it
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        # Explicit, so saving an object loaded from the replica still goes to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary (replication or sync_sqlite_replica)
+        return db != replica_alias()
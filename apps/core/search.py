@@ -0,0 +1,383 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\search.py
+"""
+Search index for the typeahead APIs (inventory items, customers, transactions).
+
+Each searchable object is stored as one document (title + body) in a table named
+``search_index``, created by migration core 0006:
+  - SQLite: an FTS5 virtual table, ranked with bm25() and prefix-matched per word
+  - PostgreSQL: a table with a weighted tsvector (GIN) plus a pg_trgm index on the
+    title, ranked with ts_rank() + similarity()
+
+Documents are kept in sync by the post_save/post_delete receivers at the bottom of
+this module. Code paths using update()/bulk_create() bypass them; run
+``manage.py rebuild_search_index`` after those.
+
+The index matches whole words and word prefixes ("acme pl" finds "Acme
+Plastics"), not text inside a word. Queries with a digit (SKUs, phone and
+reference numbers, where users type any part) and queries shorter than
+SUBSTRING_QUERY_LENGTH characters therefore use the old icontains filters, as
+does everything when the index is unavailable (another database, or migrations
+not applied).
+"""
+import logging
+import re
+from django.apps import apps
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'search_index'
+# Ranked candidates fetched from the index per query; the caller's filters apply
+# to each chunk, and further chunks are fetched until a page is full
+SEARCH_CHUNK_SIZE = 500
+# Queries shorter than this match substrings instead of word prefixes
+SUBSTRING_QUERY_LENGTH = 3
+# Rows written per statement when rebuilding
+REBUILD_CHUNK_SIZE = 2000
+
+def _customer_document(customer):
+    return customer.name, ' '.join(filter(None, [customer.email, customer.phone]))
+
+def _inventory_document(item):
+    return ' '.join(filter(None, [item.name, item.sku])), item.description or ''
+
+def _transaction_document(txn):
+    customer_name = txn.customer.name if txn.customer_id else ''
+    return txn.reference_number or '', ' '.join(filter(None, [txn.description, customer_name]))
+
+# doc_type -> (code used in the SQLite rowid, model label, document builder, select_related)
+DOCUMENT_TYPES = {
+    'inventory': (1, 'inventory.InventoryItem', _inventory_document, []),
+    'customer': (2, 'customers.Customer', _customer_document, []),
+    'transaction': (3, 'transactions.Transaction', _transaction_document, ['customer']),
+}
+
+def _model_for(doc_type):
+    return apps.get_model(DOCUMENT_TYPES[doc_type][1])
+
+def _doc_type_for(model):
+    for doc_type, (_, label, _, _) in DOCUMENT_TYPES.items():
+        if model._meta.label == label:
+            return doc_type
+    return None
+
+def _query_terms(query):
+    """Words of the user's query; punctuation is ignored"""
+    return re.findall(r'\w+', query.lower())
+
+def needs_substring_match(query):
+    """Whether ``query`` must match inside words, which the index can't do"""
+    return len(query.strip()) < SUBSTRING_QUERY_LENGTH or any(char.isdigit() for char in query)
+
+class SQLiteSearchBackend:
+    vendor = 'sqlite'
+
+    def is_available(self, cursor):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [SEARCH_TABLE])
+        return cursor.fetchone() is not None
+
+    @staticmethod
+    def _rowid(doc_type, object_id):
+        # Deterministic rowid so a document can be replaced without a table scan
+        return object_id * 8 + DOCUMENT_TYPES[doc_type][0]
+
+    def upsert(self, cursor, doc_type, rows):
+        """rows: iterable of (object_id, company_id, title, body)"""
+        rows = [
+            (self._rowid(doc_type, object_id), doc_type, object_id, company_id, title, body)
+            for object_id, company_id, title, body in rows
+        ]
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, doc_type, object_id, company_id, title, body) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows
+        )
+
+    def delete(self, cursor, doc_type, object_id):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [self._rowid(doc_type, object_id)])
+
+    def clear(self, cursor, doc_type, company_id=None):
+        if company_id:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE doc_type = %s AND company_id = %s",
+                [doc_type, company_id]
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE doc_type = %s", [doc_type])
+
+    def search(self, cursor, doc_type, company_id, terms, limit, offset=0):
+        # Every word must match, each as a prefix: "acme pl" -> "acme"* "pl"*
+        match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+        cursor.execute(
+            f"SELECT object_id FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s AND doc_type = %s AND company_id = %s "
+            # Title matches count ten times as much as body matches
+            f"ORDER BY bm25({SEARCH_TABLE}, 0, 0, 0, 10.0, 1.0), rowid LIMIT %s OFFSET %s",
+            [match, doc_type, company_id, limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+class PostgresSearchBackend:
+    vendor = 'postgresql'
+
+    def is_available(self, cursor):
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [SEARCH_TABLE])
+        available = cursor.fetchone()[0]
+        if available:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            self.has_trigram = cursor.fetchone() is not None
+        return available
+
+    def upsert(self, cursor, doc_type, rows):
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (doc_type, object_id, company_id, title, body) "
+            "VALUES (%s, %s, %s, %s, %s) "
+            "ON CONFLICT (doc_type, object_id) DO UPDATE SET "
+            "company_id = EXCLUDED.company_id, title = EXCLUDED.title, body = EXCLUDED.body",
+            [(doc_type, object_id, company_id, title, body) for object_id, company_id, title, body in rows]
+        )
+
+    def delete(self, cursor, doc_type, object_id):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE doc_type = %s AND object_id = %s", [doc_type, object_id])
+
+    def clear(self, cursor, doc_type, company_id=None):
+        if company_id:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE doc_type = %s AND company_id = %s",
+                [doc_type, company_id]
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE doc_type = %s", [doc_type])
+
+    def search(self, cursor, doc_type, company_id, terms, limit, offset=0):
+        tsquery = ' & '.join(f"{term}:*" for term in terms)
+        phrase = ' '.join(terms)
+        if getattr(self, 'has_trigram', False):
+            # Trigram similarity also catches typos in the title ("acem" -> "acme")
+            cursor.execute(
+                f"SELECT object_id FROM {SEARCH_TABLE} "
+                "WHERE doc_type = %s AND company_id = %s "
+                "AND (document @@ to_tsquery('simple', %s) OR title %% %s) "
+                "ORDER BY ts_rank(document, to_tsquery('simple', %s)) + similarity(title, %s) DESC, object_id "
+                "LIMIT %s OFFSET %s",
+                [doc_type, company_id, tsquery, phrase, tsquery, phrase, limit, offset]
+            )
+        else:
+            cursor.execute(
+                f"SELECT object_id FROM {SEARCH_TABLE} "
+                "WHERE doc_type = %s AND company_id = %s AND document @@ to_tsquery('simple', %s) "
+                "ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC, object_id LIMIT %s OFFSET %s",
+                [doc_type, company_id, tsquery, tsquery, limit, offset]
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_availability = {}
+
+def get_backend(using=None):
+    """The search backend for the connection, or None when no index exists"""
+    conn = connection if using is None else connections[using]
+    backend_class = BACKENDS.get(conn.vendor)
+    if backend_class is None:
+        return None
+
+    key = (conn.alias, conn.settings_dict.get('NAME'))
+    if key not in _availability:
+        backend = backend_class()
+        try:
+            with conn.cursor() as cursor:
+                _availability[key] = backend if backend.is_available(cursor) else None
+        except Exception:
+            logger.exception("Search index availability check failed")
+            _availability[key] = None
+    return _availability[key]
+
+def reset_backend_cache():
+    """Forget cached availability (after the index table is created or dropped)"""
+    _availability.clear()
+
+def index_objects(doc_type, objects):
+    backend = get_backend()
+    if backend is None:
+        return 0
+    build_document = DOCUMENT_TYPES[doc_type][2]
+    rows = []
+    for obj in objects:
+        title, body = build_document(obj)
+        rows.append((obj.pk, obj.company_id, title, body))
+    if rows:
+        with connection.cursor() as cursor:
+            backend.upsert(cursor, doc_type, rows)
+    return len(rows)
+
+def remove_object(doc_type, object_id):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.delete(cursor, doc_type, object_id)
+
+def rebuild_index(doc_type, company_id=None, progress_callback=None, model=None):
+    """
+    Re-index every object of ``doc_type`` (optionally one company). Returns the count.
+    ``model`` lets migrations pass their historical model.
+    """
+    backend = get_backend()
+    if backend is None:
+        return 0
+
+    model = model or _model_for(doc_type)
+    queryset = model.objects.all()
+    if company_id:
+        queryset = queryset.filter(company_id=company_id)
+    select_related = DOCUMENT_TYPES[doc_type][3]
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+
+    total = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            backend.clear(cursor, doc_type, company_id)
+        chunk = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=REBUILD_CHUNK_SIZE):
+            chunk.append(obj)
+            if len(chunk) >= REBUILD_CHUNK_SIZE:
+                total += index_objects(doc_type, chunk)
+                chunk = []
+                if progress_callback:
+                    progress_callback(total)
+        total += index_objects(doc_type, chunk)
+    return total
+
+def search_id_chunks(doc_type, company_id, query, chunk_size=SEARCH_CHUNK_SIZE):
+    """
+    Ranked object ids matching ``query``, best first, as an iterator of lists of
+    up to ``chunk_size`` ids; each chunk is one query, run when it is reached.
+    None when the caller should match substrings with icontains instead (see
+    needs_substring_match(), or the index is unavailable).
+    """
+    backend = get_backend()
+    if backend is None or needs_substring_match(query):
+        return None
+    terms = _query_terms(query)
+
+    def chunks():
+        offset = 0
+        while terms:
+            with connection.cursor() as cursor:
+                ids = backend.search(cursor, doc_type, company_id, terms, chunk_size, offset)
+            if ids:
+                yield ids
+            if len(ids) < chunk_size:
+                return
+            offset += chunk_size
+    return chunks()
+
+def paginate_request(request, default_limit=15, max_limit=100):
+    """(page, limit) from ?page=&limit=, shared by the search APIs"""
+    try:
+        limit = min(max(int(request.GET.get('limit', default_limit)), 1), max_limit)
+    except (TypeError, ValueError):
+        limit = default_limit
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except (TypeError, ValueError):
+        page = 1
+    return page, limit
+
+def search_queryset(queryset, doc_type, company_id, query, page=1, limit=15, fallback_fields=()):
+    """
+    One page of ``queryset`` matching ``query``, best matches first.
+    Returns (objects, has_more). With an empty query the queryset is paged as is.
+
+    ``fallback_fields`` are the icontains lookups used when the index is unavailable.
+    """
+    offset = (page - 1) * limit
+    chunks = search_id_chunks(doc_type, company_id, query) if query else None
+
+    if chunks is None:
+        if query and fallback_fields:
+            condition = Q()
+            for field in fallback_fields:
+                condition |= Q(**{f"{field}__icontains": query})
+            queryset = queryset.filter(condition)
+        objects = list(queryset[offset:offset + limit + 1])
+        return objects[:limit], len(objects) > limit
+
+    # Apply the caller's filters (company, active, type...) chunk by chunk, so
+    # matches ranked behind rows the filters drop are still found
+    matches = []
+    for ids in chunks:
+        rank = {object_id: position for position, object_id in enumerate(ids)}
+        matches.extend(sorted(queryset.filter(pk__in=ids), key=lambda obj: rank[obj.pk]))
+        if len(matches) > offset + limit:
+            break
+    return matches[offset:offset + limit], len(matches) > offset + limit
+
+# --- Index maintenance -------------------------------------------------------
+
+def _index_on_commit(doc_type, instance):
+    def update_index():
+        try:
+            index_objects(doc_type, [instance])
+        except Exception:
+            # A stale search entry must never break the save that triggered it
+            logger.exception("Could not update search index for %s %s", doc_type, instance.pk)
+    transaction.on_commit(update_index)
+
+def _update_search_index(sender, instance, update_fields=None, **kwargs):
+    doc_type = _doc_type_for(sender)
+    if doc_type is None:
+        return
+    # Balance and status updates don't touch any searched field
+    if update_fields is not None and not set(update_fields) & SEARCHED_FIELDS[doc_type]:
+        return
+    _index_on_commit(doc_type, instance)
+
+    if doc_type == 'customer' and (update_fields is None or 'name' in update_fields):
+        # Transactions are found by their customer's name too
+        def reindex_transactions():
+            try:
+                transactions = _model_for('transaction').objects.filter(customer=instance).select_related('customer')
+                index_objects('transaction', transactions.iterator(chunk_size=REBUILD_CHUNK_SIZE))
+            except Exception:
+                logger.exception("Could not re-index transactions of customer %s", instance.pk)
+        transaction.on_commit(reindex_transactions)
+
+def _remove_from_search_index(sender, instance, **kwargs):
+    doc_type = _doc_type_for(sender)
+    if doc_type is None:
+        return
+    object_id = instance.pk
+
+    def remove():
+        try:
+            remove_object(doc_type, object_id)
+        except Exception:
+            logger.exception("Could not remove %s %s from search index", doc_type, object_id)
+    transaction.on_commit(remove)
+
+SEARCHED_FIELDS = {
+    'inventory': {'name', 'sku', 'description', 'company'},
+    'customer': {'name', 'email', 'phone', 'company'},
+    'transaction': {'reference_number', 'description', 'customer', 'company'},
+}
+
+def _reset_after_migrate(sender, **kwargs):
+    # The index table may have been created or dropped (migration core 0006)
+    reset_backend_cache()
+
+def connect_search_signals():
+    """Called from CoreConfig.ready()"""
+    post_migrate.connect(_reset_after_migrate, dispatch_uid='search_index_migrate')
+    for doc_type in DOCUMENT_TYPES:
+        model = _model_for(doc_type)
+        post_save.connect(_update_search_index, sender=model, dispatch_uid=f'search_index_save_{doc_type}')
+        post_delete.connect(_remove_from_search_index, sender=model, dispatch_uid=f'search_index_delete_{doc_type}')
@@ -0,0 +1,80 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\sqlite.py
+"""
+SQLite tuning profile for concurrent use.
+
+Out of the box SQLite uses a rollback journal (readers and the writer block
+each other), syncs on every commit and starts transactions DEFERRED: a posting
+that reads before it writes takes the write lock only at its first write, and
+when another connection got there first SQLite fails it at once with "database
+is locked" instead of waiting (waiting could deadlock). With SQLITE_TUNING on,
+every new connection gets, through the connection_created signal:
+
+- journal_mode=WAL: readers don't block the writer or each other
+- synchronous=NORMAL: in WAL mode still safe against corruption, fsyncs only
+  at checkpoints
+- busy_timeout: how long a writer waits for the lock before giving up
+- cache_size / mmap_size / temp_store: page cache and memory-mapped reads
+
+Posting paths open their transactions with immediate_atomic(), which takes the
+write lock up front (BEGIN IMMEDIATE) so a conflicting writer waits in the busy
+handler rather than failing halfway. CONN_MAX_AGE keeps connections (and their
+page cache) open between requests. The benchmark_sqlite_writers command
+compares both profiles under parallel writers.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,  # Negative: KiB, so 64 MB
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+def pragma_statements(pragmas=None, busy_timeout=None):
+    """The PRAGMA statements of the profile; the settings' values by default"""
+    if pragmas is None:
+        pragmas = getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+    if busy_timeout is None:
+        busy_timeout = getattr(settings, 'SQLITE_BUSY_TIMEOUT', 20)
+    statements = [f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}"]
+    statements.extend(f"PRAGMA {name} = {value}" for name, value in pragmas.items())
+    return statements
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver: applies the profile to new SQLite connections"""
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False):
+        return
+    for statement in pragma_statements():
+        connection.connection.execute(statement)
+
+def connect_sqlite_signals():
+    """Called from CoreConfig.ready()"""
+    from django.db.backends.signals import connection_created
+    connection_created.connect(configure_connection, dispatch_uid='core_sqlite_profile')
+
+class ImmediateAtomic(transaction.Atomic):
+    """Atomic whose outermost block starts with BEGIN IMMEDIATE on SQLite"""
+    def __enter__(self):
+        connection = transaction.get_connection(self.using)
+        if connection.vendor != 'sqlite' or connection.in_atomic_block:
+            return super().__enter__()
+        connection.ensure_connection()
+        mode = connection.transaction_mode
+        connection.transaction_mode = 'IMMEDIATE'
+        try:
+            return super().__enter__()
+        finally:
+            # BEGIN has been issued; leave the connection's own mode for everyone else
+            connection.transaction_mode = mode
+
+def immediate_atomic(using=None, savepoint=True, durable=False):
+    """
+    transaction.atomic() for posting paths: same arguments, and usable as a
+    decorator or context manager. Other databases lock rows themselves
+    (select_for_update), so it is a plain atomic() there.
+    """
+    if callable(using):
+        return ImmediateAtomic(DEFAULT_DB_ALIAS, savepoint, durable)(using)
+    return ImmediateAtomic(using, savepoint, durable)
@@ -0,0 +1,24 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\testing.py
+"""Shared fixtures for the apps' tests"""
+from django.test import TestCase
+
+from apps.accounts.models import Account
+from .bootstrap import bootstrap_company
+from .models import Company
+
+class CompanyTestCase(TestCase):
+    """A company with the default chart of accounts, categories and settings"""
+    company_name = 'Test Co'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name=cls.company_name)
+        bootstrap_company(cls.company)
+
+    @classmethod
+    def account(cls, number):
+        return Account.objects.get(company=cls.company, account_number=number)
+
+    @classmethod
+    def system_account(cls, system_account):
+        return Account.objects.get(company=cls.company, system_account=system_account)
@@ -20,6 +20,7 @@ urlpatterns = [
     path('admin-settings/', views.admin_settings, name='admin_settings'),
     path('user-management/', views.user_management, name='user_management'),
     path('database-config/', views.database_config, name='database_config'),
+    path('email-queue/', views.email_queue_status, name='email_queue_status'),
     
     # User profile and personal settings
     path('profile/', views.user_profile, name='user_profile'),
@@ -0,0 +1,41 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\core\versions.py
+"""
+Database-backed version counters for the cached datasets.
+
+Cached reports, list counters, pickers and MRP plans are keyed on a per-company
+version. The version lives in a CacheVersion row rather than in the cache:
+with the local-memory cache every process has its own copy of the cache, and a
+version bumped there would only retire the values of the process that bumped
+it. A row is shared by web workers and management commands alike.
+
+bump_version() writes the row in the caller's transaction, so the new version
+becomes visible to other connections together with the change it describes,
+and a rolled-back change takes its bump with it. Versions jump to at least the
+current clock value, so a number seen by a rolled-back transaction (or before
+a purge) is never handed out again.
+"""
+import time
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .models import CacheVersion
+
+def get_version(name, company_id):
+    """Current version of ``name`` for a company, created on first use"""
+    version = (
+        CacheVersion.objects.filter(name=name, company_id=company_id)
+        .values_list('version', flat=True).first()
+    )
+    if version is None:
+        version = CacheVersion.objects.get_or_create(
+            name=name, company_id=company_id, defaults={'version': time.time_ns()}
+        )[0].version
+    return version
+
+def bump_version(name, company_id):
+    """Retire every value cached under the current version of ``name``"""
+    updated = CacheVersion.objects.filter(name=name, company_id=company_id).update(
+        version=Greatest(F('version') + 1, Value(time.time_ns()))
+    )
+    if not updated:
+        CacheVersion.objects.get_or_create(name=name, company_id=company_id, defaults={'version': time.time_ns()})
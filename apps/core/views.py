@@ -17,13 +17,14 @@ from django.core.mail import send_mail
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.http import JsonResponse
 from apps.authentication.decorators import user_type_required
 from apps.authentication.models import User
 from apps.backup.models import DebtorReminderLog
 from .forms import CompanySettingsForm, EmailConfigForm, UserCompanyForm, AuditorCompanyForm, UserProfileForm, UserCreationForm, UserUpdateForm
-from .models import Company, EmailConfiguration
+from .models import Company, EmailConfiguration, OutboundEmail
 from apps.core.email_utils import send_email
 from apps.subscriptions.models import Subscription 
 from apps.subscriptions.models import Subscription, ExchangeRate
@@ -294,6 +295,15 @@ def admin_settings(request):
         company=user_company
     ).order_by('-sent_date')[:70]
     
+    # Report cache effectiveness (trial balance, income statement, balance sheet)
+    from apps.reporting.cache import get_report_cache_stats
+    from apps.reporting.services import CACHED_REPORTS
+    report_cache_stats = get_report_cache_stats(CACHED_REPORTS)
+    
+    # Outbound email queue health
+    from .email_queue import get_queue_stats
+    email_queue_stats = get_queue_stats(user_company)
+    
     context = {
         'user_company_form': user_company_form,
         'auditor_company_form': auditor_company_form,
@@ -317,6 +327,8 @@ def admin_settings(request):
         'license_features': license_features,
         'page_title': 'Admin Control Panel',
         'debtor_reminder_logs': debtor_reminder_logs,
+        'report_cache_stats': report_cache_stats,
+        'email_queue_stats': email_queue_stats,
     }
     return render(request, 'core/admin_settings.html', context)
 
@@ -615,35 +627,50 @@ def get_current_database_config():
         }
 
 def test_database_connection(config):
-    """Test database connection"""
-    try:
-        if config.get('type') == 'postgresql':
-            import psycopg2
-            conn = psycopg2.connect(
-                host=config['host'],
-                port=config['port'],
-                database=config['name'],
-                user=config['user'],
-                password=config['password']
-            )
-            conn.close()
-            return True
-    except Exception as e:
-        print(f"Database connection test failed: {e}")
-        return False
+    """Test database connection; raises ValueError for a malformed host or port"""
+    from config.database import build_database_url
+    from .database_config import DatabaseConfigurator
     
+    if config.get('type') == 'postgresql':
+        build_database_url(config)
+        return DatabaseConfigurator.test_postgresql_connection(config)
     return True
 
 def save_database_config(config):
-    """Save database configuration to settings file"""
-    # This would typically write to a configuration file
-    # For now, we'll just return True as this is complex for .exe deployment
+    """Save database configuration as DATABASE_URL in .env; applied on restart"""
+    from .database_config import DatabaseConfigurator
+    
+    DatabaseConfigurator.save_database_config(config)
     return True
 
 @login_required
 @user_type_required(allowed_roles=[User.UserType.ADMIN])
+def email_queue_status(request):
+    """Queue depth, failure rate and latency of the outbound email queue"""
+    from .email_queue import get_queue_stats
+    
+    user_company = request.user.company
+    if not user_company:
+        messages.error(request, "You are not associated with a company. Please contact support.")
+        return redirect('auth:login')
+    
+    recent_emails = OutboundEmail.objects.filter(company=user_company)[:50]
+    
+    context = {
+        'stats': get_queue_stats(user_company),
+        'recent_emails': recent_emails,
+        'page_title': 'Email Queue'
+    }
+    return render(request, 'core/email_queue_status.html', context)
+
+@login_required
 def database_config(request):
-    """Database configuration for .exe installations"""
+    """
+    Database configuration for .exe installations. DATABASE_URL is shared by
+    every company of the deployment, so only a superuser may view or change it.
+    """
+    if not request.user.is_superuser:
+        raise PermissionDenied
     if request.method == 'POST':
         # Handle database configuration
         db_type = request.POST.get('db_type', 'sqlite')
@@ -651,6 +678,7 @@ def database_config(request):
         if db_type == 'postgresql':
             # Configure PostgreSQL connection
             config = {
+                'type': 'postgresql',
                 'host': request.POST.get('db_host', 'localhost'),
                 'port': request.POST.get('db_port', '5432'),
                 'name': request.POST.get('db_name'),
@@ -659,11 +687,17 @@ def database_config(request):
             }
             
             # Test connection and save configuration
-            if test_database_connection(config):
-                save_database_config(config)
-                messages.success(request, "Database configuration saved successfully!")
-            else:
-                messages.error(request, "Failed to connect to database. Please check your settings.")
+            try:
+                if test_database_connection(config):
+                    save_database_config(config)
+                    messages.success(
+                        request,
+                        "Database configuration saved. Restart the application and run 'manage.py migrate' to use it."
+                    )
+                else:
+                    messages.error(request, "Failed to connect to database. Please check your settings.")
+            except ValueError as e:
+                messages.error(request, str(e))
         
         return redirect('core:database_config')
     
@@ -735,7 +769,7 @@ def send_audit_reminder(request):
         success = send_audit_reminders(request.user.company.id)
         
         if success:
-            messages.success(request, "Audit reminders sent successfully!")
+            messages.success(request, "Audit reminders queued for sending!")
         else:
             messages.error(request, "No auditors found or email failed.")
             
@@ -793,7 +827,7 @@ def send_audit_documents(request):
         success = send_audit_documents(request.user.company.id)
         
         if success:
-            messages.success(request, "Audit documents package sent successfully!")
+            messages.success(request, "Audit documents package queued for sending!")
         else:
             messages.error(request, "Failed to send audit documents. Please check your settings.")
             
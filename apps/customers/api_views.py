@@ -1,70 +1,63 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\customers\api_views.py
 
 from django.http import JsonResponse
-from django.db.models import Q
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
 import json
+from apps.authentication.decorators import user_type_required
+from apps.authentication.models import User
+from apps.core.picker import CUSTOMER, picker_etag, search_projection
+from apps.core.search import paginate_request
 from .models import Customer
+from .payments import RECEIPT, PaymentAllocationError, allocate_payment
+from .services import customer_filters_from_request, filter_customers
 from decimal import Decimal # 👈 *** ADD THIS IMPORT ***
 
+def _customer_picker_etag(request):
+    return picker_etag(CUSTOMER, request.user.company_id, request)
+
 @login_required
 @require_http_methods(["GET"])
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_customer_picker_etag)
 def customer_search_api(request):
     query = request.GET.get('q', '').strip()
-    limit = int(request.GET.get('limit', 50))
-    
-    print(f"🔍 Customer search API called with query: '{query}', limit: {limit}")
-    
-    customers_qs = Customer.objects.filter(company=request.user.company)
+    page, limit = paginate_request(request, default_limit=50)
     
-    if query:
-        print(f"🔍 Searching for customers matching '{query}'")
-        customers = customers_qs.filter(
-            Q(name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(phone__icontains=query)
-        )[:limit]
-    elif request.GET.get('all') == '1':
-        print(f"📋 Loading all customers because 'all=1' was passed.")
-        customers = customers_qs.order_by('name')[:limit]
+    if query or request.GET.get('all') == '1':
+        customers, has_more = search_projection(CUSTOMER, request.user.company_id, query, page, limit)
     else:
-        customers = Customer.objects.none()
+        customers, has_more = [], False
 
     results = []
     for customer in customers:
-        # ======================================================================
-        # START: MODIFICATION TO RESPECT ENTITY TYPE
-        # ======================================================================
-        receivable_to_show = customer.receivable_balance
-        payable_to_show = customer.payable_balance
+        receivable_to_show = customer['receivable_balance']
+        payable_to_show = customer['payable_balance']
 
-        if customer.entity_type == Customer.CUSTOMER:
+        if customer['entity_type'] == Customer.CUSTOMER:
             # A pure customer should not have a payable balance shown
             payable_to_show = Decimal('0.00')
-        elif customer.entity_type == Customer.VENDOR:
+        elif customer['entity_type'] == Customer.VENDOR:
             # A pure vendor should not have a receivable balance shown
             receivable_to_show = Decimal('0.00')
         # If type is 'both', we show both balances as they are from the database.
 
         results.append({
-            'id': customer.id,
-            'name': customer.name,
-            'email': customer.email or '',
-            'phone': customer.phone or '',
-            'customer_type': customer.get_entity_type_display(),
-            'receivable_balance': str(receivable_to_show), # Use the filtered value
-            'payable_balance': str(payable_to_show),     # Use the filtered value
-            'credit_limit': str(customer.credit_limit)
+            'id': customer['id'],
+            'name': customer['name'],
+            'email': customer['email'],
+            'phone': customer['phone'],
+            'customer_type': customer['entity_type_display'],
+            'receivable_balance': str(receivable_to_show),
+            'payable_balance': str(payable_to_show),
+            'credit_limit': str(customer['credit_limit'])
         })
-        # ======================================================================
-        # END: MODIFICATION
-        # ======================================================================
     
-    print(f"✅ Returning {len(results)} results")
-    return JsonResponse({'results': results})
-
+    return JsonResponse({'results': results, 'page': page, 'has_more': has_more})
 
 @login_required
 @csrf_exempt
@@ -108,20 +101,11 @@ def customer_create_api(request):
 @login_required
 @require_http_methods(["GET"])
 def customer_filter_api(request):
-    """Filter customers by transaction type compatibility"""
-    transaction_type = request.GET.get('transaction_type', '')
-    company = request.user.company
-    
-    customers = Customer.objects.filter(company=company)
-    
-    if transaction_type:
-        if transaction_type in ['SALE', 'PAYMENT']:
-            customers = customers.filter(entity_type__in=[Customer.CUSTOMER, Customer.BOTH])
-        elif transaction_type in ['PURCHASE', 'EXPENSE']:
-            customers = customers.filter(entity_type__in=[Customer.VENDOR, Customer.BOTH])
+    """Filter customers by transaction type compatibility (and the customer list filters)"""
+    customers = filter_customers(request.user.company, **customer_filters_from_request(request))
     
     results = []
-    for customer in customers.order_by('name'):
+    for customer in customers:
         results.append({
             'id': customer.id,
             'name': customer.name,
@@ -132,3 +116,69 @@ def customer_filter_api(request):
     
     return JsonResponse({'customers': results})
 
+
+
+@login_required
+@user_type_required(allowed_roles=[User.UserType.ADMIN, User.UserType.ACCOUNTANT])
+@require_http_methods(["POST"])
+def allocate_payment_api(request, pk):
+    """
+    Allocate one receipt (or vendor payment) across many open documents.
+
+    JSON body: {"kind": "receipt" | "vendor_payment", "amount": "250.00",
+    "date": "YYYY-MM-DD", "reference": "...", "notes": "...",
+    "allocations": [{"transaction_id": 12, "amount": "100.00"}, ...]}
+    Without "allocations" the amount settles the oldest documents first; an
+    allocation without "amount" pays that document's full balance due.
+    """
+    customer = get_object_or_404(Customer, pk=pk, company=request.user.company)
+    try:
+        data = json.loads(request.body)
+    except (ValueError, TypeError):
+        return JsonResponse({'success': False, 'error': 'Invalid JSON body'}, status=400)
+
+    allocations = data.get('allocations')
+    if allocations is not None:
+        try:
+            allocations = [(int(row['transaction_id']), row.get('amount')) for row in allocations]
+        except (KeyError, TypeError, ValueError):
+            return JsonResponse({'success': False, 'error': 'Each allocation needs a transaction_id'}, status=400)
+
+    payment_date = None
+    if data.get('date'):
+        payment_date = parse_date(data['date'])
+        if payment_date is None:
+            return JsonResponse({'success': False, 'error': 'Invalid date, expected YYYY-MM-DD'}, status=400)
+
+    try:
+        result = allocate_payment(
+            customer,
+            data.get('amount'),
+            kind=data.get('kind', RECEIPT),
+            allocations=allocations,
+            payment_date=payment_date,
+            reference=(data.get('reference') or '')[:100],
+            notes=data.get('notes') or '',
+            user=request.user,
+        )
+    except PaymentAllocationError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    customer.refresh_from_db(fields=['receivable_balance', 'payable_balance'])
+    return JsonResponse({
+        'success': True,
+        'payment_id': result['payment'].id,
+        'reference_number': result['payment'].reference_number,
+        'journal_entry_id': result['journal_entry'].id,
+        'total': str(result['total']),
+        'allocations': [
+            {
+                'transaction_id': document.id,
+                'amount': str(applied),
+                'balance_due': str(document.balance_due),
+            }
+            for document, applied in result['allocations']
+        ],
+        'receivable_balance': str(customer.receivable_balance),
+        'payable_balance': str(customer.payable_balance),
+    })
@@ -0,0 +1,87 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\customers\management\commands\generate_customer_statements.py
+import os
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.models import Company
+from apps.customers.tasks import generate_customer_statements
+
+class Command(BaseCommand):
+    help = 'Generate every customer statement for a period into one archive per company (month-end runs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=int,
+            help='Generate statements for specific company only',
+        )
+        parser.add_argument(
+            '--start',
+            help='Period start (YYYY-MM-DD). Defaults to the first day of last month',
+        )
+        parser.add_argument(
+            '--end',
+            help='Period end (YYYY-MM-DD). Defaults to the last day of last month',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['pdf', 'csv', 'excel'],
+            default='pdf',
+            help='File format of each statement',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes used to render statements',
+        )
+        parser.add_argument(
+            '--output-dir',
+            help='Directory for the archives (default: MEDIA_ROOT/statements/<company id>)',
+        )
+        parser.add_argument(
+            '--email',
+            action='append',
+            help='Email the archive to this address (can be repeated)',
+        )
+        parser.add_argument(
+            '--include-inactive',
+            action='store_true',
+            help='Also write statements for customers with no balance and no activity',
+        )
+
+    def _parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}'. Use YYYY-MM-DD.")
+
+    def handle(self, *args, **options):
+        first_of_month = timezone.localdate().replace(day=1)
+        end_date = self._parse_date(options['end']) if options['end'] else first_of_month - timedelta(days=1)
+        start_date = self._parse_date(options['start']) if options['start'] else end_date.replace(day=1)
+        if start_date > end_date:
+            raise CommandError("The period start is after its end.")
+
+        companies = Company.objects.filter(is_active=True)
+        if options['company_id']:
+            companies = companies.filter(pk=options['company_id'])
+
+        total = 0
+        for company in companies:
+            try:
+                _, count = generate_customer_statements(
+                    company.id, start_date, end_date,
+                    format_type=options['format'],
+                    workers=options['workers'],
+                    output_dir=options['output_dir'],
+                    email_to=options['email'],
+                    include_inactive=options['include_inactive'],
+                    log=self.stdout.write
+                )
+                total += count
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"{company.name}: statement run failed: {e}"))
+
+        self.stdout.write(self.style.SUCCESS(f"Generated {total} customer statements for {start_date} to {end_date}"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_customer_payable_balance_customer_receivable_balance'),
+        ('transactions', '0008_transaction_transaction_company_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentAllocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('receipt', 'Receipt'), ('vendor_payment', 'Vendor Payment')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_allocations', to='transactions.transaction')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='transactions.transaction')),
+            ],
+            options={
+                'ordering': ['id'],
+                'unique_together': {('payment', 'document')},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+import re
+from decimal import Decimal
+
+from django.db import migrations
+
+CHUNK_SIZE = 2000
+
+# Frozen copy of the description formats allocate_payment() wrote before allocations had a table:
+# "Payment [made ]for Transaction #12" or "Payment [made ]for Transactions #12 (40.00), #15 (10.00)"
+ALLOCATED_DOCUMENTS = re.compile(r'^Payment (?:made )?for Transactions? (#\d+(?: \([\d.]+\))?(?:, #\d+(?: \([\d.]+\))?)*)')
+ALLOCATED_DOCUMENT = re.compile(r'#(\d+)(?: \(([\d.]+)\))?')
+
+
+def backfill_allocations(apps, schema_editor):
+    """
+    Allocation rows for the payments recorded so far, read from their
+    descriptions. Where a multi-document description gives no amounts, the
+    payment is shared out in order, up to what each document has been paid.
+    """
+    Transaction = apps.get_model('transactions', 'Transaction')
+    PaymentAllocation = apps.get_model('customers', 'PaymentAllocation')
+    using = schema_editor.connection.alias
+
+    payments = Transaction.objects.using(using).filter(transaction_type='PAYMENT', customer__isnull=False)
+    rows = []
+    for payment_id, customer_id, description, total in (
+        payments.values_list('id', 'customer_id', 'description', 'total_amount').iterator(chunk_size=CHUNK_SIZE)
+    ):
+        match = ALLOCATED_DOCUMENTS.match(description or '')
+        if not match:
+            continue
+        kind = 'vendor_payment' if description.startswith('Payment made for') else 'receipt'
+        allocations = [
+            (int(document_id), Decimal(amount) if amount else None)
+            for document_id, amount in ALLOCATED_DOCUMENT.findall(match.group(1))
+        ]
+        paid = dict(
+            Transaction.objects.using(using)
+            .filter(pk__in=[document_id for document_id, _ in allocations], customer_id=customer_id)
+            .values_list('id', 'amount_paid')
+        )
+        remaining = total
+        for document_id, amount in allocations:
+            if document_id not in paid or remaining <= 0:
+                continue
+            if amount is None:
+                amount = total if len(allocations) == 1 else min(remaining, paid[document_id])
+            amount = min(amount, remaining)
+            remaining -= amount
+            rows.append(PaymentAllocation(payment_id=payment_id, document_id=document_id, kind=kind, amount=amount))
+        if len(rows) >= CHUNK_SIZE:
+            PaymentAllocation.objects.using(using).bulk_create(rows)
+            rows = []
+    PaymentAllocation.objects.using(using).bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_paymentallocation'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_allocations, migrations.RunPython.noop),
+    ]
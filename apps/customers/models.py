@@ -127,3 +127,29 @@ class Customer(models.Model):
         self.receivable_balance = receivable_balance
         self.payable_balance = payable_balance
         self.save(update_fields=['receivable_balance', 'payable_balance'])
+
+class PaymentAllocation(models.Model):
+    """
+    The part of one payment (a PAYMENT transaction) applied to one document,
+    written by apps.customers.payments.allocate_payment(). Statements date what
+    each document was paid from these rows; the payment's description is for
+    display only.
+    """
+    RECEIPT = 'receipt'
+    VENDOR_PAYMENT = 'vendor_payment'
+    KIND_CHOICES = [
+        (RECEIPT, 'Receipt'),
+        (VENDOR_PAYMENT, 'Vendor Payment'),
+    ]
+
+    payment = models.ForeignKey('transactions.Transaction', on_delete=models.CASCADE, related_name='allocations')
+    document = models.ForeignKey('transactions.Transaction', on_delete=models.CASCADE, related_name='payment_allocations')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+
+    class Meta:
+        unique_together = [('payment', 'document')]
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.amount} of payment #{self.payment_id} to #{self.document_id}"
@@ -0,0 +1,238 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\customers\payments.py
+"""
+Payment allocation for customer receipts and vendor payments.
+
+allocate_payment() applies one receipt (or one payment to a vendor) across any
+number of open documents - oldest first, or to the documents the caller names -
+and posts it in a fixed number of queries whatever the number of documents:
+
+- every document's amount_paid is written with a single bulk update,
+- one payment Transaction records the money received or paid, and one
+  PaymentAllocation row per document what it settled (bulk_create),
+- one consolidated journal entry posts it (cash against the control account),
+- the customer's stored balance is adjusted by the allocated total instead of
+  being recomputed from every transaction (Customer.update_balances()).
+
+bulk_update() and queryset.update() send no signals, so the customer picker
+projection is invalidated here explicitly.
+"""
+import logging
+from decimal import Decimal
+from django.db.models import F
+from django.utils import timezone
+
+from apps.accounts.models import Account
+from apps.core.picker import CUSTOMER, bump_picker_version
+from apps.core.sqlite import immediate_atomic
+from apps.journal.models import JournalEntry, JournalEntryLine
+from apps.transactions.constants import TransactionType
+from apps.transactions.models import Transaction
+from .models import Customer, PaymentAllocation
+
+logger = logging.getLogger(__name__)
+
+RECEIPT = PaymentAllocation.RECEIPT
+VENDOR_PAYMENT = PaymentAllocation.VENDOR_PAYMENT
+
+# kind -> (document types settled, control account, customer balance field)
+PAYMENT_KINDS = {
+    RECEIPT: ([TransactionType.SALE], Account.SystemAccount.ACCOUNTS_RECEIVABLE, 'receivable_balance'),
+    VENDOR_PAYMENT: ([TransactionType.PURCHASE, TransactionType.EXPENSE], Account.SystemAccount.ACCOUNTS_PAYABLE, 'payable_balance'),
+}
+
+class PaymentAllocationError(ValueError):
+    """The payment can't be allocated as requested; nothing has been written"""
+
+def payment_kind_for(transaction_obj):
+    """The payment kind that settles ``transaction_obj``, or None"""
+    for kind, (document_types, _, _) in PAYMENT_KINDS.items():
+        if transaction_obj.transaction_type in document_types:
+            return kind
+    return None
+
+def open_documents(customer, kind=RECEIPT):
+    """The customer's documents of ``kind`` with a balance due, oldest first"""
+    document_types = PAYMENT_KINDS[kind][0]
+    return (
+        Transaction.objects
+        .filter(company_id=customer.company_id, customer=customer, transaction_type__in=document_types)
+        .filter(amount_paid__lt=F('total_amount'))
+        .order_by('date', 'id')
+    )
+
+def _to_amount(value):
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    except Exception:
+        raise PaymentAllocationError(f"Invalid amount: {value}")
+
+def plan_allocation(documents, amount=None, allocations=None):
+    """
+    [(document, amount), ...] for a payment over ``documents`` (open, oldest first).
+
+    Without ``allocations`` the amount settles the oldest documents first. With
+    ``allocations`` - (transaction_id, amount) pairs, amount None meaning the full
+    balance due - only the named documents are paid, in the order given; if
+    ``amount`` is passed as well it must equal the allocated total.
+    """
+    if allocations is None:
+        if amount is None or amount <= 0:
+            raise PaymentAllocationError("Payment amount must be greater than zero")
+        remaining = amount
+        plan = []
+        for document in documents:
+            if remaining <= 0:
+                break
+            applied = min(remaining, document.balance_due)
+            plan.append((document, applied))
+            remaining -= applied
+        if remaining > 0:
+            open_balance = sum(document.balance_due for document in documents)
+            raise PaymentAllocationError(f"Payment amount cannot exceed the open balance of {open_balance}")
+        return plan
+
+    by_id = {document.id: document for document in documents}
+    plan = []
+    seen = set()
+    for transaction_id, applied in allocations:
+        document = by_id.get(transaction_id)
+        if document is None:
+            raise PaymentAllocationError(f"Transaction #{transaction_id} is not an open document of this customer")
+        if transaction_id in seen:
+            raise PaymentAllocationError(f"Transaction #{transaction_id} is allocated more than once")
+        seen.add(transaction_id)
+        applied = document.balance_due if applied is None else _to_amount(applied)
+        if applied <= 0:
+            raise PaymentAllocationError(f"Allocation to Transaction #{transaction_id} must be greater than zero")
+        if applied > document.balance_due:
+            raise PaymentAllocationError(
+                f"Allocation to Transaction #{transaction_id} cannot exceed its balance due of {document.balance_due}"
+            )
+        plan.append((document, applied))
+
+    if not plan:
+        raise PaymentAllocationError("No documents to allocate the payment to")
+    total = sum(applied for _, applied in plan)
+    if amount is not None and amount != total:
+        raise PaymentAllocationError(f"Payment amount {amount} does not match the allocated total of {total}")
+    return plan
+
+def _payment_description(customer, kind, plan, notes):
+    ids = ', '.join(f"#{document.id}" for document, _ in plan)
+    noun = 'Transaction' if len(plan) == 1 else 'Transactions'
+    # "Transaction #<id>" is how the customer page groups a payment under its document
+    if kind == RECEIPT:
+        description = f"Payment for {noun} {ids}"
+    else:
+        description = f"Payment made for {noun} {ids}"
+    return description + (f" - {notes}" if notes else "")
+
+@immediate_atomic
+def allocate_payment(customer, amount=None, kind=RECEIPT, allocations=None, payment_date=None,
+                     reference='', notes='', user=None, cash_account=None):
+    """
+    Records one payment from (RECEIPT) or to (VENDOR_PAYMENT) ``customer`` and
+    allocates it over their open documents; see plan_allocation() for how
+    ``amount`` and ``allocations`` are read. ``cash_account`` is the account the
+    money went through (the company's default cash account by default).
+
+    Returns a dict with the payment transaction, its journal entry, the
+    [(document, amount)] allocation and the total. Raises PaymentAllocationError
+    (a ValueError) when the payment can't be allocated.
+    """
+    if kind not in PAYMENT_KINDS:
+        raise PaymentAllocationError(f"Unknown payment kind: {kind}")
+    document_types, control_system_account, balance_field = PAYMENT_KINDS[kind]
+    company = customer.company
+    amount = _to_amount(amount) if amount is not None else None
+
+    # Lock the documents so two payments can't settle the same balance twice
+    documents = list(open_documents(customer, kind).select_for_update())
+    plan = plan_allocation(documents, amount, allocations)
+    total = sum(applied for _, applied in plan)
+
+    try:
+        if cash_account is None:
+            cash_account = Account.objects.get(company=company, system_account=Account.SystemAccount.DEFAULT_CASH)
+        control_account = Account.objects.get(company=company, system_account=control_system_account)
+    except Account.DoesNotExist:
+        raise PaymentAllocationError("Required accounts not found. Please check system account configuration.")
+
+    payment_date = payment_date or timezone.now().date()
+    now = timezone.now()
+
+    # 1. Every document in one UPDATE
+    for document, applied in plan:
+        document.amount_paid += applied
+        document.updated_at = now
+        if user is not None:
+            document.updated_by = user
+    Transaction.objects.bulk_update(
+        [document for document, _ in plan],
+        ['amount_paid', 'updated_at'] + (['updated_by'] if user is not None else []),
+    )
+
+    # 2. The payment itself; its balance effect is applied as a delta below
+    prefix = 'PAY' if kind == RECEIPT else 'PMT'
+    payment = Transaction(
+        company=company,
+        customer=customer,
+        transaction_type=TransactionType.PAYMENT,
+        date=payment_date,
+        description=_payment_description(customer, kind, plan, notes),
+        reference_number=reference or f"{prefix}-{plan[0][0].id}-{now.strftime('%Y%m%d%H%M')}",
+        total_amount=total,
+        amount_paid=total,  # Payment is fully "paid" immediately
+        created_by=user,
+    )
+    payment.save(update_customer_balances=False)
+    PaymentAllocation.objects.bulk_create([
+        PaymentAllocation(payment=payment, document=document, kind=kind, amount=applied)
+        for document, applied in plan
+    ])
+
+    # 3. One consolidated journal entry
+    # (no "Transaction #<id>" here: re-posting a document deletes entries that mention it)
+    references = ', '.join(f"#{document.id}" for document, _ in plan)
+    if kind == RECEIPT:
+        entry_description = f"Payment received from {customer.name} for {references}"
+        debit_account, credit_account = cash_account, control_account
+    else:
+        entry_description = f"Payment made to {customer.name} for {references}"
+        debit_account, credit_account = control_account, cash_account
+    journal_entry = JournalEntry.objects.create(
+        company=company,
+        date=payment_date,
+        description=entry_description[:255],
+        created_by=user,
+    )
+    JournalEntryLine.objects.create(
+        journal_entry=journal_entry,
+        account=debit_account,
+        debit=total,
+        credit=Decimal('0.00'),
+        description=f"Payment {'from' if kind == RECEIPT else 'to'} {customer.name}",
+    )
+    JournalEntryLine.objects.create(
+        journal_entry=journal_entry,
+        account=credit_account,
+        debit=Decimal('0.00'),
+        credit=total,
+        description=f"Payment for {len(plan)} document(s) {references}"[:255],
+    )
+    payment.journal_entry = journal_entry
+    payment.save(update_fields=['journal_entry'], update_customer_balances=False)
+
+    # 4. Balances by delta; settled documents all count towards this one field
+    Customer.objects.filter(pk=customer.pk).update(**{balance_field: F(balance_field) - total})
+    customer.refresh_from_db(fields=[balance_field])
+    bump_picker_version(CUSTOMER, company.id)
+
+    logger.info("Allocated payment %s of %s over %d document(s) for %s",
+                payment.reference_number, total, len(plan), customer.name)
+    return {
+        'payment': payment,
+        'journal_entry': journal_entry,
+        'allocations': plan,
+        'total': total,
+    }
@@ -0,0 +1,79 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\customers\services.py
+"""
+Customer list queries shared by the customer list page, its export and the
+customer filter API.
+
+filter_customers() applies the list filters once; customer_list_stats() returns
+every summary figure of the filtered list from a single conditional aggregate.
+"""
+from decimal import Decimal
+from django.core.paginator import Paginator
+from django.db.models import Count, Q, Sum
+from .models import Customer
+
+CUSTOMERS_PER_PAGE = 20
+
+def customer_filters_from_request(request):
+    """The list filters in a request's query string"""
+    return {
+        'search': request.GET.get('search', ''),
+        'entity_type': request.GET.get('type', ''),
+        'balance_filter': request.GET.get('balance_filter', ''),
+        'transaction_type': request.GET.get('transaction_type', ''),
+    }
+
+def filter_customers(company, search='', entity_type='', balance_filter='', transaction_type=''):
+    """Customers of ``company`` matching the list filters, ordered by name"""
+    customers = Customer.objects.filter(company=company)
+
+    if search:
+        customers = customers.filter(
+            Q(name__icontains=search) |
+            Q(email__icontains=search) |
+            Q(phone__icontains=search) |
+            Q(address__icontains=search)
+        )
+
+    if entity_type:
+        customers = customers.filter(entity_type=entity_type)
+
+    # Entities that can take part in a transaction of this type
+    if transaction_type in ['SALE', 'PAYMENT']:
+        customers = customers.filter(entity_type__in=[Customer.CUSTOMER, Customer.BOTH])
+    elif transaction_type in ['PURCHASE', 'EXPENSE']:
+        customers = customers.filter(entity_type__in=[Customer.VENDOR, Customer.BOTH])
+
+    if balance_filter == 'has_receivable':
+        customers = customers.filter(receivable_balance__gt=0)
+    elif balance_filter == 'has_payable':
+        customers = customers.filter(payable_balance__gt=0)
+    elif balance_filter == 'zero_balance':
+        customers = customers.filter(receivable_balance=0, payable_balance=0)
+
+    return customers.order_by('name')
+
+def customer_list_stats(customers):
+    """Totals and counts of a filtered customer queryset in one query"""
+    stats = customers.order_by().aggregate(
+        total_customers=Count('id'),
+        total_receivables=Sum('receivable_balance'),
+        total_payables=Sum('payable_balance'),
+        customers_with_receivables=Count('id', filter=Q(receivable_balance__gt=0)),
+        customers_with_payables=Count('id', filter=Q(payable_balance__gt=0)),
+    )
+    stats['total_receivables'] = stats['total_receivables'] or Decimal('0.00')
+    stats['total_payables'] = stats['total_payables'] or Decimal('0.00')
+    return stats
+
+def get_customer_list(company, page_number=None, per_page=CUSTOMERS_PER_PAGE, **filters):
+    """
+    One page of the filtered customer list plus its summary stats.
+    Returns (page_obj, stats); the page reuses the aggregate's count.
+    """
+    customers = filter_customers(company, **filters)
+    stats = customer_list_stats(customers)
+
+    paginator = Paginator(customers, per_page)
+    # count is a cached_property; seeding it saves the paginator's own COUNT(*)
+    paginator.count = stats['total_customers']
+    return paginator.get_page(page_number), stats
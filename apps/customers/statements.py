@@ -0,0 +1,286 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\customers\statements.py
+"""
+Bulk customer statements.
+
+load_statements() computes every customer's statement for a period from a few
+grouped queries (customers, balances brought forward, payments, period
+transactions) instead of one transaction scan per customer. write_statement_archive()
+renders one file per customer - across a process pool for large runs - and packs
+them, with a summary sheet, into a single zip archive.
+
+Balances are worked out from what is dated up to each boundary, so a payment
+received after the period leaves its statement unchanged: a document counts in
+full on its date, less whatever was paid when it was issued, and each payment
+is a credit on its own date; the PaymentAllocation rows of later payments tell
+what was paid at issue. Sales count towards what the entity owes us and
+purchases/expenses towards what we owe it. Vendor statements show the amount
+we owe as positive.
+"""
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from django.db.models import Sum
+
+from apps.reporting.export_utils import (
+    REPORT_FILE_EXTENSIONS, render_csv_to_file, render_excel_to_file, render_report_to_file
+)
+from apps.transactions.constants import TransactionType
+from apps.transactions.models import Transaction
+from .models import Customer, PaymentAllocation
+from .payments import RECEIPT
+
+STATEMENT_HEADERS = ['Date', 'Type', 'Reference', 'Description', 'Amount', 'Paid', 'Balance Due', 'Running Balance']
+SUMMARY_HEADERS = ['Customer', 'Type', 'Email', 'Opening Balance', 'Invoiced', 'Paid', 'Closing Balance']
+# Statements rendered per worker task, so small files don't pay one round trip each
+RENDER_BATCH_SIZE = 25
+
+RECEIVABLE_TYPES = [TransactionType.SALE]
+PAYABLE_TYPES = [TransactionType.PURCHASE, TransactionType.EXPENSE]
+
+def _direction(customer, transaction_type):
+    """+1 when a document increases the statement balance, -1 when it reduces it, 0 if neither"""
+    if transaction_type in RECEIVABLE_TYPES:
+        sign = 1
+    elif transaction_type in PAYABLE_TYPES:
+        sign = -1
+    else:
+        return 0
+    return -sign if customer['entity_type'] == Customer.VENDOR else sign
+
+def _payment_direction(customer, kind):
+    """The statement direction of a payment: it settles the opposite of what its documents added"""
+    sign = -1 if kind == RECEIPT else 1
+    return -sign if customer['entity_type'] == Customer.VENDOR else sign
+
+def _settlements(documents, payments, end_date):
+    """
+    ({document id: amount paid when it was issued}, {document id: amount paid
+    since, up to end_date}). What payments allocated to a document is taken off
+    its amount_paid, the rest was paid at issue.
+    """
+    unexplained = {row['id']: row['amount_paid'] for row in documents}
+    paid_since = {}
+    for payment in payments:
+        for document_id, amount in payment['allocations']:
+            if document_id in unexplained:
+                applied = min(amount, unexplained[document_id])
+                unexplained[document_id] -= applied
+                if payment['date'] <= end_date:
+                    paid_since[document_id] = paid_since.get(document_id, Decimal('0.00')) + applied
+    return unexplained, paid_since
+
+def load_statements(company, start_date, end_date, customer_ids=None, include_inactive=False):
+    """
+    Statements for ``company`` over [start_date, end_date], one dict per customer:
+    customer, opening_balance, transactions (period documents and payments with
+    running balance), invoiced, paid, closing_balance. Customers with no balance
+    and no activity are left out unless ``include_inactive``.
+    """
+    customers = Customer.objects.filter(company=company).order_by('name')
+    if customer_ids:
+        customers = customers.filter(pk__in=customer_ids)
+    customers = {
+        customer['id']: customer
+        for customer in customers.values('id', 'name', 'email', 'phone', 'entity_type')
+    }
+
+    transactions = Transaction.objects.filter(company=company, customer_id__in=customers.keys())
+    documents = transactions.filter(transaction_type__in=RECEIVABLE_TYPES + PAYABLE_TYPES)
+
+    # Every payment, whatever its date: a later one explains part of an earlier document's amount_paid.
+    # One recorded by hand has no allocations and, as its journal entry does, reads as a receipt.
+    payment_rows = transactions.filter(transaction_type=TransactionType.PAYMENT)
+    payments = {
+        row['id']: dict(row, kind=RECEIPT, allocations=[])
+        for row in payment_rows.order_by('date', 'id').values('id', 'customer_id', 'date', 'total_amount')
+    }
+    for payment_id, document_id, kind, amount in (
+        PaymentAllocation.objects.filter(payment__in=payment_rows.values('pk'))
+        .values_list('payment_id', 'document_id', 'kind', 'amount')
+    ):
+        payments[payment_id]['kind'] = kind
+        payments[payment_id]['allocations'].append((document_id, amount))
+    payments = list(payments.values())
+    paid_at_issue, paid_since = _settlements(
+        documents.filter(date__lte=end_date, amount_paid__gt=0).values('id', 'amount_paid'),
+        payments,
+        end_date,
+    )
+
+    # Balances brought forward: documents and payments dated before the period
+    opening = {customer_id: Decimal('0.00') for customer_id in customers}
+    for row in (
+        documents.filter(date__lt=start_date)
+        .values('customer_id', 'transaction_type')
+        .annotate(total=Sum('total_amount'))
+        .order_by()
+    ):
+        opening[row['customer_id']] += _direction(customers[row['customer_id']], row['transaction_type']) * row['total']
+    for row in documents.filter(date__lt=start_date, amount_paid__gt=0).values('id', 'customer_id', 'transaction_type'):
+        opening[row['customer_id']] -= (
+            _direction(customers[row['customer_id']], row['transaction_type']) * paid_at_issue[row['id']]
+        )
+    for payment in payments:
+        if payment['date'] < start_date:
+            opening[payment['customer_id']] += (
+                _payment_direction(customers[payment['customer_id']], payment['kind']) * payment['total_amount']
+            )
+
+    # Every document and payment of the period in one ordered pass
+    activity = {customer_id: [] for customer_id in customers}
+    for row in (
+        transactions.filter(date__gte=start_date, date__lte=end_date)
+        .order_by('customer_id', 'date', 'id')
+        .values('id', 'customer_id', 'date', 'transaction_type', 'reference_number',
+                'description', 'total_amount', 'amount_paid')
+    ):
+        activity[row['customer_id']].append(row)
+    payment_kinds = {payment['id']: payment['kind'] for payment in payments}
+
+    statements = []
+    for customer_id, customer in customers.items():
+        balance = opening[customer_id]
+        invoiced = Decimal('0.00')
+        paid = Decimal('0.00')
+        lines = []
+        for row in activity[customer_id]:
+            if row['transaction_type'] == TransactionType.PAYMENT:
+                paid += row['total_amount']
+                balance += _payment_direction(customer, payment_kinds[row['id']]) * row['total_amount']
+                lines.append(dict(row, balance_due=None, running_balance=balance, counted=True))
+                continue
+            direction = _direction(customer, row['transaction_type'])
+            # As at end_date, so a later payment doesn't rewrite the statement
+            settled = paid_at_issue.get(row['id'], Decimal('0.00'))
+            balance_due = row['total_amount'] - settled - paid_since.get(row['id'], Decimal('0.00'))
+            if direction:
+                invoiced += row['total_amount']
+                paid += settled
+                balance += direction * (row['total_amount'] - settled)
+            lines.append(dict(row, amount_paid=settled if direction else row['amount_paid'], balance_due=balance_due,
+                              running_balance=balance, counted=bool(direction)))
+
+        if not include_inactive and not lines and not opening[customer_id]:
+            continue
+        statements.append({
+            'customer': customer,
+            'opening_balance': opening[customer_id],
+            'transactions': lines,
+            'invoiced': invoiced,
+            'paid': paid,
+            'closing_balance': balance,
+        })
+    return statements
+
+def statement_rows(statement, start_date, end_date):
+    """The statement as export rows under STATEMENT_HEADERS"""
+    customer = statement['customer']
+    blank = [''] * 8
+    rows = [
+        ['Customer Statement for:', customer['name']] + [''] * 6,
+        ['Email:', customer['email'] or 'N/A'] + [''] * 6,
+        ['Phone:', customer['phone'] or 'N/A'] + [''] * 6,
+        ['Period:', f"{start_date} to {end_date}"] + [''] * 6,
+        blank,
+        [start_date, 'Opening Balance', '', 'Balance brought forward', '', '', '', statement['opening_balance']],
+    ]
+    for line in statement['transactions']:
+        rows.append([
+            line['date'],
+            TransactionType.get_display_name(line['transaction_type']),
+            line['reference_number'] or '',
+            line['description'] or '',
+            line['total_amount'],
+            line['amount_paid'],
+            line['balance_due'] if line['counted'] and line['balance_due'] is not None else '',
+            line['running_balance'] if line['counted'] else '',
+        ])
+    rows += [
+        blank,
+        ['Total Invoiced:', '', '', '', statement['invoiced'], '', '', ''],
+        ['Total Paid:', '', '', '', '', statement['paid'], '', ''],
+        ['Closing Balance:', '', '', '', '', '', '', statement['closing_balance']],
+    ]
+    return rows
+
+def statement_filename(customer, format_type):
+    slug = re.sub(r'[^a-z0-9]+', '_', customer['name'].lower()).strip('_') or 'customer'
+    return f"statement_{slug}_{customer['id']}.{REPORT_FILE_EXTENSIONS[format_type]}"
+
+def _render_statement_batch(jobs):
+    """Worker body: renders (rows, title, company_name, format_type, path) jobs"""
+    for rows, title, company_name, format_type, path in jobs:
+        if format_type == 'excel':
+            # Worksheet names are limited to 31 characters
+            render_excel_to_file(rows, STATEMENT_HEADERS, path, 'Customer Statement', company_name)
+        else:
+            render_report_to_file(rows, STATEMENT_HEADERS, title, company_name, format_type, path)
+    return len(jobs)
+
+def _init_worker():
+    # Spawned workers (Windows/macOS) start without Django configured
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+def write_statement_archive(company, statements, start_date, end_date, format_type, archive_path,
+                            workers=0, progress_callback=None):
+    """
+    Renders one ``format_type`` file per statement and zips them with summary.csv
+    into ``archive_path``. ``workers`` > 1 renders on a process pool. Returns the
+    number of statements written.
+    """
+    work_dir = tempfile.mkdtemp(prefix='statements_')
+    try:
+        jobs = []
+        for statement in statements:
+            customer = statement['customer']
+            jobs.append((
+                statement_rows(statement, start_date, end_date),
+                f"Customer Statement - {customer['name']}",
+                company.name,
+                format_type,
+                os.path.join(work_dir, statement_filename(customer, format_type)),
+            ))
+        batches = [jobs[i:i + RENDER_BATCH_SIZE] for i in range(0, len(jobs), RENDER_BATCH_SIZE)]
+
+        done = 0
+        if workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                for count in executor.map(_render_statement_batch, batches):
+                    done += count
+                    if progress_callback:
+                        progress_callback(done, len(jobs))
+        else:
+            for batch in batches:
+                done += _render_statement_batch(batch)
+                if progress_callback:
+                    progress_callback(done, len(jobs))
+
+        summary_path = os.path.join(work_dir, 'summary.csv')
+        render_csv_to_file([
+            [
+                statement['customer']['name'],
+                dict(Customer.ENTITY_TYPE_CHOICES).get(statement['customer']['entity_type'], ''),
+                statement['customer']['email'] or '',
+                statement['opening_balance'],
+                statement['invoiced'],
+                statement['paid'],
+                statement['closing_balance'],
+            ]
+            for statement in statements
+        ], SUMMARY_HEADERS, summary_path)
+
+        os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+        with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(summary_path, 'summary.csv')
+            for job in jobs:
+                archive.write(job[4], os.path.basename(job[4]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return len(jobs)
@@ -0,0 +1,56 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\customers\tasks.py
+import os
+import time
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.email_queue import queue_email
+from apps.core.models import Company
+from .statements import load_statements, write_statement_archive
+
+def statement_archive_path(company, start_date, end_date, format_type, output_dir=None):
+    output_dir = output_dir or os.path.join(settings.MEDIA_ROOT, 'statements', str(company.id))
+    slug = company.name.lower().replace(' ', '_')
+    return os.path.join(output_dir, f"statements_{slug}_{start_date}_{end_date}_{format_type}.zip")
+
+def generate_customer_statements(company_id, start_date, end_date, format_type='pdf', workers=0,
+                                 output_dir=None, email_to=None, include_inactive=False, log=print):
+    """
+    Background job: every customer statement of a company for the period, written
+    into one zip archive (and queued by email to ``email_to`` when given).
+    Returns (archive_path, statement_count).
+    """
+    company = Company.objects.get(pk=company_id)
+    started = time.monotonic()
+
+    statements = load_statements(company, start_date, end_date, include_inactive=include_inactive)
+    load_seconds = time.monotonic() - started
+    if not statements:
+        log(f"{company.name}: no customer activity between {start_date} and {end_date}.")
+        return None, 0
+
+    archive_path = statement_archive_path(company, start_date, end_date, format_type, output_dir)
+    count = write_statement_archive(company, statements, start_date, end_date, format_type, archive_path, workers=workers)
+    log(
+        f"{company.name}: {count} statements written to {archive_path} "
+        f"(load {load_seconds:.1f}s, total {time.monotonic() - started:.1f}s)"
+    )
+
+    if email_to:
+        queue_email(
+            subject=f"Customer Statements {start_date} to {end_date} - {company.name}",
+            template_name='emails/report_delivery.html',
+            context={
+                'company': company,
+                'report_type': 'Customer Statements',
+                'report_period': f"{start_date} to {end_date}",
+                'generated_date': timezone.now(),
+            },
+            to_emails=email_to,
+            attachment_path=archive_path,
+            company=company,
+            dedup_key=f"customer-statements:{company.id}:{start_date}:{end_date}:{format_type}",
+        )
+        log(f"{company.name}: archive queued for {', '.join(email_to)}")
+
+    return archive_path, count
@@ -1,3 +1,194 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from apps.core.testing import CompanyTestCase
+from apps.transactions.models import Transaction
+from .models import Customer, PaymentAllocation
+from .payments import PaymentAllocationError, allocate_payment
+from .services import get_customer_list
+from .statements import load_statements
+
+
+class CustomerTestCase(CompanyTestCase):
+    company_name = 'Statement Co'
+
+    def make_customer(self, name='Ada Stores', entity_type=Customer.CUSTOMER):
+        return Customer.objects.create(company=self.company, name=name, entity_type=entity_type)
+
+    def make_document(self, customer, day, total, paid='0.00', transaction_type='SALE'):
+        return Transaction.objects.create(
+            company=self.company, customer=customer, transaction_type=transaction_type, date=day,
+            total_amount=Decimal(total), amount_paid=Decimal(paid), description='Document',
+        )
+
+
+class StatementBalanceTests(CustomerTestCase):
+    def statement(self, customer, start, end):
+        return load_statements(self.company, start, end, customer_ids=[customer.pk], include_inactive=True)[0]
+
+    def test_payment_after_the_period_leaves_its_statement_unchanged(self):
+        customer = self.make_customer()
+        self.make_document(customer, date(2026, 1, 10), '100.00', paid='20.00')
+        self.make_document(customer, date(2026, 2, 10), '50.00')
+        before = self.statement(customer, date(2026, 2, 1), date(2026, 2, 28))
+
+        allocate_payment(customer, Decimal('90.00'), payment_date=date(2026, 3, 5))
+        after = self.statement(customer, date(2026, 2, 1), date(2026, 2, 28))
+
+        self.assertEqual(before['opening_balance'], Decimal('80.00'))
+        self.assertEqual(before['closing_balance'], Decimal('130.00'))
+        for field in ('opening_balance', 'invoiced', 'paid', 'closing_balance'):
+            self.assertEqual(after[field], before[field], field)
+        self.assertEqual(after['transactions'][0]['balance_due'], Decimal('50.00'))
+
+    def test_payments_are_credits_on_their_own_date(self):
+        customer = self.make_customer()
+        self.make_document(customer, date(2026, 1, 10), '100.00', paid='20.00')
+        self.make_document(customer, date(2026, 2, 10), '50.00')
+        allocate_payment(customer, Decimal('90.00'), payment_date=date(2026, 3, 5))
+
+        march = self.statement(customer, date(2026, 3, 1), date(2026, 3, 31))
+        self.assertEqual(march['opening_balance'], Decimal('130.00'))
+        self.assertEqual(march['paid'], Decimal('90.00'))
+        self.assertEqual([line['running_balance'] for line in march['transactions']], [Decimal('40.00')])
+        self.assertEqual(march['closing_balance'], Decimal('40.00'))
+
+        # Over the whole history the statement agrees with the stored balance
+        everything = self.statement(customer, date(2026, 1, 1), date(2026, 3, 31))
+        customer.refresh_from_db()
+        self.assertEqual(everything['opening_balance'], Decimal('0.00'))
+        self.assertEqual(everything['invoiced'], Decimal('150.00'))
+        self.assertEqual(everything['paid'], Decimal('110.00'))
+        self.assertEqual(everything['closing_balance'], customer.receivable_balance)
+
+    def test_opening_balance_counts_payments_before_the_boundary(self):
+        customer = self.make_customer()
+        self.make_document(customer, date(2026, 1, 10), '100.00')
+        allocate_payment(customer, Decimal('60.00'), payment_date=date(2026, 1, 31))
+
+        statement = self.statement(customer, date(2026, 2, 1), date(2026, 2, 28))
+        self.assertEqual(statement['opening_balance'], Decimal('40.00'))
+        self.assertEqual(statement['closing_balance'], Decimal('40.00'))
+
+    def test_vendor_statement_shows_what_we_owe_as_positive(self):
+        vendor = self.make_customer('Mill Ltd', Customer.VENDOR)
+        self.make_document(vendor, date(2026, 1, 10), '300.00', transaction_type='PURCHASE')
+        allocate_payment(vendor, Decimal('100.00'), kind='vendor_payment', payment_date=date(2026, 1, 20))
+
+        statement = self.statement(vendor, date(2026, 1, 1), date(2026, 1, 31))
+        self.assertEqual(
+            [line['running_balance'] for line in statement['transactions']],
+            [Decimal('300.00'), Decimal('200.00')],
+        )
+        self.assertEqual(statement['closing_balance'], Decimal('200.00'))
+
+    def test_editing_a_payment_description_leaves_statements_unchanged(self):
+        vendor = self.make_customer('Mill Ltd', Customer.VENDOR)
+        self.make_document(vendor, date(2026, 1, 10), '300.00', transaction_type='PURCHASE')
+        self.make_document(vendor, date(2026, 1, 12), '50.00', transaction_type='PURCHASE')
+        payment = allocate_payment(vendor, Decimal('320.00'), kind='vendor_payment', payment_date=date(2026, 2, 20))['payment']
+        before = self.statement(vendor, date(2026, 1, 1), date(2026, 2, 28))
+
+        Transaction.objects.filter(pk=payment.pk).update(description='Paid the mill')
+        after = self.statement(vendor, date(2026, 1, 1), date(2026, 2, 28))
+
+        self.assertEqual(after['closing_balance'], Decimal('30.00'))
+        for field in ('opening_balance', 'invoiced', 'paid', 'closing_balance'):
+            self.assertEqual(after[field], before[field], field)
+        january = self.statement(vendor, date(2026, 1, 1), date(2026, 1, 31))
+        self.assertEqual(january['closing_balance'], Decimal('350.00'))
+
+
+class PaymentAllocationTests(CustomerTestCase):
+    def test_payment_settles_the_oldest_documents_first(self):
+        customer = self.make_customer()
+        newest = self.make_document(customer, date(2026, 3, 1), '70.00')
+        oldest = self.make_document(customer, date(2026, 1, 1), '100.00', paid='40.00')
+        middle = self.make_document(customer, date(2026, 2, 1), '50.00')
+
+        result = allocate_payment(customer, Decimal('90.00'), payment_date=date(2026, 3, 10))
+
+        self.assertEqual(
+            [(document.pk, applied) for document, applied in result['allocations']],
+            [(oldest.pk, Decimal('60.00')), (middle.pk, Decimal('30.00'))],
+        )
+        for document, paid in ((oldest, '100.00'), (middle, '30.00'), (newest, '0.00')):
+            document.refresh_from_db()
+            self.assertEqual(document.amount_paid, Decimal(paid))
+        customer.refresh_from_db()
+        self.assertEqual(customer.receivable_balance, Decimal('90.00'))
+
+        payment = result['payment']
+        self.assertEqual(payment.total_amount, Decimal('90.00'))
+        self.assertEqual(
+            list(PaymentAllocation.objects.filter(payment=payment).values_list('document_id', 'kind', 'amount')),
+            [(oldest.pk, PaymentAllocation.RECEIPT, Decimal('60.00')), (middle.pk, PaymentAllocation.RECEIPT, Decimal('30.00'))],
+        )
+        lines = list(result['journal_entry'].lines.all())
+        self.assertEqual(sum(line.debit for line in lines), sum(line.credit for line in lines))
+
+    def test_named_allocations_are_paid_in_the_order_given(self):
+        customer = self.make_customer()
+        first = self.make_document(customer, date(2026, 1, 1), '100.00')
+        second = self.make_document(customer, date(2026, 2, 1), '50.00')
+
+        result = allocate_payment(customer, allocations=[(second.pk, None), (first.pk, '25.00')])
+
+        self.assertEqual(result['total'], Decimal('75.00'))
+        self.assertEqual([document.pk for document, _ in result['allocations']], [second.pk, first.pk])
+
+    def test_over_allocation_is_refused_without_writing(self):
+        customer = self.make_customer()
+        document = self.make_document(customer, date(2026, 1, 1), '100.00', paid='40.00')
+        customer.refresh_from_db()
+        balance = customer.receivable_balance
+
+        with self.assertRaises(PaymentAllocationError):
+            allocate_payment(customer, Decimal('60.01'))
+        with self.assertRaises(PaymentAllocationError):
+            allocate_payment(customer, allocations=[(document.pk, '75.00')])
+        with self.assertRaises(PaymentAllocationError):
+            allocate_payment(customer, Decimal('10.00'), allocations=[(document.pk, '20.00')])
+
+        document.refresh_from_db()
+        customer.refresh_from_db()
+        self.assertEqual(document.amount_paid, Decimal('40.00'))
+        self.assertEqual(customer.receivable_balance, balance)
+        self.assertFalse(Transaction.objects.filter(customer=customer, transaction_type='PAYMENT').exists())
+
+
+class CustomerListTests(CustomerTestCase):
+    def setUp(self):
+        for name, entity_type, receivable, payable in (
+            ('Ada Stores', Customer.CUSTOMER, '100.00', '0.00'),
+            ('Bolt Supplies', Customer.VENDOR, '0.00', '40.00'),
+            ('Cole & Co', Customer.BOTH, '25.50', '10.00'),
+            ('Dune Traders', Customer.CUSTOMER, '0.00', '0.00'),
+        ):
+            customer = self.make_customer(name, entity_type)
+            Customer.objects.filter(pk=customer.pk).update(
+                receivable_balance=Decimal(receivable), payable_balance=Decimal(payable)
+            )
+
+    def test_stats_and_page_come_from_two_queries(self):
+        with self.assertNumQueries(2):
+            page, stats = get_customer_list(self.company, per_page=3)
+            names = [customer.name for customer in page]
+
+        self.assertEqual(names, ['Ada Stores', 'Bolt Supplies', 'Cole & Co'])
+        self.assertEqual(page.paginator.num_pages, 2)
+        self.assertEqual(stats, {
+            'total_customers': 4,
+            'total_receivables': Decimal('125.50'),
+            'total_payables': Decimal('50.00'),
+            'customers_with_receivables': 2,
+            'customers_with_payables': 2,
+        })
+
+    def test_stats_follow_the_filters(self):
+        _, stats = get_customer_list(self.company, transaction_type='SALE', balance_filter='has_receivable')
+        self.assertEqual((stats['total_customers'], stats['total_receivables']), (2, Decimal('125.50')))
+
+        page, stats = get_customer_list(self.company, search='nothing like this')
+        self.assertEqual(list(page), [])
+        self.assertEqual((stats['total_customers'], stats['total_payables']), (0, Decimal('0.00')))
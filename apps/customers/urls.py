@@ -21,4 +21,5 @@ urlpatterns = [
     path('create-api/', api_views.customer_create_api, name='api_create'),
     path('api/filter/', api_views.customer_filter_api, name='api_filter'),
     path('vendor-payment/<int:pk>/', views.record_vendor_payment, name='record-vendor-payment'),
+    path('<int:pk>/api/allocate-payment/', api_views.allocate_payment_api, name='api_allocate_payment'),
 ]
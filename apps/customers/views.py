@@ -5,17 +5,18 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
 from django.http import JsonResponse
-from django.db.models import Q, F
-from django.core.paginator import Paginator
+from django.db.models import F
 from django.db import transaction as db_transaction
 from apps.reporting.export_utils import export_to_csv, export_to_excel, export_to_pdf
 from datetime import date
 from .models import Customer
 from .forms import CustomerForm
+from .services import customer_filters_from_request, filter_customers, get_customer_list
+from .payments import RECEIPT, VENDOR_PAYMENT, allocate_payment
 from apps.accounts.models import Account
 from apps.core.models import Company 
 from decimal import Decimal
-from apps.core.email_utils import send_email
+from apps.core.email_queue import queue_email
 from apps.authentication.decorators import user_type_required
 from apps.authentication.models import User
 from apps.transactions.models import Transaction
@@ -33,91 +34,20 @@ def get_current_company(request):
 @login_required
 @user_type_required(allowed_roles=[User.UserType.ADMIN, User.UserType.ACCOUNTANT, User.UserType.MANAGER, User.UserType.VIEWER])
 def customer_list(request):
-    customers = Customer.objects.filter(company=request.user.company)
-    
-    # Search functionality
-    search_query = request.GET.get('search', '')
-    if search_query:
-        customers = customers.filter(
-            Q(name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(phone__icontains=search_query) |
-            Q(address__icontains=search_query)
-        )
-    
-    # Filter by entity type
-    entity_type = request.GET.get('type', '')
-    if entity_type:
-        customers = customers.filter(entity_type=entity_type)
-    
-    # Filter by balance status
-    balance_filter = request.GET.get('balance_filter', '')
-    if balance_filter == 'has_receivable':
-        customers = customers.filter(receivable_balance__gt=0)
-    elif balance_filter == 'has_payable':
-        customers = customers.filter(payable_balance__gt=0)
-    elif balance_filter == 'zero_balance':
-        customers = customers.filter(receivable_balance=0, payable_balance=0)
-    
-    # Order by name
-    customers = customers.order_by('name')
-    
-    # 🎯 CALCULATE REAL TOTALS BEFORE PAGINATION
-    from django.db.models import Sum
-    
-    # Get totals from all customers (not just current page)
-    all_customers = Customer.objects.filter(company=request.user.company)
-    
-    # Apply same filters to totals calculation
-    if search_query:
-        all_customers = all_customers.filter(
-            Q(name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(phone__icontains=search_query) |
-            Q(address__icontains=search_query)
-        )
-    
-    if entity_type:
-        all_customers = all_customers.filter(entity_type=entity_type)
-    
-    if balance_filter == 'has_receivable':
-        all_customers = all_customers.filter(receivable_balance__gt=0)
-    elif balance_filter == 'has_payable':
-        all_customers = all_customers.filter(payable_balance__gt=0)
-    elif balance_filter == 'zero_balance':
-        all_customers = all_customers.filter(receivable_balance=0, payable_balance=0)
-    
-    # 🎯 CALCULATE ACTUAL TOTALS
-    totals = all_customers.aggregate(
-        total_receivables=Sum('receivable_balance'),
-        total_payables=Sum('payable_balance')
-    )
-    
-    total_receivables = totals['total_receivables'] or Decimal('0.00')
-    total_payables = totals['total_payables'] or Decimal('0.00')
-    
-    # Count customers with balances
-    customers_with_receivables = all_customers.filter(receivable_balance__gt=0).count()
-    customers_with_payables = all_customers.filter(payable_balance__gt=0).count()
-    active_this_month = all_customers.count()  # You can refine this logic
-    
-    # Pagination
-    paginator = Paginator(customers, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    filters = customer_filters_from_request(request)
+    page_obj, stats = get_customer_list(request.user.company, request.GET.get('page'), **filters)
     
     context = {
         'customers': page_obj,
-        'search_query': search_query,
-        'selected_type': entity_type,
-        'selected_balance': balance_filter,
-        # 🎯 ADD REAL TOTALS TO CONTEXT
-        'total_receivables': total_receivables,
-        'total_payables': total_payables,
-        'customers_with_receivables': customers_with_receivables,
-        'customers_with_payables': customers_with_payables,
-        'active_this_month': active_this_month,
-        'total_customers': all_customers.count(),
+        'search_query': filters['search'],
+        'selected_type': filters['entity_type'],
+        'selected_balance': filters['balance_filter'],
+        'total_receivables': stats['total_receivables'],
+        'total_payables': stats['total_payables'],
+        'customers_with_receivables': stats['customers_with_receivables'],
+        'customers_with_payables': stats['customers_with_payables'],
+        'active_this_month': stats['total_customers'],  # You can refine this logic
+        'total_customers': stats['total_customers'],
     }
     return render(request, 'customers/customer_list.html', context)
 
@@ -274,112 +204,6 @@ def customer_update(request, pk):
 
     return render(request, 'customers/customer_form.html', {'form': form, 'customer': customer, 'is_edit': True})
 
-def create_payment_journal_entry(transaction_obj, payment_amount):
-    """
-    Creates a journal entry for customer payment recording
-    Debit: Cash/Bank Account (increase cash)
-    Credit: Main Accounts Receivable Account (decrease total receivables)
-    """
-    try:
-        with db_transaction.atomic():
-            # Get the cash account (where payment is received)
-            cash_account = Account.objects.get(
-                company=transaction_obj.company,
-                system_account=Account.SystemAccount.DEFAULT_CASH
-            )
-            
-            # 🎯 FIX: Get the MAIN Accounts Receivable account, not the customer's individual account
-            main_ar_account = Account.objects.get(
-                company=transaction_obj.company,
-                system_account=Account.SystemAccount.ACCOUNTS_RECEIVABLE
-            )
-            
-            # Create the journal entry
-            journal_entry = JournalEntry.objects.create(
-                company=transaction_obj.company,
-                date=timezone.now().date(),
-                description=f"Payment received from {transaction_obj.customer.name} for Transaction #{transaction_obj.id}",
-                created_by=None  # Will be set by the view if available
-            )
-            
-            # Debit: Cash Account (increase cash)
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=cash_account,
-                debit=payment_amount,
-                credit=Decimal('0.00'),
-                description=f"Payment from {transaction_obj.customer.name}"
-            )
-            
-            # 🎯 FIX: Credit the MAIN Accounts Receivable account (decrease total receivables)
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=main_ar_account,  # ← Changed from receivable_account to main_ar_account
-                debit=Decimal('0.00'),
-                credit=payment_amount,
-                description=f"Payment for Transaction #{transaction_obj.id} from {transaction_obj.customer.name}"
-            )
-            
-            return journal_entry
-            
-    except Account.DoesNotExist:
-        raise ValueError("Required accounts not found. Please check system account configuration.")
-    except Exception as e:
-        raise ValueError(f"Error creating payment journal entry: {str(e)}")
-    
-def create_vendor_payment_journal_entry(transaction_obj, payment_amount):
-    """
-    Creates a journal entry for vendor payment recording
-    Debit: Main Accounts Payable Account (decrease total payables)
-    Credit: Cash/Bank Account (decrease cash)
-    """
-    try:
-        with db_transaction.atomic():
-            # Get the cash account (where payment is made from)
-            cash_account = Account.objects.get(
-                company=transaction_obj.company,
-                system_account=Account.SystemAccount.DEFAULT_CASH
-            )
-            
-            # Get the MAIN Accounts Payable account
-            main_ap_account = Account.objects.get(
-                company=transaction_obj.company,
-                system_account=Account.SystemAccount.ACCOUNTS_PAYABLE
-            )
-            
-            # Create the journal entry
-            journal_entry = JournalEntry.objects.create(
-                company=transaction_obj.company,
-                date=timezone.now().date(),
-                description=f"Payment made to {transaction_obj.customer.name} for Transaction #{transaction_obj.id}",
-                created_by=None  # Will be set by the view if available
-            )
-            
-            # Debit: Main Accounts Payable (decrease what we owe)
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=main_ap_account,
-                debit=payment_amount,
-                credit=Decimal('0.00'),
-                description=f"Payment to {transaction_obj.customer.name}"
-            )
-            
-            # Credit: Cash Account (decrease cash)
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=cash_account,
-                debit=Decimal('0.00'),
-                credit=payment_amount,
-                description=f"Payment for Transaction #{transaction_obj.id} to {transaction_obj.customer.name}"
-            )
-            
-            return journal_entry
-            
-    except Account.DoesNotExist:
-        raise ValueError("Required accounts not found. Please check system account configuration.")
-    except Exception as e:
-        raise ValueError(f"Error creating vendor payment journal entry: {str(e)}")
-    
 @login_required
 @user_type_required(allowed_roles=[User.UserType.ADMIN, User.UserType.ACCOUNTANT])
 def record_payment(request, pk):
@@ -406,37 +230,20 @@ def record_payment(request, pk):
             messages.error(request, f"Payment amount cannot exceed balance due of {currency_symbol}{transaction_obj.balance_due}")
         else:
             try:
-                with db_transaction.atomic():
-                    # 🎯 FIX 1: Update the original transaction's amount_paid
-                    transaction_obj.amount_paid += amount
-                    transaction_obj.save()
-                    
-                    # 🎯 FIX 2: Create a payment transaction with proper reference
-                    payment_transaction = Transaction.objects.create(
-                        company=request.user.company,
-                        customer=customer,
-                        transaction_type=TransactionType.PAYMENT,
-                        date=payment_date or timezone.now().date(),
-                        description=f"Payment for Transaction #{transaction_obj.id}" + (f" - {payment_notes}" if payment_notes else ""),
-                        reference_number=f"PAY-{transaction_obj.id}-{timezone.now().strftime('%Y%m%d%H%M')}",
-                        total_amount=amount,
-                        amount_paid=amount,  # Payment is fully "paid" immediately
-                        created_by=request.user
-                    )
-                    
-                    # 🎯 FIX 3: Update customer balances
-                    customer.update_balances()
-                    
-                    # Create journal entry for payment
-                    journal_entry = create_payment_journal_entry(transaction_obj, amount)
-                    journal_entry.created_by = request.user
-                    journal_entry.save()
-
-                    currency_symbol = get_currency_symbol(request.user.company.currency)
-                    messages.success(
-                        request, 
-                        f"Payment of {currency_symbol}{amount} recorded successfully for Transaction #{transaction_obj.id}"
-                    )
+                allocate_payment(
+                    customer,
+                    amount,
+                    kind=RECEIPT,
+                    allocations=[(transaction_obj.id, amount)],
+                    payment_date=payment_date or None,
+                    notes=payment_notes,
+                    user=request.user,
+                )
+                currency_symbol = get_currency_symbol(request.user.company.currency)
+                messages.success(
+                    request, 
+                    f"Payment of {currency_symbol}{amount} recorded successfully for Transaction #{transaction_obj.id}"
+                )
             except ValueError as e:
                 messages.error(request, str(e))
             except Exception as e:
@@ -525,37 +332,20 @@ def record_vendor_payment(request, pk):
             messages.error(request, f"Payment amount cannot exceed balance due of {currency_symbol}{transaction_obj.balance_due}")
         else:
             try:
-                with db_transaction.atomic():
-                    # Record payment on original transaction
-                    transaction_obj.amount_paid += amount
-                    transaction_obj.save()
-                    
-                    # Create payment transaction for history
-                    payment_transaction = Transaction.objects.create(
-                        company=request.user.company,
-                        customer=customer,
-                        transaction_type=TransactionType.PAYMENT,
-                        date=payment_date or timezone.now().date(),
-                        description=f"Payment made for Transaction #{transaction_obj.id}",
-                        reference_number=f"PMT-{transaction_obj.id}-{timezone.now().strftime('%Y%m%d')}",
-                        total_amount=amount,
-                        amount_paid=amount,
-                        created_by=request.user
-                    )
-                    
-                    # Update customer balances
-                    customer.update_balances()
-                    
-                    # Create journal entry for VENDOR payment
-                    journal_entry = create_vendor_payment_journal_entry(transaction_obj, amount)
-                    journal_entry.created_by = request.user
-                    journal_entry.save()
-
-                    currency_symbol = get_currency_symbol(request.user.company.currency)
-                    messages.success(
-                        request, 
-                        f"Payment of {currency_symbol}{amount} recorded successfully for Transaction #{transaction_obj.id}"
-                    )
+                allocate_payment(
+                    customer,
+                    amount,
+                    kind=VENDOR_PAYMENT,
+                    allocations=[(transaction_obj.id, amount)],
+                    payment_date=payment_date or None,
+                    notes=payment_notes,
+                    user=request.user,
+                )
+                currency_symbol = get_currency_symbol(request.user.company.currency)
+                messages.success(
+                    request, 
+                    f"Payment of {currency_symbol}{amount} recorded successfully for Transaction #{transaction_obj.id}"
+                )
             except ValueError as e:
                 messages.error(request, str(e))
             except Exception as e:
@@ -626,8 +416,8 @@ def send_reminder_email(request, pk):
     total_receivable_balance = customer.receivable_balance
     # --- END ADDITION ---
 
-    # Send the email with the new, more detailed context
-    success = send_email(
+    # Queue the email with the new, more detailed context
+    _, success = queue_email(
         subject=f"Payment Reminder from {company.name}",
         template_name='emails/debtor_reminder.html',
         context={
@@ -640,13 +430,15 @@ def send_reminder_email(request, pk):
             'overdue_transactions': overdue_transactions, # Pass the list of overdue items
             'currency_symbol': request.user.company.currency,
         },
-        to_emails=[customer.email]
+        to_emails=[customer.email],
+        company=company,
+        dedup_key=f"debtor-reminder:{company.id}:{customer.id}:{today}"
     )
 
     if success:
-        messages.success(request, f"A payment reminder for {overdue_transactions.count()} overdue invoice(s) has been sent to {customer.name}.")
+        messages.success(request, f"A payment reminder for {overdue_transactions.count()} overdue invoice(s) has been queued for {customer.name}.")
     else:
-        messages.error(request, "There was an error sending the reminder email. Please try again later.")
+        messages.info(request, f"A payment reminder was already queued for {customer.name} today.")
         
     return redirect('customers:customer-detail', pk=customer.pk)
 
@@ -658,7 +450,8 @@ def export_customers(request):
     if not company:
         return JsonResponse({'error': 'No company found'}, status=400)
     
-    customers = Customer.objects.filter(company=company).order_by('name')
+    # Same filters as the list page, so a filtered list exports as shown
+    customers = filter_customers(company, **customer_filters_from_request(request))
     
     headers = ['Name', 'Type', 'Email', 'Phone', 'Address', 'Receivable Balance', 'Payable Balance', 'Credit Limit']
     data = []
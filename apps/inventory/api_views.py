@@ -1,48 +1,35 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\inventory\api_views.py
 
 from django.http import JsonResponse
-from django.db.models import Q
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.contrib.auth.decorators import login_required
+from apps.core.picker import INVENTORY, picker_etag, search_projection
+from apps.core.search import paginate_request
 from .models import InventoryItem
 
+def _inventory_picker_etag(request):
+    return picker_etag(INVENTORY, request.user.company_id, request)
+
 @login_required
 @require_http_methods(["GET"])
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_inventory_picker_etag)
 def inventory_search_api(request):
     query = request.GET.get('q', '').strip()
-    limit = int(request.GET.get('limit', 15))
+    page, limit = paginate_request(request, default_limit=15)
     item_type_filter = request.GET.get('item_type', '').strip()  
 
-    items = InventoryItem.objects.filter(company=request.user.company, is_active=True)
-
-    if item_type_filter:
-        items = items.filter(item_type=item_type_filter)
+    if request.GET.get('all') == '1':
+        query = ''
 
-    if request.GET.get('all') != '1':
-        items = items.filter(
-            Q(name__icontains=query) |
-            Q(sku__icontains=query) |
-            Q(description__icontains=query)
-        )
-    
-    items = items[:limit]
-    
-    results = []
-    for item in items:
-        results.append({
-            'id': item.id,
-            'name': item.name,
-            'sku': item.sku or '',
-            'description': item.description or '',
-            'unit_of_measurement': item.unit_of_measurement or 'pcs',
-            'quantity_on_hand': str(item.quantity_on_hand),
-            'sale_price': str(item.sale_price or 0),
-            'purchase_price': str(item.purchase_price or 0),
-            'item_type': item.item_type,
-            'item_type_display': item.get_item_type_display()
-        })
+    # Rows come from the company's cached picker projection, already serialized
+    results, has_more = search_projection(
+        INVENTORY, request.user.company_id, query, page, limit,
+        row_filter=(lambda row: row['item_type'] == item_type_filter) if item_type_filter else None
+    )
     
-    return JsonResponse({'results': results})
+    return JsonResponse({'results': results, 'page': page, 'has_more': has_more})
 
 @login_required
 @require_http_methods(["GET"])
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_search_index'),
+        ('inventory', '0009_migrate_product_to_stock_item'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['company', 'created_at', 'id'], name='movement_company_created_idx'),
+        ),
+    ]
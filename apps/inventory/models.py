@@ -771,6 +771,10 @@ class InventoryMovement(models.Model):
         permissions = [
             ("can_create_movement", "Can create inventory movements"),
         ]
+        indexes = [
+            # Keyset pagination of the movement list
+            models.Index(fields=['company', 'created_at', 'id'], name='movement_company_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_movement_type_display()} - {self.item.name} ({self.quantity})"
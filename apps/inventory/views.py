@@ -9,7 +9,6 @@ from django.contrib.auth.decorators import login_required
 from django.views.generic import ListView
 from django.db.models import Q, Sum, Count, F
 from django.db import models
-from django.core.paginator import Paginator
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.http import JsonResponse
@@ -23,6 +22,9 @@ from .forms import InventoryItemForm, InventoryTransactionForm, InventoryBatchFo
 
 # --- FIX: Import the new utility function ---
 from apps.journal.utils import create_journal_entry_for_inventory_transaction
+from apps.core.counters import INVENTORY_MOVEMENTS, get_monthly_counters, sum_counters
+from apps.core.sqlite import immediate_atomic
+from apps.core.pagination import keyset_paginate
 
 # ===================================================================
 # Enhanced Inventory ITEM Views (Master Data)
@@ -239,7 +241,7 @@ class InventoryTransactionCreateView(View):
         form = self.form_class(request.POST, company=request.user.company)
         if form.is_valid():
             try:
-                with transaction.atomic():
+                with immediate_atomic():
                     inventory_transaction = form.save(commit=False)
                     inventory_transaction.company = request.user.company
                     inventory_transaction.save()
@@ -277,7 +279,7 @@ def inventory_movement_list(request):
     # 🎯 GET ALL MOVEMENTS FOR THE COMPANY
     movements = InventoryMovement.objects.filter(company=company).select_related(
         'item', 'batch', 'created_by'
-    ).order_by('-created_at')
+    )
     
     # Filter by processing status
     status_filter = request.GET.get('status', '')
@@ -300,15 +302,18 @@ def inventory_movement_list(request):
     if item_filter:
         movements = movements.filter(item_id=item_filter)
     
-    # Pagination
-    paginator = Paginator(movements, 25)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # 🆕 ADD SUMMARY STATISTICS
-    total_movements = movements.count()
-    processed_count = movements.filter(is_processed=True).count()
-    pending_count = movements.filter(is_processed=False).count()
+    # Summary statistics from the cached per-month counters of the company
+    totals = sum_counters(get_monthly_counters(INVENTORY_MOVEMENTS, company.id))
+    total_movements = totals.get('count', 0)
+    processed_count = totals.get('processed', 0)
+    pending_count = total_movements - processed_count
+    
+    # Cursor pages by (created_at, id); only filtered lists need their own (capped) count
+    filtered = any([status_filter, search_query, item_filter])
+    page_obj = keyset_paginate(
+        request, movements, 25, keys=('created_at', 'id'),
+        count=None if filtered else total_movements
+    )
     
     context = {
         'movements': page_obj,
@@ -345,7 +350,7 @@ def inventory_movement_create(request):
         form = InventoryMovementForm(request.POST, company=company)
         if form.is_valid():
             try:
-                with transaction.atomic():
+                with immediate_atomic():
                     movement = form.save(commit=False)
                     movement.company = company
                     movement.created_by = request.user
@@ -4,7 +4,7 @@ from django.contrib import admin
 from django.forms import BaseInlineFormSet
 from django.core.exceptions import ValidationError
 
-from .models import JournalEntry, JournalEntryLine
+from .models import BankStatement, BankStatementLine, JournalEntry, JournalEntryLine
 
 # This is the new, more robust validation logic
 class JournalEntryLineInlineFormSet(BaseInlineFormSet):
@@ -58,3 +58,17 @@ class JournalEntryAdmin(admin.ModelAdmin):
     search_fields = ('description',)
     inlines = [JournalEntryLineInline]
     date_hierarchy = 'date'
+
+
+class BankStatementLineInline(admin.TabularInline):
+    model = BankStatementLine
+    fields = ('date', 'amount', 'description', 'reference', 'is_reconciled', 'match_rule')
+    readonly_fields = ('is_reconciled', 'match_rule')
+    extra = 0
+
+
+@admin.register(BankStatement)
+class BankStatementAdmin(admin.ModelAdmin):
+    list_display = ('id', 'account', 'start_date', 'end_date', 'source_name', 'imported_at', 'company')
+    list_filter = ('company', 'account')
+    inlines = [BankStatementLineInline]
@@ -0,0 +1,198 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\journal\bank_import.py
+"""
+Bank statement import (CSV and OFX).
+
+parse_statement() turns a statement file into plain row dicts - date, signed
+amount (positive = money in), description, reference, fingerprint. import_statement()
+stores the rows that are not already on file for the account, so importing an
+overlapping or repeated export only adds the new rows.
+"""
+import csv
+import hashlib
+import io
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+
+from .models import BankStatement, BankStatementLine
+
+logger = logging.getLogger(__name__)
+
+CSV = 'csv'
+OFX = 'ofx'
+
+CSV_DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d %b %Y', '%Y/%m/%d']
+
+# Accepted (lower-cased) CSV header names for each column
+CSV_COLUMNS = {
+    'date': ['date', 'transaction date', 'posting date', 'posted date', 'value date', 'txn date'],
+    'amount': ['amount', 'transaction amount', 'value'],
+    'credit': ['credit', 'deposit', 'deposits', 'money in', 'paid in', 'credit amount'],
+    'debit': ['debit', 'withdrawal', 'withdrawals', 'money out', 'paid out', 'debit amount'],
+    'description': ['description', 'narration', 'details', 'memo', 'payee', 'name', 'particulars'],
+    'reference': ['reference', 'ref', 'reference number', 'cheque number', 'check number', 'transaction id', 'id'],
+}
+
+class StatementImportError(ValueError):
+    """The statement file can't be read; nothing has been imported"""
+
+def detect_format(filename, content):
+    if filename.lower().endswith(('.ofx', '.qfx')) or '<OFX>' in content[:4096].upper():
+        return OFX
+    return CSV
+
+def _parse_amount(value):
+    text = (value or '').strip().replace(',', '').replace(' ', '')
+    for symbol in ('₦', '$', '£', '€'):
+        text = text.replace(symbol, '')
+    if not text:
+        return None
+    negative = text.startswith('(') and text.endswith(')')
+    text = text.strip('()')
+    if text.upper().endswith(('CR', 'DR')):
+        negative = negative or text.upper().endswith('DR')
+        text = text[:-2]
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise StatementImportError(f"Invalid amount: {value}")
+    return (-amount if negative else amount).quantize(Decimal('0.01'))
+
+def _parse_csv_date(value):
+    text = (value or '').strip()
+    for date_format in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise StatementImportError(f"Unrecognised date: {value}")
+
+def _fingerprint(row, occurrence):
+    # Identical rows in one file (two equal transfers on a day) stay distinct by occurrence
+    raw = f"{row['date'].isoformat()}|{row['amount']}|{row['description']}|{row['reference']}|{occurrence}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def parse_csv(content):
+    reader = csv.reader(io.StringIO(content))
+    header = None
+    columns = {}
+    rows = []
+    for record in reader:
+        if not any(cell.strip() for cell in record):
+            continue
+        if header is None:
+            # Banks often put account details above the header row; skip until one matches
+            names = [cell.strip().lower() for cell in record]
+            for column, aliases in CSV_COLUMNS.items():
+                for alias in aliases:
+                    if alias in names:
+                        columns[column] = names.index(alias)
+                        break
+            if 'date' in columns and ('amount' in columns or 'credit' in columns or 'debit' in columns):
+                header = names
+            else:
+                columns = {}
+            continue
+
+        def cell(column):
+            index = columns.get(column)
+            return record[index].strip() if index is not None and index < len(record) else ''
+
+        if 'amount' in columns:
+            amount = _parse_amount(cell('amount'))
+        else:
+            amount = (_parse_amount(cell('credit')) or Decimal('0.00')) - (_parse_amount(cell('debit')) or Decimal('0.00'))
+        if amount is None:
+            continue
+        rows.append({
+            'date': _parse_csv_date(cell('date')),
+            'amount': amount,
+            'description': cell('description')[:255],
+            'reference': cell('reference')[:100],
+            'fingerprint': None,
+        })
+
+    if header is None:
+        raise StatementImportError("No header row with a date and an amount (or debit/credit) column was found")
+    return rows
+
+OFX_TRANSACTION = re.compile(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))', re.S | re.I)
+
+def _ofx_field(block, name):
+    # Handles SGML (OFX 1.x, no closing tags) and XML (OFX 2.x)
+    match = re.search(rf'<{name}>([^<\r\n]*)', block, re.I)
+    return match.group(1).strip() if match else ''
+
+def parse_ofx(content):
+    rows = []
+    for block in OFX_TRANSACTION.findall(content):
+        posted = _ofx_field(block, 'DTPOSTED')
+        try:
+            date = datetime.strptime(posted[:8], '%Y%m%d').date()
+        except ValueError:
+            raise StatementImportError(f"Unrecognised OFX date: {posted}")
+        name = _ofx_field(block, 'NAME')
+        memo = _ofx_field(block, 'MEMO')
+        fitid = _ofx_field(block, 'FITID')
+        rows.append({
+            'date': date,
+            'amount': _parse_amount(_ofx_field(block, 'TRNAMT')) or Decimal('0.00'),
+            'description': ' - '.join(part for part in (name, memo) if part)[:255],
+            'reference': (_ofx_field(block, 'CHECKNUM') or _ofx_field(block, 'REFNUM') or fitid)[:100],
+            'fingerprint': f"ofx:{fitid}"[:64] if fitid else None,
+        })
+    if not rows:
+        raise StatementImportError("No <STMTTRN> transactions found in the OFX file")
+    return rows
+
+def parse_statement(content, filename=''):
+    """(format, rows) for a statement file's text"""
+    file_format = detect_format(filename, content)
+    rows = parse_ofx(content) if file_format == OFX else parse_csv(content)
+    occurrences = Counter()
+    for row in rows:
+        if row['fingerprint'] is None:
+            key = (row['date'], row['amount'], row['description'], row['reference'])
+            row['fingerprint'] = _fingerprint(row, occurrences[key])
+            occurrences[key] += 1
+    return file_format, rows
+
+@transaction.atomic
+def import_statement(company, account, content, filename='', user=None):
+    """
+    Stores a statement file's new rows for ``account``. Returns
+    (statement, created_count, skipped_count); statement is None when every row
+    was already imported.
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig', errors='replace')
+    file_format, rows = parse_statement(content, filename)
+
+    existing = set(
+        BankStatementLine.objects
+        .filter(account=account, fingerprint__in=[row['fingerprint'] for row in rows])
+        .values_list('fingerprint', flat=True)
+    )
+    new_rows = [row for row in rows if row['fingerprint'] not in existing]
+    if not new_rows:
+        return None, 0, len(rows)
+
+    statement = BankStatement.objects.create(
+        company=company,
+        account=account,
+        source_name=filename[:255],
+        file_format=file_format,
+        start_date=min(row['date'] for row in new_rows),
+        end_date=max(row['date'] for row in new_rows),
+        imported_by=user,
+    )
+    BankStatementLine.objects.bulk_create([
+        BankStatementLine(statement=statement, account=account, **row)
+        for row in new_rows
+    ], batch_size=1000)
+    logger.info("Imported %d bank statement rows into %s (%d already on file)",
+                len(new_rows), account, len(rows) - len(new_rows))
+    return statement, len(new_rows), len(rows) - len(new_rows)
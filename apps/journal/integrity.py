@@ -0,0 +1,222 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\journal\integrity.py
+"""
+Ledger integrity checks.
+
+Each check is one set-based query over the whole book (or one company), e.g.
+unbalanced entries are found with
+
+    SELECT journal_entry_id, SUM(debit), SUM(credit) FROM journal_entryline
+    GROUP BY journal_entry_id HAVING ABS(SUM(debit) - SUM(credit)) > 0.005
+
+instead of an aggregate per entry. Checks return plain dicts (ids, amounts as
+Decimals) so the management commands can print them as text or JSON:
+
+- unbalanced_entries      debits and credits of an entry differ
+- empty_entries           entries without lines, or whose lines total zero
+- orphan_lines            lines whose entry or account is missing, or whose
+                          account belongs to another company than the entry
+- transaction_mismatches  a transaction's total_amount differs from the side of
+                          its journal entry that settles it
+- stock_drift             an item's quantity_on_hand differs from the sum of its
+                          inventory movements
+"""
+from decimal import Decimal
+from django.db.models import Case, Count, DecimalField, Exists, F, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Abs, Coalesce
+
+from apps.accounts.models import Account
+from apps.inventory.models import InventoryItem, InventoryTransaction
+from apps.transactions.constants import TransactionType
+from apps.transactions.models import Transaction
+from .models import JournalEntry, JournalEntryLine
+
+# Amounts are stored to the cent; anything under half a cent is float noise from SUM()
+TOLERANCE = Decimal('0.005')
+QUANTITY_TOLERANCE = Decimal('0.00005')
+
+CENT = Decimal('0.01')
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=15, decimal_places=2))
+
+def _company_filter(queryset, company, field='company'):
+    if company is None:
+        return queryset
+    return queryset.filter(**{field: company})
+
+def unbalanced_entries(company=None, entries=None):
+    """
+    Entries whose debits and credits differ, largest difference first.
+    ``entries`` optionally limits the check to a JournalEntry queryset.
+    """
+    lines = _company_filter(JournalEntryLine.objects.all(), company, 'journal_entry__company')
+    if entries is not None:
+        lines = lines.filter(journal_entry__in=entries.values('id'))
+    rows = (
+        lines.values('journal_entry_id', 'journal_entry__company_id', 'journal_entry__date', 'journal_entry__description')
+        .annotate(total_debit=Sum('debit', default=Decimal('0.00')), total_credit=Sum('credit', default=Decimal('0.00')))
+        .annotate(difference=F('total_debit') - F('total_credit'))
+        .filter(Q(difference__gt=TOLERANCE) | Q(difference__lt=-TOLERANCE))
+        .order_by()
+    )
+    issues = []
+    for row in rows:
+        debits, credits = row['total_debit'].quantize(CENT), row['total_credit'].quantize(CENT)
+        issues.append({
+            'journal_entry_id': row['journal_entry_id'],
+            'company_id': row['journal_entry__company_id'],
+            'date': row['journal_entry__date'],
+            'description': row['journal_entry__description'],
+            'debits': debits,
+            'credits': credits,
+            'difference': debits - credits,
+        })
+    issues.sort(key=lambda issue: (-abs(issue['difference']), issue['journal_entry_id']))
+    return issues
+
+def empty_entries(company=None):
+    """Entries with no lines, or whose lines are all zero"""
+    entries = (
+        _company_filter(JournalEntry.objects.all(), company)
+        .annotate(
+            line_count=Count('lines'),
+            total_debit=Coalesce(Sum('lines__debit'), ZERO),
+            total_credit=Coalesce(Sum('lines__credit'), ZERO),
+        )
+        .filter(total_debit__lt=TOLERANCE, total_debit__gt=-TOLERANCE,
+                total_credit__lt=TOLERANCE, total_credit__gt=-TOLERANCE)
+        .order_by('id')
+        .values('id', 'company_id', 'date', 'description', 'line_count')
+    )
+    return [{
+        'journal_entry_id': entry['id'],
+        'company_id': entry['company_id'],
+        'date': entry['date'],
+        'description': entry['description'],
+        'line_count': entry['line_count'],
+    } for entry in entries]
+
+def orphan_lines(company=None):
+    """Lines whose entry or account no longer exists, or that post to another company's account"""
+    lines = (
+        JournalEntryLine.objects
+        .annotate(
+            entry_exists=Exists(JournalEntry.objects.filter(pk=OuterRef('journal_entry_id'))),
+            account_exists=Exists(Account.objects.filter(pk=OuterRef('account_id'))),
+            same_company=Exists(JournalEntry.objects.filter(
+                pk=OuterRef('journal_entry_id'), company__accounts=OuterRef('account_id')
+            )),
+        )
+        .filter(Q(entry_exists=False) | Q(account_exists=False) | Q(same_company=False))
+    )
+    if company is not None:
+        # A line whose entry is gone is still found through its account's company
+        lines = lines.filter(Q(journal_entry__company=company) | Q(account__company=company))
+    issues = []
+    for line in lines.order_by('id').values('id', 'journal_entry_id', 'account_id', 'debit', 'credit',
+                                            'entry_exists', 'account_exists'):
+        if not line['entry_exists']:
+            reason = 'missing journal entry'
+        elif not line['account_exists']:
+            reason = 'missing account'
+        else:
+            reason = "account belongs to another company"
+        issues.append({
+            'line_id': line['id'],
+            'journal_entry_id': line['journal_entry_id'],
+            'account_id': line['account_id'],
+            'debit': line['debit'],
+            'credit': line['credit'],
+            'reason': reason,
+        })
+    return issues
+
+# Which side of a transaction's journal entry carries its total (see
+# create_journal_entry_for_transaction and allocate_payment)
+CREDIT_SETTLED_TYPES = [TransactionType.PURCHASE, TransactionType.EXPENSE]
+DEBIT_SETTLED_TYPES = [TransactionType.SALE, TransactionType.PAYMENT]
+
+def transaction_mismatches(company=None):
+    """
+    Transactions whose total_amount differs from their journal entry: the debits
+    (excluding cost of goods sold) of a sale or payment, the credits of a purchase
+    or expense.
+    """
+    transactions = (
+        _company_filter(Transaction.objects.all(), company)
+        .filter(journal_entry__isnull=False, transaction_type__in=CREDIT_SETTLED_TYPES + DEBIT_SETTLED_TYPES)
+        .annotate(
+            entry_debits=Coalesce(Sum(
+                'journal_entry__lines__debit',
+                filter=~Q(journal_entry__lines__account__system_account=Account.SystemAccount.COST_OF_GOODS_SOLD),
+            ), ZERO),
+            entry_credits=Coalesce(Sum('journal_entry__lines__credit'), ZERO),
+        )
+        .annotate(entry_amount=Case(
+            When(transaction_type__in=CREDIT_SETTLED_TYPES, then=F('entry_credits')),
+            default=F('entry_debits'),
+        ))
+        .annotate(difference=Abs(F('total_amount') - F('entry_amount')))
+        .filter(difference__gt=TOLERANCE)
+        .order_by('id')
+        .values('id', 'company_id', 'transaction_type', 'date', 'reference_number', 'total_amount',
+                'journal_entry_id', 'entry_amount')
+    )
+    return [{
+        'transaction_id': row['id'],
+        'company_id': row['company_id'],
+        'transaction_type': row['transaction_type'],
+        'date': row['date'],
+        'reference_number': row['reference_number'],
+        'journal_entry_id': row['journal_entry_id'],
+        'total_amount': row['total_amount'],
+        'journal_amount': row['entry_amount'].quantize(CENT),
+        'difference': row['total_amount'] - row['entry_amount'].quantize(CENT),
+    } for row in transactions]
+
+def stock_drift(company=None):
+    """Product items whose quantity_on_hand differs from the net of their inventory movements"""
+    quantity = DecimalField(max_digits=15, decimal_places=4)
+    items = (
+        _company_filter(InventoryItem.objects.exclude(item_type=InventoryItem.SERVICE), company)
+        .annotate(movement_quantity=Coalesce(
+            Sum(Case(
+                When(transactions__transaction_type__in=InventoryTransaction.get_stock_decrease_types(),
+                     then=-F('transactions__quantity')),
+                default=F('transactions__quantity'),
+                output_field=quantity,
+            )),
+            Value(Decimal('0'), output_field=quantity),
+        ))
+        .annotate(drift=Abs(F('quantity_on_hand') - F('movement_quantity')))
+        .filter(drift__gt=QUANTITY_TOLERANCE)
+        .order_by('id')
+        .values('id', 'company_id', 'sku', 'name', 'quantity_on_hand', 'movement_quantity')
+    )
+    return [{
+        'item_id': item['id'],
+        'company_id': item['company_id'],
+        'sku': item['sku'],
+        'name': item['name'],
+        'quantity_on_hand': item['quantity_on_hand'],
+        'movement_quantity': item['movement_quantity'],
+        'drift': item['quantity_on_hand'] - item['movement_quantity'],
+    } for item in items]
+
+CHECKS = {
+    'unbalanced_entries': unbalanced_entries,
+    'empty_entries': empty_entries,
+    'orphan_lines': orphan_lines,
+    'transaction_mismatches': transaction_mismatches,
+    'stock_drift': stock_drift,
+}
+
+def run_checks(company=None, checks=None):
+    """
+    Runs ``checks`` (names from CHECKS, all by default) for one company or the
+    whole book. Returns {'company_id', 'checks': {name: [issues]}, 'issue_count'}.
+    """
+    results = {name: CHECKS[name](company) for name in (checks or CHECKS)}
+    return {
+        'company_id': company.id if company is not None else None,
+        'checks': results,
+        'issue_count': sum(len(issues) for issues in results.values()),
+    }
@@ -1,46 +1,51 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\journal\management\commands\monitor_balance.py
 
+import json
 from django.core.management.base import BaseCommand
-from django.db.models import Sum
+from django.core.serializers.json import DjangoJSONEncoder
+from apps.journal.integrity import unbalanced_entries
 from apps.journal.models import JournalEntry
 from apps.core.models import Company
-from decimal import Decimal
 
 class Command(BaseCommand):
     help = 'Monitor for unbalanced journal entries'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--recent', type=int, default=10, help='Number of latest entries to check per company')
+        parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
+
     def handle(self, *args, **options):
         companies = Company.objects.all()
-        
+        results = []
+
         for company in companies:
-            entries = JournalEntry.objects.filter(company=company).order_by('-id')[:10]  # Check last 10 entries
-            unbalanced_count = 0
-            
-            for entry in entries:
-                totals = entry.lines.aggregate(
-                    total_debit=Sum('debit'),
-                    total_credit=Sum('credit')
-                )
-                
-                total_debits = totals.get('total_debit') or Decimal('0.00')
-                total_credits = totals.get('total_credit') or Decimal('0.00')
-                
-                if total_debits != total_credits:
-                    difference = total_debits - total_credits
-                    unbalanced_count += 1
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f"NEW Unbalanced Entry JE-{entry.id}: "
-                            f"Debits={total_debits}, Credits={total_credits}, "
-                            f"Difference={difference}"
-                        )
+            # One grouped query over the company's latest entries
+            recent = JournalEntry.objects.filter(company=company).order_by('-id')[:options['recent']]
+            unbalanced = unbalanced_entries(company, entries=recent)
+            results.append({'company_id': company.id, 'company': company.name, 'unbalanced_entries': unbalanced})
+
+            if options['format'] == 'json':
+                continue
+            for entry in unbalanced:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"NEW Unbalanced Entry JE-{entry['journal_entry_id']}: "
+                        f"Debits={entry['debits']}, Credits={entry['credits']}, "
+                        f"Difference={entry['difference']}"
                     )
-            
-            if unbalanced_count == 0:
+                )
+            if not unbalanced:
                 self.stdout.write(
                     self.style.SUCCESS(f"✓ Recent entries for {company.name} are balanced!")
                 )
             else:
                 self.stdout.write(
-                    self.style.WARNING(f"⚠ Found {unbalanced_count} new unbalanced entries for {company.name}")
+                    self.style.WARNING(f"⚠ Found {len(unbalanced)} new unbalanced entries for {company.name}")
                 )
+
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps({
+                'recent': options['recent'],
+                'companies': results,
+                'unbalanced_count': sum(len(result['unbalanced_entries']) for result in results),
+            }, cls=DjangoJSONEncoder, indent=2))
@@ -0,0 +1,70 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\journal\management\commands\reconcile_bank_statement.py
+import time
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.models import Account
+from apps.core.models import Company
+from apps.journal.bank_import import StatementImportError, import_statement
+from apps.journal.reconciliation import DEFAULT_DATE_WINDOW, reconcile_account
+
+class Command(BaseCommand):
+    help = (
+        'Import a CSV/OFX bank statement (optional) and match the account\'s open '
+        'statement rows against its unreconciled journal lines.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', type=int, required=True)
+        parser.add_argument('--file', help='CSV or OFX statement to import before matching')
+        parser.add_argument('--account', help='Account number of the bank account (default: the default cash account)')
+        parser.add_argument('--date-window', type=int, default=DEFAULT_DATE_WINDOW, help='Days either side a match may be dated')
+        parser.add_argument('--amount-tolerance', default='0.00', help='Largest amount difference for tolerance matches')
+        parser.add_argument('--no-many-to-one', action='store_true', help='Only match one statement row to one ledger line')
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without saving them')
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(pk=options['company_id']).first()
+        if company is None:
+            raise CommandError(f"Company {options['company_id']} not found.")
+        try:
+            if options['account']:
+                account = Account.objects.get(company=company, account_number=options['account'])
+            else:
+                account = Account.objects.get(company=company, system_account=Account.SystemAccount.DEFAULT_CASH)
+        except Account.DoesNotExist:
+            raise CommandError("Bank account not found.")
+        try:
+            tolerance = Decimal(options['amount_tolerance'])
+        except InvalidOperation:
+            raise CommandError(f"Invalid --amount-tolerance: {options['amount_tolerance']}")
+
+        if options['file']:
+            with open(options['file'], 'rb') as statement_file:
+                content = statement_file.read()
+            try:
+                _, created, skipped = import_statement(company, account, content, filename=options['file'])
+            except StatementImportError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"Imported {created} new rows ({skipped} already imported)")
+
+        started = time.monotonic()
+        summary = reconcile_account(
+            account,
+            date_window=options['date_window'],
+            amount_tolerance=tolerance,
+            many_to_one=not options['no_many_to_one'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(f"Open statement rows: {summary['rows']}")
+        for rule, count in sorted(summary['by_rule'].items()):
+            self.stdout.write(f"  {rule:<12} {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Matched {summary['matched_rows']} rows to {summary['matched_lines']} journal lines "
+            f"in {elapsed:.2f}s" + (" (dry run, nothing saved)" if options['dry_run'] else "")
+        ))
+        unmatched = summary['rows'] - summary['matched_rows']
+        if unmatched:
+            self.stdout.write(self.style.WARNING(f"{unmatched} statement rows still need review"))
@@ -1,16 +1,40 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\journal\management\commands\validate_journal_entries.py
 
+import json
 from django.core.management.base import BaseCommand
-from django.db.models import Sum
-from apps.journal.models import JournalEntry
+from django.core.serializers.json import DjangoJSONEncoder
 from apps.core.models import Company
-from decimal import Decimal
+from apps.journal.integrity import CHECKS, run_checks
+
+ISSUE_LABELS = {
+    'unbalanced_entries': lambda issue: (
+        f"Unbalanced Entry JE-{issue['journal_entry_id']}: "
+        f"Debits={issue['debits']}, Credits={issue['credits']}, Difference={issue['difference']}"
+    ),
+    'empty_entries': lambda issue: (
+        f"Empty Entry JE-{issue['journal_entry_id']} on {issue['date']}: {issue['line_count']} line(s) totalling zero"
+    ),
+    'orphan_lines': lambda issue: (
+        f"Orphan Line #{issue['line_id']} (JE-{issue['journal_entry_id']}, account {issue['account_id']}): {issue['reason']}"
+    ),
+    'transaction_mismatches': lambda issue: (
+        f"Transaction #{issue['transaction_id']} ({issue['transaction_type']}): total {issue['total_amount']}, "
+        f"JE-{issue['journal_entry_id']} posts {issue['journal_amount']}, Difference={issue['difference']}"
+    ),
+    'stock_drift': lambda issue: (
+        f"Stock drift on {issue['sku'] or issue['name']}: on hand {issue['quantity_on_hand']}, "
+        f"movements {issue['movement_quantity']}, Drift={issue['drift']}"
+    ),
+}
 
 class Command(BaseCommand):
-    help = 'Validate and fix unbalanced journal entries'
+    help = 'Validate journal entries and the ledger: balance, empty entries, orphan lines, transaction totals, stock'
 
     def add_arguments(self, parser):
         parser.add_argument('--company-id', type=int, help='Company ID to validate')
+        parser.add_argument('--check', action='append', choices=list(CHECKS), dest='checks',
+                            help='Run only this check (repeatable; default: all)')
+        parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
         parser.add_argument('--fix', action='store_true', help='Attempt to fix unbalanced entries')
 
     def handle(self, *args, **options):
@@ -18,52 +42,32 @@ class Command(BaseCommand):
         if options['company_id']:
             companies = companies.filter(id=options['company_id'])
 
+        reports = []
         for company in companies:
-            self.stdout.write(f"\nValidating entries for {company.name}...")
-            
-            entries = JournalEntry.objects.filter(company=company)
-            unbalanced_entries = []
-            
-            for entry in entries:
-                totals = entry.lines.aggregate(
-                    total_debit=Sum('debit'),
-                    total_credit=Sum('credit')
-                )
-                
-                total_debits = totals.get('total_debit') or Decimal('0.00')
-                total_credits = totals.get('total_credit') or Decimal('0.00')
-                
-                if total_debits != total_credits:
-                    difference = total_debits - total_credits
-                    unbalanced_entries.append({
-                        'entry': entry,
-                        'debits': total_debits,
-                        'credits': total_credits,
-                        'difference': difference
-                    })
-                    
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f"Unbalanced Entry JE-{entry.id}: "
-                            f"Debits={total_debits}, Credits={total_credits}, "
-                            f"Difference={difference}"
-                        )
-                    )
-            
-            if not unbalanced_entries:
-                self.stdout.write(
-                    self.style.SUCCESS(f"All entries for {company.name} are balanced!")
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"Found {len(unbalanced_entries)} unbalanced entries for {company.name}"
-                    )
-                )
-                
-                if options['fix']:
-                    self.stdout.write("Attempting to fix unbalanced entries...")
-                    for item in unbalanced_entries:
-                        # You can add logic here to attempt fixes
-                        # For now, just report them
-                        pass
+            report = run_checks(company, options['checks'])
+            report['company'] = company.name
+            reports.append(report)
+
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps({
+                'companies': reports,
+                'issue_count': sum(report['issue_count'] for report in reports),
+            }, cls=DjangoJSONEncoder, indent=2))
+            return
+
+        for report in reports:
+            self.stdout.write(f"\nValidating entries for {report['company']}...")
+            for name, issues in report['checks'].items():
+                for issue in issues:
+                    self.stdout.write(self.style.ERROR(ISSUE_LABELS[name](issue)))
+
+            if not report['issue_count']:
+                self.stdout.write(self.style.SUCCESS(f"All entries for {report['company']} are balanced!"))
+                continue
+            counts = ', '.join(f"{len(issues)} {name.replace('_', ' ')}" for name, issues in report['checks'].items() if issues)
+            self.stdout.write(self.style.WARNING(f"Found {counts} for {report['company']}"))
+
+            if options['fix']:
+                self.stdout.write("Attempting to fix unbalanced entries...")
+                # Unbalanced entries need a decision on which line is wrong;
+                # for now they are only reported
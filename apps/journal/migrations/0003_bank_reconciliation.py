@@ -0,0 +1,75 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_initial'),
+        ('core', '0006_search_index'),
+        ('journal', '0002_journalentry_journal_company_date_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_name', models.CharField(blank=True, max_length=255)),
+                ('file_format', models.CharField(max_length=10)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bank_statements', to='accounts.account')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_statements', to='core.company')),
+                ('imported_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bank_statements_imported', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bank Statement',
+                'verbose_name_plural': 'Bank Statements',
+                'ordering': ['-imported_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BankStatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('is_reconciled', models.BooleanField(default=False)),
+                ('match_rule', models.CharField(blank=True, choices=[('EXACT', 'Exact'), ('DATE_WINDOW', 'Amount, nearby date'), ('TOLERANCE', 'Amount within tolerance'), ('MANY_TO_ONE', 'Several ledger lines'), ('MANUAL', 'Manual')], max_length=20)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bank_statement_lines', to='accounts.account')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='journal.bankstatement')),
+            ],
+            options={
+                'verbose_name': 'Bank Statement Line',
+                'verbose_name_plural': 'Bank Statement Lines',
+                'ordering': ['date', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='journalentryline',
+            name='bank_statement_line',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='journal_lines', to='journal.bankstatementline'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentryline',
+            index=models.Index(fields=['account', 'bank_statement_line'], name='journal_line_recon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatementline',
+            index=models.Index(fields=['account', 'is_reconciled', 'date'], name='bank_line_open_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='bankstatementline',
+            constraint=models.UniqueConstraint(fields=('account', 'fingerprint'), name='bank_line_account_fingerprint_uniq'),
+        ),
+    ]
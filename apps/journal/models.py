@@ -29,6 +29,10 @@ class JournalEntry(models.Model):
         verbose_name = _("Journal Entry")
         verbose_name_plural = _("Journal Entries")
         ordering = ['-date']
+        indexes = [
+            # Keyset pagination of the journal entry list
+            models.Index(fields=['company', 'date', 'id'], name='journal_company_date_idx'),
+        ]
 
     def __str__(self):
         return f"JE-{self.id} on {self.date}: {self.description}"
@@ -88,6 +92,102 @@ class JournalEntryLine(models.Model):
     debit = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     credit = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     description = models.CharField(max_length=255, blank=True)
+    # Set once the line has been matched to a bank statement row (see reconciliation.py)
+    bank_statement_line = models.ForeignKey(
+        'journal.BankStatementLine',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='journal_lines'
+    )
+
+    class Meta:
+        indexes = [
+            # Unreconciled lines of a cash account, for the bank matcher
+            models.Index(fields=['account', 'bank_statement_line'], name='journal_line_recon_idx'),
+        ]
+
+    def __str__(self):
+        return f"Line for JE-{self.journal_entry.id} - {self.account}"
+
+
+class BankStatement(models.Model):
+    """One imported bank statement file for a cash/bank account"""
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='bank_statements'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.PROTECT,
+        related_name='bank_statements'
+    )
+    source_name = models.CharField(max_length=255, blank=True)
+    file_format = models.CharField(max_length=10)
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    imported_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bank_statements_imported'
+    )
+    imported_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Bank Statement")
+        verbose_name_plural = _("Bank Statements")
+        ordering = ['-imported_at']
+
+    def __str__(self):
+        return f"{self.account} statement {self.start_date} - {self.end_date}"
+
+
+class BankStatementLine(models.Model):
+    """
+    A single bank statement row. Amounts are signed from the bank's point of view:
+    positive for money in (a debit to the cash account), negative for money out.
+    """
+    class MatchRule(models.TextChoices):
+        EXACT = 'EXACT', _('Exact')
+        DATE_WINDOW = 'DATE_WINDOW', _('Amount, nearby date')
+        TOLERANCE = 'TOLERANCE', _('Amount within tolerance')
+        MANY_TO_ONE = 'MANY_TO_ONE', _('Several ledger lines')
+        MANUAL = 'MANUAL', _('Manual')
+
+    statement = models.ForeignKey(
+        BankStatement,
+        on_delete=models.CASCADE,
+        related_name='lines'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.PROTECT,
+        related_name='bank_statement_lines'
+    )
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    description = models.CharField(max_length=255, blank=True)
+    reference = models.CharField(max_length=100, blank=True)
+    # FITID for OFX, a content hash for CSV: re-importing a file skips rows already loaded
+    fingerprint = models.CharField(max_length=64)
+    is_reconciled = models.BooleanField(default=False)
+    match_rule = models.CharField(max_length=20, choices=MatchRule.choices, blank=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Bank Statement Line")
+        verbose_name_plural = _("Bank Statement Lines")
+        ordering = ['date', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'fingerprint'], name='bank_line_account_fingerprint_uniq'),
+        ]
+        indexes = [
+            # The matcher only loads a statement account's open rows
+            models.Index(fields=['account', 'is_reconciled', 'date'], name='bank_line_open_idx'),
+        ]
 
     def __str__(self):
-        return f"Line for JE-{self.journal_entry.id} - {self.account}"
\ No newline at end of file
+        return f"{self.date} {self.amount} {self.description}"
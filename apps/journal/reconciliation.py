@@ -0,0 +1,250 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\journal\reconciliation.py
+"""
+Bank reconciliation matcher.
+
+reconcile_account() matches a bank account's open statement rows against its
+unreconciled journal lines (debit - credit, dated by their journal entry). Both
+sides are loaded once and indexed in hash maps keyed by (amount in cents, date),
+so each statement row is matched with a handful of lookups instead of a scan of
+the ledger. Rules run in passes over all open rows, strictest first, so a loose
+rule can never take a line an exact match needed:
+
+1. EXACT        - same amount, same date
+2. DATE_WINDOW  - same amount, nearest date within ``date_window`` days
+3. TOLERANCE    - amount within ``amount_tolerance``, nearest within the window
+4. MANY_TO_ONE  - several same-signed ledger lines summing to the row (all of
+                  one day's lines, or a pair), e.g. receipts banked together
+
+Matches are persisted (BankStatementLine.is_reconciled and
+JournalEntryLine.bank_statement_line), so a re-run only looks at rows and lines
+that are still open.
+"""
+import bisect
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BankStatementLine, JournalEntryLine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATE_WINDOW = 3
+UPDATE_BATCH_SIZE = 500
+MatchRule = BankStatementLine.MatchRule
+
+def _cents(amount):
+    return int((amount * 100).to_integral_value())
+
+def _offsets(window):
+    """0, -1, 1, -2, 2, ... so the nearest date wins"""
+    yield 0
+    for days in range(1, window + 1):
+        yield -days
+        yield days
+
+class _Ledger:
+    """Open journal lines indexed by amount and date; taking a line removes it everywhere"""
+
+    def __init__(self, lines):
+        self.lines = {}
+        self.by_amount_date = defaultdict(list)
+        self.by_date = defaultdict(list)
+        for line_id, cents, date in lines:
+            self.lines[line_id] = (cents, date)
+            self.by_amount_date[(cents, date)].append(line_id)
+            self.by_date[date].append((cents, line_id))
+        for entries in self.by_date.values():
+            entries.sort()
+        self.taken = set()
+
+    def take(self, line_ids):
+        self.taken.update(line_ids)
+
+    def find(self, cents, date):
+        for line_id in self.by_amount_date.get((cents, date), ()):
+            if line_id not in self.taken:
+                return line_id
+        return None
+
+    def open_on(self, date):
+        return [(cents, line_id) for cents, line_id in self.by_date.get(date, ()) if line_id not in self.taken]
+
+    def nearest_in_range(self, low, high, date):
+        """An open line on ``date`` with cents in [low, high], closest to their midpoint"""
+        entries = self.by_date.get(date)
+        if not entries:
+            return None
+        target = (low + high) // 2
+        best = None
+        start = bisect.bisect_left(entries, (low, -1))
+        for cents, line_id in entries[start:]:
+            if cents > high:
+                break
+            if line_id in self.taken:
+                continue
+            if best is None or abs(cents - target) < abs(best[0] - target):
+                best = (cents, line_id)
+        return best[1] if best else None
+
+def _match_exact(rows, ledger, window, tolerance):
+    for row_id, cents, date in rows:
+        line_id = ledger.find(cents, date)
+        if line_id is not None:
+            yield row_id, [line_id]
+
+def _match_date_window(rows, ledger, window, tolerance):
+    for row_id, cents, date in rows:
+        for offset in _offsets(window):
+            line_id = ledger.find(cents, date + timedelta(days=offset))
+            if line_id is not None:
+                yield row_id, [line_id]
+                break
+
+def _match_tolerance(rows, ledger, window, tolerance):
+    if tolerance <= 0:
+        return
+    for row_id, cents, date in rows:
+        for offset in _offsets(window):
+            line_id = ledger.nearest_in_range(cents - tolerance, cents + tolerance, date + timedelta(days=offset))
+            if line_id is not None:
+                yield row_id, [line_id]
+                break
+
+def _match_many_to_one(rows, ledger, window, tolerance):
+    for row_id, cents, date in rows:
+        sign = 1 if cents > 0 else -1
+        match = None
+        for offset in _offsets(window):
+            # Everything posted that day in the row's direction, e.g. one banked deposit
+            day = [(amount, line_id) for amount, line_id in ledger.open_on(date + timedelta(days=offset))
+                   if amount * sign > 0]
+            if len(day) > 1 and sum(amount for amount, _ in day) == cents:
+                match = [line_id for _, line_id in day]
+                break
+        if match is None:
+            # Any two lines in the window: one hash lookup per candidate
+            seen = {}
+            for offset in _offsets(window):
+                for amount, line_id in ledger.open_on(date + timedelta(days=offset)):
+                    if amount * sign <= 0:
+                        continue
+                    other = seen.get(cents - amount)
+                    if other is not None:
+                        match = [other, line_id]
+                        break
+                    seen.setdefault(amount, line_id)
+                if match:
+                    break
+        if match:
+            yield row_id, match
+
+MATCH_PASSES = [
+    (MatchRule.EXACT, _match_exact),
+    (MatchRule.DATE_WINDOW, _match_date_window),
+    (MatchRule.TOLERANCE, _match_tolerance),
+    (MatchRule.MANY_TO_ONE, _match_many_to_one),
+]
+
+def find_matches(rows, lines, date_window=DEFAULT_DATE_WINDOW, amount_tolerance=Decimal('0.00'), many_to_one=True):
+    """
+    Pure matching step. ``rows`` and ``lines`` are (id, amount, date) tuples;
+    returns [(row_id, [line_ids], rule)].
+    """
+    ledger = _Ledger((line_id, _cents(amount), date) for line_id, amount, date in lines)
+    open_rows = [(row_id, _cents(amount), date) for row_id, amount, date in rows]
+    tolerance = _cents(amount_tolerance)
+    matches = []
+    for rule, match_pass in MATCH_PASSES:
+        if rule == MatchRule.MANY_TO_ONE and not many_to_one:
+            continue
+        matched = set()
+        for row_id, line_ids in match_pass(open_rows, ledger, date_window, tolerance):
+            # Each pass consumes lines as it goes, so later rows can't reuse them
+            ledger.take(line_ids)
+            matched.add(row_id)
+            matches.append((row_id, line_ids, rule))
+        open_rows = [row for row in open_rows if row[0] not in matched]
+    return matches
+
+def reconcile_account(account, date_window=DEFAULT_DATE_WINDOW, amount_tolerance=Decimal('0.00'),
+                      many_to_one=True, dry_run=False):
+    """
+    Matches ``account``'s open statement rows to its unreconciled journal lines and
+    (unless ``dry_run``) saves the matches. Returns a summary dict.
+    """
+    rows = list(
+        BankStatementLine.objects
+        .filter(account=account, is_reconciled=False)
+        .values_list('id', 'amount', 'date')
+    )
+    summary = {'rows': len(rows), 'matched_rows': 0, 'matched_lines': 0, 'by_rule': Counter(), 'matches': []}
+    if not rows:
+        return summary
+
+    # Only ledger lines that could fall inside some row's window
+    first = min(date for _, _, date in rows) - timedelta(days=date_window)
+    last = max(date for _, _, date in rows) + timedelta(days=date_window)
+    lines = [
+        (line_id, (debit or Decimal('0.00')) - (credit or Decimal('0.00')), date)
+        for line_id, debit, credit, date in (
+            JournalEntryLine.objects
+            .filter(account=account, bank_statement_line__isnull=True,
+                    journal_entry__date__gte=first, journal_entry__date__lte=last)
+            .values_list('id', 'debit', 'credit', 'journal_entry__date')
+        )
+    ]
+
+    matches = find_matches(rows, lines, date_window, amount_tolerance, many_to_one)
+    summary['matches'] = matches
+    summary['matched_rows'] = len(matches)
+    summary['matched_lines'] = sum(len(line_ids) for _, line_ids, _ in matches)
+    summary['by_rule'] = Counter(rule for _, _, rule in matches)
+    summary['open_lines'] = len(lines) - summary['matched_lines']
+    if dry_run or not matches:
+        return summary
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Rows only differ by rule: one UPDATE per rule
+        rows_by_rule = defaultdict(list)
+        for row_id, _, rule in matches:
+            rows_by_rule[rule].append(row_id)
+        for rule, row_ids in rows_by_rule.items():
+            for start in range(0, len(row_ids), UPDATE_BATCH_SIZE):
+                BankStatementLine.objects.filter(pk__in=row_ids[start:start + UPDATE_BATCH_SIZE]).update(
+                    is_reconciled=True, match_rule=rule, reconciled_at=now
+                )
+        # Small CASE batches: SQLite evaluates every WHEN for every updated row
+        JournalEntryLine.objects.bulk_update([
+            JournalEntryLine(id=line_id, bank_statement_line_id=row_id)
+            for row_id, line_ids, _ in matches
+            for line_id in line_ids
+        ], ['bank_statement_line'], batch_size=UPDATE_BATCH_SIZE // 5)
+    logger.info("Reconciled %d of %d statement rows on %s", len(matches), len(rows), account)
+    return summary
+
+@transaction.atomic
+def unreconcile(statement_line):
+    """Reopens a statement row and the journal lines it was matched to"""
+    JournalEntryLine.objects.filter(bank_statement_line=statement_line).update(bank_statement_line=None)
+    BankStatementLine.objects.filter(pk=statement_line.pk).update(is_reconciled=False, match_rule='', reconciled_at=None)
+
+@transaction.atomic
+def reconcile_manually(statement_line, journal_line_ids):
+    """Matches a statement row to journal lines chosen by hand; their total must equal the row"""
+    lines = list(
+        JournalEntryLine.objects.select_for_update()
+        .filter(pk__in=journal_line_ids, account_id=statement_line.account_id, bank_statement_line__isnull=True)
+    )
+    if len(lines) != len(set(journal_line_ids)):
+        raise ValueError("Some journal lines are not open lines of this bank account")
+    total = sum((line.debit or Decimal('0.00')) - (line.credit or Decimal('0.00')) for line in lines)
+    if total != statement_line.amount:
+        raise ValueError(f"Selected lines total {total}, the statement row is {statement_line.amount}")
+    JournalEntryLine.objects.filter(pk__in=[line.pk for line in lines]).update(bank_statement_line=statement_line)
+    BankStatementLine.objects.filter(pk=statement_line.pk).update(
+        is_reconciled=True, match_rule=MatchRule.MANUAL, reconciled_at=timezone.now()
+    )
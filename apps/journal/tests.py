@@ -1,3 +1,226 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from apps.accounts.models import Account
+from apps.core.counters import JOURNAL_ENTRIES, get_monthly_counters, sum_counters
+from apps.core.pagination import keyset_paginate
+from apps.core.bootstrap import bootstrap_company
+from apps.core.models import Company
+from apps.core.testing import CompanyTestCase
+from apps.inventory.models import InventoryItem, InventoryTransaction
+from apps.transactions.constants import TransactionType
+from apps.transactions.models import Transaction
+from .bank_import import StatementImportError, import_statement
+from .integrity import run_checks
+from .models import BankStatementLine, JournalEntry, JournalEntryLine
+from .reconciliation import reconcile_account
+
+JANUARY = """Account: 0123456789
+Date,Description,Amount,Reference
+2026-01-02,Opening deposit,500.00,D1
+2026-01-05,Card fee,-2.50,F1
+2026-01-05,Card fee,-2.50,F1
+"""
+
+JANUARY_AND_FEBRUARY = JANUARY.split('\n', 1)[1] + """2026-02-01,Customer receipt,120.00,R1
+"""
+
+OFX = """<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260103<TRNAMT>75.00<FITID>A-1<NAME>Receipt</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260104<TRNAMT>-10.00<FITID>A-2<NAME>Charge</STMTTRN>
+</BANKTRANLIST></OFX>"""
+
+
+class BankTestCase(CompanyTestCase):
+    company_name = 'Bank Co'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bank = cls.system_account(Account.SystemAccount.DEFAULT_CASH)
+        cls.other = cls.system_account(Account.SystemAccount.ACCOUNTS_RECEIVABLE)
+
+
+class BankImportTests(BankTestCase):
+    def test_reimporting_a_file_adds_nothing(self):
+        statement, created, skipped = import_statement(self.company, self.bank, JANUARY, 'january.csv')
+        self.assertIsNotNone(statement)
+        # Identical rows on one statement are both kept
+        self.assertEqual((created, skipped), (3, 0))
+
+        statement, created, skipped = import_statement(self.company, self.bank, JANUARY.encode('utf-8'), 'january.csv')
+        self.assertIsNone(statement)
+        self.assertEqual((created, skipped), (0, 3))
+        self.assertEqual(BankStatementLine.objects.filter(account=self.bank).count(), 3)
+
+    def test_overlapping_export_adds_only_the_new_rows(self):
+        import_statement(self.company, self.bank, JANUARY, 'january.csv')
+        statement, created, skipped = import_statement(self.company, self.bank, JANUARY_AND_FEBRUARY, 'ytd.csv')
+
+        self.assertEqual((created, skipped), (1, 3))
+        self.assertEqual((statement.start_date, statement.end_date), (date(2026, 2, 1), date(2026, 2, 1)))
+        self.assertEqual(
+            sorted(BankStatementLine.objects.filter(account=self.bank).values_list('amount', flat=True)),
+            [Decimal('-2.50'), Decimal('-2.50'), Decimal('120.00'), Decimal('500.00')],
+        )
+
+    def test_ofx_rows_are_deduplicated_by_transaction_id(self):
+        import_statement(self.company, self.bank, OFX, 'bank.ofx')
+        _, created, skipped = import_statement(self.company, self.bank, OFX.replace('Receipt', 'Receipt (edited)'), 'bank.ofx')
+
+        self.assertEqual((created, skipped), (0, 2))
+
+    def test_same_file_on_another_account_is_imported(self):
+        import_statement(self.company, self.bank, JANUARY, 'january.csv')
+        _, created, _ = import_statement(self.company, self.other, JANUARY, 'january.csv')
+
+        self.assertEqual(created, 3)
+
+    def test_file_without_a_header_is_refused(self):
+        with self.assertRaises(StatementImportError):
+            import_statement(self.company, self.bank, "2026-01-02,500.00\n", 'broken.csv')
+        self.assertFalse(BankStatementLine.objects.exists())
+
+
+class ReconciliationTests(BankTestCase):
+    def post(self, day, amount):
+        entry = JournalEntry.objects.create(company=self.company, date=day, description='Bank movement')
+        amount = Decimal(amount)
+        return JournalEntryLine.objects.create(
+            journal_entry=entry, account=self.bank,
+            debit=max(amount, Decimal('0.00')), credit=max(-amount, Decimal('0.00')),
+        )
+
+    def test_matches_are_saved_and_not_made_twice(self):
+        import_statement(self.company, self.bank, JANUARY_AND_FEBRUARY, 'ytd.csv')
+        deposit = self.post(date(2026, 1, 2), '500.00')
+        receipt = self.post(date(2026, 1, 30), '120.00')
+
+        summary = reconcile_account(self.bank)
+
+        self.assertEqual(summary['matched_rows'], 2)
+        self.assertEqual(summary['by_rule'][BankStatementLine.MatchRule.EXACT], 1)
+        self.assertEqual(summary['by_rule'][BankStatementLine.MatchRule.DATE_WINDOW], 1)
+        deposit.refresh_from_db()
+        receipt.refresh_from_db()
+        self.assertEqual(deposit.bank_statement_line.amount, Decimal('500.00'))
+        self.assertEqual(receipt.bank_statement_line.amount, Decimal('120.00'))
+
+        again = reconcile_account(self.bank)
+        self.assertEqual((again['rows'], again['matched_rows']), (2, 0))
+
+
+class JournalListTests(BankTestCase):
+    def setUp(self):
+        cache.clear()
+        # Three entries share each of the first two dates, so pages split inside a date
+        days = [date(2026, 1, 1)] * 3 + [date(2026, 1, 2)] * 3 + [date(2026, 2, 1)]
+        for day in days:
+            JournalEntry.objects.create(company=self.company, date=day, description='Entry')
+        self.entries = JournalEntry.objects.filter(company=self.company)
+        self.newest_first = list(self.entries.order_by('-date', '-id').values_list('id', flat=True))
+
+    def page(self, **params):
+        return keyset_paginate(RequestFactory().get('/journal/', params), self.entries, 2)
+
+    def test_pages_cover_every_entry_once_across_equal_dates(self):
+        seen, pages = [], []
+        page = self.page()
+        while True:
+            pages.append([entry.pk for entry in page])
+            seen.extend(pages[-1])
+            if not page.has_next:
+                break
+            page = self.page(after=page.next_cursor)
+        self.assertEqual(seen, self.newest_first)
+        self.assertEqual([len(ids) for ids in pages], [2, 2, 2, 1])
+
+        # Walking back from the last page returns the same pages
+        for expected in reversed(pages[:-1]):
+            page = self.page(before=page.previous_cursor)
+            self.assertEqual([entry.pk for entry in page], expected)
+        self.assertFalse(page.has_previous)
+
+    def test_malformed_cursor_starts_at_the_first_page(self):
+        page = self.page(after='2026-01-01~not-a-number')
+        self.assertEqual([entry.pk for entry in page], self.newest_first[:2])
+        self.assertEqual(page.count, 7)
+        self.assertTrue(page.count_is_exact)
+
+    def test_monthly_counters_follow_new_entries_and_lines(self):
+        counters = get_monthly_counters(JOURNAL_ENTRIES, self.company.pk)
+        self.assertEqual(counters[(2026, 1)]['count'], 6)
+        self.assertEqual(sum_counters(counters)['count'], 7)
+
+        entry = JournalEntry.objects.create(company=self.company, date=date(2026, 2, 3), description='Entry')
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.bank, debit=Decimal('5.00'))
+
+        february = get_monthly_counters(JOURNAL_ENTRIES, self.company.pk)[(2026, 2)]
+        self.assertEqual((february['count'], february['line_count'], february['entries_with_lines']), (2, 1, 1))
+
+
+class IntegrityTests(BankTestCase):
+    def post(self, debit, credit, account=None):
+        entry = JournalEntry.objects.create(company=self.company, date=date(2026, 3, 1), description='Check')
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.bank, debit=Decimal(debit))
+        JournalEntryLine.objects.create(journal_entry=entry, account=account or self.other, credit=Decimal(credit))
+        return entry
+
+    def issues(self, check):
+        return run_checks(self.company, [check])['checks'][check]
+
+    def test_clean_book_has_no_issues(self):
+        self.post('100.00', '100.00')
+        item = InventoryItem.objects.create(
+            company=self.company, name='Widget', sku='W-1', description='', income_account=self.account('4100'),
+        )
+        InventoryTransaction.objects.create(
+            company=self.company, item=item, transaction_type=InventoryTransaction.PURCHASE,
+            quantity=Decimal('4'), unit_cost=Decimal('1.00'),
+        )
+        InventoryItem.objects.filter(pk=item.pk).update(quantity_on_hand=Decimal('4'))
+
+        self.assertEqual(run_checks(self.company)['issue_count'], 0)
+
+    def test_unbalanced_entry(self):
+        entry = self.post('100.00', '90.00')
+        [issue] = self.issues('unbalanced_entries')
+        self.assertEqual((issue['journal_entry_id'], issue['difference']), (entry.pk, Decimal('10.00')))
+
+    def test_empty_entries(self):
+        bare = JournalEntry.objects.create(company=self.company, date=date(2026, 3, 1), description='Bare')
+        zero = self.post('0.00', '0.00')
+        self.assertEqual([issue['journal_entry_id'] for issue in self.issues('empty_entries')], [bare.pk, zero.pk])
+
+    def test_line_on_another_companys_account(self):
+        other = Company.objects.create(name='Other Co')
+        bootstrap_company(other)
+        foreign = Account.objects.get(company=other, system_account=Account.SystemAccount.ACCOUNTS_RECEIVABLE)
+        entry = self.post('25.00', '25.00', account=foreign)
+
+        [issue] = self.issues('orphan_lines')
+        self.assertEqual(issue['line_id'], entry.lines.get(account=foreign).pk)
+        self.assertEqual(issue['reason'], 'account belongs to another company')
+        # The other company's own check finds it through the account too
+        self.assertEqual(len(run_checks(other, ['orphan_lines'])['checks']['orphan_lines']), 1)
+
+    def test_transaction_total_differs_from_its_entry(self):
+        sale = Transaction.objects.create(
+            company=self.company, transaction_type=TransactionType.SALE, journal_entry=self.post('80.00', '80.00'),
+        )
+        Transaction.objects.filter(pk=sale.pk).update(total_amount=Decimal('85.00'))
+
+        [issue] = self.issues('transaction_mismatches')
+        self.assertEqual((issue['transaction_id'], issue['difference']), (sale.pk, Decimal('5.00')))
+
+    def test_stock_drift(self):
+        item = InventoryItem.objects.create(
+            company=self.company, name='Widget', sku='W-1', description='', income_account=self.account('4100'),
+        )
+        InventoryItem.objects.filter(pk=item.pk).update(quantity_on_hand=Decimal('3'))
+
+        [issue] = self.issues('stock_drift')
+        self.assertEqual((issue['item_id'], issue['drift']), (item.pk, Decimal('3')))
@@ -3,20 +3,20 @@
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, ListView, DetailView, DeleteView
-from django.db import transaction
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import JsonResponse
-from django.utils import timezone
 from django.core.exceptions import ValidationError
 from decimal import Decimal
-from django.db.models import Q, Avg, Count, Sum
-from django.core.paginator import Paginator
+from django.db.models import Q, Sum
 from datetime import date
 from apps.reporting.export_utils import export_to_csv, export_to_excel, export_to_pdf
-from .models import JournalEntry
+from .models import JournalEntry, JournalEntryLine
 from .forms import JournalEntryForm, JournalEntryLineFormSet
+from apps.core.counters import JOURNAL_ENTRIES, current_month, get_monthly_counters, sum_counters
 from apps.core.models import Company
+from apps.core.pagination import keyset_paginate
+from apps.core.sqlite import immediate_atomic
 from apps.accounts.models import Account
 from apps.authentication.decorators import RoleRequiredMixin
 from apps.authentication.models import User
@@ -25,20 +25,28 @@ class JournalEntryListView(LoginRequiredMixin, RoleRequiredMixin, ListView):
     model = JournalEntry
     template_name = 'journal/journal_entry_list.html'
     context_object_name = 'journal_entries'
-    ordering = ['-date']
     allowed_roles = [User.UserType.ADMIN, User.UserType.ACCOUNTANT, User.UserType.MANAGER, User.UserType.AUDITOR, User.UserType.VIEWER]
-    paginate_by = 20
+    # Paged by (date, id) cursors in get_context_data rather than by OFFSET
+    paginate_by = None
+    per_page = 20
+
+    def has_filters(self):
+        return any(self.request.GET.get(name) for name in ('search', 'date_from', 'date_to'))
 
     def get_queryset(self):
         queryset = JournalEntry.objects.filter(company=self.request.user.company).prefetch_related('lines__account')
         
         search_query = self.request.GET.get('search', '')
         if search_query:
+            # A subquery on the lines instead of a join, so no DISTINCT is needed
+            matching_lines = JournalEntryLine.objects.filter(
+                Q(account__name__icontains=search_query) |
+                Q(account__account_number__icontains=search_query)
+            ).values('journal_entry_id')
             queryset = queryset.filter(
                 Q(description__icontains=search_query) |
-                Q(lines__account__name__icontains=search_query) |
-                Q(lines__account__account_number__icontains=search_query)
-            ).distinct()
+                Q(pk__in=matching_lines)
+            )
         
         date_from = self.request.GET.get('date_from', '')
         date_to = self.request.GET.get('date_to', '')
@@ -47,7 +55,7 @@ class JournalEntryListView(LoginRequiredMixin, RoleRequiredMixin, ListView):
         if date_to:
             queryset = queryset.filter(date__lte=date_to)
             
-        return queryset.order_by('-date')
+        return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -55,30 +63,23 @@ class JournalEntryListView(LoginRequiredMixin, RoleRequiredMixin, ListView):
         context['date_from'] = self.request.GET.get('date_from', '')
         context['date_to'] = self.request.GET.get('date_to', '')
         
-        # --- ACTION: REVISED SUMMARY STATISTICS LOGIC ---
-        # The full (unpaginated) queryset is available from the view's object_list attribute
-        filtered_entries = self.get_queryset()
-
-        # Default values
-        entries_this_month = 0
-        average_lines = 0
-
-        if filtered_entries.exists():
-            current_month = timezone.now().date().replace(day=1)
-            entries_this_month = filtered_entries.filter(date__gte=current_month).count()
+        # Summary statistics come from the cached per-month counters of the company
+        counters = get_monthly_counters(JOURNAL_ENTRIES, self.request.user.company_id)
+        totals = sum_counters(counters)
+        this_month = counters.get(current_month(), {})
 
-            avg_agg = filtered_entries.annotate(
-                num_lines=Count('lines')
-            ).filter(num_lines__gt=0).aggregate(
-                avg_val=Avg('num_lines')
-            )
-            
-            if avg_agg.get('avg_val'):
-                average_lines = round(avg_agg['avg_val'], 1)
+        # Unfiltered lists know their exact size from the counters; filtered ones get a capped count
+        page_obj = keyset_paginate(
+            self.request, self.object_list, self.per_page,
+            count=None if self.has_filters() else totals.get('count', 0)
+        )
+        context['page_obj'] = page_obj
+        context['journal_entries'] = page_obj
 
-        context['entries_this_month'] = entries_this_month
-        context['average_lines'] = average_lines
-        # The total count is already available in the template via `paginator.count`
+        context['total_entries'] = totals.get('count', 0)
+        context['entries_this_month'] = this_month.get('count', 0)
+        entries_with_lines = totals.get('entries_with_lines', 0)
+        context['average_lines'] = round(totals['line_count'] / entries_with_lines, 1) if entries_with_lines else 0
         
         return context
 
@@ -114,7 +115,7 @@ class JournalEntryCreateView(LoginRequiredMixin, RoleRequiredMixin, CreateView):
         context = self.get_context_data()
         lines = context['lines']
         
-        with transaction.atomic():
+        with immediate_atomic():
             company = self.request.user.company
             if not company:
                 messages.error(self.request, "Could not identify your company. Please log in again.")
@@ -5,3 +5,9 @@ from django.apps import AppConfig
 class ProductionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.production' 
+
+    def ready(self):
+        # Stored formula costs follow their materials' cost layers
+        import apps.production.signals
+        from .mrp import connect_mrp_signals
+        connect_mrp_signals()
@@ -1,4 +1,5 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\production\context_processors.py
+from apps.subscriptions.utils import get_company_access
 
 def production_access(request):
     """
@@ -8,12 +9,9 @@ def production_access(request):
     
     # Check if user is authenticated
     if request.user.is_authenticated:
-        # Check if user has a subscription with production access
-        if hasattr(request.user, 'subscription'):
-            subscription = request.user.subscription
-            # Production module is available in Deluxe and Premium plans
-            if subscription.plan_code in ['DELUXE', 'PREMIUM']:
-                has_access = True
+        # Production module is available in Deluxe and Premium plans
+        if get_company_access(request.user).has_production_plan:
+            has_access = True
         
         # Admins always have access
         if request.user.user_type == 'ADMIN':
@@ -0,0 +1,197 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\production\costing.py
+"""
+Stored formula cost rollup.
+
+ProductionFormula.material_cost, total_cost_per_unit and profit_margin used to
+walk the ingredients and compute each material's current_average_cost (two
+aggregate queries per ingredient) on every access - per formula on the list
+page, again per order for the estimated costs. The rollup is now kept on the
+rows themselves:
+
+- FormulaIngredient.cached_unit_cost: the material's unit cost
+- ProductionFormula.cached_material_cost / cached_unit_cost / costed_at
+
+recost_formulas() recomputes them for whole companies with a fixed number of
+queries: average costs come from one pass over the cost layers, batches and
+price adjustments of the materials involved, and formulas are costed in
+dependency order, so a finished good used as an ingredient is priced from its
+own formula's fresh cost when there is none of it in stock. The signals in
+signals.py call recost_for_items() on commit whenever a material's cost
+layers, batches, price adjustments or stock change, which recosts the
+formulas using it and, up the graph, the formulas using those.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+
+from apps.inventory.models import (
+    InventoryBatch, InventoryCostLayer, InventoryItem, InventoryPriceAdjustment,
+)
+from .models import FormulaIngredient, ProductionFormula
+
+COST = Decimal('0.0001')
+ZERO = Decimal('0.00')
+
+def _load_items(item_ids):
+    return {
+        row[0]: row[1:] for row in InventoryItem.objects.filter(pk__in=item_ids)
+        .values_list('id', 'quantity_on_hand', 'costing_method', 'enable_batch_tracking')
+    }
+
+def average_costs(item_ids, items=None):
+    """
+    {item_id: current_average_cost} for many items, with the same result as
+    InventoryItem.current_average_cost, in at most four queries. ``items`` is
+    _load_items() output when the caller already has it.
+    """
+    if items is None:
+        items = _load_items(item_ids)
+    in_stock = [item_id for item_id, (on_hand, _, _) in items.items() if on_hand > 0]
+    adjusted = [item_id for item_id in in_stock if items[item_id][1] == InventoryItem.CostingMethod.PRICE_ADJUSTMENT]
+    batched = [item_id for item_id in in_stock if item_id not in adjusted and items[item_id][2]]
+
+    latest_adjustment = {}
+    if adjusted:
+        # Model ordering is newest first; keep each item's first row
+        for item_id, cost in InventoryPriceAdjustment.objects.filter(item_id__in=adjusted).values_list('item_id', 'new_unit_cost'):
+            latest_adjustment.setdefault(item_id, cost)
+
+    def weighted(rows):
+        totals = defaultdict(lambda: [ZERO, ZERO])
+        for item_id, quantity, unit_cost in rows:
+            totals[item_id][0] += quantity * unit_cost
+            totals[item_id][1] += quantity
+        return {item_id: cost / quantity for item_id, (cost, quantity) in totals.items() if quantity > 0}
+
+    # Price-adjusted items without adjustments fall back to their layers too
+    layer_items = [item_id for item_id in in_stock if item_id not in batched]
+    layered = weighted(
+        InventoryCostLayer.objects.filter(item_id__in=layer_items, quantity_remaining__gt=0)
+        .values_list('item_id', 'quantity_remaining', 'unit_cost')
+    ) if layer_items else {}
+    batch_costs = weighted(
+        InventoryBatch.objects.filter(item_id__in=batched, quantity_remaining__gt=0)
+        .values_list('item_id', 'quantity_remaining', 'unit_cost')
+    ) if batched else {}
+
+    costs = {}
+    for item_id in items:
+        if item_id not in in_stock:
+            costs[item_id] = ZERO
+        elif item_id in latest_adjustment:
+            costs[item_id] = latest_adjustment[item_id]
+        elif item_id in batched:
+            costs[item_id] = batch_costs.get(item_id, ZERO)
+        else:
+            costs[item_id] = layered.get(item_id, ZERO)
+    return costs
+
+def _dependency_order(formulas, makers):
+    """Formulas ordered so each one comes after the formulas making its ingredients"""
+    ordered, state = [], {}
+
+    def visit(formula):
+        if state.get(formula.id) is not None:
+            # Done, or a cycle: a cyclic ingredient keeps its average cost
+            return
+        state[formula.id] = False
+        for ingredient in formula.ingredients.all():
+            maker = makers.get(ingredient.material_id)
+            if maker is not None:
+                visit(maker)
+        state[formula.id] = True
+        ordered.append(formula)
+
+    for formula in formulas:
+        visit(formula)
+    return ordered
+
+def _affected(formulas, makers, item_ids, formula_ids):
+    """Formulas using ``item_ids`` or listed in ``formula_ids``, and every formula above them"""
+    users = defaultdict(set)
+    for formula in formulas:
+        for ingredient in formula.ingredients.all():
+            users[ingredient.material_id].add(formula.id)
+    by_id = {formula.id: formula for formula in formulas}
+    affected = set(formula_ids or ())
+    for item_id in item_ids or ():
+        affected |= users[item_id]
+    queue = list(affected)
+    while queue:
+        formula = by_id.get(queue.pop())
+        if formula is None:
+            continue
+        for parent_id in users[formula.finished_product_id] - affected:
+            affected.add(parent_id)
+            queue.append(parent_id)
+    return affected
+
+def recost_formulas(company_ids, item_ids=None, formula_ids=None):
+    """
+    Recomputes the stored costs of the formulas of ``company_ids``; all of
+    them, or only those depending on ``item_ids`` / ``formula_ids`` when given.
+    Rows are written with bulk_update only when a figure changed. Returns the
+    number of formulas recosted.
+    """
+    formulas = list(
+        ProductionFormula.objects.filter(company_id__in=company_ids)
+        .prefetch_related('ingredients').order_by('name', 'id')
+    )
+    makers = {}
+    for formula in formulas:
+        if formula.is_active:
+            makers.setdefault(formula.finished_product_id, formula)
+    if item_ids is not None or formula_ids is not None:
+        affected = _affected(formulas, makers, item_ids, formula_ids)
+        if not affected:
+            return 0
+    else:
+        affected = {formula.id for formula in formulas}
+
+    ordered = [formula for formula in _dependency_order(formulas, makers) if formula.id in affected]
+    material_ids = {ingredient.material_id for formula in ordered for ingredient in formula.ingredients.all()}
+    items = _load_items(material_ids) if material_ids else {}
+    costs = average_costs(material_ids, items)
+    stocked = {item_id for item_id, (on_hand, _, _) in items.items() if on_hand > 0}
+
+    now = timezone.now()
+    changed_formulas, changed_ingredients = [], []
+    for formula in ordered:
+        material_cost = ZERO
+        for ingredient in formula.ingredients.all():
+            unit_cost = costs.get(ingredient.material_id, ZERO)
+            maker = makers.get(ingredient.material_id)
+            if ingredient.material_id not in stocked and maker is not None and maker.costed_at is not None and maker is not formula:
+                # Nothing in stock to average: price a made ingredient at its formula's cost per item
+                unit_cost = maker.cached_unit_cost / maker.unit_quantity
+            unit_cost = unit_cost.quantize(COST)
+            material_cost += ingredient.quantity * unit_cost
+            if ingredient.cached_unit_cost != unit_cost:
+                ingredient.cached_unit_cost = unit_cost
+                changed_ingredients.append(ingredient)
+
+        material_cost = material_cost.quantize(COST)
+        unit_cost = (material_cost + formula.labor_cost + formula.overhead_cost).quantize(COST)
+        if (formula.costed_at is None or formula.cached_material_cost != material_cost
+                or formula.cached_unit_cost != unit_cost):
+            changed_formulas.append(formula)
+        formula.cached_material_cost = material_cost
+        formula.cached_unit_cost = unit_cost
+        formula.costed_at = now
+
+    with transaction.atomic():
+        FormulaIngredient.objects.bulk_update(changed_ingredients, ['cached_unit_cost'], batch_size=500)
+        ProductionFormula.objects.bulk_update(
+            changed_formulas, ['cached_material_cost', 'cached_unit_cost', 'costed_at'], batch_size=500
+        )
+    return len(changed_formulas)
+
+def recost_for_items(item_ids):
+    """Recosts the formulas depending on the given materials (after their costs changed)"""
+    company_ids = set(
+        FormulaIngredient.objects.filter(material_id__in=item_ids).values_list('formula__company_id', flat=True)
+    )
+    if not company_ids:
+        return 0
+    return recost_formulas(company_ids, item_ids=item_ids)
@@ -0,0 +1,63 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\production\management\commands\execute_production_orders.py
+import time
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.production.models import ProductionOrder
+from apps.production.posting import execute_orders
+
+class Command(BaseCommand):
+    help = (
+        'Execute planned production orders in one posting (shift-end batch run): '
+        'consumes their materials, receives the finished goods and posts one '
+        'journal entry per order.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', action='append', type=int, default=[],
+                            help='Execute orders of this company only (repeatable); all companies by default')
+        parser.add_argument('--order', action='append', type=int, default=[],
+                            help='Execute this order (repeatable) instead of every order due')
+        parser.add_argument('--until', type=str,
+                            help='Execute orders planned on or before this date (YYYY-MM-DD); today by default')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the orders that would be executed without posting them')
+
+    def handle(self, *args, **options):
+        orders = ProductionOrder.objects.filter(status=ProductionOrder.Status.PLANNED).select_related('formula')
+        if options['order']:
+            orders = orders.filter(pk__in=options['order'])
+        else:
+            try:
+                until = datetime.strptime(options['until'], '%Y-%m-%d').date() if options['until'] else timezone.localdate()
+            except ValueError:
+                raise CommandError("Invalid --until date. Use YYYY-MM-DD.")
+            orders = orders.filter(planned_date__lte=until)
+        if options['company_id']:
+            orders = orders.filter(company_id__in=options['company_id'])
+        orders = list(orders.order_by('planned_date', 'id'))
+
+        if options['order']:
+            missing = set(options['order']) - {order.pk for order in orders}
+            if missing:
+                raise CommandError(f"No planned order with ID(s): {', '.join(map(str, sorted(missing)))}")
+        if not orders:
+            self.stdout.write("No planned orders to execute.")
+            return
+
+        if options['dry_run']:
+            for order in orders:
+                self.stdout.write(f"  {order.order_number} (company {order.company_id}): "
+                                  f"{order.quantity} x {order.formula.name}, planned {order.planned_date}")
+            self.stdout.write(self.style.WARNING(f"DRY RUN: {len(orders)} order(s) would be executed"))
+            return
+
+        started = time.monotonic()
+        result = execute_orders(orders)
+        for order_id, reason in result['skipped'].items():
+            self.stdout.write(self.style.WARNING(f"  Skipped: {reason}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Executed {len(result['executed'])} production order(s) in {time.monotonic() - started:.2f}s, "
+            f"{len(result['skipped'])} skipped"
+        ))
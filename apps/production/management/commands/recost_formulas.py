@@ -0,0 +1,33 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\production\management\commands\recost_formulas.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import Company
+from apps.production.costing import recost_formulas
+from apps.production.models import ProductionFormula
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the stored cost rollup of production formulas (material, labor, '
+        'overhead and cost per unit), walking the formula dependency graph.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', action='append', type=int, default=[],
+                            help='Recost this company only (repeatable); all companies by default')
+
+    def handle(self, *args, **options):
+        company_ids = options['company_id']
+        if company_ids:
+            missing = set(company_ids) - set(Company.objects.filter(pk__in=company_ids).values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"Company ID(s) not found: {', '.join(map(str, sorted(missing)))}")
+        else:
+            company_ids = list(ProductionFormula.objects.order_by().values_list('company_id', flat=True).distinct())
+
+        started = time.monotonic()
+        changed = recost_formulas(company_ids) if company_ids else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Recosted formulas of {len(company_ids)} company(ies) in {time.monotonic() - started:.2f}s: "
+            f"{changed} formula(s) changed"
+        ))
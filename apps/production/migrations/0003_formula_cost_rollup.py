@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:08
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0002_alter_formulaingredient_material_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formulaingredient',
+            name='cached_unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=4, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='productionformula',
+            name='cached_material_cost',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.0000'), editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='productionformula',
+            name='cached_unit_cost',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.0000'), editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='productionformula',
+            name='costed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -45,6 +45,10 @@ class ProductionFormula(models.Model):
         help_text="Overhead cost per unit produced (electricity, etc.)"
     )
     is_active = models.BooleanField(default=True)
+    # Cost rollup kept by apps.production.costing; costed_at is None until the first recost
+    cached_material_cost = models.DecimalField(max_digits=14, decimal_places=4, default=Decimal('0.0000'), editable=False)
+    cached_unit_cost = models.DecimalField(max_digits=14, decimal_places=4, default=Decimal('0.0000'), editable=False)
+    costed_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_formulas')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -58,12 +62,16 @@ class ProductionFormula(models.Model):
     
     @property
     def material_cost(self):
-        """Calculate the total material cost for this formula"""
+        """Total material cost for this formula, from the stored rollup once costed"""
+        if self.costed_at is not None:
+            return self.cached_material_cost
         return sum(item.total_cost for item in self.ingredients.all())
     
     @property
     def total_cost_per_unit(self):
         """Calculate the total cost per unit including materials, labor and overhead"""
+        if self.costed_at is not None:
+            return self.cached_unit_cost
         return self.material_cost + self.labor_cost + self.overhead_cost
     
     @property
@@ -95,6 +103,8 @@ class FormulaIngredient(models.Model):
         help_text="Quantity of this material needed per formula unit"
     )
     notes = models.CharField(max_length=255, blank=True)
+    # Material unit cost of the last recost (see apps.production.costing)
+    cached_unit_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, editable=False)
     
     class Meta:
         unique_together = [('formula', 'material')]
@@ -105,7 +115,9 @@ class FormulaIngredient(models.Model):
     
     @property
     def total_cost(self):
-        """Calculate the total cost for this ingredient based on current average cost"""
+        """Total cost for this ingredient, at the recosted unit cost or the current average cost"""
+        if self.cached_unit_cost is not None:
+            return self.quantity * self.cached_unit_cost
         return self.quantity * self.material.current_average_cost
 
 
@@ -182,7 +194,7 @@ class ProductionOrder(models.Model):
     @property
     def material_status(self):
         """Check if we have enough materials for this production order"""
-        for ingredient in self.formula.ingredients.all():
+        for ingredient in self.formula.ingredients.select_related('material'):
             required = ingredient.quantity * self.quantity
             if ingredient.material.quantity_on_hand < required:
                 return False
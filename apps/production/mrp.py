@@ -0,0 +1,224 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\production\mrp.py
+"""
+Material requirements planning across all planned production orders.
+
+The plan is built from two inputs, each loaded with a fixed number of queries
+and cached separately:
+
+- demand: the company's PLANNED orders and its formulas with their ingredients
+  (one prefetch), as plain tuples. Cached under the company's MRP version,
+  bumped in the writer's transaction when an order, formula or ingredient is
+  saved or deleted.
+- stock: quantity on hand of every product item. Cached under the inventory
+  picker version (apps.core.picker), which already moves whenever an item,
+  cost layer or batch changes.
+
+A stock change therefore only reloads one query's worth of data, and an order
+change only the demand; the netting itself runs in memory. Materials are netted
+in low-level-code order (the deepest level at which an item appears in any
+formula), so a finished good used as an ingredient has collected all of its
+demand before its own shortfall is exploded through its formula. Planned orders
+count as scheduled receipts of their finished product. There are no purchase
+orders in this system - purchases reach quantity_on_hand when they are booked -
+so on-hand stock and planned production are the only supply.
+"""
+from collections import defaultdict
+from decimal import Decimal, ROUND_UP
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+from apps.core.picker import INVENTORY, get_picker_version
+from apps.core.versions import bump_version, get_version
+from apps.inventory.models import InventoryItem
+from .models import FormulaIngredient, ProductionFormula, ProductionOrder
+
+MRP_CACHE_PREFIX = 'mrp'
+QUANTITY = Decimal('0.0001')
+RUNS = Decimal('0.01')
+
+def get_mrp_version(company_id):
+    return get_version(MRP_CACHE_PREFIX, company_id)
+
+def bump_mrp_version(company_id):
+    bump_version(MRP_CACHE_PREFIX, company_id)
+
+def _cached(key, builder):
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout=getattr(settings, 'MRP_CACHE_TIMEOUT', 3600))
+    return value
+
+# --- Inputs ------------------------------------------------------------------
+
+def load_demand(company_id):
+    """
+    {'orders': [(id, order_number, formula_id, quantity, planned_date)],
+     'formulas': {id: (finished_product_id, unit_quantity, [(material_id, quantity)])},
+     'makers': {finished_product_id: formula_id}} - three queries.
+    """
+    orders = list(
+        ProductionOrder.objects.filter(company_id=company_id, status=ProductionOrder.Status.PLANNED)
+        .order_by('planned_date', 'id')
+        .values_list('id', 'order_number', 'formula_id', 'quantity', 'planned_date')
+    )
+    formulas, makers = {}, {}
+    for formula in ProductionFormula.objects.filter(company_id=company_id).prefetch_related('ingredients').order_by('name'):
+        formulas[formula.id] = (
+            formula.finished_product_id,
+            formula.unit_quantity,
+            [(ingredient.material_id, ingredient.quantity) for ingredient in formula.ingredients.all()],
+        )
+        # An item is made with its first active formula by name
+        if formula.is_active:
+            makers.setdefault(formula.finished_product_id, formula.id)
+    return {'orders': orders, 'formulas': formulas, 'makers': makers}
+
+def load_stock(company_id):
+    """{item_id: (name, sku, unit_of_measurement, quantity_on_hand)} of the company's products"""
+    return {
+        row[0]: row[1:]
+        for row in InventoryItem.objects.filter(company_id=company_id)
+        .exclude(item_type=InventoryItem.SERVICE)
+        .values_list('id', 'name', 'sku', 'unit_of_measurement', 'quantity_on_hand')
+    }
+
+# --- Netting -----------------------------------------------------------------
+
+def low_level_codes(demand):
+    """{item_id: deepest level at which it is needed}; finished products of the orders are level 0"""
+    formulas, makers = demand['formulas'], demand['makers']
+    levels = {}
+
+    def visit(formula_id, level, path):
+        for material_id, _ in formulas[formula_id][2]:
+            if material_id in path or levels.get(material_id, -1) >= level:
+                # A cyclic formula, or a subtree already placed at least this deep
+                continue
+            levels[material_id] = level
+            if material_id in makers:
+                visit(makers[material_id], level + 1, path | {material_id})
+
+    for _, _, formula_id, _, _ in demand['orders']:
+        product_id = formulas[formula_id][0]
+        levels.setdefault(product_id, 0)
+        visit(formula_id, 1, frozenset([product_id]))
+    return levels
+
+def compute_plan(demand, stock):
+    """
+    Nets the requirements of the planned orders against stock and planned
+    production. Returns {'materials': [...], 'shortages': [...], 'order_count'},
+    materials in low-level-code order, each with its time-phased periods.
+    """
+    formulas, makers = demand['formulas'], demand['makers']
+    levels = low_level_codes(demand)
+
+    # Gross requirements and scheduled receipts: {item_id: {date: ...}}
+    required = defaultdict(lambda: defaultdict(Decimal))
+    sources = defaultdict(lambda: defaultdict(set))
+    receipts = defaultdict(lambda: defaultdict(Decimal))
+    for _, order_number, formula_id, quantity, planned_date in demand['orders']:
+        product_id, unit_quantity, ingredients = formulas[formula_id]
+        receipts[product_id][planned_date] += quantity * unit_quantity
+        for material_id, per_run in ingredients:
+            required[material_id][planned_date] += per_run * quantity
+            sources[material_id][planned_date].add(order_number)
+
+    materials, shortages = [], []
+    # Exploding a made item adds requirements to deeper items only, so every item
+    # has all of its demand by the time its level comes up
+    for material_id in sorted(set(levels) | set(required), key=lambda item_id: (levels.get(item_id, 0), item_id)):
+        if material_id not in required:
+            continue
+        name, sku, unit, on_hand = stock.get(material_id, ('', '', '', Decimal('0')))
+        maker = makers.get(material_id)
+        projected = on_hand
+        pending = sorted(receipts[material_id].items())
+        periods = []
+        for period_date in sorted(required[material_id]):
+            while pending and pending[0][0] <= period_date:
+                projected += pending.pop(0)[1]
+            quantity = required[material_id][period_date]
+            available = projected
+            projected -= quantity
+            net = -projected if projected < 0 else Decimal('0')
+            projected = max(projected, Decimal('0'))
+            orders = sorted(sources[material_id][period_date])
+            periods.append({
+                'date': period_date,
+                'required': quantity.quantize(QUANTITY),
+                'available': available.quantize(QUANTITY),
+                'shortage': net.quantize(QUANTITY),
+                'orders': orders,
+            })
+            if net <= 0:
+                continue
+            shortages.append({
+                'item_id': material_id, 'name': name, 'sku': sku, 'unit': unit, 'date': period_date,
+                'quantity': net.quantize(QUANTITY), 'action': 'make' if maker else 'buy', 'orders': orders,
+            })
+            if maker:
+                # Explode the shortfall of a made item into its own ingredients, due the same day
+                product_id, unit_quantity, ingredients = formulas[maker]
+                runs = (net / unit_quantity).quantize(RUNS, rounding=ROUND_UP)
+                for ingredient_id, per_run in ingredients:
+                    if levels.get(ingredient_id, 0) > levels.get(material_id, 0):
+                        required[ingredient_id][period_date] += per_run * runs
+                        sources[ingredient_id][period_date].update(orders)
+
+        materials.append({
+            'item_id': material_id,
+            'name': name,
+            'sku': sku,
+            'unit': unit,
+            'level': levels.get(material_id, 0),
+            'make': maker is not None,
+            'on_hand': on_hand,
+            'gross_requirement': sum(required[material_id].values(), Decimal('0')).quantize(QUANTITY),
+            'scheduled_receipts': sum(receipts[material_id].values(), Decimal('0')).quantize(QUANTITY),
+            'shortage': sum((period['shortage'] for period in periods), Decimal('0')),
+            'periods': periods,
+        })
+
+    shortages.sort(key=lambda row: (row['date'], row['name']))
+    return {'materials': materials, 'shortages': shortages, 'order_count': len(demand['orders'])}
+
+def get_material_plan(company_id):
+    """The cached plan; rebuilt from whichever input changed since it was computed"""
+    mrp_version = get_mrp_version(company_id)
+    stock_version = get_picker_version(INVENTORY, company_id)
+
+    def build():
+        demand = _cached(f"{MRP_CACHE_PREFIX}:demand:{company_id}:{mrp_version}", lambda: load_demand(company_id))
+        stock = _cached(f"{MRP_CACHE_PREFIX}:stock:{company_id}:{stock_version}", lambda: load_stock(company_id))
+        return compute_plan(demand, stock)
+
+    return _cached(f"{MRP_CACHE_PREFIX}:plan:{company_id}:{mrp_version}:{stock_version}", build)
+
+# --- Invalidation ------------------------------------------------------------
+
+def _bump(company_id):
+    if company_id:
+        bump_mrp_version(company_id)
+
+def _invalidate_for_company_row(sender, instance, **kwargs):
+    _bump(instance.company_id)
+
+def _invalidate_for_ingredient(sender, instance, **kwargs):
+    if sender.formula.is_cached(instance):
+        company_id = instance.formula.company_id
+    else:
+        company_id = ProductionFormula.objects.filter(pk=instance.formula_id).values_list('company_id', flat=True).first()
+    _bump(company_id)
+
+def connect_mrp_signals():
+    """Called from ProductionConfig.ready()"""
+    for model in (ProductionOrder, ProductionFormula):
+        for signal in (post_save, post_delete):
+            signal.connect(_invalidate_for_company_row, sender=model,
+                           dispatch_uid=f'mrp_{model._meta.label}_{signal is post_save}')
+    for signal in (post_save, post_delete):
+        signal.connect(_invalidate_for_ingredient, sender=FormulaIngredient,
+                       dispatch_uid=f'mrp_ingredient_{signal is post_save}')
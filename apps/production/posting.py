@@ -0,0 +1,435 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\production\posting.py
+"""
+Production posting engine.
+
+Executing an order used to save every MaterialUsage, create one
+InventoryTransaction per material (each running update_cost_layers() with its
+own item and layer queries), save each material's quantity_on_hand, then post
+the journal entry one line at a time. execute_orders() posts one order or a
+whole shift's worth in a fixed number of queries:
+
+- the orders, the items involved (materials and finished products), their open
+  cost layers and batches are read and locked once (select_for_update);
+- materials are consumed in memory the way consume_cost_layers() would: FIFO /
+  LIFO walk the layers, weighted average and price adjustment relieve every
+  layer in proportion, batch-tracked materials draw from the chosen batch or
+  the first to expire;
+- the finished goods get one cost layer (or batch) per order, at the order's
+  total cost per unit produced;
+- usages, inventory transactions, layers, batches, stock, orders and the
+  journal entries with their lines are then written with bulk_create /
+  bulk_update.
+
+Orders run by planned date, so an intermediate made by one order of a batch is
+in stock for the next. bulk_create() and bulk_update() send no signals, so the
+report cache, journal counters, inventory picker, MRP plan and formula cost
+rollup are refreshed here explicitly: the versions in the posting's
+transaction (see apps.core.versions), the formula costs once it commits.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.accounts.models import Account
+from apps.core.counters import JOURNAL_ENTRIES, bump_counters
+from apps.core.picker import INVENTORY, bump_picker_version
+from apps.core.sqlite import immediate_atomic
+from apps.inventory.models import InventoryBatch, InventoryCostLayer, InventoryItem, InventoryTransaction
+from apps.journal.models import JournalEntry, JournalEntryLine
+from apps.reporting.cache import bump_ledger_version
+from .costing import average_costs, recost_for_items
+from .models import MaterialUsage, ProductionFormula, ProductionOrder
+from .mrp import bump_mrp_version
+
+BULK_BATCH_SIZE = 1000
+CENT = Decimal('0.01')
+COST = Decimal('0.0001')
+ZERO = Decimal('0.00')
+
+ORDER_FIELDS = ['status', 'start_date', 'completion_date', 'actual_labor_cost', 'actual_overhead_cost', 'notes', 'updated_at']
+USAGE_FIELDS = ['actual_quantity', 'batch', 'unit_cost', 'usage_date', 'notes']
+
+Method = InventoryItem.CostingMethod
+
+class ProductionPostingError(ValueError):
+    """The order can't be posted; nothing has been written"""
+
+class _Stock:
+    """
+    The locked items of a posting with their open cost layers and batches,
+    consumed and received in memory; execute_orders() writes them back.
+    """
+    def __init__(self, item_ids, batch_ids):
+        self.items = InventoryItem.objects.select_for_update().order_by('pk').in_bulk(item_ids)
+        self.layers = defaultdict(list)
+        for layer in (InventoryCostLayer.objects.select_for_update()
+                      .filter(item_id__in=item_ids, quantity_remaining__gt=0).order_by('purchase_date', 'id')):
+            self.layers[layer.item_id].append(layer)
+        self.batches = defaultdict(list)
+        self.batch_by_id = {}
+        for batch in (InventoryBatch.objects.select_for_update()
+                      .filter(Q(item_id__in=item_ids, quantity_remaining__gt=0) | Q(pk__in=batch_ids))
+                      .order_by('expiry_date', 'manufacture_date', 'batch_number')):
+            self.batches[batch.item_id].append(batch)
+            self.batch_by_id[batch.pk] = batch
+        # Price adjustments don't move during a posting; the rest is recomputed as stock is drawn
+        self.base_costs = average_costs(item_ids, {
+            item.pk: (item.quantity_on_hand, item.costing_method, item.enable_batch_tracking)
+            for item in self.items.values()
+        })
+        self.changed_layers, self.changed_batches, self.changed_items = {}, {}, {}
+        self.new_batches = []
+        self._batch_numbers = defaultdict(set)
+
+    def average_cost(self, item):
+        """InventoryItem.current_average_cost over the in-memory layers / batches"""
+        if item.quantity_on_hand <= 0:
+            return ZERO
+        if item.costing_method == Method.PRICE_ADJUSTMENT:
+            return self.base_costs.get(item.pk, ZERO)
+        rows = [row for row in (self.batches if item.enable_batch_tracking else self.layers)[item.pk]
+                if row.quantity_remaining > 0]
+        quantity = sum((row.quantity_remaining for row in rows), ZERO)
+        if quantity <= 0:
+            return ZERO
+        return sum((row.quantity_remaining * row.unit_cost for row in rows), ZERO) / quantity
+
+    def issue(self, item, quantity, batch_id=None):
+        """
+        Takes ``quantity`` of ``item`` out of stock. Returns the draws as
+        [(batch, quantity, unit_cost, [(layer, quantity, unit_cost)])], one per
+        batch for batch-tracked items, otherwise a single one.
+        """
+        if item.enable_batch_tracking:
+            draws = self._issue_batches(item, quantity, batch_id)
+        else:
+            unit_cost, layers_used = self._issue_layers(item, quantity)
+            draws = [(None, quantity, unit_cost, layers_used)]
+        item.quantity_on_hand -= quantity
+        self.changed_items[item.pk] = item
+        return draws
+
+    def _take(self, row, quantity, changed):
+        row.quantity_remaining -= quantity
+        if row.pk is not None:
+            changed[row.pk] = row
+
+    def _issue_batches(self, item, quantity, batch_id):
+        if batch_id:
+            batch = self.batch_by_id[batch_id]
+            self._take(batch, quantity, self.changed_batches)
+            return [(batch, quantity, batch.unit_cost, [])]
+        # No batch chosen: draw the first to expire, like the batch picker lists them
+        shortfall_cost = self.average_cost(item)
+        draws, remaining = [], quantity
+        for batch in self.batches[item.pk]:
+            if remaining <= 0:
+                break
+            taken = min(remaining, batch.quantity_remaining)
+            if taken <= 0:
+                continue
+            self._take(batch, taken, self.changed_batches)
+            draws.append((batch, taken, batch.unit_cost, []))
+            remaining -= taken
+        if remaining > 0:
+            draws.append((None, remaining, shortfall_cost, []))
+        return draws
+
+    def _issue_layers(self, item, quantity):
+        layers = [layer for layer in self.layers[item.pk] if layer.quantity_remaining > 0]
+        average = self.average_cost(item)
+
+        if item.costing_method in (Method.FIFO, Method.LIFO):
+            if item.costing_method == Method.LIFO:
+                layers.reverse()
+            layers_used, total_cost, remaining = [], ZERO, quantity
+            for layer in layers:
+                if remaining <= 0:
+                    break
+                taken = min(remaining, layer.quantity_remaining)
+                self._take(layer, taken, self.changed_layers)
+                layers_used.append((layer, taken, layer.unit_cost))
+                total_cost += taken * layer.unit_cost
+                remaining -= taken
+            # Stock the layers don't cover is valued at the average cost, as production always was
+            total_cost += remaining * average
+            return (total_cost / quantity if quantity > 0 else ZERO), layers_used
+
+        # Weighted average and price adjustment: every layer gives up its share, kept to the cent
+        unit_cost = average
+        available = sum((layer.quantity_remaining for layer in layers), ZERO)
+        to_relieve = min(quantity, available)
+        layers_used, relieved = [], ZERO
+        for index, layer in enumerate(layers):
+            if index == len(layers) - 1:
+                taken = to_relieve - relieved
+            else:
+                taken = (to_relieve * layer.quantity_remaining / available).quantize(CENT)
+            taken = min(taken, layer.quantity_remaining)
+            if taken <= 0:
+                continue
+            self._take(layer, taken, self.changed_layers)
+            relieved += taken
+            layer_cost = unit_cost if item.costing_method == Method.PRICE_ADJUSTMENT else layer.unit_cost
+            layers_used.append((layer, taken, layer_cost))
+        return unit_cost, layers_used
+
+    def shortages(self, quantities, batch_quantities):
+        """
+        [(name, needed, available)] for the {item_id: quantity} and {batch_id:
+        quantity} that the stock, as drawn so far, can't cover
+        """
+        short = []
+        for item_id, needed in quantities.items():
+            item = self.items[item_id]
+            if needed > item.quantity_on_hand:
+                short.append((item.name, needed, item.quantity_on_hand))
+        for batch_id, needed in batch_quantities.items():
+            batch = self.batch_by_id.get(batch_id)
+            available = batch.quantity_remaining if batch is not None else ZERO
+            if needed > available:
+                name = f"{self.items[batch.item_id].name} batch {batch.batch_number}" if batch is not None else f"batch #{batch_id}"
+                short.append((name, needed, available))
+        return short
+
+    def receive(self, item, quantity, unit_cost, when):
+        """Puts ``quantity`` of ``item`` in stock as a new layer, or a new batch; returns the batch or None"""
+        unit_cost = unit_cost or self.average_cost(item)
+        batch = layer = None
+        if item.enable_batch_tracking:
+            number = f"AUTO-{when.strftime('%Y%m%d%H%M%S')}"
+            taken = self._batch_numbers[item.pk]
+            suffix = 1
+            while number in taken:
+                suffix += 1
+                number = f"AUTO-{when.strftime('%Y%m%d%H%M%S')}-{suffix}"
+            taken.add(number)
+            batch = InventoryBatch(item=item, batch_number=number, quantity_remaining=quantity,
+                                   unit_cost=unit_cost.quantize(CENT))
+            self.batches[item.pk].append(batch)
+            self.new_batches.append(batch)
+        else:
+            layer = InventoryCostLayer(item=item, purchase_date=when, quantity=quantity,
+                                       quantity_remaining=quantity, unit_cost=unit_cost.quantize(CENT))
+            self.layers[item.pk].append(layer)
+        item.quantity_on_hand += quantity
+        self.changed_items[item.pk] = item
+        return batch, layer
+
+def _posting_accounts(company_ids, formulas):
+    """{formula_id: (inventory asset account id, cost of goods sold account id)}, as production always chose them"""
+    system = {
+        (company_id, system_account): account_id
+        for account_id, company_id, system_account in Account.objects.filter(
+            company_id__in=company_ids,
+            system_account__in=[Account.SystemAccount.INVENTORY_ASSET, Account.SystemAccount.COST_OF_GOODS_SOLD],
+        ).values_list('id', 'company_id', 'system_account')
+    }
+    accounts = {}
+    for formula in formulas.values():
+        inventory_account = system.get((formula.company_id, Account.SystemAccount.INVENTORY_ASSET))
+        cogs_account = system.get((formula.company_id, Account.SystemAccount.COST_OF_GOODS_SOLD))
+        if inventory_account is None or cogs_account is None:
+            inventory_account = formula.finished_product.asset_account_id
+            cogs_account = formula.finished_product.expense_account_id
+        accounts[formula.pk] = (inventory_account, cogs_account)
+    return accounts
+
+def _journal_lines(entry, product_name, inventory_account, cogs_account, material_cost, labor_cost, overhead_cost):
+    total_cost = material_cost + labor_cost + overhead_cost
+    lines = []
+    if total_cost > 0:
+        lines.append(JournalEntryLine(journal_entry=entry, account_id=inventory_account,
+                                      description=f"Production of {product_name}", debit=total_cost, credit=ZERO))
+    if material_cost > 0:
+        lines.append(JournalEntryLine(journal_entry=entry, account_id=inventory_account,
+                                      description="Raw materials consumed in production", debit=ZERO, credit=material_cost))
+    if labor_cost > 0:
+        lines.append(JournalEntryLine(journal_entry=entry, account_id=cogs_account,
+                                      description="Labor cost for production", debit=ZERO, credit=labor_cost))
+    if overhead_cost > 0:
+        lines.append(JournalEntryLine(journal_entry=entry, account_id=cogs_account,
+                                      description="Overhead cost for production", debit=ZERO, credit=overhead_cost))
+    return lines
+
+def execute_orders(orders, usages=None, when=None):
+    """
+    Executes PLANNED production orders, of one company or several. ``orders``
+    may carry unsaved actual_labor_cost / actual_overhead_cost / notes from the
+    execute form; ``usages`` is {order_id: [MaterialUsage]} with the actual
+    quantities and batches entered, the orders' saved usages (at their planned
+    quantities) when None.
+
+    Returns {'executed': [order], 'entries': [JournalEntry], 'skipped':
+    {order_id: reason}}. Orders no longer PLANNED, without the accounts to post
+    to, or needing more of a material (or batch) than is in stock are skipped;
+    the others are all posted or, on error, none.
+    """
+    when = when or timezone.now()
+    orders = list(orders)
+    result = {'executed': [], 'entries': [], 'skipped': {}}
+    if not orders:
+        return result
+
+    with immediate_atomic():
+        # Lock the orders first, so two runs can't execute the same one twice
+        planned = set(
+            ProductionOrder.objects.select_for_update()
+            .filter(pk__in=[order.pk for order in orders], status=ProductionOrder.Status.PLANNED)
+            .values_list('pk', flat=True)
+        )
+        for order in orders:
+            if order.pk not in planned:
+                result['skipped'][order.pk] = f"Order {order.order_number} is no longer planned."
+        orders = sorted((order for order in orders if order.pk in planned), key=lambda order: (order.planned_date, order.pk))
+        if not orders:
+            return result
+
+        formulas = ProductionFormula.objects.select_related('finished_product').in_bulk({order.formula_id for order in orders})
+        accounts = _posting_accounts({order.company_id for order in orders}, formulas)
+        if usages is None:
+            usages = defaultdict(list)
+            for usage in MaterialUsage.objects.filter(production_order_id__in=[order.pk for order in orders]).order_by('id'):
+                usages[usage.production_order_id].append(usage)
+
+        postable = []
+        for order in orders:
+            inventory_account, cogs_account = accounts[order.formula_id]
+            if inventory_account is None or cogs_account is None:
+                result['skipped'][order.pk] = (
+                    f"Order {order.order_number}: no inventory asset / cost of goods sold account to post to."
+                )
+            else:
+                postable.append(order)
+        if not postable:
+            return result
+
+        item_ids = {formulas[order.formula_id].finished_product_id for order in postable}
+        item_ids.update(usage.material_id for order in postable for usage in usages.get(order.pk, []))
+        batch_ids = {usage.batch_id for order in postable for usage in usages.get(order.pk, []) if usage.batch_id}
+        stock = _Stock(item_ids, batch_ids)
+
+        receipts, issues, entries, lines, posted_usages = [], [], [], [], []
+        for order in postable:
+            formula = formulas[order.formula_id]
+            product = stock.items[formula.finished_product_id]
+            note = f"Used in Production Order {order.order_number}"
+
+            # Checked against the stock as earlier orders of the run left it
+            quantities, batch_quantities = defaultdict(Decimal), defaultdict(Decimal)
+            for usage in usages.get(order.pk, []):
+                quantity = usage.actual_quantity or usage.planned_quantity
+                quantities[usage.material_id] += quantity
+                if usage.batch_id:
+                    batch_quantities[usage.batch_id] += quantity
+            short = stock.shortages(quantities, batch_quantities)
+            if short:
+                result['skipped'][order.pk] = f"Order {order.order_number}: insufficient stock of " + ', '.join(
+                    f"{name} (needs {needed}, {available} available)" for name, needed, available in short
+                )
+                continue
+
+            material_cost = ZERO
+            for usage in usages.get(order.pk, []):
+                if not usage.actual_quantity:
+                    usage.actual_quantity = usage.planned_quantity
+                draws = stock.issue(stock.items[usage.material_id], usage.actual_quantity, usage.batch_id)
+                drawn_cost = sum((quantity * unit_cost for _, quantity, unit_cost, _ in draws), ZERO)
+                usage.unit_cost = (drawn_cost / usage.actual_quantity).quantize(COST) if usage.actual_quantity else ZERO
+                usage.usage_date = when
+                material_cost += usage.actual_quantity * usage.unit_cost
+                posted_usages.append(usage)
+                for batch, quantity, unit_cost, layers_used in draws:
+                    issues.append((InventoryTransaction(
+                        company_id=order.company_id, item_id=usage.material_id,
+                        transaction_type=InventoryTransaction.ADJUSTMENT_OUT, batch=batch, quantity=quantity,
+                        unit_cost=unit_cost, total_cost=quantity * unit_cost, transaction_date=when, notes=note,
+                    ), layers_used))
+
+            labor_cost = order.actual_labor_cost or (formula.labor_cost * order.quantity)
+            overhead_cost = order.actual_overhead_cost or (formula.overhead_cost * order.quantity)
+            material_cost, labor_cost, overhead_cost = (
+                material_cost.quantize(CENT), labor_cost.quantize(CENT), overhead_cost.quantize(CENT)
+            )
+            total_cost = material_cost + labor_cost + overhead_cost
+            produced_quantity = order.quantity * formula.unit_quantity
+            if produced_quantity > 0:
+                unit_cost = total_cost / produced_quantity
+                batch, layer = stock.receive(product, produced_quantity, unit_cost, when)
+                receipts.append((InventoryTransaction(
+                    company_id=order.company_id, item=product, transaction_type=InventoryTransaction.PURCHASE,
+                    batch=batch, quantity=produced_quantity, unit_cost=unit_cost, total_cost=total_cost,
+                    transaction_date=when, notes=f"Produced in Production Order {order.order_number}",
+                ), layer))
+
+            order.status = ProductionOrder.Status.COMPLETED
+            order.start_date = order.completion_date = order.updated_at = when
+            entry = JournalEntry(
+                company_id=order.company_id, date=when.date(), created_by_id=order.created_by_id,
+                description=f"Production Order {order.order_number}: {product.name}"[:255],
+            )
+            entries.append(entry)
+            lines.extend(_journal_lines(entry, product.name, *accounts[order.formula_id],
+                                        material_cost, labor_cost, overhead_cost))
+            result['executed'].append(order)
+
+        # New batches, then the receipts (they point at them), then the layers (named after the receipts),
+        # then the issues, whose layer lists may name layers received earlier in this run
+        InventoryBatch.objects.bulk_create(stock.new_batches, batch_size=BULK_BATCH_SIZE)
+        InventoryTransaction.objects.bulk_create([receipt for receipt, _ in receipts], batch_size=BULK_BATCH_SIZE)
+        new_layers = []
+        for receipt, layer in receipts:
+            if layer is not None:
+                layer.reference = f"{receipt.transaction_type}-{receipt.pk}"
+                new_layers.append(layer)
+        InventoryCostLayer.objects.bulk_create(new_layers, batch_size=BULK_BATCH_SIZE)
+        for issue, layers_used in issues:
+            issue.cost_layers_used = [
+                {'layer_id': layer.pk, 'quantity': float(quantity), 'unit_cost': float(unit_cost)}
+                for layer, quantity, unit_cost in layers_used
+            ]
+        InventoryTransaction.objects.bulk_create([issue for issue, _ in issues], batch_size=BULK_BATCH_SIZE)
+
+        InventoryCostLayer.objects.bulk_update(stock.changed_layers.values(), ['quantity_remaining'], batch_size=BULK_BATCH_SIZE)
+        InventoryBatch.objects.bulk_update(stock.changed_batches.values(), ['quantity_remaining'], batch_size=BULK_BATCH_SIZE)
+        InventoryItem.objects.bulk_update(stock.changed_items.values(), ['quantity_on_hand'], batch_size=BULK_BATCH_SIZE)
+
+        MaterialUsage.objects.bulk_update([usage for usage in posted_usages if usage.pk], USAGE_FIELDS, batch_size=BULK_BATCH_SIZE)
+        MaterialUsage.objects.bulk_create([usage for usage in posted_usages if not usage.pk], batch_size=BULK_BATCH_SIZE)
+        ProductionOrder.objects.bulk_update(result['executed'], ORDER_FIELDS, batch_size=BULK_BATCH_SIZE)
+
+        JournalEntry.objects.bulk_create(entries, batch_size=BULK_BATCH_SIZE)
+        JournalEntryLine.objects.bulk_create(lines, batch_size=BULK_BATCH_SIZE)
+
+        _bump_versions(sorted({order.company_id for order in result['executed']}))
+        changed_item_ids = sorted(stock.changed_items)
+        if changed_item_ids:
+            transaction.on_commit(lambda: recost_for_items(changed_item_ids))
+
+    result['entries'] = entries
+    return result
+
+def execute_order(order, usages=None, when=None):
+    """Executes one order; raises ProductionPostingError when it can't be posted"""
+    result = execute_orders([order], {order.pk: usages} if usages is not None else None, when)
+    if order.pk in result['skipped']:
+        raise ProductionPostingError(result['skipped'][order.pk])
+    return result
+
+def due_orders(company_id, until=None):
+    """PLANNED orders of a company due on or before ``until`` (today by default), oldest first"""
+    return (
+        ProductionOrder.objects.filter(
+            company_id=company_id, status=ProductionOrder.Status.PLANNED,
+            planned_date__lte=until or timezone.localdate(),
+        ).order_by('planned_date', 'id')
+    )
+
+def _bump_versions(company_ids):
+    for company_id in company_ids:
+        bump_ledger_version(company_id)
+        bump_counters(JOURNAL_ENTRIES, company_id)
+        bump_picker_version(INVENTORY, company_id)
+        bump_mrp_version(company_id)
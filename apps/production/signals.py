@@ -0,0 +1,64 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\production\signals.py
+import threading
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.inventory.models import InventoryBatch, InventoryCostLayer, InventoryItem, InventoryPriceAdjustment
+from .costing import recost_for_items, recost_formulas
+from .models import FormulaIngredient, ProductionFormula
+
+# Materials and formulas to recost when the current transaction commits
+_pending = threading.local()
+
+# An item save touching none of these can't change its average cost
+COST_FIELDS = {'quantity_on_hand', 'costing_method', 'enable_batch_tracking'}
+
+def _pending_sets():
+    if not hasattr(_pending, 'items'):
+        _pending.items, _pending.formulas = set(), set()
+    return _pending.items, _pending.formulas
+
+def _flush():
+    items, formulas = _pending_sets()
+    _pending.items, _pending.formulas = set(), set()
+    if items:
+        recost_for_items(items)
+    if formulas:
+        company_ids = set(ProductionFormula.objects.filter(pk__in=formulas).values_list('company_id', flat=True))
+        if company_ids:
+            recost_formulas(company_ids, formula_ids=formulas)
+
+def _queue(item_id=None, formula_id=None):
+    """Collects the ids and recosts once per commit, however many rows the transaction saved"""
+    items, formulas = _pending_sets()
+    if item_id:
+        items.add(item_id)
+    if formula_id:
+        formulas.add(formula_id)
+    # Every save schedules a flush, so one dropped by a rolled back savepoint
+    # can't strand the ids; the first flush to run empties the sets for the rest
+    transaction.on_commit(_flush)
+
+@receiver([post_save, post_delete], sender=InventoryCostLayer)
+@receiver([post_save, post_delete], sender=InventoryBatch)
+@receiver([post_save, post_delete], sender=InventoryPriceAdjustment)
+def recost_on_layer_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _queue(item_id=instance.item_id)
+
+@receiver(post_save, sender=InventoryItem)
+def recost_on_stock_change(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and not set(update_fields) & COST_FIELDS):
+        return
+    _queue(item_id=instance.pk)
+
+@receiver([post_save, post_delete], sender=FormulaIngredient)
+def recost_on_ingredient_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _queue(formula_id=instance.formula_id)
+
+@receiver(post_save, sender=ProductionFormula)
+def recost_on_formula_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _queue(formula_id=instance.pk)
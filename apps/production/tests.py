@@ -1,3 +1,183 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from apps.core.testing import CompanyTestCase
+from apps.inventory.models import InventoryItem, InventoryTransaction
+from .models import FormulaIngredient, MaterialUsage, ProductionFormula, ProductionOrder
+from .mrp import get_material_plan
+from .posting import ProductionPostingError, execute_order, execute_orders
+
+
+class ProductionTestCase(CompanyTestCase):
+    company_name = 'Bakery Co'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.income = cls.account('4100')
+
+    def setUp(self):
+        self.flour = self.make_item('Flour', InventoryItem.STOCK_ITEM)
+        self.dough = self.make_item('Dough', InventoryItem.FINISHED_GOOD)
+        self.cake = self.make_item('Cake', InventoryItem.FINISHED_GOOD)
+        self.buy(self.flour, '10', '2.50')
+        self.buy(self.flour, '5', '3.10')
+
+        # 3 flour + 1.00 labour make 2 dough; 1 dough + 1 flour + 0.75 overhead make a cake
+        self.dough_formula = self.make_formula(self.dough, [(self.flour, '3')], unit_quantity=Decimal('2'),
+                                               labor_cost=Decimal('1.00'))
+        self.cake_formula = self.make_formula(self.cake, [(self.dough, '1'), (self.flour, '1')],
+                                              overhead_cost=Decimal('0.75'))
+
+    def make_item(self, name, item_type):
+        return InventoryItem.objects.create(
+            company=self.company, name=name, sku=name.upper(), description='', income_account=self.income,
+            item_type=item_type, costing_method=InventoryItem.CostingMethod.FIFO,
+        )
+
+    def buy(self, item, quantity, unit_cost):
+        InventoryTransaction.objects.create(
+            company=self.company, item=item, transaction_type=InventoryTransaction.PURCHASE,
+            quantity=Decimal(quantity), unit_cost=Decimal(unit_cost),
+        )
+        item.quantity_on_hand += Decimal(quantity)
+        item.save()
+
+    def make_formula(self, product, ingredients, **costs):
+        formula = ProductionFormula.objects.create(company=self.company, name=product.name, finished_product=product, **costs)
+        for material, quantity in ingredients:
+            FormulaIngredient.objects.create(formula=formula, material=material, quantity=Decimal(quantity))
+        return formula
+
+    def make_order(self, formula, quantity, day):
+        order = ProductionOrder.objects.create(
+            company=self.company, formula=formula, quantity=Decimal(quantity), planned_date=day,
+        )
+        for ingredient in formula.ingredients.all():
+            MaterialUsage.objects.create(production_order=order, material=ingredient.material,
+                                         planned_quantity=ingredient.quantity * order.quantity)
+        return order
+
+    def quantity_on_hand(self, item):
+        item.refresh_from_db()
+        return item.quantity_on_hand
+
+
+class BatchPostingTests(ProductionTestCase):
+    def test_batch_posts_balanced_entries_and_uses_what_it_produced(self):
+        # Listed out of order: the cake needs the dough planned the day before
+        cakes = self.make_order(self.cake_formula, '3', date(2026, 1, 2))
+        dough = self.make_order(self.dough_formula, '2', date(2026, 1, 1))
+
+        result = execute_orders([cakes, dough])
+
+        self.assertEqual(result['skipped'], {})
+        self.assertEqual([order.pk for order in result['executed']], [dough.pk, cakes.pk])
+        for entry in result['entries']:
+            lines = list(entry.lines.all())
+            self.assertEqual(sum(line.debit for line in lines), sum(line.credit for line in lines))
+
+        # 6 flour at 2.50 + 2.00 labour = 17.00 for 4 dough; 3 dough, 3 flour and 2.25 overhead for the cakes
+        receipts = InventoryTransaction.objects.filter(
+            transaction_type=InventoryTransaction.PURCHASE, notes__startswith='Produced in'
+        )
+        self.assertEqual(receipts.get(item=self.dough).total_cost, Decimal('17.00'))
+        self.assertEqual(receipts.get(item=self.cake).total_cost, Decimal('22.50'))
+        self.assertEqual(self.quantity_on_hand(self.flour), Decimal('6'))
+        self.assertEqual(self.quantity_on_hand(self.dough), Decimal('1'))
+        self.assertEqual(self.quantity_on_hand(self.cake), Decimal('3'))
+
+    def test_order_short_of_stock_is_skipped_and_the_rest_post(self):
+        dough = self.make_order(self.dough_formula, '2', date(2026, 1, 1))
+        too_much = self.make_order(self.dough_formula, '4', date(2026, 1, 2))
+
+        result = execute_orders([dough, too_much])
+
+        self.assertEqual([order.pk for order in result['executed']], [dough.pk])
+        self.assertRegex(result['skipped'][too_much.pk], r'insufficient stock of Flour \(needs 12(\.0+)?, 9(\.0+)? available\)')
+        too_much.refresh_from_db()
+        self.assertEqual(too_much.status, ProductionOrder.Status.PLANNED)
+        self.assertEqual(self.quantity_on_hand(self.flour), Decimal('9'))
+
+    def test_single_order_short_of_stock_raises_without_writing(self):
+        order = self.make_order(self.dough_formula, '6', date(2026, 1, 1))
+
+        with self.assertRaises(ProductionPostingError):
+            execute_order(order)
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, ProductionOrder.Status.PLANNED)
+        self.assertEqual(self.quantity_on_hand(self.flour), Decimal('15'))
+        self.assertFalse(InventoryTransaction.objects.filter(notes__contains=order.order_number).exists())
+
+    def test_executed_order_is_not_posted_twice(self):
+        order = self.make_order(self.dough_formula, '1', date(2026, 1, 1))
+        execute_orders([order])
+
+        again = execute_orders([order])
+
+        self.assertEqual(again['executed'], [])
+        self.assertIn(order.pk, again['skipped'])
+        self.assertEqual(self.quantity_on_hand(self.dough), Decimal('2'))
+
+
+class RecostTests(ProductionTestCase):
+    def test_rolled_back_change_does_not_stop_later_recosts(self):
+        layer = self.flour.cost_layers.order_by('id').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError):
+                with transaction.atomic():
+                    layer.unit_cost = Decimal('9.00')
+                    layer.save()
+                    raise IntegrityError('rolled back')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            layer.unit_cost = Decimal('4.00')
+            layer.save()
+
+        # Flour now averages (10 x 4.00 + 5 x 3.10) / 15 = 3.70: 3 x 3.70 + 1.00 labour a batch
+        self.dough_formula.refresh_from_db()
+        self.assertIsNotNone(self.dough_formula.costed_at)
+        self.assertEqual(self.dough_formula.cached_unit_cost, Decimal('12.1000'))
+
+
+class MaterialPlanTests(ProductionTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # 2 dough on the 1st; 8 cakes on the 2nd need 8 dough and 8 flour
+        self.dough_order = self.make_order(self.dough_formula, '1', date(2026, 1, 1))
+        self.make_order(self.cake_formula, '8', date(2026, 1, 2))
+
+    def shortages(self, plan):
+        return [(row['name'], row['date'], row['quantity'], row['action']) for row in plan['shortages']]
+
+    def test_made_shortfall_is_exploded_before_its_ingredients_are_netted(self):
+        plan = get_material_plan(self.company.pk)
+
+        self.assertEqual([(row['name'], row['level']) for row in plan['materials']], [('Dough', 1), ('Flour', 2)])
+        # 6 dough short = 3 runs = 9 more flour: 3 + 8 + 9 needed against 15 on hand
+        self.assertEqual(self.shortages(plan), [
+            ('Dough', date(2026, 1, 2), Decimal('6.0000'), 'make'),
+            ('Flour', date(2026, 1, 2), Decimal('5.0000'), 'buy'),
+        ])
+        flour = plan['materials'][1]
+        self.assertEqual([period['required'] for period in flour['periods']], [Decimal('3.0000'), Decimal('17.0000')])
+
+    def test_plan_follows_stock_and_order_changes(self):
+        get_material_plan(self.company.pk)
+
+        self.buy(self.flour, '5', '2.00')
+        self.assertEqual(self.shortages(get_material_plan(self.company.pk)), [
+            ('Dough', date(2026, 1, 2), Decimal('6.0000'), 'make'),
+        ])
+
+        self.dough_order.status = ProductionOrder.Status.CANCELLED
+        self.dough_order.save()
+        # Without the planned dough, 8 are short: 4 runs, 12 flour
+        self.assertEqual(self.shortages(get_material_plan(self.company.pk)), [
+            ('Dough', date(2026, 1, 2), Decimal('8.0000'), 'make'),
+        ])
@@ -18,8 +18,10 @@ urlpatterns = [
     path('orders/<int:pk>/', views.ProductionOrderDetailView.as_view(), name='order_detail'),
     path('orders/<int:pk>/execute/', views.ProductionOrderExecuteView.as_view(), name='order_execute'),
     path('orders/<int:pk>/cancel/', views.ProductionOrderCancelView.as_view(), name='order_cancel'),
+    path('requirements/', views.MaterialRequirementsView.as_view(), name='material_requirements'),
     
     # API Endpoints
     path('api/formulas/<int:pk>/', views.get_formula_details, name='api_formula_details'),
     path('api/calculate-requirements/', views.calculate_production_requirements, name='api_calculate_requirements'),
+    path('api/material-requirements/', views.material_requirements_api, name='api_material_requirements'),
 ]
@@ -4,19 +4,18 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
 from django.contrib import messages
 from django.http import JsonResponse
-from django.utils import timezone
 from django.db import transaction
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.db.models import Q, Sum, F
 from django.core.paginator import Paginator
 from decimal import Decimal
+from datetime import datetime
+from django.core.serializers.json import DjangoJSONEncoder
 
 from apps.authentication.decorators import user_type_required, RoleRequiredMixin
 from apps.authentication.models import User
-from apps.inventory.models import InventoryTransaction, InventoryItem, InventoryBatch
-from apps.journal.models import JournalEntry, JournalEntryLine
-from apps.accounts.models import Account
+from apps.inventory.models import InventoryItem, InventoryBatch
 
 from .models import (
     ProductionFormula, FormulaIngredient, ProductionOrder, 
@@ -27,6 +26,8 @@ from .forms import (
     ProductionOrderForm, ProductionOrderExecuteForm, MaterialUsageFormSet
 )
 from apps.subscriptions.utils import has_production_access
+from .mrp import get_material_plan
+from .posting import execute_order
 
 
 @method_decorator(login_required, name='dispatch')
@@ -38,7 +39,7 @@ class ProductionFormulaListView(View):
             return redirect('dashboard:home')
         
         company = request.user.company
-        formulas = ProductionFormula.objects.filter(company=company)
+        formulas = ProductionFormula.objects.filter(company=company).select_related('finished_product')
         
         search_query = request.GET.get('search', '')
         if search_query:
@@ -197,7 +198,7 @@ class ProductionFormulaDetailView(View):
         company = request.user.company
         formula = get_object_or_404(ProductionFormula, pk=pk, company=company)
         
-        ingredients = formula.ingredients.all()
+        ingredients = formula.ingredients.select_related('material')
         for ingredient in ingredients:
             ingredient.available = ingredient.material.quantity_on_hand
             ingredient.required_per_unit = ingredient.quantity
@@ -236,7 +237,7 @@ class ProductionOrderListView(View):
             return redirect('dashboard:home')
         
         company = request.user.company
-        orders = ProductionOrder.objects.filter(company=company)
+        orders = ProductionOrder.objects.filter(company=company).select_related('formula')
         
         search_query = request.GET.get('search', '')
         if search_query:
@@ -426,75 +427,11 @@ class ProductionOrderExecuteView(View):
         
         if form.is_valid() and formset.is_valid():
             try:
-                with transaction.atomic():
-                    order = form.save(commit=False)
-                    order.status = ProductionOrder.Status.COMPLETED
-                    order.start_date = timezone.now()
-                    order.completion_date = timezone.now()
-                    order.save()
-                    
-                    for usage_form in formset:
-                        usage = usage_form.save(commit=False)
-                        
-                        if not usage.actual_quantity:
-                            usage.actual_quantity = usage.planned_quantity
-                        
-                        if usage.batch:
-                            usage.unit_cost = usage.batch.unit_cost
-                        else:
-                            usage.unit_cost = usage.material.current_average_cost or Decimal('0.00')
-                        
-                        usage.usage_date = timezone.now()
-                        usage.save()
-                        
-                        InventoryTransaction.objects.create(
-                            company=company,
-                            item=usage.material,
-                            transaction_type=InventoryTransaction.ADJUSTMENT_OUT,
-                            batch=usage.batch,
-                            quantity=usage.actual_quantity,
-                            unit_cost=usage.unit_cost,
-                            transaction_date=timezone.now(),
-                            notes=f"Used in Production Order {order.order_number}"
-                        )
-                        
-                        usage.material.quantity_on_hand -= usage.actual_quantity
-                        usage.material.save(update_fields=['quantity_on_hand'])
-                    
-                    order.refresh_from_db()
-
-                    finished_product = order.formula.finished_product
-                    produced_quantity = order.quantity * order.formula.unit_quantity
-                    
-                    total_material_cost = sum(
-                        u.actual_quantity * u.unit_cost
-                        for u in order.material_usages.all()
-                        if u.actual_quantity is not None and u.unit_cost is not None
-                    )
-                    
-                    total_labor_cost = order.actual_labor_cost or (order.formula.labor_cost * order.quantity)
-                    total_overhead_cost = order.actual_overhead_cost or (order.formula.overhead_cost * order.quantity)
-                    
-                    total_cost = total_material_cost + total_labor_cost + total_overhead_cost
-                    unit_cost = total_cost / produced_quantity if produced_quantity > 0 else Decimal('0.00')
-                    
-                    InventoryTransaction.objects.create(
-                        company=company,
-                        item=finished_product,
-                        transaction_type=InventoryTransaction.PURCHASE,
-                        quantity=produced_quantity,
-                        unit_cost=unit_cost,
-                        transaction_date=timezone.now(),
-                        notes=f"Produced in Production Order {order.order_number}"
-                    )
-                    
-                    finished_product.quantity_on_hand += produced_quantity
-                    finished_product.save(update_fields=['quantity_on_hand'])
-                    
-                    self.create_journal_entry_for_production(order, total_material_cost, total_labor_cost, total_overhead_cost)
-                    
-                    messages.success(request, f"Production order {order.order_number} executed successfully!")
-                    return redirect('production:order_detail', pk=order.pk)
+                order = form.save(commit=False)
+                usages = [usage_form.save(commit=False) for usage_form in formset]
+                execute_order(order, usages)
+                messages.success(request, f"Production order {order.order_number} executed successfully!")
+                return redirect('production:order_detail', pk=order.pk)
             except Exception as e:
                 messages.error(request, f"Error executing production order: {e}")
 
@@ -517,70 +454,6 @@ class ProductionOrderExecuteView(View):
             'page_title': f'Execute Production Order: {order.order_number}'
         }
         return render(request, 'production/order_execute.html', context)
-    
-    def create_journal_entry_for_production(self, order, material_cost, labor_cost, overhead_cost):
-        company = order.company
-        finished_product = order.formula.finished_product
-        
-        try:
-            inventory_asset_account = Account.objects.get(
-                company=company, 
-                system_account=Account.SystemAccount.INVENTORY_ASSET
-            )
-            cogs_account = Account.objects.get(
-                company=company,
-                system_account=Account.SystemAccount.COST_OF_GOODS_SOLD
-            )
-        except Account.DoesNotExist:
-            inventory_asset_account = finished_product.asset_account
-            cogs_account = finished_product.expense_account
-        
-        journal_entry = JournalEntry.objects.create(
-            company=company,
-            date=timezone.now().date(),
-            description=f"Production Order {order.order_number}: {finished_product.name}",
-            created_by=order.created_by
-        )
-        
-        total_cost = material_cost + labor_cost + overhead_cost
-        
-        if total_cost > 0:
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=inventory_asset_account,
-                description=f"Production of {finished_product.name}",
-                debit=total_cost,
-                credit=Decimal('0.00')
-            )
-        
-        if material_cost > 0:
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=inventory_asset_account,
-                description=f"Raw materials consumed in production",
-                debit=Decimal('0.00'),
-                credit=material_cost
-            )
-        
-        if labor_cost > 0:
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=cogs_account,
-                description=f"Labor cost for production",
-                debit=Decimal('0.00'),
-                credit=labor_cost
-            )
-        
-        if overhead_cost > 0:
-            JournalEntryLine.objects.create(
-                journal_entry=journal_entry,
-                account=cogs_account,
-                description=f"Overhead cost for production",
-                debit=Decimal('0.00'),
-                credit=overhead_cost
-            )
-        
-        return journal_entry
 
 @method_decorator(login_required, name='dispatch')
 @method_decorator(user_type_required(allowed_roles=[User.UserType.ADMIN, User.UserType.ACCOUNTANT, User.UserType.STOCK_KEEPER]), name='dispatch')
@@ -604,6 +477,48 @@ class ProductionOrderCancelView(View):
         return redirect('production:order_list')
 
 
+def _plan_until(request):
+    """?until=YYYY-MM-DD limits the plan's periods to that date"""
+    try:
+        return datetime.strptime(request.GET.get('until', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+def _filter_plan(plan, until):
+    if until is None:
+        return plan
+    materials = []
+    for material in plan['materials']:
+        periods = [period for period in material['periods'] if period['date'] <= until]
+        if periods:
+            materials.append(dict(
+                material, periods=periods,
+                gross_requirement=sum((period['required'] for period in periods), Decimal('0')),
+                shortage=sum((period['shortage'] for period in periods), Decimal('0')),
+            ))
+    return dict(plan, materials=materials,
+                shortages=[row for row in plan['shortages'] if row['date'] <= until])
+
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(user_type_required(allowed_roles=[User.UserType.ADMIN, User.UserType.ACCOUNTANT, User.UserType.MANAGER, User.UserType.STOCK_KEEPER]), name='dispatch')
+class MaterialRequirementsView(View):
+    def get(self, request):
+        if not has_production_access(request.user):
+            messages.error(request, "Production management is only available for DELUXE and PREMIUM subscriptions.")
+            return redirect('dashboard:home')
+        
+        until = _plan_until(request)
+        plan = _filter_plan(get_material_plan(request.user.company_id), until)
+        
+        context = {
+            'plan': plan,
+            'until': request.GET.get('until', '') if until else '',
+            'page_title': 'Material Requirements'
+        }
+        return render(request, 'production/material_requirements.html', context)
+
+
 # API Endpoints
 @login_required
 @user_type_required(allowed_roles=[User.UserType.ADMIN, User.UserType.ACCOUNTANT, User.UserType.MANAGER, User.UserType.STOCK_KEEPER])
@@ -615,8 +530,9 @@ def get_formula_details(request, pk):
         company = request.user.company
         formula = ProductionFormula.objects.get(pk=pk, company=company)
         
+        ingredients = list(formula.ingredients.select_related('material'))
         ingredients_data = []
-        for ingredient in formula.ingredients.all():
+        for ingredient in ingredients:
             ingredients_data.append({
                 'id': ingredient.id,
                 'material_id': ingredient.material.id,
@@ -633,7 +549,7 @@ def get_formula_details(request, pk):
         total_cost = float(formula.total_cost_per_unit)
         
         max_production = float('inf')
-        for ingredient in formula.ingredients.all():
+        for ingredient in ingredients:
             if ingredient.quantity > 0:
                 possible = ingredient.material.quantity_on_hand / ingredient.quantity
                 max_production = min(max_production, possible)
@@ -690,7 +606,7 @@ def calculate_production_requirements(request):
         requirements = []
         all_available = True
         
-        for ingredient in formula.ingredients.all():
+        for ingredient in formula.ingredients.select_related('material'):
             required_qty = ingredient.quantity * quantity
             available_qty = ingredient.material.quantity_on_hand
             is_available = available_qty >= required_qty
@@ -735,4 +651,14 @@ def calculate_production_requirements(request):
     except ProductionFormula.DoesNotExist:
         return JsonResponse({'error': 'Formula not found'}, status=404)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@login_required
+@user_type_required(allowed_roles=[User.UserType.ADMIN, User.UserType.ACCOUNTANT, User.UserType.MANAGER, User.UserType.STOCK_KEEPER])
+def material_requirements_api(request):
+    if not has_production_access(request.user):
+        return JsonResponse({'error': 'Subscription does not include production features'}, status=403)
+    
+    plan = _filter_plan(get_material_plan(request.user.company_id), _plan_until(request))
+    return JsonResponse(plan, encoder=DjangoJSONEncoder)
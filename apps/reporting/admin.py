@@ -1,3 +1,16 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\admin.py
 from django.contrib import admin
+from .models import ReportSchedule, ReportScheduleRun
 
-# Register your models here.
+@admin.register(ReportSchedule)
+class ReportScheduleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'company', 'report', 'format', 'period', 'cadence', 'next_run_at', 'last_run_at', 'is_active')
+    list_filter = ('report', 'format', 'cadence', 'is_active')
+    search_fields = ('name', 'company__name', 'recipients')
+    readonly_fields = ('last_run_at', 'created_at', 'updated_at')
+
+@admin.register(ReportScheduleRun)
+class ReportScheduleRunAdmin(admin.ModelAdmin):
+    list_display = ('schedule', 'status', 'started_at', 'render_seconds', 'send_seconds', 'total_seconds', 'shared_render')
+    list_filter = ('status', 'shared_render')
+    readonly_fields = [field.name for field in ReportScheduleRun._meta.fields]
@@ -5,3 +5,7 @@ from django.apps import AppConfig
 class ReportingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.reporting'
+
+    def ready(self):
+        # Connect the ledger-version signals that invalidate cached reports
+        import apps.reporting.signals
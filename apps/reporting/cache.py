@@ -0,0 +1,93 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\cache.py
+"""
+Report result cache.
+
+Report datasets are cached under (company, report, parameters, ledger_version).
+The ledger version of a company is bumped, in the same transaction, whenever any
+of its journal entries, journal lines or accounts change (see
+apps.reporting.signals), so a cached report is never served once the underlying
+ledger has moved on - it simply stops being hit. The version is a database row
+(apps.core.versions), so a posting in one worker or command retires the reports
+cached by every other process too.
+A dataset built on a lagging read replica may predate the version it is cached
+under, so those are kept only for REPLICA_REPORT_CACHE_TIMEOUT.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.routers import reading_from_replica
+from apps.core.versions import bump_version, get_version
+
+REPORT_CACHE_PREFIX = 'report_cache'
+LEDGER_VERSION = 'ledger'
+
+def _stats_key(report_name, outcome):
+    return f"{REPORT_CACHE_PREFIX}:stats:{report_name}:{outcome}"
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter missing or evicted; add() avoids clobbering a concurrent writer
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+def get_ledger_version(company_id):
+    """Current ledger version for a company, initialised on first use"""
+    return get_version(LEDGER_VERSION, company_id)
+
+def bump_ledger_version(company_id):
+    """Invalidate every cached report for a company, in every process"""
+    bump_version(LEDGER_VERSION, company_id)
+
+def report_cache_key(company_id, report_name, params):
+    params_repr = repr(sorted((name, str(value)) for name, value in params.items()))
+    digest = hashlib.md5(params_repr.encode('utf-8')).hexdigest()
+    version = get_ledger_version(company_id)
+    return f"{REPORT_CACHE_PREFIX}:{company_id}:{report_name}:{digest}:{version}"
+
+def get_cached_report(company, report_name, builder, **params):
+    """
+    Returns the dataset for ``report_name``, building it with ``builder(company, **params)``
+    only when no dataset exists for the company's current ledger version.
+    """
+    key = report_cache_key(company.id, report_name, params)
+    dataset = cache.get(key)
+    if dataset is not None:
+        _increment(_stats_key(report_name, 'hits'))
+        return dataset
+
+    _increment(_stats_key(report_name, 'misses'))
+    dataset = builder(company, **params)
+    if reading_from_replica():
+        timeout = getattr(settings, 'REPLICA_REPORT_CACHE_TIMEOUT', 30)
+    else:
+        timeout = getattr(settings, 'REPORT_CACHE_TIMEOUT', 3600)
+    cache.set(key, dataset, timeout=timeout)
+    return dataset
+
+def get_report_cache_stats(report_names):
+    """Hit/miss counters per report (counted by this cache backend, not per company)"""
+    stats = []
+    total_hits = 0
+    total_misses = 0
+    for report_name in report_names:
+        hits = cache.get(_stats_key(report_name, 'hits')) or 0
+        misses = cache.get(_stats_key(report_name, 'misses')) or 0
+        total_hits += hits
+        total_misses += misses
+        stats.append({
+            'report': report_name,
+            'label': report_name.replace('_', ' ').title(),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits * 100 / (hits + misses), 1) if hits + misses else 0,
+        })
+
+    return {
+        'reports': stats,
+        'hits': total_hits,
+        'misses': total_misses,
+        'hit_rate': round(total_hits * 100 / (total_hits + total_misses), 1) if total_hits + total_misses else 0,
+    }
@@ -1,9 +1,14 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\export_utils.py
 import csv
 import io
+import os
+import shutil
+import tempfile
 import xlsxwriter
-from django.http import HttpResponse
-from reportlab.lib.pagesizes import letter, A4, landscape
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.http import HttpResponse, FileResponse
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas as pdf_canvas
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
@@ -11,6 +16,13 @@ from reportlab.lib.units import inch
 from datetime import datetime
 import re
 
+try:
+    # Optional: only needed to merge sections rendered in parallel
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = None
+    PdfWriter = None
+
 def analyze_content_requirements(headers, data):
     """Enhanced analysis with better column compression detection and currency formatting"""
     analysis = {}
@@ -332,22 +344,43 @@ def calculate_dynamic_column_widths(headers, data, available_width, min_width=0.
     
     return final_widths
 
+def _write_csv_rows(output, data, headers):
+    writer = csv.writer(output)
+    writer.writerow(headers)
+    
+    for row in data:
+        writer.writerow(row)
+
 def export_to_csv(data, filename, headers):
     """Export data to CSV format"""
     response = HttpResponse(content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
     
-    writer = csv.writer(response)
-    writer.writerow(headers)
-    
-    for row in data:
-        writer.writerow(row)
+    _write_csv_rows(response, data, headers)
     
     return response
 
+def render_csv_to_file(data, headers, output):
+    """Write a CSV export straight to ``output`` (a path)"""
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        _write_csv_rows(f, data, headers)
+
 def export_to_excel(data, filename, headers, sheet_name="Report", company_name=""):
     """Export data to Excel format with DYNAMIC description column handling and proper number formatting"""
     output = io.BytesIO()
+    render_excel_to_file(data, headers, output, sheet_name, company_name)
+    output.seek(0)
+    
+    response = HttpResponse(
+        output.read(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
+    
+    return response
+
+def render_excel_to_file(data, headers, output, sheet_name="Report", company_name=""):
+    """Write the Excel export to ``output`` (a path or a binary file object)"""
     workbook = xlsxwriter.Workbook(output)
     worksheet = workbook.add_worksheet(sheet_name)
     
@@ -552,51 +585,22 @@ def export_to_excel(data, filename, headers, sheet_name="Report", company_name="
             worksheet.set_row(row_num, min(row_height, 160))  # Increased cap for descriptions
     
     workbook.close()
-    output.seek(0)
-    
-    response = HttpResponse(
-        output.read(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-    
-    return response
 
-def export_to_pdf(data, filename, headers, title, company_name, page_size=None):
-    """Export data to PDF format with DYNAMIC description handling and proper number formatting"""
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
-    
-    if page_size is None:
-        page_size = landscape(A4)
-    
-    doc = SimpleDocTemplate(
-        response, 
-        pagesize=page_size, 
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch,
-        leftMargin=0.5*inch,
-        rightMargin=0.5*inch
-    )
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Company name and title
-    title_style = styles['Title']
-    title_style.fontSize = 18
-    
-    elements.append(Paragraph(f"{company_name}", title_style))
-    elements.append(Paragraph(f"{title}", styles['Heading2']))
-    elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-    elements.append(Spacer(1, 15))
-    
-    # Calculate available width
-    available_width = page_size[0] - 1*inch
-    
-    # 🧠 GET ANALYSIS FOR SMART FORMATTING
+# Reports with more rows than this are rendered page by page (see render_pdf_to_file)
+PDF_CHUNKED_ROW_THRESHOLD = 2000
+# Column analysis is driven by the headers, so large exports only sample this many rows
+PDF_ANALYSIS_SAMPLE_ROWS = 1000
+# Smallest height a data row can take (8pt text plus 4pt top and bottom padding)
+PDF_MIN_ROW_HEIGHT = 17
+# Rendered PDFs bigger than this spill from memory to a temporary file
+PDF_SPOOL_MAX_MEMORY = 10 * 1024 * 1024
+# Rows per section when sections are rendered in separate processes
+PDF_SECTION_ROWS = 20000
+
+def _analyze_pdf_columns(headers, data):
+    """Column analysis for PDF output, falling back to plain text columns"""
     try:
-        analysis = analyze_content_requirements(headers, data)
+        return analyze_content_requirements(headers, data)
     except Exception:
         analysis = {}
         for i in range(len(headers)):
@@ -606,8 +610,10 @@ def export_to_pdf(data, filename, headers, title, company_name, page_size=None):
                 'is_description_column': False,
                 'longest_word': 10
             }
-    
-    # 🎯 DYNAMIC COLUMN WIDTH CALCULATION
+        return analysis
+
+def _pdf_column_widths(headers, analysis, available_width):
+    """Distribute the available page width between columns based on content analysis"""
     num_cols = len(headers)
     col_widths = []
     
@@ -652,136 +658,123 @@ def export_to_pdf(data, filename, headers, title, company_name, page_size=None):
         col_width = max(min_width, min(col_width, max_width))
         col_widths.append(col_width)
     
-    # 🎯 ENHANCED PARAGRAPH STYLES
-    header_style = ParagraphStyle(
-        'HeaderStyle',
-        parent=styles['Normal'],
-        fontSize=9,
-        leading=11,
-        wordWrap='CJK',
-        alignment=1,
-        fontName='Helvetica-Bold',
-        spaceBefore=2,
-        spaceAfter=2
-    )
-    
-    # 🎯 SPECIAL STYLE FOR DESCRIPTION COLUMNS
-    description_style = ParagraphStyle(
-        'DescriptionStyle',
-        parent=styles['Normal'],
-        fontSize=7,
-        leading=9,
-        wordWrap='CJK',
-        alignment=0,
-        spaceBefore=0,
-        spaceAfter=0,
-        leftIndent=2,
-        rightIndent=2
-    )
-    
-    text_style = ParagraphStyle(
-        'TextStyle',
-        parent=styles['Normal'],
-        fontSize=8,
-        leading=10,
-        wordWrap='CJK',
-        alignment=0,
-        spaceBefore=1,
-        spaceAfter=1
-    )
-    
-    number_style = ParagraphStyle(
-        'NumberStyle',
-        parent=styles['Normal'],
-        fontSize=8,
-        leading=10,
-        alignment=2,
-    )
-    
-    # 🎯 PROCESS DATA WITH ENHANCED FORMATTING
-    processed_data = []
-    
-    # Process headers
+    return col_widths
+
+def _pdf_cell_styles(styles):
+    """Paragraph styles used for wrapped header, description, text and number cells"""
+    return {
+        'header': ParagraphStyle(
+            'HeaderStyle',
+            parent=styles['Normal'],
+            fontSize=9,
+            leading=11,
+            wordWrap='CJK',
+            alignment=1,
+            fontName='Helvetica-Bold',
+            spaceBefore=2,
+            spaceAfter=2
+        ),
+        # 🎯 SPECIAL STYLE FOR DESCRIPTION COLUMNS
+        'description': ParagraphStyle(
+            'DescriptionStyle',
+            parent=styles['Normal'],
+            fontSize=7,
+            leading=9,
+            wordWrap='CJK',
+            alignment=0,
+            spaceBefore=0,
+            spaceAfter=0,
+            leftIndent=2,
+            rightIndent=2
+        ),
+        'text': ParagraphStyle(
+            'TextStyle',
+            parent=styles['Normal'],
+            fontSize=8,
+            leading=10,
+            wordWrap='CJK',
+            alignment=0,
+            spaceBefore=1,
+            spaceAfter=1
+        ),
+        'number': ParagraphStyle(
+            'NumberStyle',
+            parent=styles['Normal'],
+            fontSize=8,
+            leading=10,
+            alignment=2,
+        ),
+    }
+
+def _pdf_header_row(headers, cell_styles):
     processed_headers = []
-    for col_idx, header in enumerate(headers):
+    for header in headers:
         header_str = str(header)
         if len(header_str) > 15:
-            processed_headers.append(Paragraph(header_str, header_style))
+            processed_headers.append(Paragraph(header_str, cell_styles['header']))
         else:
             processed_headers.append(header_str)
-    processed_data.append(processed_headers)
+    return processed_headers
+
+def _pdf_process_row(row, analysis, col_widths, cell_styles):
+    """Format one data row for a PDF table (number formatting, wrapping and truncation)"""
+    processed_row = []
     
-    # Process data rows
-    for row_idx, row in enumerate(data):
-        processed_row = []
+    for col_idx, cell in enumerate(row):
+        cell_str = str(cell) if cell is not None else ""
         
-        for col_idx, cell in enumerate(row):
-            cell_str = str(cell) if cell is not None else ""
-            
-            try:
-                if col_idx < len(analysis):
-                    col_analysis = analysis[col_idx]
-                    
-                    # 🎯 SPECIAL HANDLING FOR DIFFERENT CONTENT TYPES
-                    if col_analysis.get('content_type') in ['currency', 'number']:
-                        # Format numbers properly
-                        try:
-                            if cell is not None and str(cell).strip():
-                                numeric_value = float(str(cell).replace(',', ''))
-                                if col_analysis.get('content_type') == 'currency':
-                                    formatted_number = f"{numeric_value:,.2f}"
-                                else:
-                                    formatted_number = f"{numeric_value:,.0f}" if numeric_value == int(numeric_value) else f"{numeric_value:,.2f}"
-                                processed_row.append(formatted_number)
+        try:
+            if col_idx < len(analysis):
+                col_analysis = analysis[col_idx]
+                
+                # 🎯 SPECIAL HANDLING FOR DIFFERENT CONTENT TYPES
+                if col_analysis.get('content_type') in ['currency', 'number']:
+                    # Format numbers properly
+                    try:
+                        if cell is not None and str(cell).strip():
+                            numeric_value = float(str(cell).replace(',', ''))
+                            if col_analysis.get('content_type') == 'currency':
+                                formatted_number = f"{numeric_value:,.2f}"
                             else:
-                                processed_row.append("0.00" if col_analysis.get('content_type') == 'currency' else "0")
-                        except (ValueError, TypeError):
-                            processed_row.append(cell_str)
-                            
-                    elif col_analysis.get('is_description_column'):
-                        # Special handling for description columns
-                        if len(cell_str) > 100:  # Long descriptions
-                            if len(cell_str) > 300:
-                                cell_str = cell_str[:297] + "..."
-                            processed_row.append(Paragraph(cell_str, description_style))
+                                formatted_number = f"{numeric_value:,.0f}" if numeric_value == int(numeric_value) else f"{numeric_value:,.2f}"
+                            processed_row.append(formatted_number)
                         else:
-                            processed_row.append(cell_str)
-                            
+                            processed_row.append("0.00" if col_analysis.get('content_type') == 'currency' else "0")
+                    except (ValueError, TypeError):
+                        processed_row.append(cell_str)
+                        
+                elif col_analysis.get('is_description_column'):
+                    # Special handling for description columns
+                    if len(cell_str) > 100:  # Long descriptions
+                        if len(cell_str) > 300:
+                            cell_str = cell_str[:297] + "..."
+                        processed_row.append(Paragraph(cell_str, cell_styles['description']))
                     else:
-                        # Regular text handling
-                        col_width_chars = int(col_widths[col_idx] / 0.08)
+                        processed_row.append(cell_str)
                         
-                        if len(cell_str) > col_width_chars:
-                            if len(cell_str) > 200:
-                                cell_str = cell_str[:197] + "..."
-                            processed_row.append(Paragraph(cell_str, text_style))
-                        else:
-                            processed_row.append(cell_str)
                 else:
-                    # Fallback
-                    if len(cell_str) > 25:
-                        processed_row.append(Paragraph(cell_str, text_style))
+                    # Regular text handling
+                    col_width_chars = int(col_widths[col_idx] / 0.08)
+                    
+                    if len(cell_str) > col_width_chars:
+                        if len(cell_str) > 200:
+                            cell_str = cell_str[:197] + "..."
+                        processed_row.append(Paragraph(cell_str, cell_styles['text']))
                     else:
                         processed_row.append(cell_str)
-                        
-            except Exception:
-                processed_row.append(str(cell)[:50] if cell else "")
-        
-        processed_data.append(processed_row)
-    
-    # 🎯 CREATE TABLE WITH DYNAMIC WIDTHS
-    try:
-        table = Table(
-            processed_data, 
-            colWidths=col_widths, 
-            repeatRows=1,
-            splitByRow=True,
-            spaceBefore=10,
-            spaceAfter=10
-        )
-    except Exception:
-        table = Table(processed_data, repeatRows=1)
+            else:
+                # Fallback
+                if len(cell_str) > 25:
+                    processed_row.append(Paragraph(cell_str, cell_styles['text']))
+                else:
+                    processed_row.append(cell_str)
+                    
+        except Exception:
+            processed_row.append(str(cell)[:50] if cell else "")
     
+    return processed_row
+
+def _pdf_table_style(headers, analysis):
     # 🎯 ENHANCED TABLE STYLING
     table_style = [
         # Header styling
@@ -821,18 +814,86 @@ def export_to_pdf(data, filename, headers, title, company_name, page_size=None):
     except Exception:
         pass
     
-    table.setStyle(TableStyle(table_style))
+    return table_style
+
+def _pdf_title_flowables(title, company_name, styles):
+    # Company name and title
+    title_style = styles['Title']
+    title_style.fontSize = 18
+    
+    return [
+        Paragraph(f"{company_name}", title_style),
+        Paragraph(f"{title}", styles['Heading2']),
+        Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']),
+        Spacer(1, 15),
+    ]
+
+def _draw_pdf_footer(canv, page_size, company_name, title, page_num=None):
+    try:
+        if page_num is not None:
+            canv.drawRightString(page_size[0] - 0.5*inch, 0.5*inch, f"Page {page_num}")
+        canv.drawString(0.5*inch, 0.5*inch, f"{company_name} - {title}")
+    except Exception:
+        pass
+
+def export_to_pdf(data, filename, headers, title, company_name, page_size=None):
+    """Export data to PDF format with DYNAMIC description handling and proper number formatting"""
+    if len(data) > PDF_CHUNKED_ROW_THRESHOLD:
+        # Large ledgers are rendered page by page to keep memory flat
+        return export_to_pdf_chunked(data, filename, headers, title, company_name, page_size)
+    
+    response = HttpResponse(content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+    
+    if page_size is None:
+        page_size = landscape(A4)
+    
+    doc = SimpleDocTemplate(
+        response, 
+        pagesize=page_size, 
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch,
+        leftMargin=0.5*inch,
+        rightMargin=0.5*inch
+    )
+    
+    styles = getSampleStyleSheet()
+    elements = _pdf_title_flowables(title, company_name, styles)
+    
+    # Calculate available width
+    available_width = page_size[0] - 1*inch
+    
+    # 🧠 GET ANALYSIS FOR SMART FORMATTING
+    analysis = _analyze_pdf_columns(headers, data)
+    
+    # 🎯 DYNAMIC COLUMN WIDTH CALCULATION
+    col_widths = _pdf_column_widths(headers, analysis, available_width)
+    
+    # 🎯 PROCESS DATA WITH ENHANCED FORMATTING
+    cell_styles = _pdf_cell_styles(styles)
+    processed_data = [_pdf_header_row(headers, cell_styles)]
+    for row in data:
+        processed_data.append(_pdf_process_row(row, analysis, col_widths, cell_styles))
+    
+    # 🎯 CREATE TABLE WITH DYNAMIC WIDTHS
+    try:
+        table = Table(
+            processed_data, 
+            colWidths=col_widths, 
+            repeatRows=1,
+            splitByRow=True,
+            spaceBefore=10,
+            spaceAfter=10
+        )
+    except Exception:
+        table = Table(processed_data, repeatRows=1)
+    
+    table.setStyle(TableStyle(_pdf_table_style(headers, analysis)))
     elements.append(table)
     
     # Page footer
     def add_page_number(canvas, doc):
-        try:
-            page_num = canvas.getPageNumber()
-            text = f"Page {page_num}"
-            canvas.drawRightString(page_size[0] - 0.5*inch, 0.5*inch, text)
-            canvas.drawString(0.5*inch, 0.5*inch, f"{company_name} - {title}")
-        except Exception:
-            pass
+        _draw_pdf_footer(canvas, page_size, company_name, title, canvas.getPageNumber())
     
     # Build document
     try:
@@ -850,6 +911,198 @@ def export_to_pdf(data, filename, headers, title, company_name, page_size=None):
     
     return response
 
+def _pdf_layout(headers, data, page_size):
+    """Column analysis and widths computed once and shared by every page and section"""
+    analysis = _analyze_pdf_columns(headers, data[:PDF_ANALYSIS_SAMPLE_ROWS])
+    col_widths = _pdf_column_widths(headers, analysis, page_size[0] - 1*inch)
+    return {'page_size': page_size, 'analysis': analysis, 'col_widths': col_widths}
+
+def _render_pdf_pages(output, data, headers, title, company_name, layout, include_title=True,
+                      number_pages=True, progress_callback=None, progress_offset=0, progress_total=None):
+    """
+    Draws the report straight onto a canvas one page at a time.
+    Each page gets its own table holding only the rows that fit, with the header row
+    repeated, so only one page worth of cells is ever held in memory.
+    Returns the number of pages drawn.
+    """
+    page_size = layout['page_size']
+    analysis = layout['analysis']
+    col_widths = layout['col_widths']
+    
+    styles = getSampleStyleSheet()
+    cell_styles = _pdf_cell_styles(styles)
+    header_row = _pdf_header_row(headers, cell_styles)
+    table_style = TableStyle(_pdf_table_style(headers, analysis))
+    
+    canv = pdf_canvas.Canvas(output, pagesize=page_size, pageCompression=1)
+    canv.setTitle(f"{company_name} - {title}")
+    
+    frame_x = 0.5*inch
+    frame_top = page_size[1] - 0.75*inch
+    frame_bottom = 0.75*inch
+    frame_width = page_size[0] - 1*inch
+    
+    total_rows = len(data)
+    if progress_total is None:
+        progress_total = total_rows
+    position = 0
+    page_num = 0
+    rows_per_page = 0
+    
+    while True:
+        page_num += 1
+        y = frame_top
+        
+        if include_title and page_num == 1:
+            for flowable in _pdf_title_flowables(title, company_name, styles):
+                _, height = flowable.wrapOn(canv, frame_width, y - frame_bottom)
+                flowable.drawOn(canv, frame_x, y - height)
+                y -= height
+        
+        available_height = y - frame_bottom
+        # No row is shorter than PDF_MIN_ROW_HEIGHT, so max_rows always fills the page.
+        # Start from what fitted on the previous page to avoid wrapping rows twice.
+        max_rows = int(available_height // PDF_MIN_ROW_HEIGHT) + 1
+        batch_size = min(max_rows, int(rows_per_page * 1.5) + 1) if rows_per_page else max_rows
+        
+        while position < total_rows:
+            batch = data[position:position + batch_size]
+            rows = [header_row] + [_pdf_process_row(row, analysis, col_widths, cell_styles) for row in batch]
+            table = Table(rows, colWidths=col_widths, repeatRows=1)
+            table.setStyle(table_style)
+            parts = table.split(frame_width, available_height)
+            
+            if parts and parts[0] is table and batch_size < max_rows and position + batch_size < total_rows:
+                # Everything fitted but the page may have room left: retry with the full bound
+                batch_size = max_rows
+                continue
+            
+            if parts and parts[0] is table:
+                rows_drawn = len(batch)
+            elif parts and len(parts[0]._cellvalues) > 1:
+                rows_drawn = len(parts[0]._cellvalues) - 1
+            else:
+                # A single row taller than the page: draw it on its own and let it clip
+                rows_drawn = 1
+            
+            if rows_drawn < len(batch):
+                # Reuse the measured row heights so the fitted rows are not wrapped again
+                table = Table(
+                    rows[:rows_drawn + 1],
+                    colWidths=col_widths,
+                    rowHeights=table._rowHeights[:rows_drawn + 1],
+                    repeatRows=1
+                )
+                table.setStyle(table_style)
+            
+            _, height = table.wrapOn(canv, frame_width, available_height)
+            table.drawOn(canv, frame_x, y - height)
+            position += rows_drawn
+            rows_per_page = rows_drawn
+            break
+        
+        _draw_pdf_footer(canv, page_size, company_name, title, page_num if number_pages else None)
+        canv.showPage()
+        
+        if progress_callback:
+            progress_callback(progress_offset + position, progress_total)
+        
+        if position >= total_rows:
+            break
+    
+    canv.save()
+    return page_num
+
+def _render_pdf_section(section_index, rows, headers, title, company_name, layout, path):
+    """Process pool entry point: renders one section of a report to its own file"""
+    return _render_pdf_pages(
+        path, rows, headers, title, company_name, layout,
+        include_title=(section_index == 0),
+        number_pages=False
+    )
+
+def _merge_pdf_sections(section_paths, output, page_size):
+    """Concatenates section files and stamps continuous page numbers over the result"""
+    writer = PdfWriter()
+    for path in section_paths:
+        writer.append(path)
+    
+    stamps = io.BytesIO()
+    stamp_canvas = pdf_canvas.Canvas(stamps, pagesize=page_size)
+    for page_num in range(1, len(writer.pages) + 1):
+        stamp_canvas.drawRightString(page_size[0] - 0.5*inch, 0.5*inch, f"Page {page_num}")
+        stamp_canvas.showPage()
+    stamp_canvas.save()
+    stamps.seek(0)
+    
+    for page, stamp in zip(writer.pages, PdfReader(stamps).pages):
+        page.merge_page(stamp)
+    
+    writer.write(output)
+    return len(writer.pages)
+
+def render_pdf_to_file(data, headers, title, company_name, output, page_size=None,
+                       progress_callback=None, parallel_sections=0):
+    """
+    Renders a report PDF page by page into ``output`` (a path or binary file object).
+    
+    Args:
+        progress_callback: Optional callable receiving (rows_done, total_rows) as pages complete.
+        parallel_sections: Number of worker processes. When greater than 1 and pypdf is
+            installed, the rows are split into sections of PDF_SECTION_ROWS which are
+            rendered concurrently and merged. Otherwise rendering happens in-process.
+    
+    Returns the number of pages written.
+    """
+    if page_size is None:
+        page_size = landscape(A4)
+    
+    layout = _pdf_layout(headers, data, page_size)
+    total_rows = len(data)
+    
+    if parallel_sections <= 1 or PdfWriter is None or total_rows <= PDF_SECTION_ROWS:
+        return _render_pdf_pages(
+            output, data, headers, title, company_name, layout,
+            progress_callback=progress_callback
+        )
+    
+    section_dir = tempfile.mkdtemp(prefix='pdf_sections_')
+    section_paths = []
+    try:
+        with ProcessPoolExecutor(max_workers=parallel_sections) as executor:
+            futures = {}
+            for section_index, start in enumerate(range(0, total_rows, PDF_SECTION_ROWS)):
+                path = os.path.join(section_dir, f'section_{section_index:05d}.pdf')
+                section_paths.append(path)
+                rows = data[start:start + PDF_SECTION_ROWS]
+                future = executor.submit(
+                    _render_pdf_section, section_index, rows, headers, title, company_name, layout, path
+                )
+                futures[future] = len(rows)
+            
+            rows_done = 0
+            for future in as_completed(futures):
+                future.result()
+                rows_done += futures[future]
+                if progress_callback:
+                    progress_callback(rows_done, total_rows)
+        
+        return _merge_pdf_sections(section_paths, output, page_size)
+    finally:
+        shutil.rmtree(section_dir, ignore_errors=True)
+
+def export_to_pdf_chunked(data, filename, headers, title, company_name, page_size=None,
+                          progress_callback=None, parallel_sections=0):
+    """Export a large report to PDF through a spooled file and stream it back"""
+    spool = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_MEMORY)
+    render_pdf_to_file(
+        data, headers, title, company_name, spool, page_size,
+        progress_callback=progress_callback,
+        parallel_sections=parallel_sections
+    )
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=f"{filename}.pdf", content_type='application/pdf')
+
 def export_hierarchical_to_excel(data, filename, title, company_name):
     """Export hierarchical data with DYNAMIC column widths"""
     output = io.BytesIO()
@@ -943,32 +1196,42 @@ def export_hierarchical_to_excel(data, filename, title, company_name):
     
     return response
 
+REPORT_FILE_EXTENSIONS = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+    'pdf': 'pdf',
+}
+
+def render_report_to_file(data, headers, title, company_name, format_type, output):
+    """
+    Render an export straight to ``output`` (a path) without building an HttpResponse.
+    Returns False for an unknown format.
+    """
+    if format_type == 'csv':
+        render_csv_to_file(data, headers, output)
+    elif format_type == 'excel':
+        render_excel_to_file(data, headers, output, title, company_name)
+    elif format_type == 'pdf':
+        render_pdf_to_file(data, headers, title, company_name, output)
+    else:
+        return False
+    return True
+
 def export_and_email(data, filename, headers, title, company_name, format_type='excel', recipient_emails=None):
     """Export data and optionally email it as attachment"""
     import tempfile
     import os
     from apps.core.email_utils import send_email
     
-    if not recipient_emails:
+    if not recipient_emails or format_type not in REPORT_FILE_EXTENSIONS:
         return None
     
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{format_type}') as temp_file:
-        temp_path = temp_file.name
+    # Render straight into a temporary file named after the export
+    temp_dir = tempfile.mkdtemp(prefix='report_')
+    temp_path = os.path.join(temp_dir, f'{filename}.{REPORT_FILE_EXTENSIONS[format_type]}')
     
     try:
-        if format_type == 'csv':
-            response = export_to_csv(data, filename, headers)
-        elif format_type == 'excel':
-            response = export_to_excel(data, filename, headers, title, company_name)
-        elif format_type == 'pdf':
-            response = export_to_pdf(data, filename, headers, title, company_name)
-        else:
-            return None
-        
-        # Write response content to temp file
-        with open(temp_path, 'wb') as f:
-            f.write(response.content)
+        render_report_to_file(data, headers, title, company_name, format_type, temp_path)
         
         # Send email with attachment
         success = send_email(
@@ -987,8 +1250,7 @@ def export_and_email(data, filename, headers, title, company_name, format_type='
         
     finally:
         # Clean up temp file
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
 def export_to_pdf_custom(data, filename, headers, title, company_name, orientation='landscape', paper_size='A4'):
     """Export to PDF with custom orientation and paper size options"""
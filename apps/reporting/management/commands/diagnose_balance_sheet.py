@@ -1,55 +1,101 @@
 # apps/reports/management/commands/diagnose_balance_sheet.py
 
+import json
 from django.core.management.base import BaseCommand
-from django.db.models import Sum, Q
-from apps.accounts.models import Account, AccountType
-from apps.journal.models import JournalEntryLine
+from django.core.serializers.json import DjangoJSONEncoder
+from apps.accounts.models import AccountType
+from apps.accounts.tree import load_account_tree
+from apps.journal.integrity import unbalanced_entries
 from apps.core.models import Company
 from decimal import Decimal
 
 class Command(BaseCommand):
     help = 'Diagnose balance sheet calculation issues'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', type=int, help='Company ID to diagnose')
+        parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
+
     def handle(self, *args, **options):
         companies = Company.objects.all()
-        
-        for company in companies:
-            self.stdout.write(f"\n=== BALANCE SHEET DIAGNOSIS FOR {company.name} ===")
-            
-            # Get all accounts with balances
-            accounts = Account.objects.filter(company=company)
-            
-            total_assets = Decimal('0.00')
-            total_liabilities = Decimal('0.00')
-            total_equity = Decimal('0.00')
-            
+        if options['company_id']:
+            companies = companies.filter(id=options['company_id'])
+
+        reports = [self.diagnose(company) for company in companies]
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps({'companies': reports}, cls=DjangoJSONEncoder, indent=2))
+            return
+
+        for report in reports:
+            self.stdout.write(f"\n=== BALANCE SHEET DIAGNOSIS FOR {report['company']} ===")
             self.stdout.write(f"\n--- ACCOUNT HIERARCHY AND BALANCES ---")
-            
-            for account in accounts:
-                balance = account.get_balance()
-                if balance != 0:
-                    account_type = account.account_type.category if account.account_type else "Unknown"
-                    
-                    # Show hierarchy
-                    indent = "  " * account.level if hasattr(account, 'level') else ""
-                    parent_info = f" (Parent: {account.parent.account_number})" if account.parent else " (Root)"
-                    has_transactions = "✓" if account.journal_lines.exists() else "✗"
-                    
-                    self.stdout.write(f"{indent}{account.account_number} - {account.name}: ₦{balance} ({account_type}){parent_info} [Transactions: {has_transactions}]")
-                    
-                    # Only count LEAF accounts (accounts with actual transactions) for totals
-                    if account.journal_lines.exists():
-                        if account_type == AccountType.Category.ASSET:
-                            total_assets += balance
-                        elif account_type == AccountType.Category.LIABILITY:
-                            total_liabilities += abs(balance)
-                        elif account_type in [AccountType.Category.EQUITY, AccountType.Category.REVENUE]:
-                            total_equity += abs(balance)
-                        elif account_type == AccountType.Category.EXPENSE:
-                            total_equity -= balance
-            
+            for account in report['accounts']:
+                indent = "  " * account['level']
+                parent_info = f" (Parent: {account['parent']})" if account['parent'] else " (Root)"
+                has_transactions = "✓" if account['has_transactions'] else "✗"
+                self.stdout.write(
+                    f"{indent}{account['account_number']} - {account['name']}: ₦{account['balance']} "
+                    f"({account['category']}){parent_info} [Transactions: {has_transactions}]"
+                )
+
+            totals = report['totals']
             self.stdout.write(f"\n--- CORRECTED TOTALS (LEAF ACCOUNTS ONLY) ---")
-            self.stdout.write(f"Total Assets: ₦{total_assets}")
-            self.stdout.write(f"Total Liabilities: ₦{total_liabilities}")
-            self.stdout.write(f"Total Equity: ₦{total_equity}")
-            self.stdout.write(f"Assets - (Liabilities + Equity): ₦{total_assets - (total_liabilities + total_equity)}")
+            self.stdout.write(f"Total Assets: ₦{totals['assets']}")
+            self.stdout.write(f"Total Liabilities: ₦{totals['liabilities']}")
+            self.stdout.write(f"Total Equity: ₦{totals['equity']}")
+            self.stdout.write(f"Assets - (Liabilities + Equity): ₦{totals['difference']}")
+            if report['unbalanced_entries']:
+                self.stdout.write(self.style.WARNING(
+                    f"{len(report['unbalanced_entries'])} unbalanced journal entries "
+                    f"(see validate_journal_entries) account for part of any difference"
+                ))
+
+    def diagnose(self, company):
+        """Non-zero account balances and leaf-account totals from one pass over the account tree"""
+        accounts = load_account_tree(company)
+        by_id = {account.id: account for account in accounts}
+
+        total_assets = Decimal('0.00')
+        total_liabilities = Decimal('0.00')
+        total_equity = Decimal('0.00')
+        rows = []
+
+        for account in accounts:
+            if account.balance == 0:
+                continue
+            account_type = account.account_type.category
+            parent = by_id.get(account.parent_id)
+            rows.append({
+                'id': account.id,
+                'account_number': account.account_number,
+                'name': account.name,
+                'level': account.level,
+                'parent': parent.account_number if parent else None,
+                'category': account_type,
+                'balance': account.balance,
+                'has_transactions': account.has_lines,
+            })
+
+            # Only count LEAF accounts (accounts with actual transactions) for totals
+            if account.has_lines:
+                if account_type == AccountType.Category.ASSET:
+                    total_assets += account.balance
+                elif account_type == AccountType.Category.LIABILITY:
+                    total_liabilities += abs(account.balance)
+                elif account_type in [AccountType.Category.EQUITY, AccountType.Category.REVENUE]:
+                    total_equity += abs(account.balance)
+                elif account_type == AccountType.Category.EXPENSE:
+                    total_equity -= account.balance
+
+        return {
+            'company_id': company.id,
+            'company': company.name,
+            'accounts': rows,
+            'totals': {
+                'assets': total_assets,
+                'liabilities': total_liabilities,
+                'equity': total_equity,
+                'difference': total_assets - (total_liabilities + total_equity),
+            },
+            'unbalanced_entries': unbalanced_entries(company),
+        }
@@ -0,0 +1,78 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\management\commands\export_report_pdf.py
+import os
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from apps.core.models import Company
+from apps.reporting.export_utils import render_pdf_to_file
+from apps.reporting.utils import build_general_ledger_export_rows
+
+REPORTS = {
+    'general_ledger': (
+        'General Ledger',
+        ['Account Code', 'Account Name', 'Date', 'Description', 'Debit', 'Credit', 'Balance'],
+        build_general_ledger_export_rows,
+    ),
+}
+
+class Command(BaseCommand):
+    help = 'Render a large report to PDF in the background, reporting progress as pages are written'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', type=int, required=True, help='Company to export')
+        parser.add_argument(
+            '--report',
+            choices=sorted(REPORTS.keys()),
+            default='general_ledger',
+            help='Report to render'
+        )
+        parser.add_argument('--output', help='Destination file (defaults to MEDIA_ROOT/exports/)')
+        parser.add_argument(
+            '--parallel',
+            type=int,
+            default=0,
+            help='Render sections in this many processes and merge them (requires pypdf)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            company = Company.objects.get(id=options['company_id'])
+        except Company.DoesNotExist:
+            raise CommandError(f"Company {options['company_id']} does not exist.")
+
+        title, headers, build_rows = REPORTS[options['report']]
+
+        output = options.get('output')
+        if not output:
+            export_dir = os.path.join(settings.MEDIA_ROOT, 'exports')
+            os.makedirs(export_dir, exist_ok=True)
+            output = os.path.join(
+                export_dir,
+                f"{options['report']}_{company.name.lower().replace(' ', '_')}_{date.today()}.pdf"
+            )
+
+        self.stdout.write(f"Building {title} for {company.name}...")
+        started = time.monotonic()
+        data = build_rows(company)
+        self.stdout.write(f"  {len(data)} rows in {time.monotonic() - started:.1f}s")
+
+        last_reported = {'percent': -1}
+
+        def report_progress(rows_done, total_rows):
+            percent = int(rows_done * 100 / total_rows) if total_rows else 100
+            # Only print every 5% so large ledgers don't flood the log
+            if percent >= last_reported['percent'] + 5 or rows_done >= total_rows:
+                last_reported['percent'] = percent
+                self.stdout.write(f"  Rendered {rows_done}/{total_rows} rows ({percent}%)")
+
+        started = time.monotonic()
+        pages = render_pdf_to_file(
+            data, headers, title, company.name, output,
+            progress_callback=report_progress,
+            parallel_sections=options['parallel']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {pages} pages to {output} in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,61 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\management\commands\send_scheduled_reports.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.reporting.models import ReportScheduleRun
+from apps.reporting.tasks import deliver_report_schedules, get_due_schedules, render_key
+
+class Command(BaseCommand):
+    help = 'Render and email every report schedule that is due (run from cron, e.g. every 15 minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=int,
+            help='Send due schedules for specific company only',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be rendered and sent without doing it',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        schedules = get_due_schedules(now, options.get('company_id'))
+
+        if not schedules:
+            self.stdout.write("No report schedules are due.")
+            return
+
+        if options.get('dry_run'):
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No reports will be rendered or sent'))
+            today = timezone.localdate(now)
+            renders = set()
+            for schedule in schedules:
+                key = (schedule.company_id,) + render_key(schedule, today)
+                shared = key in renders
+                renders.add(key)
+                self.stdout.write(
+                    f"  {schedule} -> {', '.join(schedule.get_recipient_list())} "
+                    f"[{schedule.get_format_display()}, {schedule.get_period_label(today)}]"
+                    f"{' (reuses render)' if shared else ''}"
+                )
+            self.stdout.write(f"{len(schedules)} schedules due, {len(renders)} renders needed.")
+            return
+
+        self.stdout.write(f"Delivering {len(schedules)} due report schedules...")
+        runs = deliver_report_schedules(schedules, now, log=self.stdout.write)
+
+        failed = [run for run in runs if run.status == ReportScheduleRun.StatusChoices.FAILED]
+        render_seconds = sum(run.render_seconds for run in runs if not run.shared_render)
+        send_seconds = sum(run.send_seconds for run in runs)
+
+        summary = (
+            f"Sent {len(runs) - len(failed)}/{len(runs)} scheduled reports "
+            f"(render {render_seconds:.1f}s, send {send_seconds:.1f}s)"
+        )
+        if failed:
+            self.stdout.write(self.style.ERROR(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
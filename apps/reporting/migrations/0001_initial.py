@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:23
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0004_company_fiscal_closing_grace_period_months_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('report', models.CharField(choices=[('trial_balance', 'Trial Balance'), ('income_statement', 'Income Statement'), ('balance_sheet', 'Balance Sheet'), ('general_ledger', 'General Ledger')], max_length=30)),
+                ('format', models.CharField(choices=[('pdf', 'PDF'), ('excel', 'Excel'), ('csv', 'CSV')], default='pdf', max_length=10)),
+                ('period', models.CharField(choices=[('MONTH_TO_DATE', 'Month to Date'), ('PREVIOUS_MONTH', 'Previous Month'), ('YEAR_TO_DATE', 'Year to Date'), ('PREVIOUS_YEAR', 'Previous Year'), ('ALL_TIME', 'All Time')], default='MONTH_TO_DATE', max_length=20)),
+                ('recipients', models.TextField(help_text='Comma-separated email addresses')),
+                ('cadence', models.CharField(choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly')], default='MONTHLY', max_length=10)),
+                ('send_time', models.TimeField(default=datetime.time(8, 0), help_text='What time of day to send the report (24-hour format)')),
+                ('is_active', models.BooleanField(default=True)),
+                ('next_run_at', models.DateTimeField(blank=True, help_text='When the report is next due (blank = due now)', null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_schedules', to='core.company')),
+            ],
+            options={
+                'ordering': ['company', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportScheduleRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('SUCCESS', 'Success'), ('FAILED', 'Failed')], max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('render_seconds', models.FloatField(default=0, help_text='Time spent rendering the report (shared with schedules using the same render)')),
+                ('send_seconds', models.FloatField(default=0)),
+                ('total_seconds', models.FloatField(default=0)),
+                ('shared_render', models.BooleanField(default=False, help_text='The file was rendered for another schedule in the same run and reused')),
+                ('file_size', models.PositiveIntegerField(default=0)),
+                ('recipient_count', models.PositiveIntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='reporting.reportschedule')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reportschedule',
+            index=models.Index(fields=['is_active', 'next_run_at'], name='reporting_r_is_acti_c913b7_idx'),
+        ),
+    ]
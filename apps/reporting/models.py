@@ -1,3 +1,144 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\models.py
+from datetime import datetime, time, timedelta
+from dateutil.relativedelta import relativedelta
 from django.db import models
+from django.utils import timezone
+from apps.core.models import Company
 
-# Create your models here.
+class ReportSchedule(models.Model):
+    """A report that is rendered and emailed to a list of recipients on a fixed cadence."""
+    class ReportChoices(models.TextChoices):
+        TRIAL_BALANCE = 'trial_balance', 'Trial Balance'
+        INCOME_STATEMENT = 'income_statement', 'Income Statement'
+        BALANCE_SHEET = 'balance_sheet', 'Balance Sheet'
+        GENERAL_LEDGER = 'general_ledger', 'General Ledger'
+
+    class FormatChoices(models.TextChoices):
+        PDF = 'pdf', 'PDF'
+        EXCEL = 'excel', 'Excel'
+        CSV = 'csv', 'CSV'
+
+    class PeriodChoices(models.TextChoices):
+        MONTH_TO_DATE = 'MONTH_TO_DATE', 'Month to Date'
+        PREVIOUS_MONTH = 'PREVIOUS_MONTH', 'Previous Month'
+        YEAR_TO_DATE = 'YEAR_TO_DATE', 'Year to Date'
+        PREVIOUS_YEAR = 'PREVIOUS_YEAR', 'Previous Year'
+        ALL_TIME = 'ALL_TIME', 'All Time'
+
+    class CadenceChoices(models.TextChoices):
+        DAILY = 'DAILY', 'Daily'
+        WEEKLY = 'WEEKLY', 'Weekly'
+        MONTHLY = 'MONTHLY', 'Monthly'
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='report_schedules'
+    )
+    name = models.CharField(max_length=100)
+    report = models.CharField(max_length=30, choices=ReportChoices.choices)
+    format = models.CharField(max_length=10, choices=FormatChoices.choices, default=FormatChoices.PDF)
+    period = models.CharField(max_length=20, choices=PeriodChoices.choices, default=PeriodChoices.MONTH_TO_DATE)
+    recipients = models.TextField(help_text="Comma-separated email addresses")
+    cadence = models.CharField(max_length=10, choices=CadenceChoices.choices, default=CadenceChoices.MONTHLY)
+    send_time = models.TimeField(
+        default=time(8, 0),
+        help_text="What time of day to send the report (24-hour format)"
+    )
+    is_active = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the report is next due (blank = due now)"
+    )
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['company', 'name']
+        indexes = [
+            models.Index(fields=['is_active', 'next_run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_cadence_display()}) - {self.company.name}"
+
+    def get_recipient_list(self):
+        return [email.strip() for email in self.recipients.split(',') if email.strip()]
+
+    def get_period_dates(self, today=None):
+        """(start_date, end_date) covered by this schedule's period; None means unbounded"""
+        today = today or timezone.localdate()
+
+        if self.period == self.PeriodChoices.MONTH_TO_DATE:
+            return today.replace(day=1), today
+        if self.period == self.PeriodChoices.PREVIOUS_MONTH:
+            end_date = today.replace(day=1) - timedelta(days=1)
+            return end_date.replace(day=1), end_date
+        if self.period == self.PeriodChoices.YEAR_TO_DATE:
+            return today.replace(month=1, day=1), today
+        if self.period == self.PeriodChoices.PREVIOUS_YEAR:
+            start_date = today.replace(year=today.year - 1, month=1, day=1)
+            return start_date, start_date.replace(month=12, day=31)
+        return None, today
+
+    def get_period_label(self, today=None):
+        start_date, end_date = self.get_period_dates(today)
+        if start_date is None:
+            return f"Up to {end_date.strftime('%d %b %Y')}"
+        return f"{start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}"
+
+    def is_due(self, now=None):
+        now = now or timezone.now()
+        return self.is_active and (self.next_run_at is None or self.next_run_at <= now)
+
+    def calculate_next_run(self, now=None):
+        """First send time after ``now`` on this schedule's cadence"""
+        now = now or timezone.now()
+        step = {
+            self.CadenceChoices.DAILY: relativedelta(days=1),
+            self.CadenceChoices.WEEKLY: relativedelta(weeks=1),
+            self.CadenceChoices.MONTHLY: relativedelta(months=1),
+        }[self.cadence]
+
+        base = timezone.localtime(self.next_run_at) if self.next_run_at else timezone.localtime(now)
+        next_run = timezone.make_aware(datetime.combine(base.date(), self.send_time))
+        # Skip any runs that were missed while the runner was not scheduled
+        while next_run <= now:
+            next_run += step
+        return next_run
+
+class ReportScheduleRun(models.Model):
+    """One delivery attempt of a ReportSchedule, with how long each stage took."""
+    class StatusChoices(models.TextChoices):
+        SUCCESS = 'SUCCESS', 'Success'
+        FAILED = 'FAILED', 'Failed'
+
+    schedule = models.ForeignKey(
+        ReportSchedule,
+        on_delete=models.CASCADE,
+        related_name='runs'
+    )
+    status = models.CharField(max_length=20, choices=StatusChoices.choices)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    render_seconds = models.FloatField(
+        default=0,
+        help_text="Time spent rendering the report (shared with schedules using the same render)"
+    )
+    send_seconds = models.FloatField(default=0)
+    total_seconds = models.FloatField(default=0)
+    shared_render = models.BooleanField(
+        default=False,
+        help_text="The file was rendered for another schedule in the same run and reused"
+    )
+    file_size = models.PositiveIntegerField(default=0)
+    recipient_count = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.schedule.name} at {self.started_at.strftime('%Y-%m-%d %H:%M')} ({self.status})"
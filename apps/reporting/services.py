@@ -0,0 +1,315 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\services.py
+"""
+Report datasets shared by the on-screen reports and their exports.
+
+Each build_* function computes a report from one grouped aggregate over the
+journal lines; the matching get_* function serves it through the report cache.
+"""
+from decimal import Decimal
+from apps.accounts.models import AccountType
+from apps.accounts.tree import DEBIT_BALANCE_CATEGORIES, load_account_tree, natural_balance as _natural_balance
+from .cache import get_cached_report
+from .utils import build_general_ledger_export_rows
+
+TRIAL_BALANCE = 'trial_balance'
+INCOME_STATEMENT = 'income_statement'
+BALANCE_SHEET = 'balance_sheet'
+
+CACHED_REPORTS = [TRIAL_BALANCE, INCOME_STATEMENT, BALANCE_SHEET]
+
+def _load_account_totals(company, start_date=None, end_date=None):
+    """
+    Loads the company's accounts with their direct debit/credit totals and the
+    totals rolled up over each account's descendants, which is what
+    Account.get_balance() returns (see apps.accounts.tree).
+
+    Returns (accounts, direct_totals, rolled_totals) where the totals are dicts of
+    account_id -> [total_debit, total_credit]. Accounts without lines are absent
+    from direct_totals.
+    """
+    accounts = load_account_tree(company, start_date, end_date)
+    direct_totals = {
+        account.id: [account.direct_debit, account.direct_credit]
+        for account in accounts if account.has_lines
+    }
+    rolled_totals = {
+        account.id: [account.total_debit, account.total_credit]
+        for account in accounts if account.has_lines_below
+    }
+    accounts.sort(key=lambda account: account.account_number)
+    return accounts, direct_totals, rolled_totals
+
+def build_trial_balance(company, start_date=None, end_date=None):
+    """
+    Trial balance over the accounts that have journal lines (leaf accounts).
+    Zero-balance accounts are kept with is_zero=True; the screen hides them.
+    """
+    accounts, direct_totals, rolled_totals = _load_account_totals(company, start_date, end_date)
+
+    lines = []
+    total_debits = Decimal('0.00')
+    total_credits = Decimal('0.00')
+
+    for account in accounts:
+        # ONLY include accounts that have direct journal entries (leaf accounts)
+        if account.id not in direct_totals:
+            continue
+
+        balance = _natural_balance(account.account_type.category, *rolled_totals[account.id])
+        debit_balance = Decimal('0.00')
+        credit_balance = Decimal('0.00')
+
+        # For trial balance, show the natural balance side
+        if account.account_type.category in DEBIT_BALANCE_CATEGORIES:
+            if balance >= 0:
+                debit_balance = balance
+            else:
+                # Negative asset/expense balance goes on credit side
+                credit_balance = abs(balance)
+        else:
+            if balance >= 0:
+                credit_balance = balance
+            else:
+                # Negative liability/equity/revenue balance goes on debit side
+                debit_balance = abs(balance)
+
+        total_debits += debit_balance
+        total_credits += credit_balance
+
+        lines.append({
+            'code': account.account_number,
+            'name': account.name,
+            'debit': debit_balance,
+            'credit': credit_balance,
+            'is_zero': balance == 0,
+        })
+
+    return {
+        'lines': lines,
+        'total_debits': total_debits,
+        'total_credits': total_credits,
+        'difference': abs(total_debits - total_credits),
+    }
+
+def build_income_statement(company, start_date=None, end_date=None):
+    """Revenue and expense accounts with a non-zero balance from their own lines"""
+    accounts, direct_totals, _ = _load_account_totals(company, start_date, end_date)
+
+    revenue_lines = []
+    expense_lines = []
+    total_revenue = Decimal('0.00')
+    total_expenses = Decimal('0.00')
+
+    # Listed in chart-of-accounts tree order, like the account manager's default
+    for account in sorted(accounts, key=lambda account: (account.tree_id, account.lft)):
+        if account.id not in direct_totals:
+            continue
+        total_debit, total_credit = direct_totals[account.id]
+        calculated_balance = total_credit - total_debit
+        if calculated_balance == 0:
+            continue
+
+        if account.account_type.category == AccountType.Category.REVENUE:
+            # Revenue: Credit balance is positive
+            total_revenue += calculated_balance
+            revenue_lines.append({
+                'code': account.account_number,
+                'name': account.name,
+                'balance': calculated_balance,
+            })
+        elif account.account_type.category == AccountType.Category.EXPENSE:
+            # Expense: Debit balance is positive, so flip the sign
+            balance = calculated_balance * -1
+            total_expenses += balance
+            expense_lines.append({
+                'code': account.account_number,
+                'name': account.name,
+                'balance': balance,
+            })
+
+    net_income = total_revenue - total_expenses
+
+    return {
+        'revenue_lines': revenue_lines,
+        'total_revenue': total_revenue,
+        'expense_lines': expense_lines,
+        'total_expenses': total_expenses,
+        'net_income': net_income,
+        'is_profit': net_income >= 0,
+    }
+
+def build_balance_sheet(company, start_date=None, end_date=None):
+    """
+    Balance sheet over leaf accounts (accounts with journal lines) to prevent
+    double-counting parent/child accounts, with retained earnings from revenue
+    less expenses.
+    """
+    accounts, direct_totals, rolled_totals = _load_account_totals(company, start_date, end_date)
+
+    asset_lines = []
+    liability_lines = []
+    equity_lines = []
+    total_assets = Decimal('0.00')
+    total_liabilities = Decimal('0.00')
+    base_equity = Decimal('0.00')
+    total_revenue = Decimal('0.00')
+    total_expenses = Decimal('0.00')
+
+    for account in accounts:
+        if account.id not in direct_totals:
+            continue
+
+        category = account.account_type.category
+        balance = _natural_balance(category, *rolled_totals[account.id])
+
+        if category == AccountType.Category.REVENUE:
+            total_revenue += balance
+            continue
+        if category == AccountType.Category.EXPENSE:
+            total_expenses += balance
+            continue
+        if balance == 0:
+            continue
+
+        line_item = {
+            'code': account.account_number,
+            'name': account.name,
+            'balance': abs(balance)
+        }
+
+        if category == AccountType.Category.ASSET:
+            asset_lines.append(line_item)
+            total_assets += abs(balance)
+        elif category == AccountType.Category.LIABILITY:
+            liability_lines.append(line_item)
+            total_liabilities += abs(balance)
+        elif category == AccountType.Category.EQUITY:
+            equity_lines.append(line_item)
+            base_equity += abs(balance)
+
+    retained_earnings = total_revenue - total_expenses
+    total_equity = base_equity + retained_earnings
+
+    return {
+        'asset_lines': asset_lines,
+        'liability_lines': liability_lines,
+        'equity_lines': equity_lines,
+        'retained_earnings': retained_earnings,
+        'total_assets': total_assets,
+        'total_liabilities': total_liabilities,
+        'total_equity': total_equity,
+        'total_liabilities_and_equity': total_liabilities + total_equity,
+    }
+
+def get_trial_balance(company, start_date=None, end_date=None):
+    return get_cached_report(company, TRIAL_BALANCE, build_trial_balance, start_date=start_date, end_date=end_date)
+
+def get_income_statement(company, start_date=None, end_date=None):
+    return get_cached_report(company, INCOME_STATEMENT, build_income_statement, start_date=start_date, end_date=end_date)
+
+def get_balance_sheet(company, start_date=None, end_date=None):
+    return get_cached_report(company, BALANCE_SHEET, build_balance_sheet, start_date=start_date, end_date=end_date)
+
+def trial_balance_export_rows(report):
+    data = []
+    for line in report['lines']:
+        data.append([
+            line['code'],
+            line['name'],
+            line['debit'] if line['debit'] > 0 else '',
+            line['credit'] if line['credit'] > 0 else ''
+        ])
+    
+    # Add totals row
+    data.append(['', 'TOTALS', report['total_debits'], report['total_credits']])
+    return data
+
+def income_statement_export_rows(report):
+    data = []
+    
+    # Revenue section
+    data.append(['', '=== REVENUE ===', ''])
+    for line in report['revenue_lines']:
+        data.append([line['code'], line['name'], line['balance']])
+    
+    data.append(['', 'Total Revenue', report['total_revenue']])
+    data.append(['', '', ''])
+    
+    # Expense section
+    data.append(['', '=== EXPENSES ===', ''])
+    for line in report['expense_lines']:
+        data.append([line['code'], line['name'], line['balance']])
+    
+    data.append(['', 'Total Expenses', report['total_expenses']])
+    data.append(['', '', ''])
+    
+    data.append(['', '=== NET INCOME ===', report['net_income']])
+    return data
+
+def balance_sheet_export_rows(report):
+    data = []
+    
+    # --- ASSETS ---
+    data.append(['', '=== ASSETS ===', ''])
+    for line in report['asset_lines']:
+        data.append([line['code'], line['name'], line['balance']])
+    data.append(['', 'Total Assets', report['total_assets']])
+    data.append(['', '', ''])
+    
+    # --- LIABILITIES ---
+    data.append(['', '=== LIABILITIES ===', ''])
+    for line in report['liability_lines']:
+        data.append([line['code'], line['name'], line['balance']])
+    data.append(['', 'Total Liabilities', report['total_liabilities']])
+    data.append(['', '', ''])
+    
+    # --- EQUITY ---
+    data.append(['', '=== EQUITY ===', ''])
+    for line in report['equity_lines']:
+        data.append([line['code'], line['name'], line['balance']])
+    
+    data.append(['', 'Retained Earnings', report['retained_earnings']])
+    data.append(['', 'Total Equity', report['total_equity']])
+    data.append(['', '', ''])
+    data.append(['', 'Total Liabilities & Equity', report['total_liabilities_and_equity']])
+    return data
+
+GENERAL_LEDGER = 'general_ledger'
+
+# report name -> (title, headers, rows builder taking (company, start_date, end_date))
+EXPORTABLE_REPORTS = {
+    TRIAL_BALANCE: (
+        'Trial Balance',
+        ['Account Code', 'Account Name', 'Debit', 'Credit'],
+        lambda company, start_date, end_date: trial_balance_export_rows(
+            get_trial_balance(company, start_date, end_date)
+        ),
+    ),
+    INCOME_STATEMENT: (
+        'Income Statement',
+        ['Account Code', 'Account Name', 'Amount'],
+        lambda company, start_date, end_date: income_statement_export_rows(
+            get_income_statement(company, start_date, end_date)
+        ),
+    ),
+    BALANCE_SHEET: (
+        'Balance Sheet',
+        ['Account Code', 'Account Name', 'Amount'],
+        # A balance sheet is a position as at the end date
+        lambda company, start_date, end_date: balance_sheet_export_rows(
+            get_balance_sheet(company, end_date=end_date)
+        ),
+    ),
+    GENERAL_LEDGER: (
+        'General Ledger',
+        ['Account Code', 'Account Name', 'Date', 'Description', 'Debit', 'Credit', 'Balance'],
+        lambda company, start_date, end_date: build_general_ledger_export_rows(
+            company, start_date, end_date
+        ),
+    ),
+}
+
+def build_export_rows(company, report_name, start_date=None, end_date=None):
+    """Returns (title, headers, data) for one of EXPORTABLE_REPORTS"""
+    title, headers, build_rows = EXPORTABLE_REPORTS[report_name]
+    return title, headers, build_rows(company, start_date, end_date)
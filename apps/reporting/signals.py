@@ -0,0 +1,34 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.accounts.models import Account
+from apps.journal.models import JournalEntry, JournalEntryLine
+from .cache import bump_ledger_version
+
+# Note: queryset.update() and bulk_create() do not send these signals; code
+# that writes the ledger that way must call bump_ledger_version() itself.
+
+def _bump(company_id):
+    # In the writer's transaction: other connections see the new version only
+    # together with the change, and a rollback undoes both
+    if company_id:
+        bump_ledger_version(company_id)
+
+@receiver([post_save, post_delete], sender=JournalEntryLine)
+def invalidate_reports_for_line(sender, instance, **kwargs):
+    if JournalEntryLine.journal_entry.is_cached(instance):
+        company_id = instance.journal_entry.company_id
+    else:
+        company_id = Account.objects.filter(pk=instance.account_id).values_list('company_id', flat=True).first()
+    _bump(company_id)
+
+@receiver([post_save, post_delete], sender=JournalEntry)
+def invalidate_reports_for_entry(sender, instance, **kwargs):
+    # Entry dates drive period filters, so header edits matter too
+    _bump(instance.company_id)
+
+@receiver([post_save, post_delete], sender=Account)
+def invalidate_reports_for_account(sender, instance, **kwargs):
+    # Account names, numbers, types and hierarchy all appear in reports
+    _bump(instance.company_id)
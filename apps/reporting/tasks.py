@@ -0,0 +1,183 @@
+# C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\tasks.py
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from apps.core.email_transport import email_batch, get_transport, send_message
+from apps.core.email_utils import build_email_message, get_sender_config
+from .export_utils import REPORT_FILE_EXTENSIONS, render_report_to_file
+from .models import ReportSchedule, ReportScheduleRun
+from .services import build_export_rows
+
+logger = logging.getLogger(__name__)
+
+def get_due_schedules(now=None, company_id=None):
+    """Active schedules whose next run time has passed, grouped later by company"""
+    now = now or timezone.now()
+    schedules = ReportSchedule.objects.filter(
+        Q(next_run_at__isnull=True) | Q(next_run_at__lte=now),
+        is_active=True,
+        company__is_active=True
+    ).select_related('company').order_by('company_id', 'id')
+    if company_id:
+        schedules = schedules.filter(company_id=company_id)
+    return list(schedules)
+
+def render_key(schedule, today):
+    """Schedules with the same key in a run share a single rendered file"""
+    start_date, end_date = schedule.get_period_dates(today)
+    return (schedule.report, schedule.format, start_date, end_date)
+
+def deliver_report_schedules(schedules, now=None, log=None):
+    """
+    Renders and emails the given schedules, then moves each one to its next run.
+
+    Schedules are processed company by company: each distinct report/format/period
+    is rendered once straight to disk, and every email for the company is sent over
+    a single SMTP connection. Each outcome goes to ``log`` (e.g. a command's
+    stdout.write), or to this module's logger when None. Returns the
+    ReportScheduleRun records created.
+    """
+    now = now or timezone.now()
+    by_company = defaultdict(list)
+    for schedule in schedules:
+        by_company[schedule.company_id].append(schedule)
+
+    runs = []
+    for company_schedules in by_company.values():
+        runs.extend(_deliver_company_schedules(company_schedules, now, log))
+    return runs
+
+def _render_schedule_file(schedule, start_date, end_date, work_dir):
+    """Renders a schedule's report to work_dir; returns (path, seconds)"""
+    started = time.monotonic()
+    company = schedule.company
+    title, headers, data = build_export_rows(company, schedule.report, start_date, end_date)
+
+    filename = f"{schedule.report}_{company.name.lower().replace(' ', '_')}_{end_date}"
+    path = os.path.join(work_dir, f"{filename}.{REPORT_FILE_EXTENSIONS[schedule.format]}")
+    render_report_to_file(data, headers, title, company.name, schedule.format, path)
+    return path, time.monotonic() - started
+
+def _send_schedule_email(schedule, path, config, today):
+    company = schedule.company
+    title = schedule.get_report_display()
+    html_content = render_to_string('emails/report_delivery.html', {
+        'company': company,
+        'report_type': title,
+        'report_period': schedule.get_period_label(today),
+        'generated_date': timezone.now(),
+    })
+
+    msg, recipients = build_email_message(
+        config.email,
+        f"{title} Report - {company.name}",
+        schedule.get_recipient_list(),
+        html_content=html_content,
+        attachment_path=path
+    )
+    send_message(config, msg, recipients)
+
+def _deliver_company_schedules(schedules, now, log):
+    company = schedules[0].company
+    today = timezone.localdate(now)
+    work_dir = tempfile.mkdtemp(prefix='scheduled_reports_')
+    # render key -> (path, seconds) or the exception the render raised
+    renders = {}
+    runs = []
+
+    config = get_sender_config(company)
+    try:
+        # One connection for every email of this company
+        with email_batch():
+            connection_error = None
+            if config is None:
+                connection_error = "Email credentials are not configured."
+            else:
+                try:
+                    # Connect up front so a bad mailbox fails every schedule without rendering
+                    get_transport(config).open()
+                except Exception as e:
+                    connection_error = f"Could not connect to the mail server: {e}"
+
+            for schedule in schedules:
+                runs.append(_deliver_schedule(schedule, config, connection_error, renders, work_dir, now, today, log))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return runs
+
+def _deliver_schedule(schedule, config, connection_error, renders, work_dir, now, today, log):
+    started_at = timezone.now()
+    started = time.monotonic()
+    key = render_key(schedule, today)
+    shared_render = key in renders
+    render_seconds = 0
+    send_seconds = 0
+    file_size = 0
+    error_message = ''
+
+    try:
+        if connection_error:
+            raise RuntimeError(connection_error)
+
+        if not shared_render:
+            try:
+                renders[key] = _render_schedule_file(schedule, key[2], key[3], work_dir)
+            except Exception as e:
+                # Don't retry the same failing render for the next schedule
+                renders[key] = e
+                raise
+        if isinstance(renders[key], Exception):
+            raise renders[key]
+
+        path, render_seconds = renders[key]
+        file_size = os.path.getsize(path)
+
+        send_started = time.monotonic()
+        _send_schedule_email(schedule, path, config, today)
+        send_seconds = time.monotonic() - send_started
+    except Exception as e:
+        error_message = str(e) or e.__class__.__name__
+
+    run = ReportScheduleRun.objects.create(
+        schedule=schedule,
+        status=ReportScheduleRun.StatusChoices.FAILED if error_message else ReportScheduleRun.StatusChoices.SUCCESS,
+        started_at=started_at,
+        finished_at=timezone.now(),
+        render_seconds=render_seconds,
+        send_seconds=send_seconds,
+        total_seconds=time.monotonic() - started,
+        shared_render=shared_render,
+        file_size=file_size,
+        recipient_count=len(schedule.get_recipient_list()),
+        error_message=error_message,
+    )
+
+    # Failed runs are not retried until the next cadence so a broken mailbox
+    # doesn't get hammered every time the runner is invoked
+    ReportSchedule.objects.filter(pk=schedule.pk).update(
+        last_run_at=started_at,
+        next_run_at=schedule.calculate_next_run(now)
+    )
+
+    if error_message:
+        message = f"ERROR: {schedule} failed: {error_message}"
+    else:
+        message = (
+            f"SUCCESS: {schedule} sent to {run.recipient_count} recipients "
+            f"(render {render_seconds:.2f}s{' shared' if shared_render else ''}, send {send_seconds:.2f}s)"
+        )
+    if log is not None:
+        log(message)
+    elif error_message:
+        logger.error(message)
+    else:
+        logger.info(message)
+    return run
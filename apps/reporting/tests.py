@@ -1,3 +1,202 @@
-from django.test import TestCase
+import io
+import re
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.http import FileResponse
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.accounts.models import Account
+from apps.core.testing import CompanyTestCase
+from apps.journal.models import JournalEntry, JournalEntryLine
+from .cache import get_ledger_version
+from .export_utils import PDF_CHUNKED_ROW_THRESHOLD, PdfReader, export_to_pdf, render_pdf_to_file
+from .models import ReportSchedule, ReportScheduleRun
+from .services import get_trial_balance
+from .tasks import deliver_report_schedules, get_due_schedules
+
+
+class ReportTestCase(CompanyTestCase):
+    company_name = 'Report Co'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bank = cls.system_account(Account.SystemAccount.DEFAULT_CASH)
+        cls.sales = cls.account('4100')
+
+    def setUp(self):
+        cache.clear()
+
+    def post_sale(self, amount, day=date(2026, 1, 5)):
+        entry = JournalEntry.objects.create(company=self.company, date=day, description='Cash sale')
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.bank, debit=Decimal(amount))
+        JournalEntryLine.objects.create(journal_entry=entry, account=self.sales, credit=Decimal(amount))
+        return entry
+
+    def balances(self, report):
+        return {line['code']: (line['debit'], line['credit']) for line in report['lines']}
+
+
+class ReportCacheTests(ReportTestCase):
+    def test_cached_report_is_served_until_the_ledger_changes(self):
+        self.post_sale('100.00')
+        first = get_trial_balance(self.company)
+        self.assertEqual(self.balances(first)['1110'], (Decimal('100.00'), Decimal('0.00')))
+
+        with self.assertNumQueries(1):
+            # Only the version lookup; the dataset comes from the cache
+            self.assertEqual(get_trial_balance(self.company), first)
+
+        self.post_sale('20.00')
+        report = get_trial_balance(self.company)
+        self.assertEqual(self.balances(report)['1110'], (Decimal('120.00'), Decimal('0.00')))
+        self.assertEqual(report['total_debits'], report['total_credits'])
+
+    def test_each_ledger_write_retires_the_cached_reports(self):
+        entry = self.post_sale('100.00')
+        line = entry.lines.get(account=self.bank)
+        account = Account.objects.get(pk=self.sales.pk)
+
+        for change in (lambda: entry.save(), lambda: line.save(), lambda: account.save(), lambda: line.delete()):
+            version = get_ledger_version(self.company.pk)
+            change()
+            self.assertNotEqual(get_ledger_version(self.company.pk), version)
+
+    def test_rolled_back_posting_keeps_the_cached_reports(self):
+        self.post_sale('100.00')
+        get_trial_balance(self.company)
+        version = get_ledger_version(self.company.pk)
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                self.post_sale('50.00')
+                raise IntegrityError('rolled back')
+
+        self.assertEqual(get_ledger_version(self.company.pk), version)
+        self.assertEqual(self.balances(get_trial_balance(self.company))['1110'], (Decimal('100.00'), Decimal('0.00')))
+
+    def test_periods_are_cached_separately(self):
+        self.post_sale('100.00', day=date(2026, 1, 5))
+        self.post_sale('30.00', day=date(2026, 2, 5))
+
+        january = get_trial_balance(self.company, end_date=date(2026, 1, 31))
+        year = get_trial_balance(self.company, end_date=date(2026, 12, 31))
+
+        self.assertEqual(self.balances(january)['1110'][0], Decimal('100.00'))
+        self.assertEqual(self.balances(year)['1110'][0], Decimal('130.00'))
+
+
+@mock.patch('apps.reporting.tasks.send_message')
+@mock.patch('apps.reporting.tasks.get_transport')
+@mock.patch('apps.reporting.tasks.get_sender_config', return_value=SimpleNamespace(email='books@example.com'))
+class ScheduledReportTests(ReportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post_sale('100.00', day=timezone.localdate())
+
+    def schedule(self, name, **fields):
+        fields = {'report': ReportSchedule.ReportChoices.TRIAL_BALANCE, 'format': ReportSchedule.FormatChoices.CSV,
+                  'recipients': 'owner@example.com, accountant@example.com', **fields}
+        return ReportSchedule.objects.create(company=self.company, name=name, **fields)
+
+    def test_only_active_due_schedules_run(self, get_sender_config, get_transport, send_message):
+        now = timezone.now()
+        due = self.schedule('Due', next_run_at=now - timedelta(minutes=1))
+        new = self.schedule('New')
+        self.schedule('Later', next_run_at=now + timedelta(hours=1))
+        self.schedule('Off', is_active=False)
+
+        self.assertEqual(get_due_schedules(now), [due, new])
+
+    def test_same_report_is_rendered_once_and_sent_to_each_schedule(self, get_sender_config, get_transport, send_message):
+        schedules = [self.schedule('Owner'), self.schedule('Board'), self.schedule('Ledger', format='excel')]
+        messages = []
+        now = timezone.now()
+
+        runs = deliver_report_schedules(schedules, now=now, log=messages.append)
+
+        self.assertEqual([run.status for run in runs], [ReportScheduleRun.StatusChoices.SUCCESS] * 3)
+        self.assertEqual([run.shared_render for run in runs], [False, True, False])
+        self.assertEqual([run.recipient_count for run in runs], [2, 2, 2])
+        self.assertEqual(send_message.call_count, 3)
+        self.assertEqual(len(messages), 3)
+        for schedule in ReportSchedule.objects.filter(pk__in=[schedule.pk for schedule in schedules]):
+            self.assertGreater(schedule.next_run_at, now)
+            self.assertIsNotNone(schedule.last_run_at)
+
+    def test_missing_mailbox_fails_every_schedule_until_the_next_cadence(self, get_sender_config, get_transport,
+                                                                       send_message):
+        get_sender_config.return_value = None
+        schedule = self.schedule('Owner')
+        now = timezone.now()
+
+        with self.assertLogs('apps.reporting.tasks', 'ERROR'):
+            [run] = deliver_report_schedules([schedule], now=now)
+
+        self.assertEqual(run.status, ReportScheduleRun.StatusChoices.FAILED)
+        self.assertIn('credentials', run.error_message)
+        send_message.assert_not_called()
+        self.assertEqual(get_due_schedules(now), [])
+
+
+@unittest.skipIf(PdfReader is None, 'pypdf is not installed')
+class PagedPdfTests(SimpleTestCase):
+    headers = ['Reference', 'Description', 'Amount']
+
+    def rows(self, count):
+        # Every few rows wraps onto several lines, so pages hold different numbers of rows
+        return [
+            [f"ROW{number:05d}", 'Long description ' * (number % 7 * 4), Decimal(number) / 4]
+            for number in range(1, count + 1)
+        ]
+
+    def render(self, data, **kwargs):
+        output = io.BytesIO()
+        progress = []
+        pages = render_pdf_to_file(
+            data, self.headers, 'Ledger', 'Paged Co', output,
+            progress_callback=lambda done, total: progress.append((done, total)), **kwargs
+        )
+        output.seek(0)
+        return pages, progress, [page.extract_text() for page in PdfReader(output).pages]
+
+    def assertEveryRowOnce(self, data, texts):
+        references = re.findall(r'ROW\d{5}', ''.join(texts))
+        self.assertEqual(references, [row[0] for row in data])
+
+    def test_rows_are_split_over_pages_without_loss(self):
+        data = self.rows(400)
+        pages, progress, texts = self.render(data)
+
+        self.assertEqual(len(texts), pages)
+        self.assertGreater(pages, 1)
+        self.assertEveryRowOnce(data, texts)
+        # The header row is repeated on every page
+        self.assertTrue(all('Reference' in text for text in texts))
+        self.assertEqual(progress[-1], (400, 400))
+        self.assertEqual(progress, sorted(progress))
+
+    def test_parallel_sections_are_merged_and_numbered(self):
+        data = self.rows(250)
+        with mock.patch('apps.reporting.export_utils.PDF_SECTION_ROWS', 100), \
+                mock.patch('apps.reporting.export_utils.ProcessPoolExecutor', ThreadPoolExecutor):
+            pages, progress, texts = self.render(data, parallel_sections=3)
+
+        self.assertEveryRowOnce(data, texts)
+        self.assertEqual([f"Page {number}" in text for number, text in enumerate(texts, 1)], [True] * pages)
+        self.assertEqual(progress[-1], (250, 250))
+
+    def test_large_export_is_streamed(self):
+        data = self.rows(PDF_CHUNKED_ROW_THRESHOLD + 1)
+        response = export_to_pdf(data, 'ledger', self.headers, 'Ledger', 'Paged Co')
+
+        self.assertIsInstance(response, FileResponse)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
@@ -8,6 +8,8 @@ from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q
 
+from apps.core.routers import replica_reads
+
 # Import all relevant models
 from apps.accounts.models import Account
 from apps.journal.models import JournalEntry, JournalEntryLine
@@ -16,6 +18,73 @@ from apps.customers.models import Customer
 from apps.inventory.models import InventoryItem, InventoryTransaction
 from apps.assets.models import Asset, AssetMaintenance, DepreciationEntry
 
+# Rows fetched per round trip by the streaming exports; on PostgreSQL
+# queryset.iterator() reads them through a server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+def build_general_ledger_export_rows(company, start_date=None, end_date=None):
+    """
+    Flattened general ledger rows used by the CSV and PDF exports: an account header,
+    each line with its running balance, the final balance and a spacer row.
+    All lines are read in a single ordered query instead of one query per account.
+    """
+    from apps.accounts.models import AccountType
+    
+    credit_balance_categories = [
+        AccountType.Category.LIABILITY,
+        AccountType.Category.EQUITY,
+        AccountType.Category.REVENUE
+    ]
+    
+    lines = JournalEntryLine.objects.filter(
+        account__company=company
+    ).select_related(
+        'account__account_type', 'journal_entry'
+    ).order_by('account__account_number', 'journal_entry__date', 'id')
+    if start_date:
+        lines = lines.filter(journal_entry__date__gte=start_date)
+    if end_date:
+        lines = lines.filter(journal_entry__date__lte=end_date)
+    
+    data = []
+    current_account = None
+    running_balance = 0
+    is_credit_balance_account = False
+    
+    for line in lines.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        if line.account_id != getattr(current_account, 'id', None):
+            if current_account is not None:
+                data.append(['', '', '', 'Final Balance:', '', '', running_balance])
+                data.append(['', '', '', '', '', '', ''])  # Spacer
+            
+            current_account = line.account
+            running_balance = 0
+            is_credit_balance_account = current_account.account_type.category in credit_balance_categories
+            
+            # Add account header
+            data.append([f"{current_account.account_number} - {current_account.name}", '', '', '', '', '', ''])
+        
+        if is_credit_balance_account:
+            running_balance += (line.credit - line.debit)
+        else:
+            running_balance += (line.debit - line.credit)
+        
+        data.append([
+            '',
+            '',
+            line.journal_entry.date,
+            line.journal_entry.description,
+            line.debit if line.debit > 0 else '',
+            line.credit if line.credit > 0 else '',
+            running_balance
+        ])
+    
+    if current_account is not None:
+        data.append(['', '', '', 'Final Balance:', '', '', running_balance])
+        data.append(['', '', '', '', '', '', ''])  # Spacer
+    
+    return data
+
 def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=False, last_backup_date=None):
     """
     Exports key company data to a series of CSV files with date range and incremental support.
@@ -104,7 +173,7 @@ def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=
             fields = ['id', 'date', 'description', 'created_by', 'created_at', 'updated_at']
             writer.writerow(fields)
             
-            for entry in journal_entries:
+            for entry in journal_entries.select_related('created_by').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 writer.writerow([
                     entry.id, entry.date, entry.description,
                     entry.created_by.username if entry.created_by else '',
@@ -124,7 +193,7 @@ def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=
             fields = ['id', 'journal_entry_id', 'journal_entry_date', 'account_name', 'account_number', 'debit', 'credit', 'description']
             writer.writerow(fields)
             
-            for line in journal_lines:
+            for line in journal_lines.select_related('journal_entry', 'account').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 writer.writerow([
                     line.id, line.journal_entry.id, line.journal_entry.date,
                     line.account.name, line.account.account_number,
@@ -150,7 +219,7 @@ def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=
                      'total_amount', 'amount_paid', 'reference_number', 'created_at', 'updated_at']
             writer.writerow(fields)
             
-            for txn in transactions:
+            for txn in transactions.select_related('customer').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 writer.writerow([
                     txn.id, txn.transaction_type, txn.date, txn.due_date,
                     txn.customer.name if txn.customer else '',
@@ -167,7 +236,7 @@ def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=
             fields = ['id', 'transaction_id', 'item_name', 'description', 'quantity', 'unit_price', 'line_total']
             writer.writerow(fields)
             
-            for item in transaction_items:
+            for item in transaction_items.select_related('transaction', 'item').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 writer.writerow([
                     item.id, item.transaction.id, item.item.name,
                     item.description, item.quantity, item.unit_price, item.line_total
@@ -233,7 +302,7 @@ def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=
             fields = ['id', 'item_name', 'transaction_type', 'quantity', 'unit_cost', 'total_cost', 'transaction_date', 'notes']
             writer.writerow(fields)
             
-            for txn in inventory_transactions:
+            for txn in inventory_transactions.select_related('item').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 writer.writerow([
                     txn.id, txn.item.name, txn.transaction_type,
                     txn.quantity, txn.unit_cost or 0, txn.total_cost or 0,
@@ -250,7 +319,7 @@ def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=
             fields = ['id', 'item_name', 'purchase_date', 'quantity', 'quantity_remaining', 'unit_cost', 'reference']
             writer.writerow(fields)
             
-            for layer in cost_layers:
+            for layer in cost_layers.select_related('item').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 writer.writerow([
                     layer.id, layer.item.name, layer.purchase_date,
                     layer.quantity, layer.quantity_remaining, layer.unit_cost, layer.reference
@@ -347,6 +416,7 @@ def export_all_data_to_zip(company, start_date=None, end_date=None, incremental=
             
     return zip_filepath
 
+@replica_reads()
 def export_audit_documents_to_zip(company, start_date=None, end_date=None):
     """
     Creates a comprehensive audit package with all financial reports in multiple formats.
@@ -789,7 +859,7 @@ def export_audit_documents_to_zip(company, start_date=None, end_date=None):
             inv_txn_data = []
             inv_txn_headers = ['Date', 'Item', 'Transaction Type', 'Quantity', 'Unit Cost', 'Total Cost', 'Notes']
             
-            for txn in inventory_transactions:
+            for txn in inventory_transactions.select_related('item').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 inv_txn_data.append([
                     txn.transaction_date.date() if hasattr(txn.transaction_date, 'date') else txn.transaction_date,
                     txn.item.name,
@@ -840,7 +910,7 @@ def export_audit_documents_to_zip(company, start_date=None, end_date=None):
             txn_data = []
             txn_headers = ['Date', 'Type', 'Customer', 'Reference', 'Description', 'Total Amount', 'Amount Paid', 'Balance Due']
             
-            for txn in transactions:
+            for txn in transactions.select_related('customer').iterator(chunk_size=EXPORT_CHUNK_SIZE):
                 balance_due = txn.total_amount - txn.amount_paid
                 txn_data.append([
                     txn.date,
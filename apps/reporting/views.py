@@ -1,12 +1,17 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\reporting\views.py
 from django.shortcuts import render
-from django.db.models import Sum, Q
+from django.db.models import Q
 from apps.accounts.models import Account, AccountType
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from apps.authentication.decorators import user_type_required
 from apps.authentication.models import User
 from .export_utils import export_to_csv, export_to_excel, export_to_pdf, export_hierarchical_to_excel
+from .utils import build_general_ledger_export_rows
+from .services import (
+    get_trial_balance, get_income_statement, get_balance_sheet,
+    trial_balance_export_rows, income_statement_export_rows, balance_sheet_export_rows
+)
 from datetime import date
 from apps.journal.models import JournalEntryLine
 from apps.core.models import Company
@@ -43,70 +48,20 @@ def trial_balance_view(request):
 
         if company:
             logger.info(f"Processing accounts for company: {company.name}")
-            accounts = Account.objects.filter(company=company).order_by('account_number')
-            logger.info(f"Found {accounts.count()} accounts")
-            
-            report_lines = []
-            total_debits = safe_decimal(0)
-            total_credits = safe_decimal(0)
-            
-            for account in accounts:
-                try:
-                    balance = safe_decimal(account.get_balance())
-                    logger.debug(f"Account {account.name}: balance = {balance}")
-                    
-                    if balance == 0:
-                        continue
-
-                    # ONLY include accounts that have direct journal entries (leaf accounts)
-                    has_transactions = account.journal_lines.exists()
-                    if not has_transactions:
-                        continue
-                        
-                    debit_balance = safe_decimal(0)
-                    credit_balance = safe_decimal(0)
-                    
-                    # For trial balance, show the natural balance side
-                    if account.account_type.category in [AccountType.Category.ASSET, AccountType.Category.EXPENSE]:
-                        if balance >= 0:
-                            debit_balance = balance
-                            total_debits += balance
-                        else:
-                            # Negative asset/expense balance goes on credit side
-                            credit_balance = abs(balance)
-                            total_credits += abs(balance)
-                    else:
-                        if balance >= 0:
-                            credit_balance = balance
-                            total_credits += balance
-                        else:
-                            # Negative liability/equity/revenue balance goes on debit side
-                            debit_balance = abs(balance)
-                            total_debits += abs(balance)
-                        
-                    report_lines.append({
-                        'code': account.account_number,
-                        'name': account.name,
-                        'debit': debit_balance,
-                        'credit': credit_balance,
-                    })
-                except Exception as e:
-                    logger.error(f"Error processing account {account.name}: {str(e)}")
-                    continue
-                
-            # Calculate the difference
-            difference = abs(total_debits - total_credits)
+            # Shared with export_trial_balance through the report cache
+            report = get_trial_balance(company)
+            report_lines = [line for line in report['lines'] if not line['is_zero']]
                 
             context.update({
                 'company_name': company.name,
                 'report_lines': report_lines,
-                'total_debits': total_debits,
-                'total_credits': total_credits,
-                'difference': difference,
+                'total_debits': report['total_debits'],
+                'total_credits': report['total_credits'],
+                'difference': report['difference'],
             })
             
             logger.info(f"Trial balance completed. Total lines: {len(report_lines)}")
-            logger.info(f"Total debits: {total_debits}, Total credits: {total_credits}, Difference: {difference}")
+            logger.info(f"Total debits: {report['total_debits']}, Total credits: {report['total_credits']}, Difference: {report['difference']}")
         
         return render(request, 'reporting/trial_balance.html', context)
         
@@ -222,51 +177,8 @@ def income_statement(request):
     }
 
     if company:
-        accounts = Account.objects.filter(company=company)
-        report_accounts = accounts.filter(
-            account_type__category__in=[AccountType.Category.REVENUE, AccountType.Category.EXPENSE]
-        )
-        
-        account_balances = report_accounts.annotate(
-            calculated_balance=Sum('journal_lines__credit', default=0) - Sum('journal_lines__debit', default=0)
-        ).exclude(calculated_balance=0)
-
-        revenue_lines = []
-        total_revenue = safe_decimal(0)
-        expense_lines = []
-        total_expenses = safe_decimal(0)
-
-        for account in account_balances:
-            if account.account_type.category == AccountType.Category.REVENUE:
-                # Revenue: Credit balance is positive
-                balance = safe_decimal(account.calculated_balance)
-                total_revenue += balance
-                revenue_lines.append({
-                    'code': account.account_number,
-                    'name': account.name,
-                    'balance': balance,
-                })
-            elif account.account_type.category == AccountType.Category.EXPENSE:
-                # Expense: Debit balance is positive, so flip the sign
-                balance = safe_decimal(account.calculated_balance) * -1
-                total_expenses += balance
-                expense_lines.append({
-                    'code': account.account_number,
-                    'name': account.name,
-                    'balance': balance,
-                })
-
-        net_income = total_revenue - total_expenses
-        
-        context.update({
-            'company_name': company.name, 
-            'revenue_lines': revenue_lines,
-            'total_revenue': total_revenue,
-            'expense_lines': expense_lines,
-            'total_expenses': total_expenses,
-            'net_income': net_income,
-            'is_profit': net_income >= 0,
-        })
+        context.update(get_income_statement(company))
+        context['company_name'] = company.name
     
     return render(request, 'reporting/income_statement.html', context)
 
@@ -279,9 +191,6 @@ def balance_sheet(request):
     """
     company = request.user.company
     
-    # Import currency utilities
-    from apps.core.utils import safe_decimal
-    
     context = {
         'company_name': "No Company Found",
         'today': date.today(),
@@ -289,66 +198,8 @@ def balance_sheet(request):
     }
 
     if company:
-        # 🎯 CRITICAL FIX: Only get accounts that have actual journal entries (leaf accounts)
-        # This prevents double-counting parent/child account relationships
-        accounts_with_transactions = Account.objects.filter(
-            company=company,
-            journal_lines__isnull=False  # Only accounts with actual transactions
-        ).exclude(
-            account_type__category__in=[AccountType.Category.REVENUE, AccountType.Category.EXPENSE]
-        ).distinct().order_by('account_number')
-
-        # Calculate Retained Earnings (Net Income) from Revenue and Expense accounts
-        revenue_accounts = Account.objects.filter(
-            company=company, 
-            account_type__category=AccountType.Category.REVENUE,
-            journal_lines__isnull=False  # Only accounts with transactions
-        ).distinct()
-        
-        expense_accounts = Account.objects.filter(
-            company=company, 
-            account_type__category=AccountType.Category.EXPENSE,
-            journal_lines__isnull=False  # Only accounts with transactions
-        ).distinct()
-        
-        total_revenue = sum(safe_decimal(account.get_balance()) for account in revenue_accounts)
-        total_expenses = sum(safe_decimal(account.get_balance()) for account in expense_accounts)
-        retained_earnings = total_revenue - total_expenses
-
-        # Categorize accounts and calculate totals
-        asset_lines = []
-        liability_lines = []
-        equity_lines = []
-        total_assets = safe_decimal(0)
-        total_liabilities = safe_decimal(0)
-        base_equity = safe_decimal(0)
-
-        for account in accounts_with_transactions:
-            balance = safe_decimal(account.get_balance())
-            if balance == 0:
-                continue
-
-            line_item = {
-                'code': account.account_number,
-                'name': account.name, 
-                'balance': abs(balance)
-            }
-
-            if account.account_type.category == AccountType.Category.ASSET:
-                asset_lines.append(line_item)
-                total_assets += abs(balance)
-            
-            elif account.account_type.category == AccountType.Category.LIABILITY:
-                liability_lines.append(line_item)
-                total_liabilities += abs(balance)
-
-            elif account.account_type.category == AccountType.Category.EQUITY:
-                equity_lines.append(line_item)
-                base_equity += abs(balance)
-
-        # Calculate final equity
-        total_equity = base_equity + retained_earnings
-        total_liabilities_and_equity = total_liabilities + total_equity
+        # 🎯 Leaf accounts only - see build_balance_sheet
+        context.update(get_balance_sheet(company))
 
         # Add currency symbol from company
         currency_symbol = '₦'  # Default
@@ -363,14 +214,6 @@ def balance_sheet(request):
 
         context.update({
             'company_name': company.name,
-            'asset_lines': asset_lines,
-            'liability_lines': liability_lines,
-            'equity_lines': equity_lines,
-            'retained_earnings': retained_earnings,
-            'total_assets': total_assets,
-            'total_liabilities': total_liabilities,
-            'total_equity': total_equity,
-            'total_liabilities_and_equity': total_liabilities_and_equity,
             'currency_symbol': currency_symbol,
         })
 
@@ -386,52 +229,11 @@ def export_trial_balance(request):
     if not company:
         return JsonResponse({'error': 'No company found'}, status=400)
     
-    # --- FIX: Only include accounts that have journal entries (leaf accounts) ---
-    # This prevents double-counting parent accounts and aligns with the on-screen view.
-    accounts = Account.objects.filter(
-        company=company,
-        journal_lines__isnull=False  # This is the critical filter
-    ).distinct().order_by('account_number')
+    # Same cached dataset as the on-screen view (leaf accounts only)
+    report = get_trial_balance(company)
     
     headers = ['Account Code', 'Account Name', 'Debit', 'Credit']
-    data = []
-    total_debits = 0
-    total_credits = 0
-    
-    for account in accounts:
-        # The get_balance() method is now safe to use because we are only iterating over leaf accounts.
-        balance = account.get_balance()
-        
-        # We can skip the 'if balance == 0' check because the journal_lines__isnull=False
-        # filter already implies the account has activity.
-            
-        debit_balance = 0
-        credit_balance = 0
-        
-        if account.account_type.category in [AccountType.Category.ASSET, AccountType.Category.EXPENSE]:
-            if balance >= 0:
-                debit_balance = balance
-                total_debits += balance
-            else:
-                credit_balance = abs(balance)
-                total_credits += abs(balance)
-        else:
-            if balance >= 0:
-                credit_balance = balance
-                total_credits += balance
-            else:
-                debit_balance = abs(balance)
-                total_debits += abs(balance)
-        
-        data.append([
-            account.account_number,
-            account.name,
-            debit_balance if debit_balance > 0 else '',
-            credit_balance if credit_balance > 0 else ''
-        ])
-    
-    # Add totals row
-    data.append(['', 'TOTALS', total_debits, total_credits])
+    data = trial_balance_export_rows(report)
     
     filename = f"trial_balance_{company.name.lower().replace(' ', '_')}_{date.today()}"
     title = "Trial Balance"
@@ -450,52 +252,15 @@ def export_trial_balance(request):
 def export_income_statement(request):
     """Export income statement in requested format"""
     format_type = request.GET.get('format', 'csv')
-    company = request.user.company  # 🎯 FIX: Remove duplicate assignment
+    company = request.user.company
     
     if not company:
         return JsonResponse({'error': 'No company found'}, status=400)
     
-    headers = ['Account Code', 'Account Name', 'Amount']
-    data = []
-    
-    # Revenue section
-    data.append(['', '=== REVENUE ===', ''])
-    revenue_accounts = Account.objects.filter(
-        company=company,  # 🎯 FIX: Use company object directly
-        account_type__category=AccountType.Category.REVENUE
-    ).annotate(
-        calculated_balance=Sum('journal_lines__credit', default=0) - Sum('journal_lines__debit', default=0)
-    ).exclude(calculated_balance=0)
-    
-    total_revenue = 0
-    for account in revenue_accounts:
-        balance = account.calculated_balance
-        total_revenue += balance
-        data.append([account.account_number, account.name, balance])
-    
-    data.append(['', 'Total Revenue', total_revenue])
-    data.append(['', '', ''])
+    report = get_income_statement(company)
     
-    # Expense section
-    data.append(['', '=== EXPENSES ===', ''])
-    expense_accounts = Account.objects.filter(
-        company=company,  # 🎯 FIX: Use company object directly
-        account_type__category=AccountType.Category.EXPENSE
-    ).annotate(
-        calculated_balance=Sum('journal_lines__credit', default=0) - Sum('journal_lines__debit', default=0)
-    ).exclude(calculated_balance=0)
-    
-    total_expenses = 0
-    for account in expense_accounts:
-        balance = account.calculated_balance * -1
-        total_expenses += balance
-        data.append([account.account_number, account.name, balance])
-    
-    data.append(['', 'Total Expenses', total_expenses])
-    data.append(['', '', ''])
-    
-    net_income = total_revenue - total_expenses
-    data.append(['', '=== NET INCOME ===', net_income])
+    headers = ['Account Code', 'Account Name', 'Amount']
+    data = income_statement_export_rows(report)
     
     filename = f"income_statement_{company.name.lower().replace(' ', '_')}_{date.today()}"
     title = "Income Statement"
@@ -567,40 +332,7 @@ def export_general_ledger(request):
     else:
         # For CSV and PDF, flatten the data
         headers = ['Account Code', 'Account Name', 'Date', 'Description', 'Debit', 'Credit', 'Balance']
-        data = []
-        
-        for account in accounts_with_transactions:
-            lines = JournalEntryLine.objects.filter(account=account).order_by('journal_entry__date', 'id')
-            
-            running_balance = 0
-            is_credit_balance_account = account.account_type.category in [
-                AccountType.Category.LIABILITY, 
-                AccountType.Category.EQUITY, 
-                AccountType.Category.REVENUE
-            ]
-            
-            # Add account header
-            data.append([f"{account.account_number} - {account.name}", '', '', '', '', '', ''])
-            
-            for line in lines:
-                if is_credit_balance_account:
-                    running_balance += (line.credit - line.debit)
-                else:
-                    running_balance += (line.debit - line.credit)
-
-                data.append([
-                    '',
-                    '',
-                    line.journal_entry.date,
-                    line.journal_entry.description,
-                    line.debit if line.debit > 0 else '',
-                    line.credit if line.credit > 0 else '',
-                    running_balance
-                ])
-            
-            # Add final balance
-            data.append(['', '', '', 'Final Balance:', '', '', running_balance])
-            data.append(['', '', '', '', '', '', ''])  # Spacer
+        data = build_general_ledger_export_rows(company)
         
         title = "General Ledger"
         
@@ -621,75 +353,11 @@ def export_balance_sheet(request):
     if not company:
         return JsonResponse({'error': 'No company found'}, status=400)
 
-    # --- FIX: Use the same correct logic as the on-screen view ---
-    # 1. Only get accounts that have actual journal entries (leaf accounts).
-    # This is the critical fix to prevent double-counting parent accounts.
-    accounts_with_transactions = Account.objects.filter(
-        company=company,
-        journal_lines__isnull=False
-    ).exclude(
-        account_type__category__in=[AccountType.Category.REVENUE, AccountType.Category.EXPENSE]
-    ).distinct().order_by('account_number')
-
-    # 2. Calculate Retained Earnings using the same robust method as the view.
-    revenue_accounts = Account.objects.filter(
-        company=company, 
-        account_type__category=AccountType.Category.REVENUE,
-        journal_lines__isnull=False
-    ).distinct()
-    
-    expense_accounts = Account.objects.filter(
-        company=company, 
-        account_type__category=AccountType.Category.EXPENSE,
-        journal_lines__isnull=False
-    ).distinct()
-    
-    total_revenue = sum(account.get_balance() for account in revenue_accounts)
-    total_expenses = sum(account.get_balance() for account in expense_accounts)
-    retained_earnings = total_revenue - total_expenses
+    # Same cached dataset as the on-screen view (leaf accounts only)
+    report = get_balance_sheet(company)
 
     headers = ['Account Code', 'Account Name', 'Amount']
-    data = []
-    
-    # --- ASSETS ---
-    data.append(['', '=== ASSETS ===', ''])
-    total_assets = 0
-    for account in accounts_with_transactions:
-        if account.account_type.category == AccountType.Category.ASSET:
-            balance = account.get_balance()
-            if balance != 0:
-                data.append([account.account_number, account.name, abs(balance)])
-                total_assets += abs(balance)
-    data.append(['', 'Total Assets', total_assets])
-    data.append(['', '', ''])
-    
-    # --- LIABILITIES ---
-    data.append(['', '=== LIABILITIES ===', ''])
-    total_liabilities = 0
-    for account in accounts_with_transactions:
-        if account.account_type.category == AccountType.Category.LIABILITY:
-            balance = account.get_balance()
-            if balance != 0:
-                data.append([account.account_number, account.name, abs(balance)])
-                total_liabilities += abs(balance)
-    data.append(['', 'Total Liabilities', total_liabilities])
-    data.append(['', '', ''])
-    
-    # --- EQUITY ---
-    data.append(['', '=== EQUITY ===', ''])
-    base_equity = 0
-    for account in accounts_with_transactions:
-        if account.account_type.category == AccountType.Category.EQUITY:
-            balance = account.get_balance()
-            if balance != 0:
-                data.append([account.account_number, account.name, abs(balance)])
-                base_equity += abs(balance)
-    
-    data.append(['', 'Retained Earnings', retained_earnings])
-    total_equity = base_equity + retained_earnings
-    data.append(['', 'Total Equity', total_equity])
-    data.append(['', '', ''])
-    data.append(['', 'Total Liabilities & Equity', total_liabilities + total_equity])
+    data = balance_sheet_export_rows(report)
     
     filename = f"balance_sheet_{company.name.lower().replace(' ', '_')}_{date.today()}"
     title = "Balance Sheet"
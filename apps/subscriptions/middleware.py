@@ -3,7 +3,7 @@ from django.shortcuts import redirect
 from django.urls import reverse
 from django.conf import settings
 from django.contrib import messages
-from .models import Subscription
+from .utils import get_company_access
 
 class SubscriptionValidationMiddleware:
     """
@@ -32,19 +32,19 @@ class SubscriptionValidationMiddleware:
         if request.user.is_superuser:
             return self.get_response(request)
 
-        # Main validation logic
-        company = request.user.company
-        if not company:
+        # Main validation logic (the company's access state is loaded once and
+        # shared with views, context processors and template tags)
+        access = get_company_access(request.user)
+        if not access.company_id:
             messages.error(request, "Your user account is not associated with a company.")
             return redirect('auth:login')
 
-        try:
-            subscription = company.subscription
-            if not subscription.is_valid():
-                messages.warning(request, "Your subscription is inactive or has expired. Please contact support.")
-                return redirect('subscriptions:status')
-        except Subscription.DoesNotExist:
+        if not access.has_subscription:
             messages.error(request, "No active subscription found for your company. Please contact support.")
             return redirect('subscriptions:status')
+
+        if not access.has_valid_subscription:
+            messages.warning(request, "Your subscription is inactive or has expired. Please contact support.")
+            return redirect('subscriptions:status')
         
         return self.get_response(request)
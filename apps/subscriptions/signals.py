@@ -2,18 +2,19 @@
 import secrets
 import string
 import random  # <-- ACTION: Import the random module
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 from django.conf import settings
-from django.core.management import call_command
 from django.db import transaction
 
 from .models import RegistrationRequest, Subscription
 from apps.core.models import Company
+from apps.core.bootstrap import bootstrap_company
 from apps.authentication.models import User
 from apps.core.email_utils import send_email
+from .utils import invalidate_company_access
 
 def generate_random_password(length=12):
     """Generates a secure random password."""
@@ -114,10 +115,8 @@ def approve_registration_request(sender, instance, created, **kwargs):
 
             try:
                 print(f"\nINFO: Starting automatic setup for new company '{company.name}' (ID: {company.id})...")
-                print(f"  -> Seeding Chart of Accounts for company {company.id}...")
-                call_command('seed_coa', company.id)
-                print(f"  -> Creating default transaction categories for company {company.id}...")
-                call_command('create_default_categories', company_id=company.id)
+                # Chart of accounts, categories and settings in a handful of bulk inserts
+                bootstrap_company(company)
                 print(f"SUCCESS: Automatic setup for company {company.id} complete.\n")
             except Exception as e:
                 print(f"ERROR: Automatic data seeding failed for company {company.id}: {e}")
@@ -143,3 +142,13 @@ def approve_registration_request(sender, instance, created, **kwargs):
         instance.admin_notes = f"{admin_note_suffix} Company '{company.name}' and admin user '{admin_user.username}' created."
         instance.save(update_fields=['verified_at', 'admin_notes'])
 
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscription_access(sender, instance, **kwargs):
+    """Subscription changes must reach the middleware without waiting for the cache to expire."""
+    invalidate_company_access(instance.company_id)
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_access_on_change(sender, instance, **kwargs):
+    invalidate_company_access(instance.pk)
@@ -1,3 +1,60 @@
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from apps.authentication.models import User
+from apps.core.models import Company
+from apps.core.versions import bump_version, get_version
+from .models import Subscription
+from .utils import COMPANY_ACCESS_VERSION, company_access_cache_key, get_company_access
+
+
+class CompanyAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Access Co', currency='USD')
+        cls.subscription = Subscription.objects.create(
+            company=cls.company, plan=Subscription.Plan.DELUXE, status=Subscription.Status.ACTIVE, is_active=True,
+        )
+        cls.user = User.objects.create_user(username='owner', password='x', company=cls.company)
+
+    def setUp(self):
+        cache.clear()
+
+    def access(self):
+        # A fresh user object per "request", as the auth middleware loads it
+        return get_company_access(User.objects.get(pk=self.user.pk))
+
+    def test_only_flags_are_cached(self):
+        access = self.access()
+        self.assertTrue(access.has_valid_subscription)
+        self.assertTrue(access.has_production_plan)
+        self.assertEqual(access.currency, 'USD')
+
+        self.assertEqual(access.company, self.company)
+        cached = cache.get(company_access_cache_key(self.company.pk, get_version(COMPANY_ACCESS_VERSION, self.company.pk)))
+        self.assertEqual(cached[:2], (True, 'USD'))
+        self.assertEqual(set(cached[2]), {'plan', 'status', 'is_active', 'expires_on'})
+
+    def test_saved_changes_are_seen_at_once(self):
+        self.assertTrue(self.access().has_valid_subscription)
+
+        self.subscription.status = Subscription.Status.EXPIRED
+        self.subscription.save()
+
+        self.assertFalse(self.access().has_valid_subscription)
+
+    def test_version_bumped_elsewhere_retires_this_process_copy(self):
+        self.assertTrue(self.access().has_valid_subscription)
+
+        # Another worker saved the subscription: the row changed and so did the version, not this cache
+        Subscription.objects.filter(pk=self.subscription.pk).update(is_active=False)
+        self.assertTrue(self.access().has_valid_subscription)
+        bump_version(COMPANY_ACCESS_VERSION, self.company.pk)
+
+        self.assertFalse(self.access().has_valid_subscription)
+
+    def test_user_without_a_company(self):
+        user = User.objects.create_user(username='drifter', password='x')
+        access = get_company_access(user)
+        self.assertIsNone(access.company)
+        self.assertFalse(access.has_subscription)
@@ -1,7 +1,92 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\subscriptions\utils.py
 
+from django.conf import settings
+from django.core.cache import cache
+from apps.core.models import Company
+from apps.core.versions import bump_version, get_version
 from apps.subscriptions.models import Subscription
 
+# Only DELUXE and PREMIUM plans have production features
+PRODUCTION_PLANS = [Subscription.Plan.DELUXE, Subscription.Plan.PREMIUM]
+
+COMPANY_ACCESS_CACHE_PREFIX = 'company_access'
+COMPANY_ACCESS_VERSION = 'company_access'
+SUBSCRIPTION_FIELDS = ('plan', 'status', 'is_active', 'expires_on')
+
+def company_access_cache_key(company_id, version):
+    return f"{COMPANY_ACCESS_CACHE_PREFIX}:{company_id}:{version}"
+
+def invalidate_company_access(company_id):
+    """Retire the cached access state of a company in every process (see subscriptions.signals)"""
+    bump_version(COMPANY_ACCESS_VERSION, company_id)
+
+class CompanyAccess:
+    """
+    The company and subscription state of a user, loaded once per request. Only
+    ids and flags are shared between requests; the company itself is read from
+    the database when asked for. Validity is evaluated on each check since it
+    depends on the current time.
+    """
+    def __init__(self, user=None, company_id=None, currency=None, subscription=None):
+        self.user = user
+        self.company_id = company_id
+        self.currency = currency
+        # {field: value} for SUBSCRIPTION_FIELDS, None without a subscription
+        self.subscription = subscription
+
+    @property
+    def company(self):
+        return self.user.company if self.company_id else None
+
+    @property
+    def has_subscription(self):
+        return self.subscription is not None
+
+    @property
+    def has_valid_subscription(self):
+        # An unsaved Subscription holding the cached flags, so the rule stays Subscription.is_valid()
+        return self.subscription is not None and Subscription(**self.subscription).is_valid()
+
+    @property
+    def has_production_plan(self):
+        return self.subscription is not None and self.subscription['plan'] in PRODUCTION_PLANS
+
+def _load_company_access(company_id):
+    """
+    (company exists, currency, subscription flags) from the shared cache, keyed
+    on the company's access version, or two queries on a miss
+    """
+    key = company_access_cache_key(company_id, get_version(COMPANY_ACCESS_VERSION, company_id))
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    company = Company.objects.filter(pk=company_id).values('currency').first()
+    subscription = (
+        Subscription.objects.filter(company_id=company_id).values(*SUBSCRIPTION_FIELDS).first() if company else None
+    )
+    cached = (company is not None, company['currency'] if company else None, subscription)
+    cache.set(key, cached, timeout=getattr(settings, 'COMPANY_ACCESS_CACHE_TIMEOUT', 60))
+    return cached
+
+def get_company_access(user):
+    """
+    CompanyAccess for ``user``, computed once and kept on the user object for the
+    rest of the request.
+    """
+    access = getattr(user, '_company_access', None)
+    if access is not None:
+        return access
+
+    company_id = getattr(user, 'company_id', None) if user.is_authenticated else None
+    access = CompanyAccess(user)
+    if company_id:
+        exists, currency, subscription = _load_company_access(company_id)
+        if exists:
+            access = CompanyAccess(user, company_id, currency, subscription)
+    user._company_access = access
+    return access
+
 def has_production_access(user):
     """Check if user's subscription plan includes production management features."""
     if not user.is_authenticated:
@@ -10,13 +95,4 @@ def has_production_access(user):
     if user.is_superuser:
         return True
     
-    company = user.company
-    if not company:
-        return False
-    
-    subscription = company.subscription
-    if not subscription:
-        return False
-    
-    # Only DELUXE and PREMIUM plans have production features
-    return subscription.plan in [Subscription.Plan.DELUXE, Subscription.Plan.PREMIUM]
\ No newline at end of file
+    return get_company_access(user).has_production_plan
@@ -1,29 +1,29 @@
 # C:\Users\Adeyanju Joshua\Desktop\lexy sofware\accounting_system_2\apps\transactions\api_views.py
 from django.http import JsonResponse
-from django.db.models import Q
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 import json
+from apps.core.picker import CUSTOMER, picker_etag, search_projection
+from apps.core.search import paginate_request, search_queryset
 from .models import Transaction, Customer
 
 @login_required
 @require_http_methods(["GET"])
 def transaction_search_api(request):
     query = request.GET.get('q', '').strip()
-    limit = int(request.GET.get('limit', 15))
+    page, limit = paginate_request(request, default_limit=15)
     
     if not query:
-        return JsonResponse({'results': []})
+        return JsonResponse({'results': [], 'page': page, 'has_more': False})
     
     # Search transactions
-    transactions = Transaction.objects.filter(
-        company=request.user.company
-    ).filter(
-        Q(reference_number__icontains=query) |
-        Q(description__icontains=query) |
-        Q(customer__name__icontains=query)
-    ).select_related('customer')[:limit]
+    transactions, has_more = search_queryset(
+        Transaction.objects.filter(company=request.user.company).select_related('customer'),
+        'transaction', request.user.company_id, query, page, limit,
+        fallback_fields=('reference_number', 'description', 'customer__name')
+    )
     
     results = []
     for transaction in transactions:
@@ -39,53 +39,50 @@ def transaction_search_api(request):
             'date': transaction.date.strftime('%Y-%m-%d')
         })
     
-    return JsonResponse({'results': results})
+    return JsonResponse({'results': results, 'page': page, 'has_more': has_more})
+
+def _customer_picker_etag(request):
+    return picker_etag(CUSTOMER, request.user.company_id, request)
 
 @login_required
 @require_http_methods(["GET"])
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_customer_picker_etag)
 def smart_customer_search_api(request):
     """Smart customer search based on transaction type"""
     query = request.GET.get('q', '').strip()
     transaction_type = request.GET.get('transaction_type', '')
-    limit = int(request.GET.get('limit', 15))
-    
-    company = request.user.company
-    customers = Customer.objects.filter(company=company)
+    page, limit = paginate_request(request, default_limit=15)
     
     # Filter by transaction type compatibility
-    if transaction_type:
-        if transaction_type in ['SALE', 'PAYMENT']:
-            # Sales and payments - show customers and both
-            customers = customers.filter(entity_type__in=[Customer.CUSTOMER, Customer.BOTH])
-        elif transaction_type in ['PURCHASE', 'EXPENSE']:
-            # Purchases and expenses - show vendors and both
-            customers = customers.filter(entity_type__in=[Customer.VENDOR, Customer.BOTH])
+    entity_types = None
+    if transaction_type in ['SALE', 'PAYMENT']:
+        # Sales and payments - show customers and both
+        entity_types = {Customer.CUSTOMER, Customer.BOTH}
+    elif transaction_type in ['PURCHASE', 'EXPENSE']:
+        # Purchases and expenses - show vendors and both
+        entity_types = {Customer.VENDOR, Customer.BOTH}
     
     # Apply search filter
-    if query:
-        customers = customers.filter(
-            Q(name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(phone__icontains=query) |
-            Q(company_name__icontains=query)
-        )
-    
-    customers = customers[:limit]
+    customers, has_more = search_projection(
+        CUSTOMER, request.user.company_id, query, page, limit,
+        row_filter=(lambda row: row['entity_type'] in entity_types) if entity_types else None
+    )
     
     results = []
     for customer in customers:
         results.append({
-            'id': customer.id,
-            'name': customer.name,
-            'email': customer.email or '',
-            'phone': customer.phone or '',
-            'entity_type': customer.get_entity_type_display(),
-            'receivable_balance': str(customer.receivable_balance),
-            'payable_balance': str(customer.payable_balance),
+            'id': customer['id'],
+            'name': customer['name'],
+            'email': customer['email'],
+            'phone': customer['phone'],
+            'entity_type': customer['entity_type_display'],
+            'receivable_balance': str(customer['receivable_balance']),
+            'payable_balance': str(customer['payable_balance']),
             'is_compatible': True  # Already filtered above
         })
     
-    return JsonResponse({'results': results})
+    return JsonResponse({'results': results, 'page': page, 'has_more': has_more})
 
 @login_required
 @csrf_exempt
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_search_index'),
+        ('customers', '0004_customer_payable_balance_customer_receivable_balance'),
+        ('journal', '0002_journalentry_journal_company_date_idx'),
+        ('transactions', '0007_expenseline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['company', 'date', 'id'], name='transaction_company_date_idx'),
+        ),
+    ]
@@ -144,6 +144,10 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Keyset pagination of the transaction list
+            models.Index(fields=['company', 'date', 'id'], name='transaction_company_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_transaction_type_display()} #{self.id} for {self.customer or 'N/A'}"
@@ -175,11 +179,12 @@ class Transaction(models.Model):
         # For now, return 0 - you can implement tax calculation later
         return Decimal('0.00')
     
-    def save(self, *args, **kwargs):
+    def save(self, *args, update_customer_balances=True, **kwargs):
         super().save(*args, **kwargs)
         
-        # Auto-update customer balances when transaction changes
-        if self.customer:
+        # Auto-update customer balances when transaction changes; callers that
+        # adjust the balances themselves (see apps.customers.payments) opt out
+        if self.customer and update_customer_balances:
             self.customer.update_balances()
 
 class ExpenseLine(models.Model):
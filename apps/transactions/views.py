@@ -3,14 +3,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
 from django.contrib import messages
-from django.db import transaction
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import ListView, CreateView, UpdateView, DetailView
 from django.urls import reverse_lazy
 from django.views.decorators.http import require_GET
 from django.http import JsonResponse
 from django.db.models import Q, F
-from django.core.paginator import Paginator
 from apps.reporting.export_utils import export_to_csv, export_to_excel, export_to_pdf
 from datetime import date
 from django.utils import timezone
@@ -24,7 +22,11 @@ from .models import Transaction, TransactionItem
 from .forms import TransactionForm, TransactionItemFormSet
 from .services import create_journal_entry_for_transaction
 from apps.customers.models import Customer
+from apps.customers.payments import PaymentAllocationError, allocate_payment, payment_kind_for
 from apps.accounts.models import Account, AccountType
+from apps.core.counters import TRANSACTIONS, get_monthly_counters, sum_counters
+from apps.core.pagination import keyset_paginate
+from apps.core.sqlite import immediate_atomic
 from .constants import TransactionType
 
 from .models import TransactionCategory, ExpenseLine  
@@ -119,7 +121,7 @@ class TransactionListView(LoginRequiredMixin, RoleRequiredMixin, View):
     
     def get(self, request):
         company = request.user.company
-        transactions = Transaction.objects.filter(company=company).order_by('-date')
+        transactions = Transaction.objects.filter(company=company)
         
         search_query = request.GET.get('search', '')
         if search_query:
@@ -152,9 +154,10 @@ class TransactionListView(LoginRequiredMixin, RoleRequiredMixin, View):
         if date_to:
             transactions = transactions.filter(date__lte=date_to)
         
-        paginator = Paginator(transactions, 25) 
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Cursor pages by (date, id); an unfiltered list takes its size from the monthly counters
+        filtered = any([search_query, transaction_type, payment_status, customer_id, date_from, date_to])
+        total = None if filtered else sum_counters(get_monthly_counters(TRANSACTIONS, company.id)).get('count', 0)
+        page_obj = keyset_paginate(request, transactions, 25, count=total)
         
         customers = Customer.objects.filter(company=company).order_by('name')
         
@@ -239,7 +242,7 @@ class TransactionCreateView(LoginRequiredMixin, RoleRequiredMixin, View):
 
         if is_form_valid and is_formset_valid:
             try:
-                with transaction.atomic():
+                with immediate_atomic():
                     transaction_obj = form.save(commit=False)
                     transaction_obj.company = request.user.company
                     transaction_obj.created_by = request.user
@@ -334,7 +337,7 @@ class TransactionUpdateView(LoginRequiredMixin, RoleRequiredMixin, View):
 
         if is_form_valid and is_formset_valid:
             try:
-                with transaction.atomic():
+                with immediate_atomic():
                     updated_transaction = form.save(commit=False)
                     updated_transaction.updated_by = request.user
                     
@@ -414,18 +417,34 @@ class RecordPaymentView(LoginRequiredMixin, RoleRequiredMixin, View):
                 messages.error(request, "Payment amount cannot exceed the balance due.")
                 return redirect('transactions:record_payment', pk=pk)
             
-            # Update transaction
-            with transaction.atomic():
-                transaction_obj.amount_paid += payment_amount
-                transaction_obj.save()
-                
-                # Update customer balance
-                if transaction_obj.customer:
-                    transaction_obj.customer.update_balances()
+            kind = payment_kind_for(transaction_obj)
+            if transaction_obj.customer and kind:
+                # Payment transaction, journal entry and balance delta in one go
+                allocate_payment(
+                    transaction_obj.customer,
+                    payment_amount,
+                    kind=kind,
+                    allocations=[(transaction_obj.id, payment_amount)],
+                    payment_date=payment_date or None,
+                    notes=' - '.join(part for part in (payment_method, payment_reference.strip()) if part),
+                    user=request.user,
+                )
+            else:
+                # Update transaction
+                with immediate_atomic():
+                    transaction_obj.amount_paid += payment_amount
+                    transaction_obj.save()
+                    
+                    # Update customer balance
+                    if transaction_obj.customer:
+                        transaction_obj.customer.update_balances()
             
             messages.success(request, f"Payment of {payment_amount} recorded successfully!")
             return redirect('transactions:transaction_detail', pk=pk)
             
+        except PaymentAllocationError as e:
+            messages.error(request, str(e))
+            return redirect('transactions:record_payment', pk=pk)
         except (ValueError, TypeError) as e:
             messages.error(request, "Invalid payment amount entered.")
             return redirect('transactions:record_payment', pk=pk)
@@ -14,6 +14,8 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv  # Import the load_dotenv function
 
+from .database import database_from_env, replica_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -80,6 +82,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'apps.authentication.middleware.PasswordChangeMiddleware',
     'apps.subscriptions.middleware.SubscriptionValidationMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -107,13 +110,59 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuning profile applied to every new connection (see apps/core/sqlite.py)
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', 'True') == 'True'
+# Seconds a writer waits for the database lock before "database is locked"
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 20))
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64000)),  # Negative: KiB
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 268435456)),
+    'temp_store': 'MEMORY',
+}
+
+# DATABASE_URL / DB_* environment variables (see config/database.py); SQLite by default
 DATABASES = {
+    'default': database_from_env(BASE_DIR, sqlite_timeout=SQLITE_BUSY_TIMEOUT),
+}
+
+# Read replica (REPLICA_DATABASE_URL) for reports, exports and audit packages; backups
+# always read the primary. Without it everything runs on 'default' (see apps/core/routers.py)
+REPLICA_DATABASE_ALIAS = 'replica'
+_replica = replica_from_env(BASE_DIR, sqlite_timeout=SQLITE_BUSY_TIMEOUT)
+if _replica:
+    DATABASES[REPLICA_DATABASE_ALIAS] = _replica
+DATABASE_ROUTERS = ['apps.core.routers.ReplicaRouter']
+# Seconds a user's reads stay on the primary after they post something (read-your-writes)
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
+# Cache used for report results (see apps/reporting/cache.py). Cached values are
+# keyed on versions stored in the database (apps/core/versions.py), so a change
+# retires them in every process. Local memory is still per process: each worker
+# builds its own copy; point this at Redis/Memcached to share them.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wj-accounting',
     }
 }
 
+# Seconds a cached report is kept; ledger changes invalidate it earlier
+REPORT_CACHE_TIMEOUT = int(os.getenv('REPORT_CACHE_TIMEOUT', 3600))
+# Reports built on the replica may lag the ledger version they are cached under
+REPLICA_REPORT_CACHE_TIMEOUT = int(os.getenv('REPLICA_REPORT_CACHE_TIMEOUT', 30))
+# Company/subscription flags shared by the middleware, context processors and
+# template tags; keyed on a version bumped on save, so this only bounds
+# staleness from raw updates
+COMPANY_ACCESS_CACHE_TIMEOUT = int(os.getenv('COMPANY_ACCESS_CACHE_TIMEOUT', 60))
+# Per-month list counters (transactions, journal entries, movements); invalidated on save
+MONTHLY_COUNTERS_CACHE_TIMEOUT = int(os.getenv('MONTHLY_COUNTERS_CACHE_TIMEOUT', 86400))
+# Material requirements plan and its inputs; keyed by versions bumped on save
+MRP_CACHE_TIMEOUT = int(os.getenv('MRP_CACHE_TIMEOUT', 3600))
+# Typeahead picker projections (whole catalogues) each process keeps in memory
+PICKER_MAX_PROJECTIONS = int(os.getenv('PICKER_MAX_PROJECTIONS', 64))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -191,6 +240,10 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 
+# Transport used by apps.core.email_utils: 'smtp', 'console' or 'file' (writes .eml files)
+EMAIL_TRANSPORT = os.getenv('EMAIL_TRANSPORT', 'smtp')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'sent_emails'))
+
 # Email settings for different purposes
 COMPANY_EMAIL = os.getenv('COMPANY_EMAIL', DEFAULT_FROM_EMAIL)
 ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', DEFAULT_FROM_EMAIL)